@@ -79,6 +79,12 @@ function main() {
         PIPELINE="${RELEASE_PIPELINE_NAME}"
     fi
 
+    # Validating all pipelines works offline and needs no foundation
+    if [[ "${COMMAND}" == "validate" && "${PIPELINE}" == "all" ]]; then
+        cmd_validate_all_pipelines
+        return
+    fi
+
     # Validate required parameters
     if [[ -z "${FOUNDATION}" ]]; then
         error "Foundation not specified. Use -f or --foundation option."
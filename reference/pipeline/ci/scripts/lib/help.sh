@@ -102,9 +102,11 @@ EOF
     ;;
   validate)
     cat <<EOF
-Usage: fly.sh [options] validate [pipeline_name]
+Usage: fly.sh [options] validate [pipeline_name|all]
 
 Validate a pipeline YAML without setting it in Concourse.
+Specify 'all' to check every pipeline in the pipelines directory offline,
+without fly and without modifying the files.
 
 Options:
   -f, --foundation     Specify foundation (for parameter interpolation)
@@ -114,6 +116,7 @@ Options:
 Examples:
   ./fly.sh -f cml-k8s-n-01 validate
   ./fly.sh -f cml-k8s-n-01 -p custom validate
+  ./fly.sh validate all
 EOF
     ;;
   release)
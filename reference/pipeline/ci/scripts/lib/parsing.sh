@@ -19,34 +19,34 @@ function process_args() {
 
         # Handle options with values
         if [[ "${arg}" == "-f" || "${arg}" == "--foundation" ]]; then
-            ((i++))
+            i=$((i + 1))
             FOUNDATION="${args[$i]}"
         elif [[ "${arg}" == "-t" || "${arg}" == "--target" ]]; then
-            ((i++))
+            i=$((i + 1))
             TARGET="${args[$i]}"
         elif [[ "${arg}" == "-b" || "${arg}" == "--branch" ]]; then
-            ((i++))
+            i=$((i + 1))
             BRANCH="${args[$i]}"
         elif [[ "${arg}" == "-p" || "${arg}" == "--pipeline" ]]; then
-            ((i++))
+            i=$((i + 1))
             PIPELINE="${args[$i]}"
         elif [[ "${arg}" == "-P" || "${arg}" == "--params-repo" ]]; then
-            ((i++))
+            i=$((i + 1))
             PARAMS_REPO="${args[$i]}"
         elif [[ "${arg}" == "-d" || "${arg}" == "--params-branch" ]]; then
-            ((i++))
+            i=$((i + 1))
             PARAMS_GIT_BRANCH="${args[$i]}"
         elif [[ "${arg}" == "-e" || "${arg}" == "--environment" ]]; then
-            ((i++))
+            i=$((i + 1))
             ENVIRONMENT="${args[$i]}"
         elif [[ "${arg}" == "-v" || "${arg}" == "--version" ]]; then
-            ((i++))
+            i=$((i + 1))
             VERSION="${args[$i]}"
         elif [[ "${arg}" == "--version-file" ]]; then
-            ((i++))
+            i=$((i + 1))
             VERSION_FILE="${args[$i]}"
         elif [[ "${arg}" == "--timer-duration" ]]; then
-            ((i++))
+            i=$((i + 1))
             TIMER_DURATION="${args[$i]}"
 
         # Handle boolean flags
@@ -78,7 +78,7 @@ function process_args() {
             positional_args+=("${arg}")
         fi
 
-        ((i++))
+        i=$((i + 1))
     done
 
     # Process positional arguments if any
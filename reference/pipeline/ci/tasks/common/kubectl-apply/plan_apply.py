@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+#
+# plan_apply.py - Dependency-ordered, sharded apply plan for the kubectl-apply task
+#
+# Reads every manifest under the manifests directory, classifies each object by
+# kind and namespace and groups the objects into waves that must be applied in
+# order, because objects of a later wave refer to objects of an earlier one:
+#   1. crds        CustomResourceDefinitions
+#   2. namespaces  Namespaces
+#   3. cluster     other cluster-scoped objects, e.g. ClusterRoles and StorageClasses
+#   4. rbac        ServiceAccounts, Roles and RoleBindings
+#   5. config      ConfigMaps, Secrets, quotas, limit ranges, network policies and claims
+#   6. workloads   Deployments, Services, Ingresses, custom resources and any other kind
+#   7. webhooks    admission webhooks, last so they cannot reject the waves before them
+#
+# Objects of different namespaces do not depend on each other, so each wave is
+# split into shards that can be applied in parallel: every namespace goes to one
+# shard, balanced by object count, and the cluster-scoped objects of a wave form
+# a shard of their own.
+#
+# Only objects of the listed KINDS are planned. NAMESPACE_LIMIT counts
+# namespaces rather than the manifest files scripts/apply.sh counts without a
+# plan: only the objects of the first NAMESPACE_LIMIT namespaces sorted by name
+# (a Namespace object belonging to itself) are planned, together with every
+# cluster-scoped object. The limit is applied before the waves are built.
+#
+# Usage: plan_apply.py --manifests DIR [--kinds all] [--namespace-limit 0] [--shards 4]
+#                      (--output-dir DIR | --dry-run) [--json]
+#
+
+import argparse
+import json
+import os
+import sys
+
+try:
+    import yaml
+except ImportError:
+    print("ERROR: PyYAML is required to plan the apply (pip install pyyaml)", file=sys.stderr)
+    sys.exit(2)
+
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+WAVES = ["crds", "namespaces", "cluster", "rbac", "config", "workloads", "webhooks"]
+
+WAVE_KINDS = {
+    "CustomResourceDefinition": "crds",
+    "Namespace": "namespaces",
+    "ServiceAccount": "rbac",
+    "Role": "rbac",
+    "RoleBinding": "rbac",
+    "ConfigMap": "config",
+    "Secret": "config",
+    "ResourceQuota": "config",
+    "LimitRange": "config",
+    "NetworkPolicy": "config",
+    "PersistentVolumeClaim": "config",
+    "MutatingWebhookConfiguration": "webhooks",
+    "ValidatingWebhookConfiguration": "webhooks",
+}
+
+# Built-in kinds that are not namespaced; kinds of the manifests' own CRDs are
+# looked up in their spec.scope
+CLUSTER_KINDS = {
+    "APIService", "CSIDriver", "ClusterRole", "ClusterRoleBinding", "CustomResourceDefinition",
+    "IngressClass", "MutatingWebhookConfiguration", "Namespace", "PersistentVolume", "PodSecurityPolicy",
+    "PriorityClass", "RuntimeClass", "StorageClass", "ValidatingWebhookConfiguration", "VolumeSnapshotClass",
+}
+
+class PlanError(Exception):
+    """A manifest that cannot be planned"""
+
+def manifest_files(manifests_dir):
+    """List the *.yaml and *.yml files under a directory, sorted"""
+    paths = []
+    for dirpath, dirnames, filenames in os.walk(manifests_dir):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            if filename.endswith((".yaml", ".yml")):
+                paths.append(os.path.join(dirpath, filename))
+    return paths
+
+def load_objects(paths):
+    """Parse every document of the manifest files, expanding List objects
+
+    Returns:
+        List of (path, object) in file order
+    """
+    objects = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as file:
+            try:
+                documents = list(yaml.load_all(file, Loader=_Loader))
+            except yaml.YAMLError as e:
+                raise PlanError(f"{path}: invalid YAML: {e}")
+        for document in documents:
+            items = document.get("items") if isinstance(document, dict) and document.get("kind") == "List" else [document]
+            for item in items or []:
+                if item is None:
+                    continue
+                if not isinstance(item, dict) or not item.get("kind") or not (item.get("metadata") or {}).get("name"):
+                    raise PlanError(f"{path}: every object needs a kind and metadata.name")
+                objects.append((path, item))
+    return objects
+
+def custom_scopes(objects):
+    """Get the scope (Namespaced or Cluster) of the kinds defined by CRDs in the manifests"""
+    scopes = {}
+    for _, obj in objects:
+        if obj["kind"] == "CustomResourceDefinition":
+            spec = obj.get("spec") or {}
+            kind = (spec.get("names") or {}).get("kind")
+            if kind:
+                scopes[kind] = spec.get("scope", "Namespaced")
+    return scopes
+
+def object_namespace(obj, scopes, default_namespace):
+    """Get the namespace an object is applied to, or None for cluster-scoped objects"""
+    kind = obj["kind"]
+    if kind in CLUSTER_KINDS or scopes.get(kind) == "Cluster":
+        return None
+    return obj["metadata"].get("namespace") or default_namespace
+
+def owner_namespace(obj, namespace):
+    """Get the namespace an object belongs to for NAMESPACE_LIMIT, which for a Namespace is itself"""
+    return obj["metadata"]["name"] if obj["kind"] == "Namespace" else namespace
+
+def object_id(obj, namespace):
+    return f"{obj['kind']}/{namespace}/{obj['metadata']['name']}" if namespace else f"{obj['kind']}/{obj['metadata']['name']}"
+
+def wave_of(obj, namespace, scopes):
+    """Get the wave of an object; custom resources wait for their CRDs in the workloads wave"""
+    if obj["kind"] in WAVE_KINDS:
+        return WAVE_KINDS[obj["kind"]]
+    return "cluster" if namespace is None and obj["kind"] not in scopes else "workloads"
+
+def split_shards(groups, shards):
+    """Assign namespaces to shards, largest first to the shard with the fewest objects
+
+    Args:
+        groups: Dictionary of namespace to its objects
+        shards: Maximum number of shards
+
+    Returns:
+        List of shards, each a sorted list of namespaces
+    """
+    bins = [[0, []] for _ in range(min(shards, len(groups)))]
+    for namespace in sorted(groups, key=lambda name: (-len(groups[name]), name)):
+        smallest = min(bins, key=lambda item: item[0])
+        smallest[0] += len(groups[namespace])
+        smallest[1].append(namespace)
+    return [sorted(namespaces) for _, namespaces in bins]
+
+def build_plan(objects, kinds=None, namespace_limit=0, shards=4, default_namespace="default"):
+    """Group objects into ordered waves of parallel shards
+
+    Args:
+        objects: List of (path, object)
+        kinds: Lower-case kinds to plan, or None for all
+        namespace_limit: Number of namespaces to plan, or 0 for all
+        shards: Maximum number of shards per wave
+        default_namespace: Namespace of namespaced objects without one
+
+    Returns:
+        Plan dictionary with the waves and the objects left out
+    """
+    scopes = custom_scopes(objects)
+    skipped = {"kinds": [], "namespaces": []}
+
+    selected = []
+    for path, obj in objects:
+        namespace = object_namespace(obj, scopes, default_namespace)
+        if kinds and obj["kind"].lower() not in kinds:
+            skipped["kinds"].append(object_id(obj, namespace))
+            continue
+        selected.append((path, obj, namespace))
+
+    namespaces = sorted({owner_namespace(obj, namespace) for _, obj, namespace in selected} - {None})
+    if namespace_limit > 0:
+        allowed = set(namespaces[:namespace_limit])
+        kept = []
+        for path, obj, namespace in selected:
+            owner = owner_namespace(obj, namespace)
+            if owner and owner not in allowed:
+                skipped["namespaces"].append(object_id(obj, namespace))
+            else:
+                kept.append((path, obj, namespace))
+        selected = kept
+        namespaces = sorted(allowed)
+
+    waves = []
+    for wave in WAVES:
+        members = [member for member in selected if wave_of(member[1], member[2], scopes) == wave]
+        if not members:
+            continue
+
+        groups = {}
+        for member in members:
+            groups.setdefault(member[2], []).append(member)
+
+        wave_shards = []
+        if None in groups:
+            wave_shards.append({"namespaces": [], "objects": groups.pop(None)})
+        for shard_namespaces in split_shards(groups, max(1, shards)):
+            wave_shards.append({
+                "namespaces": shard_namespaces,
+                "objects": [member for namespace in shard_namespaces for member in groups[namespace]]
+            })
+        waves.append({"name": wave, "shards": wave_shards})
+
+    return {"namespaces": namespaces, "waves": waves, "skipped": skipped}
+
+def plan_to_dict(plan):
+    """Convert a plan to a JSON-serializable dictionary, naming each object Kind/namespace/name"""
+    return {
+        "namespaces": plan["namespaces"],
+        "waves": [{
+            "name": wave["name"],
+            "shards": [{
+                "namespaces": shard["namespaces"],
+                "objects": [object_id(obj, namespace) for _, obj, namespace in shard["objects"]]
+            } for shard in wave["shards"]]
+        } for wave in plan["waves"]],
+        "skipped": plan["skipped"]
+    }
+
+def print_plan(plan):
+    """Print the waves and shards of a plan"""
+    total = sum(len(shard["objects"]) for wave in plan["waves"] for shard in wave["shards"])
+    print(f"Apply plan: {total} objects in {len(plan['namespaces'])} namespaces, {len(plan['waves'])} waves")
+    for number, wave in enumerate(plan["waves"], 1):
+        count = sum(len(shard["objects"]) for shard in wave["shards"])
+        print(f"Wave {number}: {wave['name']} ({count} objects, shards: {len(wave['shards'])})")
+        for index, shard in enumerate(wave["shards"], 1):
+            where = f"namespaces {', '.join(shard['namespaces'])}" if shard["namespaces"] else "cluster-scoped"
+            print(f"  shard {index}: {len(shard['objects'])} objects, {where}")
+    for reason, objects in plan["skipped"].items():
+        if objects:
+            print(f"Skipped {len(objects)} objects not in the selected {reason}")
+
+def write_plan(plan, output_dir):
+    """Write each shard as a multi-document manifest, NN-wave/shard-NN.yaml, and the plan as plan.json"""
+    os.makedirs(output_dir, exist_ok=True)
+    for number, wave in enumerate(plan["waves"], 1):
+        wave_dir = os.path.join(output_dir, f"{number:02d}-{wave['name']}")
+        os.makedirs(wave_dir, exist_ok=True)
+        for index, shard in enumerate(wave["shards"], 1):
+            with open(os.path.join(wave_dir, f"shard-{index:02d}.yaml"), "w", encoding="utf-8") as file:
+                yaml.safe_dump_all([obj for _, obj, _ in shard["objects"]], file, sort_keys=False)
+    with open(os.path.join(output_dir, "plan.json"), "w", encoding="utf-8") as file:
+        json.dump(plan_to_dict(plan), file, indent=2)
+
+def parse_kinds(value):
+    kinds = {kind.strip().lower() for kind in value.split(",") if kind.strip()}
+    return None if not kinds or "all" in kinds else kinds
+
+def main():
+    parser = argparse.ArgumentParser(description="Plan a dependency-ordered, parallel apply of Kubernetes manifests")
+    parser.add_argument("--manifests", required=True, help="Directory of the manifests to apply")
+    parser.add_argument("--kinds", default="all", help="Comma-separated list of kinds to apply (default: all)")
+    parser.add_argument("--namespace-limit", type=int, default=0, help="Number of namespaces to apply (default: 0 = all)")
+    parser.add_argument("--shards", type=int, default=4, help="Maximum number of shards applied in parallel per wave")
+    parser.add_argument("--default-namespace", default="default", help="Namespace of namespaced objects without one")
+    output = parser.add_mutually_exclusive_group(required=True)
+    output.add_argument("--output-dir", help="Directory to write the shards and plan.json to")
+    output.add_argument("--dry-run", action="store_true", help="Print the plan without writing it")
+    parser.add_argument("--json", action="store_true", help="Print the plan as JSON")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.manifests):
+        print(f"ERROR: Manifests directory not found: {args.manifests}", file=sys.stderr)
+        return 1
+
+    try:
+        objects = load_objects(manifest_files(args.manifests))
+    except (OSError, PlanError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+
+    plan = build_plan(objects, parse_kinds(args.kinds), args.namespace_limit, args.shards, args.default_namespace)
+    if args.output_dir:
+        write_plan(plan, args.output_dir)
+
+    if args.json:
+        print(json.dumps(plan_to_dict(plan), indent=2))
+    else:
+        print_plan(plan)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+#
+# http_stand_in.py - Local HTTP server standing in for download sites in tests
+#
+# Serves the files of a directory over HTTP/1.1 with keep-alive and Range
+# support, and logs every connection and request so tests can check how many
+# were made:
+#   connection
+#   GET /path bytes=N-
+#
+# --truncate PATH=BYTES cuts the first response for PATH off after BYTES bytes
+# and drops the connection, to test resumed downloads.
+#
+# Usage: http_stand_in.py --root DIR --log FILE --port-file FILE [--truncate PATH=BYTES]
+#
+
+import argparse
+import os
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+RANGE_PATTERN = re.compile(r"^bytes=(\d+)-$")
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.log("connection")
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        range_header = self.headers.get("Range")
+        self.server.log(f"GET {self.path}{f' {range_header}' if range_header else ''}")
+
+        path = os.path.join(self.server.root, self.path.lstrip("/").split("?")[0])
+        if not os.path.isfile(path):
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        with open(path, "rb") as file:
+            data = file.read()
+        etag = f'"{os.path.getmtime(path)}-{len(data)}"'
+
+        start = 0
+        match = RANGE_PATTERN.match(range_header or "")
+        if match and self.headers.get("If-Range", etag) == etag:
+            start = int(match.group(1))
+            if start >= len(data):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(data)}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(data) - start))
+        self.send_header("ETag", etag)
+        self.end_headers()
+
+        limit = self.server.truncate.pop(self.path, None)
+        if limit is not None:
+            self.wfile.write(data[start:start + limit])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(data[start:])
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, root, log_path, truncate):
+        super().__init__(("127.0.0.1", 0), StandInHandler)
+        self.root = root
+        self.log_path = log_path
+        self.truncate = truncate
+        self.lock = threading.Lock()
+
+    def log(self, line):
+        with self.lock:
+            with open(self.log_path, "a") as file:
+                file.write(f"{line}\n")
+
+def main():
+    parser = argparse.ArgumentParser(description="Local HTTP server standing in for download sites in tests")
+    parser.add_argument("--root", required=True, help="Directory of the files to serve")
+    parser.add_argument("--log", required=True, help="File to log connections and requests to")
+    parser.add_argument("--port-file", required=True, help="File to write the port to once listening")
+    parser.add_argument("--truncate", action="append", default=[], help="PATH=BYTES to cut the first response for PATH off")
+    args = parser.parse_args()
+
+    truncate = {}
+    for value in args.truncate:
+        path, _, size = value.partition("=")
+        truncate[path] = int(size)
+
+    server = StandInServer(args.root, args.log, truncate)
+    with open(f"{args.port_file}.tmp", "w") as file:
+        file.write(str(server.server_address[1]))
+    os.replace(f"{args.port_file}.tmp", args.port_file)
+    server.serve_forever()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env bash
+#
+# Tests for the download cache used by scripts/download.sh (download_cache.py)
+# Runs offline against a local HTTP stand-in server
+#
+
+# Get script directory for relative paths
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" &>/dev/null && pwd)"
+source "${SCRIPT_DIR}/test-framework.sh"
+DOWNLOAD_CACHE="${SCRIPT_DIR}/../../../scripts/download_cache.py"
+
+TEST_TMP="$(mktemp -d)"
+SERVER_ROOT="${TEST_TMP}/site"
+SERVER_LOG="${TEST_TMP}/server.log"
+SERVER_PID=""
+BASE_URL=""
+
+# Start the stand-in server, passing extra arguments such as --truncate
+function start_server() {
+  rm -f "${TEST_TMP}/port" "${SERVER_LOG}"
+  touch "${SERVER_LOG}"
+  python3 "${SCRIPT_DIR}/http_stand_in.py" --root "${SERVER_ROOT}" --log "${SERVER_LOG}" \
+    --port-file "${TEST_TMP}/port" "$@" &
+  SERVER_PID=$!
+
+  local i
+  for i in $(seq 1 50); do
+    [[ -f "${TEST_TMP}/port" ]] && break
+    sleep 0.1
+  done
+  BASE_URL="http://127.0.0.1:$(cat "${TEST_TMP}/port")"
+}
+
+function stop_server() {
+  [[ -n "${SERVER_PID}" ]] || return 0
+  kill "${SERVER_PID}" 2>/dev/null || true
+  wait "${SERVER_PID}" 2>/dev/null || true
+  SERVER_PID=""
+}
+
+function cleanup() {
+  stop_server
+  rm -rf "${TEST_TMP}"
+}
+trap cleanup EXIT
+
+# Count the lines of the server log matching a pattern
+function server_count() {
+  grep -c "$1" "${SERVER_LOG}" || true
+}
+
+# Run download_cache.py fetch for the test tool against a cache directory
+function fetch() {
+  local cache_dir="$1"
+  shift
+  python3 "${DOWNLOAD_CACHE}" fetch --cache-dir "${cache_dir}" --tool test-tool --version 1.0.0 "$@"
+}
+
+function sha256_of() {
+  python3 -c "import hashlib, sys; print(hashlib.sha256(open(sys.argv[1], 'rb').read()).hexdigest())" "$1"
+}
+
+function setup_site() {
+  mkdir -p "${SERVER_ROOT}"
+  head -c 4096 /dev/urandom > "${SERVER_ROOT}/tool.bin"
+  head -c 4096 /dev/urandom > "${SERVER_ROOT}/plugin.bin"
+  head -c 2048 /dev/urandom > "${SERVER_ROOT}/small-a.bin"
+  head -c 2048 /dev/urandom > "${SERVER_ROOT}/small-b.bin"
+  head -c 65536 /dev/urandom > "${SERVER_ROOT}/big.bin"
+}
+
+function test_warm_fetch_skips_network() {
+  describe "warm builds skip the network"
+  local cache_dir="${TEST_TMP}/cache-warm"
+  start_server
+
+  fetch "${cache_dir}" --artifact "${BASE_URL}/tool.bin" "${TEST_TMP}/out/tool" >/dev/null
+  assert_equals "1" "$(server_count '^GET /tool.bin')" "Cold fetch downloads the artifact"
+
+  : > "${SERVER_LOG}"
+  rm -f "${TEST_TMP}/out/tool"
+  local result
+  result=$(fetch "${cache_dir}" --artifact "${BASE_URL}/tool.bin" "${TEST_TMP}/out/tool")
+  assert_contains "Cached:" "${result}" "Warm fetch is served from the cache"
+  assert_equals "0" "$(server_count '.')" "Warm fetch opens no connection"
+  assert_equals "$(sha256_of "${SERVER_ROOT}/tool.bin")" "$(sha256_of "${TEST_TMP}/out/tool")" "Cached artifact matches the original"
+
+  stop_server
+}
+
+function test_connection_reuse() {
+  describe "artifacts of one run share a connection"
+  local cache_dir="${TEST_TMP}/cache-reuse"
+  start_server
+
+  fetch "${cache_dir}" --artifact "${BASE_URL}/tool.bin" "${TEST_TMP}/out/tool" \
+    --artifact "${BASE_URL}/plugin.bin" "${TEST_TMP}/out/plugin" >/dev/null
+  assert_equals "2" "$(server_count '^GET ')" "Both artifacts are downloaded"
+  assert_equals "1" "$(server_count '^connection')" "One connection is used for both"
+
+  stop_server
+}
+
+function test_checksums() {
+  describe "downloads are verified against their checksum"
+  local cache_dir="${TEST_TMP}/cache-checksum"
+  local digest
+  digest=$(sha256_of "${SERVER_ROOT}/tool.bin")
+  start_server
+
+  local exit_code=0
+  fetch "${cache_dir}" --artifact "${BASE_URL}/tool.bin" "${TEST_TMP}/out/bad" "$(printf '0%.0s' {1..64})" >/dev/null 2>&1 || exit_code=$?
+  assert_equals "1" "${exit_code}" "A checksum mismatch fails the fetch"
+  assert_false "$([[ -f "${TEST_TMP}/out/bad" ]] && echo true || echo false)" "Nothing is written on a mismatch"
+
+  fetch "${cache_dir}" --artifact "${BASE_URL}/tool.bin" "${TEST_TMP}/out/good" "${digest}" >/dev/null
+  assert_equals "${digest}" "$(sha256_of "${TEST_TMP}/out/good")" "A matching checksum passes"
+
+  : > "${SERVER_LOG}"
+  fetch "${cache_dir}" --artifact "${BASE_URL}/mirror/tool.bin" "${TEST_TMP}/out/mirror" "${digest}" >/dev/null
+  assert_equals "0" "$(server_count '.')" "A known checksum is served from the cache for any URL"
+
+  stop_server
+}
+
+function test_resume() {
+  describe "interrupted downloads are resumed"
+  local cache_dir="${TEST_TMP}/cache-resume"
+  start_server --truncate /big.bin=20000
+
+  local exit_code=0
+  fetch "${cache_dir}" --artifact "${BASE_URL}/big.bin" "${TEST_TMP}/out/big" >/dev/null 2>&1 || exit_code=$?
+  assert_equals "1" "${exit_code}" "The interrupted download fails"
+
+  fetch "${cache_dir}" --artifact "${BASE_URL}/big.bin" "${TEST_TMP}/out/big" >/dev/null
+  assert_equals "1" "$(server_count '^GET /big.bin bytes=20000-')" "The retry asks for the missing bytes only"
+  assert_equals "$(sha256_of "${SERVER_ROOT}/big.bin")" "$(sha256_of "${TEST_TMP}/out/big")" "The resumed artifact is complete"
+
+  stop_server
+}
+
+function test_lru_eviction() {
+  describe "least recently used artifacts are evicted"
+  local cache_dir="${TEST_TMP}/cache-lru"
+  start_server
+
+  fetch "${cache_dir}" --max-size 3K --artifact "${BASE_URL}/small-a.bin" "${TEST_TMP}/out/a" >/dev/null
+  fetch "${cache_dir}" --max-size 3K --artifact "${BASE_URL}/small-b.bin" "${TEST_TMP}/out/b" >/dev/null
+  local result
+  result=$(python3 "${DOWNLOAD_CACHE}" stats --cache-dir "${cache_dir}")
+  assert_equals "1 artifacts in 1 blobs, 2048 bytes" "${result}" "The cache is evicted down to its maximum size"
+
+  : > "${SERVER_LOG}"
+  fetch "${cache_dir}" --max-size 3K --artifact "${BASE_URL}/small-b.bin" "${TEST_TMP}/out/b" >/dev/null
+  assert_equals "0" "$(server_count '.')" "The most recently used artifact is kept"
+
+  stop_server
+}
+
+setup_site
+
+# Run all tests
+test_warm_fetch_skips_network
+test_connection_reuse
+test_checksums
+test_resume
+test_lru_eviction
+
+# Report test results
+print_summary
@@ -9,6 +9,8 @@
 #
 # Optional Environment Variables:
 #   - DOWNLOAD_URL: URL to download the tool (if not using built-in logic)
+#   - TOOL_SHA256: Expected SHA-256 digest of the download
+#   - DOWNLOAD_CACHE_DIR: Download cache directory (default: no cache)
 #   - HARBOR_HOSTNAME: Harbor registry hostname (for container images)
 #   - VERBOSE: Enable verbose output (default: false)
 #
@@ -17,6 +19,9 @@
 set -o errexit
 set -o pipefail
 
+# Resolve task cache directories against the build directory
+[[ -z "${DOWNLOAD_CACHE_DIR:-}" || "${DOWNLOAD_CACHE_DIR}" == /* ]] || export DOWNLOAD_CACHE_DIR="${PWD}/${DOWNLOAD_CACHE_DIR}"
+
 # Get script directory for relative paths
 __DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" &>/dev/null && pwd)"
 
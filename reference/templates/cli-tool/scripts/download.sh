@@ -10,6 +10,8 @@
 #   -v, --version VERSION         Tool version
 #   -o, --output-dir DIRECTORY    Output directory (default: ./bin)
 #   -u, --url URL                 Custom download URL
+#   -s, --sha256 DIGEST           Expected SHA-256 digest of the download
+#   -c, --cache-dir DIRECTORY     Download cache directory (default: $DOWNLOAD_CACHE_DIR)
 #   -h, --harbor HOSTNAME         Harbor registry hostname
 #   -V, --verbose                 Enable verbose output
 #   --help                        Show this help message
@@ -30,6 +32,8 @@ TOOL_NAME=""
 TOOL_VERSION=""
 OUTPUT_DIR="./bin"
 DOWNLOAD_URL=""
+TOOL_SHA256="${TOOL_SHA256:-}"
+CACHE_DIR="${DOWNLOAD_CACHE_DIR:-}"
 HARBOR_HOSTNAME=""
 VERBOSE=false
 
@@ -46,6 +50,8 @@ Options:
   -v, --version VERSION         Tool version
   -o, --output-dir DIRECTORY    Output directory (default: ./bin)
   -u, --url URL                 Custom download URL
+  -s, --sha256 DIGEST           Expected SHA-256 digest of the download
+  -c, --cache-dir DIRECTORY     Download cache directory (default: \$DOWNLOAD_CACHE_DIR)
   -h, --harbor HOSTNAME         Harbor registry hostname
   -V, --verbose                 Enable verbose output
   --help                        Show this help message
@@ -72,6 +78,14 @@ while [[ $# -gt 0 ]]; do
       DOWNLOAD_URL="$2"
       shift 2
       ;;
+    -s|--sha256)
+      TOOL_SHA256="$2"
+      shift 2
+      ;;
+    -c|--cache-dir)
+      CACHE_DIR="$2"
+      shift 2
+      ;;
     -h|--harbor)
       HARBOR_HOSTNAME="$2"
       shift 2
@@ -109,6 +123,27 @@ fi
 # Create output directory
 mkdir -p "${OUTPUT_DIR}"
 
+# Download a URL to a file, through the download cache when one is configured
+# The cache verifies TOOL_SHA256, resumes interrupted downloads and skips the
+# network when the same tool, version and URL were fetched before
+function fetch_url() {
+  local url="$1"
+  local output="$2"
+
+  if [[ -n "${CACHE_DIR}" ]] && command -v python3 &>/dev/null; then
+    python3 "${__DIR}/download_cache.py" fetch \
+      --cache-dir "${CACHE_DIR}" \
+      --tool "${TOOL_NAME}" \
+      --version "${TOOL_VERSION}" \
+      --artifact "${url}" "${output}" ${TOOL_SHA256:+"${TOOL_SHA256}"}
+  else
+    curl -fL -o "${output}" "${url}"
+    if [[ -n "${TOOL_SHA256}" ]]; then
+      echo "${TOOL_SHA256}  ${output}" | sha256sum -c -
+    fi
+  fi
+}
+
 # Download the CLI tool based on its name
 case "${TOOL_NAME}" in
   "tridentctl")
@@ -116,11 +151,11 @@ case "${TOOL_NAME}" in
     
     if [[ -n "${DOWNLOAD_URL}" ]]; then
       # Use provided download URL
-      curl -L -o "${OUTPUT_DIR}/trident-installer-${TOOL_VERSION}.tar.gz" "${DOWNLOAD_URL}"
+      fetch_url "${DOWNLOAD_URL}" "${OUTPUT_DIR}/trident-installer-${TOOL_VERSION}.tar.gz"
     else
       # Use default download URL
-      curl -L -o "${OUTPUT_DIR}/trident-installer-${TOOL_VERSION}.tar.gz" \
-        "https://github.com/NetApp/trident/releases/download/v${TOOL_VERSION}/trident-installer-${TOOL_VERSION}.tar.gz"
+      fetch_url "https://github.com/NetApp/trident/releases/download/v${TOOL_VERSION}/trident-installer-${TOOL_VERSION}.tar.gz" \
+        "${OUTPUT_DIR}/trident-installer-${TOOL_VERSION}.tar.gz"
     fi
     
     tar -xzf "${OUTPUT_DIR}/trident-installer-${TOOL_VERSION}.tar.gz" -C "${OUTPUT_DIR}"
@@ -160,7 +195,7 @@ case "${TOOL_NAME}" in
     fi
     
     info "Downloading ${TOOL_NAME} version ${TOOL_VERSION} from ${DOWNLOAD_URL}"
-    curl -L -o "${OUTPUT_DIR}/${TOOL_NAME}" "${DOWNLOAD_URL}"
+    fetch_url "${DOWNLOAD_URL}" "${OUTPUT_DIR}/${TOOL_NAME}"
     chmod +x "${OUTPUT_DIR}/${TOOL_NAME}"
     ;;
 esac
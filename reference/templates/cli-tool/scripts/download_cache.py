@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+#
+# download_cache.py - Content-addressed, checksum-verified download cache
+#
+# Used by download.sh when DOWNLOAD_CACHE_DIR is set, e.g. to the download-cache
+# task cache of the download-tool task. Each artifact is keyed by tool, version
+# and URL; the key points to a blob stored once under its SHA-256 digest:
+#
+#   DOWNLOAD_CACHE_DIR/
+#     keys/<key>.json          tool, version, url and sha256 of the artifact
+#     blobs/<ab>/<sha256>      artifact content
+#     partial/<key>.part       interrupted download, resumed with a Range request
+#
+# A warm build finds the key, verifies the blob against its digest and copies
+# it out without opening a connection. Cold downloads are verified against the
+# expected --sha256 when one is given, interrupted downloads are resumed where
+# they stopped, and the artifacts of one run share a connection per host. After
+# each run the least recently used entries are evicted until the blobs fit in
+# --max-size.
+#
+# Usage: download_cache.py fetch --cache-dir DIR --tool NAME --version VERSION
+#                                --artifact URL OUTPUT [SHA256] [--artifact ...] [--max-size 1G]
+#        download_cache.py stats --cache-dir DIR [--json]
+#
+
+import argparse
+import hashlib
+import http.client
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from urllib.parse import urljoin, urlsplit
+
+CHUNK_SIZE = 1024 * 1024
+MAX_REDIRECTS = 5
+SIZE_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+
+class DownloadError(Exception):
+    """An artifact that cannot be downloaded or fails verification"""
+
+def parse_size(value):
+    """Parse a size such as 512M or 2G into bytes"""
+    number, unit = value.strip().upper().rstrip("B"), ""
+    if number and number[-1] in SIZE_UNITS:
+        number, unit = number[:-1], number[-1]
+    if not number.isdigit():
+        raise argparse.ArgumentTypeError(f"invalid size: {value}")
+    return int(number) * SIZE_UNITS[unit]
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class ConnectionPool:
+    """Keep one HTTP/1.1 connection per scheme, host and port for the whole run"""
+
+    def __init__(self, timeout=60):
+        self.timeout = timeout
+        self.connections = {}
+        self.opened = 0
+
+    def request(self, url, headers):
+        """Send a GET request, following redirects
+
+        Returns:
+            Response; the caller must read it fully before the next request
+        """
+        for _ in range(MAX_REDIRECTS + 1):
+            parts = urlsplit(url)
+            if parts.scheme not in ("http", "https"):
+                raise DownloadError(f"unsupported URL scheme: {url}")
+            path = parts.path or "/"
+            if parts.query:
+                path += f"?{parts.query}"
+
+            response = self._send(parts.scheme, parts.netloc, path, headers)
+            if response.status in (301, 302, 303, 307, 308) and response.getheader("Location"):
+                response.read()
+                url = urljoin(url, response.getheader("Location"))
+                continue
+            return response
+        raise DownloadError(f"too many redirects: {url}")
+
+    def _send(self, scheme, netloc, path, headers):
+        key = (scheme, netloc)
+        # A kept-alive connection the server closed is reopened once
+        for attempt in range(2):
+            connection = self.connections.get(key)
+            if connection is None:
+                connection_class = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+                connection = self.connections[key] = connection_class(netloc, timeout=self.timeout)
+                self.opened += 1
+            try:
+                connection.request("GET", path, headers=headers)
+                return connection.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                connection.close()
+                del self.connections[key]
+                if attempt:
+                    raise
+
+    def close(self):
+        for connection in self.connections.values():
+            connection.close()
+        self.connections.clear()
+
+class DownloadCache:
+    """Artifacts keyed by tool, version and URL, stored once per content digest"""
+
+    def __init__(self, cache_dir, pool=None):
+        self.cache_dir = cache_dir
+        self.pool = pool or ConnectionPool()
+        for name in ("keys", "blobs", "partial"):
+            os.makedirs(os.path.join(cache_dir, name), exist_ok=True)
+
+    @staticmethod
+    def key(tool, version, url):
+        return hashlib.sha256(f"{tool}\0{version}\0{url}".encode("utf-8")).hexdigest()
+
+    def _key_path(self, key):
+        return os.path.join(self.cache_dir, "keys", f"{key}.json")
+
+    def _blob_path(self, digest):
+        return os.path.join(self.cache_dir, "blobs", digest[:2], digest)
+
+    def _partial_path(self, key):
+        return os.path.join(self.cache_dir, "partial", f"{key}.part")
+
+    def lookup(self, tool, version, url, sha256=None):
+        """Find a verified blob for an artifact, marking it as recently used
+
+        Returns:
+            Blob path, or None on a miss
+        """
+        key = self.key(tool, version, url)
+        try:
+            with open(self._key_path(key), "r") as file:
+                digest = json.load(file)["sha256"]
+        except (OSError, ValueError, KeyError):
+            # A blob with the expected digest serves any key
+            digest = sha256
+        if not digest or (sha256 and digest != sha256):
+            return None
+
+        blob = self._blob_path(digest)
+        if not os.path.isfile(blob):
+            return None
+        if file_sha256(blob) != digest:
+            os.remove(blob)
+            return None
+
+        self._record(key, tool, version, url, digest)
+        return blob
+
+    def _record(self, key, tool, version, url, digest):
+        """Write the key of an artifact with the time of its last use"""
+        entry = {"tool": tool, "version": version, "url": url, "sha256": digest, "used": time.time()}
+        with tempfile.NamedTemporaryFile("w", dir=os.path.join(self.cache_dir, "keys"), delete=False) as file:
+            json.dump(entry, file)
+        os.replace(file.name, self._key_path(key))
+
+    def download(self, tool, version, url, sha256=None):
+        """Download an artifact into the cache, resuming an interrupted download
+
+        Returns:
+            Blob path
+        """
+        key = self.key(tool, version, url)
+        partial = self._partial_path(key)
+        validator_path = f"{partial}.json"
+
+        headers = {}
+        offset = os.path.getsize(partial) if os.path.isfile(partial) else 0
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+            try:
+                with open(validator_path, "r") as file:
+                    validator = json.load(file).get("validator")
+                if validator:
+                    headers["If-Range"] = validator
+            except (OSError, ValueError):
+                pass
+
+        response = self.pool.request(url, headers)
+        if response.status == 416 and offset:
+            # The partial file is already complete, or stale; start over
+            response.read()
+            os.remove(partial)
+            return self.download(tool, version, url, sha256)
+        if response.status not in (200, 206):
+            response.read()
+            raise DownloadError(f"{url}: HTTP {response.status} {response.reason}")
+
+        # A 200 answer to a Range request means the server sent the whole file
+        append = response.status == 206
+        validator = response.getheader("ETag") or response.getheader("Last-Modified")
+        with open(validator_path, "w") as file:
+            json.dump({"url": url, "validator": validator}, file)
+        expected = response.getheader("Content-Length")
+        received = 0
+        with open(partial, "ab" if append else "wb") as file:
+            while True:
+                chunk = response.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                file.write(chunk)
+                received += len(chunk)
+        if expected and received < int(expected):
+            raise DownloadError(f"{url}: connection closed after {received} of {expected} bytes, "
+                                "the next fetch resumes the download")
+
+        digest = file_sha256(partial)
+        if sha256 and digest != sha256:
+            os.remove(partial)
+            os.remove(validator_path)
+            raise DownloadError(f"{url}: checksum mismatch, expected sha256 {sha256}, got {digest}")
+
+        blob = self._blob_path(digest)
+        os.makedirs(os.path.dirname(blob), exist_ok=True)
+        os.replace(partial, blob)
+        os.remove(validator_path)
+        self._record(key, tool, version, url, digest)
+        return blob
+
+    def fetch(self, tool, version, url, output, sha256=None):
+        """Copy an artifact to output, downloading it only on a cache miss
+
+        Returns:
+            True on a cache hit
+        """
+        sha256 = sha256.lower() if sha256 else None
+        blob = self.lookup(tool, version, url, sha256)
+        hit = blob is not None
+        if not hit:
+            blob = self.download(tool, version, url, sha256)
+
+        output_dir = os.path.dirname(os.path.abspath(output))
+        os.makedirs(output_dir, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=output_dir, delete=False) as file:
+            with open(blob, "rb") as source:
+                shutil.copyfileobj(source, file, CHUNK_SIZE)
+        os.replace(file.name, output)
+        return hit
+
+    def entries(self):
+        """List the keys with their blob sizes, least recently used first"""
+        entries = []
+        keys_dir = os.path.join(self.cache_dir, "keys")
+        for name in os.listdir(keys_dir):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(keys_dir, name)
+            try:
+                with open(path, "r") as file:
+                    entry = json.load(file)
+                entry["size"] = os.path.getsize(self._blob_path(entry["sha256"]))
+            except (OSError, ValueError, KeyError):
+                continue
+            entry["key_path"] = path
+            entries.append(entry)
+        return sorted(entries, key=lambda entry: entry["used"])
+
+    def evict(self, max_size):
+        """Remove the least recently used entries until the blobs fit in max_size bytes
+
+        Returns:
+            Number of blobs removed
+        """
+        entries = self.entries()
+        keys_by_blob = {}
+        for entry in entries:
+            keys_by_blob.setdefault(entry["sha256"], []).append(entry)
+        total = sum(self._blob_size(digest) for digest in keys_by_blob)
+
+        removed = 0
+        for entry in entries:
+            if total <= max_size:
+                break
+            os.remove(entry["key_path"])
+            keys = keys_by_blob[entry["sha256"]]
+            keys.remove(entry)
+            # Blobs are shared between keys and only go with their last key
+            if not keys:
+                total -= self._blob_size(entry["sha256"])
+                os.remove(self._blob_path(entry["sha256"]))
+                removed += 1
+        return removed
+
+    def _blob_size(self, digest):
+        return os.path.getsize(self._blob_path(digest))
+
+    def stats(self):
+        entries = self.entries()
+        blobs = {entry["sha256"]: entry["size"] for entry in entries}
+        return {"keys": len(entries), "blobs": len(blobs), "bytes": sum(blobs.values())}
+
+def parse_artifacts(parser, values):
+    artifacts = []
+    for value in values:
+        if len(value) not in (2, 3):
+            parser.error("--artifact takes URL OUTPUT [SHA256]")
+        artifacts.append((value[0], value[1], value[2] if len(value) == 3 else None))
+    return artifacts
+
+def main():
+    parser = argparse.ArgumentParser(description="Content-addressed, checksum-verified download cache")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    fetch = subparsers.add_parser("fetch", help="Copy artifacts out of the cache, downloading the missing ones")
+    fetch.add_argument("--cache-dir", required=True, help="Cache directory, e.g. a task cache")
+    fetch.add_argument("--tool", required=True, help="Tool the artifacts belong to")
+    fetch.add_argument("--version", required=True, help="Version of the tool")
+    fetch.add_argument("--artifact", nargs="+", action="append", required=True, metavar="URL OUTPUT [SHA256]",
+                       help="Artifact to fetch, with its expected SHA-256 digest if known (repeatable)")
+    fetch.add_argument("--max-size", type=parse_size, default=os.environ.get("DOWNLOAD_CACHE_MAX_SIZE", "1G"),
+                       help="Size the cached blobs are evicted down to, e.g. 512M (default: $DOWNLOAD_CACHE_MAX_SIZE or 1G)")
+
+    stats = subparsers.add_parser("stats", help="Show the number and size of the cached artifacts")
+    stats.add_argument("--cache-dir", required=True, help="Cache directory")
+    stats.add_argument("--json", action="store_true", help="Print the statistics as JSON")
+    args = parser.parse_args()
+
+    cache = DownloadCache(args.cache_dir)
+    if args.command == "stats":
+        result = cache.stats()
+        print(json.dumps(result) if args.json else f"{result['keys']} artifacts in {result['blobs']} blobs, {result['bytes']} bytes")
+        return 0
+
+    try:
+        for url, output, sha256 in parse_artifacts(fetch, args.artifact):
+            hit = cache.fetch(args.tool, args.version, url, output, sha256)
+            print(f"{'Cached' if hit else 'Downloaded'}: {url} -> {output}")
+    except (OSError, http.client.HTTPException, DownloadError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+    finally:
+        cache.pool.close()
+
+    evicted = cache.evict(args.max_size)
+    if evicted:
+        print(f"Evicted {evicted} least recently used artifacts to stay within {args.max_size} bytes")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
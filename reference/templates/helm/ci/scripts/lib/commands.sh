@@ -228,6 +228,12 @@ function cmd_validate_pipeline() {
     # Always treat this as a dry run
     dry_run="true"
 
+    # Validate all pipelines if requested
+    if [[ "${pipeline}" == "all" ]]; then
+        cmd_validate_all_pipelines
+        return
+    fi
+
     # Validate required pipeline file exists
     local pipeline_file="${CI_DIR}/pipelines/${pipeline}.yml"
     if ! verify_file_exists "${pipeline_file}"; then
@@ -250,6 +256,31 @@ function cmd_validate_pipeline() {
     return 0
 }
 
+# Command: Validate all pipelines offline with the batch validator
+function cmd_validate_all_pipelines() {
+    local pipeline_files=("${CI_DIR}"/pipelines/*.yml)
+
+    if [[ ! -f "${pipeline_files[0]}" ]]; then
+        error "No pipeline files found in ${CI_DIR}/pipelines"
+        return 1
+    fi
+
+    if ! command -v python3 &>/dev/null; then
+        error "python3 is required to validate all pipelines"
+        return 1
+    fi
+
+    info "Validating ${#pipeline_files[@]} pipeline files in ${CI_DIR}/pipelines"
+
+    if ! python3 "${LIB_DIR}/validate_pipelines.py" "${pipeline_files[@]}"; then
+        error "Pipeline validation failed"
+        return 1
+    fi
+
+    success "All pipeline files are valid"
+    return 0
+}
+
 # Command: Set set-pipeline pipeline
 function cmd_set_pipeline_pipeline() {
     local foundation="$1"
@@ -0,0 +1,169 @@
+#!/usr/bin/env bash
+#
+# Tests for the layered values and no-op deploy detection of helm-deploy (helm_values.py)
+# Runs offline against the fixture chart and values in fixtures/helm-values
+#
+
+# Get script directory for relative paths
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" &>/dev/null && pwd)"
+source "${SCRIPT_DIR}/test-framework.sh"
+HELM_VALUES="${SCRIPT_DIR}/../../tasks/helm/helm-deploy/helm_values.py"
+FIXTURES="${SCRIPT_DIR}/fixtures/helm-values"
+
+TEST_TMP="$(mktemp -d)"
+
+function cleanup() {
+  rm -rf "${TEST_TMP}"
+}
+trap cleanup EXIT
+
+# Render the fixture release for a chart, printing only the deploy hash
+function render_hash() {
+  local chart="$1"
+  shift
+  python3 "${HELM_VALUES}" render --chart "${chart}" --release component-name --namespace component \
+    --output "${TEST_TMP}/hash-values.yaml" --hash-file "${TEST_TMP}/hash" "$@" >/dev/null 2>&1
+  cat "${TEST_TMP}/hash"
+}
+
+# Read a dotted key path of a values file
+function value_of() {
+  python3 -c "import sys, yaml
+value = yaml.safe_load(open(sys.argv[1]))
+for key in sys.argv[2].split('.'):
+    value = value.get(key, '<missing>') if isinstance(value, dict) else '<missing>'
+print(value)" "$1" "$2"
+}
+
+function test_layering() {
+  describe "values are layered from chart defaults to overrides"
+  local output="${TEST_TMP}/layered.yaml"
+  python3 "${HELM_VALUES}" render --chart "${FIXTURES}/chart" --release component-name --namespace component \
+    --values "${FIXTURES}/chart/values/lab.yaml" \
+    --values "${FIXTURES}/chart/values/cml-k8s-n-01.yaml" \
+    --set image.release=1.2.3 --set debug.level=4 \
+    --output "${output}" >/dev/null 2>&1
+
+  assert_equals "3" "$(value_of "${output}" replicaCount)" "The foundation overrides the environment"
+  assert_equals "512Mi" "$(value_of "${output}" resources.limits.memory)" "The environment overrides the chart defaults"
+  assert_equals "500m" "$(value_of "${output}" resources.limits.cpu)" "Maps are merged key by key"
+  assert_equals "[]" "$(value_of "${output}" tolerations)" "Lists replace the lower layer"
+  assert_equals "4" "$(value_of "${output}" debug.level)" "A null value removes the key before overrides"
+  assert_equals "<missing>" "$(value_of "${output}" debug.enabled)" "A null value removes the chart default"
+  assert_equals "1.2.3" "$(value_of "${output}" image.release)" "--set overrides are applied last"
+}
+
+function test_set_syntax() {
+  describe "--set accepts comma-separated pairs and escaped dots, and rejects lists"
+  local output="${TEST_TMP}/set.yaml"
+  python3 "${HELM_VALUES}" render --chart "${FIXTURES}/chart" --release component-name --namespace component \
+    --set 'replicaCount=4,debug.level=2' --set 'annotations.example\.com/team=platform' \
+    --set 'message=a\,b' --output "${output}" >/dev/null 2>&1
+
+  assert_equals "4" "$(value_of "${output}" replicaCount)" "The first pair of a comma-separated --set is applied"
+  assert_equals "2" "$(value_of "${output}" debug.level)" "The second pair of a comma-separated --set is applied"
+  assert_equals "platform" "$(python3 -c "import sys, yaml; print(yaml.safe_load(open(sys.argv[1]))['annotations']['example.com/team'])" "${output}")" \
+    "An escaped dot stays within the key"
+  assert_equals "a,b" "$(value_of "${output}" message)" "An escaped comma stays within the value"
+
+  local result exit_code=0
+  result=$(python3 "${HELM_VALUES}" render --chart "${FIXTURES}/chart" --release component-name --namespace component \
+    --set 'tolerations[0].key=dedicated' --output "${TEST_TMP}/index.yaml" 2>&1) || exit_code=$?
+  assert_equals "1" "${exit_code}" "A list index is rejected"
+  assert_contains "list indexes are not supported" "${result}" "The error names the unsupported syntax"
+
+  exit_code=0
+  python3 "${HELM_VALUES}" render --chart "${FIXTURES}/chart" --release component-name --namespace component \
+    --set 'tolerations={a,b}' --output "${TEST_TMP}/list.yaml" >/dev/null 2>&1 || exit_code=$?
+  assert_equals "1" "${exit_code}" "A list value is rejected"
+}
+
+function test_missing_values_file() {
+  describe "missing values files are skipped"
+  local result
+  result=$(python3 "${HELM_VALUES}" render --chart "${FIXTURES}/chart" --release component-name --namespace component \
+    --values "${FIXTURES}/chart/values/missing.yaml" --output "${TEST_TMP}/defaults.yaml" 2>/dev/null)
+  assert_contains "chart defaults only" "${result}" "Only the chart defaults are used"
+  assert_equals "1" "$(value_of "${TEST_TMP}/defaults.yaml" replicaCount)" "The chart default is kept"
+}
+
+function test_stable_hash() {
+  describe "the deploy hash is stable"
+  local first second reordered
+  first=$(render_hash "${FIXTURES}/chart" --values "${FIXTURES}/chart/values/lab.yaml")
+  second=$(render_hash "${FIXTURES}/chart" --values "${FIXTURES}/chart/values/lab.yaml")
+  assert_equals "${first}" "${second}" "Rendering twice gives the same hash"
+
+  printf 'tolerations: []\ndebug: null\nresources:\n  limits:\n    memory: 512Mi\nreplicaCount: 2\n' > "${TEST_TMP}/lab-reordered.yaml"
+  reordered=$(render_hash "${FIXTURES}/chart" --values "${TEST_TMP}/lab-reordered.yaml")
+  assert_equals "${first}" "${reordered}" "Key order does not change the hash"
+
+  assert_true "$([[ "${first}" != "$(render_hash "${FIXTURES}/chart" --values "${FIXTURES}/chart/values/lab.yaml" --set replicaCount=5)" ]] && echo true || echo false)" \
+    "Changed values change the hash"
+}
+
+function test_chart_digest() {
+  describe "the deploy hash follows the packaged chart files"
+  local chart="${TEST_TMP}/chart"
+  cp -R "${FIXTURES}/chart" "${chart}"
+  local before
+  before=$(render_hash "${chart}")
+
+  echo "# environment note" >> "${chart}/values/cml-k8s-n-02.yaml"
+  assert_equals "${before}" "$(render_hash "${chart}")" "Files in .helmignore do not change the hash"
+
+  echo "  environment: lab" >> "${chart}/templates/configmap.yaml"
+  assert_true "$([[ "${before}" != "$(render_hash "${chart}")" ]] && echo true || echo false)" "A changed template changes the hash"
+}
+
+function test_skip_unchanged() {
+  describe "unchanged releases are skipped"
+  local current exit_code
+  current=$(render_hash "${FIXTURES}/chart" --values "${FIXTURES}/chart/values/lab.yaml")
+
+  exit_code=0
+  python3 "${HELM_VALUES}" render --chart "${FIXTURES}/chart" --release component-name --namespace component \
+    --values "${FIXTURES}/chart/values/lab.yaml" --output "${TEST_TMP}/skip.yaml" \
+    --recorded-hash "${current}" >/dev/null 2>&1 || exit_code=$?
+  assert_equals "3" "${exit_code}" "A matching recorded hash exits with 3"
+
+  exit_code=0
+  python3 "${HELM_VALUES}" render --chart "${FIXTURES}/chart" --release component-name --namespace component \
+    --values "${FIXTURES}/chart/values/lab.yaml" --output "${TEST_TMP}/skip.yaml" \
+    --recorded-hash 0123456789abcdef >/dev/null 2>&1 || exit_code=$?
+  assert_equals "0" "${exit_code}" "A different recorded hash deploys"
+}
+
+function test_recorded_hash() {
+  describe "the recorded hash is read from helm status"
+  assert_equals "0123456789abcdef" "$(python3 "${HELM_VALUES}" recorded-hash < "${FIXTURES}/status-deployed.json")" \
+    "The hash of a deployed release is read from its description"
+  assert_equals "" "$(python3 "${HELM_VALUES}" recorded-hash < "${FIXTURES}/status-failed.json")" \
+    "A failed release has no recorded hash"
+  assert_equals "" "$(echo "" | python3 "${HELM_VALUES}" recorded-hash)" "A missing release has no recorded hash"
+}
+
+function test_merge_cache() {
+  describe "foundations share the merges of their common layers"
+  local log
+  log=$(python3 "${HELM_VALUES}" render --chart "${FIXTURES}/chart" --release component-name --namespace component \
+    --values "${FIXTURES}/chart/values/lab.yaml" --values "${FIXTURES}/chart/values/{foundation}.yaml" \
+    --foundation cml-k8s-n-01 --foundation cml-k8s-n-02 \
+    --output "${TEST_TMP}/foundations/{foundation}.yaml" 2>&1 >/dev/null)
+  assert_contains "Merged 4 layers, reused 1 merges" "${log}" "The chart and environment layers are merged once"
+  assert_equals "3" "$(value_of "${TEST_TMP}/foundations/cml-k8s-n-01.yaml" replicaCount)" "The first foundation gets its own values"
+  assert_equals "2" "$(value_of "${TEST_TMP}/foundations/cml-k8s-n-02.yaml" replicaCount)" "The second foundation gets its own values"
+}
+
+# Run all tests
+test_layering
+test_set_syntax
+test_missing_values_file
+test_stable_hash
+test_chart_digest
+test_skip_unchanged
+test_recorded_hash
+test_merge_cache
+
+# Report test results
+print_summary
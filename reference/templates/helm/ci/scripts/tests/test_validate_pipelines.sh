@@ -0,0 +1,80 @@
+#!/usr/bin/env bash
+#
+# Tests for the offline pipeline validator used by `fly.sh validate all` (lib/validate_pipelines.py)
+# Runs against the fixture pipelines in fixtures/validate-pipelines and the template's own pipelines
+#
+
+# Get script directory for relative paths
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" &>/dev/null && pwd)"
+source "${SCRIPT_DIR}/test-framework.sh"
+VALIDATOR="${SCRIPT_DIR}/../lib/validate_pipelines.py"
+FIXTURES="${SCRIPT_DIR}/fixtures/validate-pipelines"
+
+# Validate pipeline files without the result cache, printing the report and the exit code
+function validate() {
+  local exit_code=0
+  python3 "${VALIDATOR}" --no-cache "$@" 2>&1 || exit_code=$?
+  echo "exit=${exit_code}"
+}
+
+function test_valid_pipeline() {
+  describe "a valid pipeline passes"
+  local result
+  result=$(validate "${FIXTURES}/valid.yml")
+  assert_contains "VALID: ${FIXTURES}/valid.yml" "${result}" "The pipeline is reported as valid"
+  assert_contains "exit=0" "${result}" "The validator exits with 0"
+}
+
+function test_duplicate_keys() {
+  describe "duplicate mapping keys are reported"
+  local result
+  result=$(validate "${FIXTURES}/duplicate-keys.yml")
+  assert_contains "line 7: duplicate key 'uri'" "${result}" "The duplicate key and its line are reported"
+  assert_contains "exit=1" "${result}" "The validator exits with 1"
+}
+
+function test_var_syntax() {
+  describe "((var)) references are checked"
+  local result
+  result=$(validate "${FIXTURES}/invalid-vars.yml")
+  assert_contains "invalid ((var)) reference '((git uri))'" "${result}" "A var name with a space is invalid"
+  assert_contains "refers to undefined var source 'vault'" "${result}" "A var source must be declared"
+  assert_contains "line 8: unterminated ((var)) reference" "${result}" "An unterminated var is reported"
+  assert_false "$([[ "$(validate "${FIXTURES}/valid.yml")" == *"((REPLICAS"* ]] && echo true || echo false)" \
+    "Shell arithmetic \$((...)) is not a var"
+}
+
+function test_unknown_passed_job() {
+  describe "passed: constraints must name jobs of the pipeline"
+  local result
+  result=$(validate "${FIXTURES}/unknown-passed.yml")
+  assert_contains "jobs[deploy].plan[0]: passed refers to unknown job 'test'" "${result}" "The unknown job is reported"
+  assert_contains "exit=1" "${result}" "The validator exits with 1"
+}
+
+function test_placeholder() {
+  describe "empty placeholder pipelines do not fail"
+  local result
+  result=$(validate "${FIXTURES}/placeholder.yml" "${FIXTURES}/valid.yml")
+  assert_contains "EMPTY: ${FIXTURES}/placeholder.yml" "${result}" "A comment-only file is reported as empty"
+  assert_contains "exit=0" "${result}" "The validator exits with 0"
+}
+
+function test_template_pipelines() {
+  describe "the template's own pipelines are valid"
+  local result
+  result=$(validate "${SCRIPT_DIR}"/../../pipelines/*.yml)
+  assert_false "$([[ "${result}" == *"INVALID"* ]] && echo true || echo false)" "No pipeline of the template is invalid"
+  assert_contains "exit=0" "${result}" "The validator exits with 0"
+}
+
+# Run all tests
+test_valid_pipeline
+test_duplicate_keys
+test_var_syntax
+test_unknown_passed_job
+test_placeholder
+test_template_pipelines
+
+# Report test results
+print_summary
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+#
+# helm_values.py - Layered Helm values and no-op deploy detection for helm-deploy
+#
+# Deep-merges the values of a release the way Helm does, lowest layer first:
+#   1. chart defaults   values.yaml of the chart
+#   2. environment      e.g. values/lab.yaml
+#   3. foundation       e.g. values/cml-k8s-n-01.yaml
+#   4. overrides        --set key.path=value[,key.path=value...]
+# Maps are merged key by key, lists and scalars replace the lower layer, and a
+# null value removes the key. Missing values files are skipped.
+#
+# The effective values are written to one file for `helm upgrade --values`, and
+# hashed together with the release name, namespace and a digest of the chart
+# files Helm would package (honoring .helmignore). When the hash equals the one
+# recorded by the last successful deploy, nothing changed and the deploy can be
+# skipped. The task records the hash in the release description
+# (deploy-hash=...), where `recorded-hash` reads it back from `helm status -o json`.
+#
+# --set supports the subset of Helm's syntax that maps keys to scalars: several
+# pairs separated by commas, \. for a dot within a key and \, for a comma
+# within a value. List indexes (a[0]=x) and list values ({a,b}) are rejected;
+# put lists in a values file.
+#
+# Merges are memoized by the digests of their layers, so rendering several
+# foundations that share the chart and environment layers merges those once.
+#
+# Usage: helm_values.py render --chart PATH [--values FILE ...] [--set KEY=VALUE ...]
+#                              --release NAME --namespace NAME --output FILE
+#                              [--foundation NAME ...] [--hash-file FILE] [--recorded-hash HASH]
+#        helm status RELEASE -n NAMESPACE -o json | helm_values.py recorded-hash
+#
+# render exits with 3 when --recorded-hash matches, so the deploy can be skipped.
+#
+
+import argparse
+import copy
+import hashlib
+import json
+import os
+import re
+import sys
+from fnmatch import fnmatchcase
+
+try:
+    import yaml
+except ImportError:
+    print("ERROR: PyYAML is required to render Helm values (pip install pyyaml)", file=sys.stderr)
+    sys.exit(2)
+
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Exit code of render when the release is unchanged
+UNCHANGED = 3
+
+# Prefix of the release description holding the deploy hash
+HASH_PREFIX = "deploy-hash="
+
+INTEGER_PATTERN = re.compile(r"^[-+]?\d+$")
+
+class ValuesError(Exception):
+    """A values layer or chart that cannot be read"""
+
+def canonical_json(value):
+    """Serialize values independently of key order"""
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+
+def digest_text(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def deep_merge(base, layer):
+    """Merge a layer over a base the way Helm coalesces values
+
+    Returns:
+        New dictionary; the arguments are not modified
+    """
+    merged = dict(base)
+    for key, value in layer.items():
+        if value is None:
+            merged.pop(key, None)
+        elif isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = deep_merge(merged[key], value)
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
+
+def split_unescaped(text, separator):
+    """Split text on a separator that is not escaped with a backslash, keeping the escapes"""
+    parts = [""]
+    escaped = False
+    for char in text:
+        if char == separator and not escaped:
+            parts.append("")
+            continue
+        parts[-1] += char
+        escaped = char == "\\" and not escaped
+    return parts
+
+def parse_value(raw):
+    """Type a --set value like Helm: booleans, null and integers, anything else a string"""
+    if raw in ("true", "false"):
+        return raw == "true"
+    if raw == "null":
+        return None
+    if INTEGER_PATTERN.match(raw) and not (len(raw.lstrip("+-")) > 1 and raw.lstrip("+-").startswith("0")):
+        return int(raw)
+    return raw
+
+def parse_set(assignment):
+    """Parse key.path=value[,key.path=value...] into a nested layer, typed like `helm --set`
+
+    Raises:
+        ValuesError: For a malformed pair, or the list syntax Helm supports
+            but this parser does not (a[0]=x, a={x,y})
+    """
+    layer = {}
+    for pair in split_unescaped(assignment, ","):
+        path, separator, raw = pair.partition("=")
+        if not separator or not path:
+            raise ValuesError(f"--set must be KEY=VALUE[,KEY=VALUE...], got {assignment}")
+        if "[" in path:
+            raise ValuesError(f"--set {pair}: list indexes are not supported, put lists in a values file")
+        if raw.startswith("{") and raw.endswith("}"):
+            raise ValuesError(f"--set {pair}: list values are not supported, put lists in a values file")
+
+        keys = [key.replace("\\.", ".") for key in split_unescaped(path, ".")]
+        if not all(keys):
+            raise ValuesError(f"--set {pair}: empty key in {path}")
+
+        node = layer
+        for key in keys[:-1]:
+            if not isinstance(node.get(key), dict):
+                node[key] = {}
+            node = node[key]
+        node[keys[-1]] = parse_value(raw.replace("\\,", ","))
+    return layer
+
+def helmignore_patterns(chart_dir):
+    try:
+        with open(os.path.join(chart_dir, ".helmignore"), "r") as file:
+            lines = [line.strip() for line in file]
+    except OSError:
+        return []
+    return [line for line in lines if line and not line.startswith("#")]
+
+def is_ignored(rel_path, patterns):
+    """Match a chart file against .helmignore patterns (globs, dir/ for directories)"""
+    parts = rel_path.split("/")
+    for pattern in patterns:
+        if pattern.endswith("/"):
+            if pattern.rstrip("/") in parts[:-1] or fnmatchcase("/".join(parts[:-1]), pattern.rstrip("/")):
+                return True
+        elif fnmatchcase(rel_path, pattern.lstrip("/")) or fnmatchcase(parts[-1], pattern):
+            return True
+    return False
+
+def chart_digest(chart_path):
+    """Digest of the chart files Helm would package, or of a packaged chart"""
+    if os.path.isfile(chart_path):
+        with open(chart_path, "rb") as file:
+            return hashlib.sha256(file.read()).hexdigest()
+    if not os.path.isfile(os.path.join(chart_path, "Chart.yaml")):
+        raise ValuesError(f"{chart_path} is not a chart directory (no Chart.yaml)")
+
+    patterns = helmignore_patterns(chart_path)
+    digest = hashlib.sha256()
+    for dirpath, dirnames, filenames in os.walk(chart_path):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            path = os.path.join(dirpath, filename)
+            rel_path = os.path.relpath(path, chart_path).replace(os.sep, "/")
+            if rel_path == ".helmignore" or is_ignored(rel_path, patterns):
+                continue
+            with open(path, "rb") as file:
+                digest.update(f"{rel_path}\0{hashlib.sha256(file.read()).hexdigest()}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+class ValuesEngine:
+    """Merge values layers, reading each file once and memoizing merged prefixes"""
+
+    def __init__(self):
+        self.files = {}
+        self.merges = {}
+        self.merged = 0
+        self.reused = 0
+
+    def load_file(self, path):
+        """Parse a values file once
+
+        Returns:
+            (digest, values), or None for a missing file
+        """
+        if path not in self.files:
+            if not os.path.isfile(path):
+                self.files[path] = None
+            else:
+                with open(path, "r", encoding="utf-8") as file:
+                    try:
+                        values = yaml.load(file, Loader=_Loader) or {}
+                    except yaml.YAMLError as e:
+                        raise ValuesError(f"{path}: invalid YAML: {e}")
+                if not isinstance(values, dict):
+                    raise ValuesError(f"{path}: values must be a mapping")
+                self.files[path] = (digest_text(canonical_json(values)), values)
+        return self.files[path]
+
+    def merge(self, layers):
+        """Merge (digest, values) layers, lowest first, reusing merged prefixes"""
+        key = tuple(digest for digest, _ in layers)
+        if key in self.merges:
+            self.reused += 1
+            return self.merges[key]
+        if not layers:
+            return {}
+        self.merged += 1
+        self.merges[key] = deep_merge(self.merge(layers[:-1]), layers[-1][1])
+        return self.merges[key]
+
+    def render(self, chart_path, values_paths, assignments):
+        """Compute the effective values of a release
+
+        Returns:
+            (values, used values files)
+        """
+        layers = []
+        used = []
+        defaults = None if os.path.isfile(chart_path) else self.load_file(os.path.join(chart_path, "values.yaml"))
+        if defaults:
+            layers.append(defaults)
+        for path in values_paths:
+            layer = self.load_file(path)
+            if layer:
+                layers.append(layer)
+                used.append(path)
+        for assignment in assignments:
+            layer = parse_set(assignment)
+            layers.append((digest_text(canonical_json(layer)), layer))
+        return self.merge(layers), used
+
+def deploy_hash(values, chart, release, namespace):
+    """Hash of everything a deploy depends on; equal hashes mean a no-op upgrade"""
+    return digest_text(canonical_json({"release": release, "namespace": namespace, "chart": chart, "values": values}))
+
+def recorded_hash(status):
+    """Get the deploy hash of a release from `helm status -o json`, if it is deployed"""
+    info = status.get("info") or {}
+    description = info.get("description") or ""
+    if info.get("status") != "deployed" or not description.startswith(HASH_PREFIX):
+        return ""
+    return description[len(HASH_PREFIX):].strip()
+
+def cmd_render(args):
+    foundations = args.foundation or [None]
+    if args.recorded_hash is not None and len(foundations) > 1:
+        print("ERROR: --recorded-hash needs a single foundation", file=sys.stderr)
+        return 1
+
+    engine = ValuesEngine()
+    chart = chart_digest(args.chart)
+    hashes = {}
+    for foundation in foundations:
+        substitute = (lambda value: value.replace("{foundation}", foundation)) if foundation else (lambda value: value)
+        values, used = engine.render(args.chart, [substitute(path) for path in args.values], args.set)
+        output = substitute(args.output)
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, "w", encoding="utf-8") as file:
+            yaml.safe_dump(values, file, sort_keys=True, default_flow_style=False)
+        hashes[foundation] = deploy_hash(values, chart, args.release, args.namespace)
+
+        label = f"{foundation}: " if foundation else ""
+        print(f"{label}{hashes[foundation]} ({len(used)} values files: {', '.join(used) or 'chart defaults only'}) -> {output}")
+
+    print(f"Merged {engine.merged} layers, reused {engine.reused} merges from the cache", file=sys.stderr)
+    if args.hash_file:
+        with open(args.hash_file, "w") as file:
+            file.write(hashes[foundations[0]] + "\n")
+
+    if args.recorded_hash and args.recorded_hash == hashes[foundations[0]]:
+        print("Unchanged since the last successful deploy")
+        return UNCHANGED
+    return 0
+
+def cmd_recorded_hash(args):
+    try:
+        status = json.load(sys.stdin)
+    except ValueError:
+        # No release yet, or helm status failed
+        status = {}
+    print(recorded_hash(status if isinstance(status, dict) else {}))
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Layered Helm values and no-op deploy detection")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    render = subparsers.add_parser("render", help="Write the effective values and their deploy hash")
+    render.add_argument("--chart", required=True, help="Chart directory or packaged chart")
+    render.add_argument("--values", action="append", default=[],
+                        help="Values file, lowest layer first (repeatable; may contain {foundation}; missing files are skipped)")
+    render.add_argument("--set", action="append", default=[], help="Overrides as key.path=value[,key.path=value...], applied last (repeatable)")
+    render.add_argument("--release", required=True, help="Release name")
+    render.add_argument("--namespace", required=True, help="Release namespace")
+    render.add_argument("--output", required=True, help="File to write the effective values to (may contain {foundation})")
+    render.add_argument("--foundation", action="append", help="Foundation to render {foundation} for (repeatable)")
+    render.add_argument("--hash-file", help="File to write the deploy hash to")
+    render.add_argument("--recorded-hash", help="Hash of the last successful deploy; exit 3 if unchanged")
+
+    subparsers.add_parser("recorded-hash", help="Print the deploy hash recorded in `helm status -o json` read from stdin")
+    args = parser.parse_args()
+
+    try:
+        if args.command == "render":
+            return cmd_render(args)
+        return cmd_recorded_hash(args)
+    except (OSError, ValuesError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
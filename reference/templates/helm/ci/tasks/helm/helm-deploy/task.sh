@@ -13,6 +13,15 @@ setup_tkgi_credentials
 # Validate required parameters
 validate_env "FOUNDATION" "NAMESPACE" "RELEASE_NAME" "CHART_PATH"
 
+# Use the version-specific chart if a version tag is set and the chart exists
+if [[ -n $CHART_VERSION_TAG ]]; then
+  if [[ -d "${CHART_PATH}-v${CHART_VERSION_TAG}" ]]; then
+    CHART_PATH="${CHART_PATH}-v${CHART_VERSION_TAG}"
+  else
+    info "Chart ${CHART_PATH}-v${CHART_VERSION_TAG} not found, using $CHART_PATH"
+  fi
+fi
+
 # Handle dry run mode
 if [[ "$PIPELINE_DRY_RUN" == "true" ]]; then
   info "DRY RUN mode - would have deployed Helm chart $CHART_PATH as $RELEASE_NAME to $NAMESPACE in foundation $FOUNDATION"
@@ -24,35 +33,67 @@ info "Deploying Helm chart $CHART_PATH as $RELEASE_NAME to $NAMESPACE in foundat
 # Make sure helm is available
 ensure_helm
 
-# Set up Helm command parameters
-HELM_ARGS=""
+# Layer the values: chart defaults, VALUES_FILE (environment), VALUES_FILES
+# (e.g. foundation) in order, then VALUES_OVERRIDES and the Gatekeeper version
+RENDER_ARGS=(--chart "$CHART_PATH" --release "$RELEASE_NAME" --namespace "$NAMESPACE")
+for values_file in $VALUES_FILE $VALUES_FILES; do
+  if [[ -f $values_file ]]; then
+    info "Using values file: $values_file"
+  else
+    info "Values file not found, skipping: $values_file"
+  fi
+  RENDER_ARGS+=(--values "$values_file")
+done
+for override in $VALUES_OVERRIDES; do
+  RENDER_ARGS+=(--set "$override")
+done
 
-# Add values file if specified
-if [[ -n $VALUES_FILE && -f $VALUES_FILE ]]; then
-  HELM_ARGS="$HELM_ARGS --values $VALUES_FILE"
-  info "Using values file: $VALUES_FILE"
-else
-  info "No values file specified or file not found, using chart defaults"
+# If version is specified, use it for specific Gatekeeper version
+if [[ -n $GATEKEEPER_VERSION ]]; then
+  RENDER_ARGS+=(--set "image.release=$GATEKEEPER_VERSION")
+  info "Setting Gatekeeper version: $GATEKEEPER_VERSION"
+fi
+
+# Skip the deploy when the values and chart match the last successful deploy
+RECORDED_HASH=""
+if [[ "$FORCE_DEPLOY" != "true" ]]; then
+  RECORDED_HASH=$(helm status "$RELEASE_NAME" -n "$NAMESPACE" -o json 2>/dev/null |
+    python3 "${__DIR}/helm_values.py" recorded-hash || true)
 fi
 
+WORK_DIR="$(mktemp -d)"
+trap 'rm -rf "$WORK_DIR"' EXIT
+render_status=0
+python3 "${__DIR}/helm_values.py" render "${RENDER_ARGS[@]}" \
+  --output "$WORK_DIR/values.yaml" \
+  --hash-file "$WORK_DIR/deploy-hash" \
+  ${RECORDED_HASH:+--recorded-hash "$RECORDED_HASH"} || render_status=$?
+if [[ $render_status -eq 3 ]]; then
+  info "Release $RELEASE_NAME is unchanged since its last successful deploy, skipping"
+  exit 0
+elif [[ $render_status -ne 0 ]]; then
+  error "Failed to render Helm values"
+  exit 1
+fi
+DEPLOY_HASH="$(cat "$WORK_DIR/deploy-hash")"
+
+# Set up Helm command parameters
+HELM_ARGS=""
+
 # Add timeout if specified
 if [[ -n $TIMEOUT ]]; then
   HELM_ARGS="$HELM_ARGS --timeout $TIMEOUT"
   info "Using timeout: $TIMEOUT"
 fi
 
-# If version is specified, use it for specific Gatekeeper version
-if [[ -n $GATEKEEPER_VERSION ]]; then
-  HELM_ARGS="$HELM_ARGS --set image.release=$GATEKEEPER_VERSION"
-  info "Setting Gatekeeper version: $GATEKEEPER_VERSION"
-fi
-
 # Make sure namespace exists
 create_namespace_if_not_exists "$NAMESPACE"
 
-# Execute Helm upgrade/install
+# Execute Helm upgrade/install, recording the deploy hash in the release description
 if ! helm upgrade --install "$RELEASE_NAME" "$CHART_PATH" \
   --namespace "$NAMESPACE" \
+  --values "$WORK_DIR/values.yaml" \
+  --description "deploy-hash=$DEPLOY_HASH" \
   $HELM_ARGS \
   --atomic \
   --wait; then
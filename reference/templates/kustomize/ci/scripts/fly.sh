@@ -85,6 +85,12 @@ main() {
     PIPELINE="${RELEASE_PIPELINE_NAME}"
   fi
 
+  # Validating all pipelines works offline and needs no foundation
+  if [[ "${COMMAND}" == "validate" && "${PIPELINE}" == "all" ]]; then
+    cmd_validate_all_pipelines
+    return
+  fi
+
   # Try to get version if available and not already set
   if [[ -z "$VERSION" ]] && type get_latest_version &>/dev/null; then
     VERSION="$(get_latest_version)"
@@ -293,6 +293,32 @@ function cmd_destroy_pipeline() {
   return 0
 }
 
+# Implementation of validate all pipelines command
+# Parses and checks every pipeline file offline in a single batch, without fly
+function cmd_validate_all_pipelines() {
+  local pipeline_files=("${CI_DIR}"/pipelines/*.yml)
+
+  if [[ ! -f "${pipeline_files[0]}" ]]; then
+    error "No pipeline files found in ${CI_DIR}/pipelines"
+    return 1
+  fi
+
+  if ! command -v python3 &>/dev/null; then
+    error "python3 is required to validate all pipelines"
+    return 1
+  fi
+
+  info "Validating ${#pipeline_files[@]} pipeline files in ${CI_DIR}/pipelines"
+
+  if ! python3 "${LIB_DIR}/validate_pipelines.py" "${pipeline_files[@]}"; then
+    error "Pipeline validation failed"
+    return 1
+  fi
+
+  success "All pipeline files are valid"
+  return 0
+}
+
 # Implementation of validate pipeline command
 # This function takes parameters instead of using global variables
 # @param pipeline_name The name of the pipeline without foundation
@@ -312,20 +338,8 @@ function cmd_validate_pipeline() {
 
   # Validate all pipelines if requested
   if [[ "$pipeline" == "all" ]]; then
-    info "Validating all pipelines"
-
-    for pipeline_file in "${CI_DIR}"/pipelines/*.yml; do
-      local pipeline_name=$(basename "${pipeline_file}" .yml)
-      info "Validating pipeline: ${pipeline_name}"
-
-      fly validate-pipeline -c "${pipeline_file}" || {
-        error "Pipeline validation failed: ${pipeline_name}"
-        return 1
-      }
-    done
-
-    success "All pipelines validated successfully"
-    return 0
+    cmd_validate_all_pipelines
+    return
   fi
 
   # Validate a specific pipeline
@@ -80,7 +80,8 @@ Description: Validate a pipeline YAML without setting it
 Usage: ./fly.sh [options] validate [pipeline_name|all]
 
 Validates the syntax of a pipeline YAML file without setting it in Concourse.
-Specify 'all' to validate all pipelines in the pipelines directory.
+Specify 'all' to check every pipeline in the pipelines directory offline,
+without fly and without modifying the files.
 
 Options:
   -f, --foundation NAME      Foundation name (required for some validations)
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+#
+# validate_pipelines.py - Offline batch validation of Concourse pipeline files
+#
+# Used by `fly.sh validate all`. Every pipeline is parsed once, in parallel, and
+# checked for the structural errors Concourse would reject, without the fly
+# binary and without rewriting the files:
+#   - YAML syntax and duplicate mapping keys
+#   - duplicate job, resource, resource type, group and var source names
+#   - resource references of get/put steps and resource types of resources
+#   - passed: constraints referring to jobs that use the resource
+#   - group job references
+#   - ((var)) syntax and var source references
+#   - step structure (exactly one step type, task file or config)
+#
+# Files that are empty or hold only comments are placeholders for pipelines a
+# project has not written yet; they are reported as EMPTY and do not fail.
+#
+# Results are cached per file content, so unchanged pipelines are not parsed
+# again.
+#
+# Usage: validate_pipelines.py [--jobs N] [--cache-dir DIR] [--no-cache] [--json] pipeline.yml...
+#
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from fnmatch import fnmatchcase
+
+try:
+    import yaml
+except ImportError:
+    print("ERROR: PyYAML is required to validate pipelines (pip install pyyaml)", file=sys.stderr)
+    sys.exit(2)
+
+# Bump when checks change so cached results are invalidated
+VALIDATOR_VERSION = "2"
+
+# Resource types bundled with Concourse workers
+BASE_RESOURCE_TYPES = {
+    "bosh-io-release", "bosh-io-stemcell", "cf", "docker-image", "git", "github-release",
+    "hg", "mock", "pool", "registry-image", "s3", "semver", "time", "tracker"
+}
+
+STEP_TYPES = ["get", "put", "task", "set_pipeline", "load_var", "in_parallel", "do", "try"]
+HOOKS = ["on_success", "on_failure", "on_error", "on_abort", "ensure"]
+TOP_LEVEL_KEYS = {"jobs", "resources", "resource_types", "groups", "var_sources", "display"}
+
+# ((var)), ((var.field)), ((source:var)) and ((source:"quoted var".field))
+VAR_SEGMENT = r'(?:[-\w/]+|"[^"]*")'
+VAR_PATTERN = re.compile(rf'^(?:([-\w/.]+):)?{VAR_SEGMENT}(?:\.{VAR_SEGMENT})*$')
+
+_BaseLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+class PipelineLoader(_BaseLoader):
+    """Safe loader (C-accelerated when available) that records duplicate mapping keys"""
+
+    def __init__(self, stream):
+        super().__init__(stream)
+        self.duplicates = []
+
+    def construct_mapping(self, node, deep=False):
+        seen = set()
+        for key_node, _ in node.value:
+            key = key_node.value
+            if key in seen:
+                self.duplicates.append((key, key_node.start_mark.line + 1))
+            seen.add(key)
+        return super().construct_mapping(node, deep=deep)
+
+PipelineLoader.add_constructor(
+    yaml.resolver.BaseResolver.DEFAULT_MAPPING_TAG,
+    lambda loader, node: loader.construct_mapping(node)
+)
+
+def check_var_syntax(content, var_sources, issues):
+    """Check ((var)) references in the raw pipeline text"""
+    for line_number, line in enumerate(content.splitlines(), 1):
+        if line.lstrip().startswith("#"):
+            continue
+        start = line.find("((")
+        while start != -1:
+            # $((...)) is shell arithmetic in inline scripts, not a pipeline var
+            if start > 0 and line[start - 1] == "$":
+                end = line.find("))", start + 2)
+                start = line.find("((", end + 2 if end != -1 else start + 2)
+                continue
+
+            end = line.find("))", start + 2)
+            if end == -1:
+                issues.append(f"line {line_number}: unterminated ((var)) reference")
+                break
+
+            name = line[start + 2:end]
+            match = VAR_PATTERN.match(name)
+            if not match:
+                issues.append(f"line {line_number}: invalid ((var)) reference '(({name}))'")
+            elif match.group(1) and match.group(1) not in var_sources:
+                issues.append(f"line {line_number}: (({name})) refers to undefined var source '{match.group(1)}'")
+            start = line.find("((", end + 2)
+
+def named_items(pipeline, section, issues):
+    """Get the names of a pipeline section, reporting missing and duplicate names"""
+    items = pipeline.get(section) or []
+    if not isinstance(items, list):
+        issues.append(f"{section}: must be a list")
+        return {}
+
+    named = {}
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or not item.get("name"):
+            issues.append(f"{section}[{index}]: missing name")
+            continue
+        name = str(item["name"])
+        if name in named:
+            issues.append(f"{section}: duplicate name '{name}'")
+        named[name] = item
+    return named
+
+def iter_steps(step, location):
+    """Yield a step and all steps nested in it, with their locations"""
+    if not isinstance(step, dict):
+        yield step, location
+        return
+
+    yield step, location
+
+    nested = []
+    if "in_parallel" in step:
+        parallel = step["in_parallel"]
+        steps = parallel.get("steps", []) if isinstance(parallel, dict) else parallel
+        nested.extend((child, f"{location}.in_parallel[{i}]") for i, child in enumerate(steps or []))
+    if "do" in step:
+        nested.extend((child, f"{location}.do[{i}]") for i, child in enumerate(step["do"] or []))
+    if "try" in step:
+        nested.append((step["try"], f"{location}.try"))
+    for hook in HOOKS:
+        if hook in step:
+            nested.append((step[hook], f"{location}.{hook}"))
+
+    for child, child_location in nested:
+        yield from iter_steps(child, child_location)
+
+def job_steps(job, job_name):
+    """Yield every step of a job, including job-level hooks"""
+    for index, step in enumerate(job.get("plan") or []):
+        yield from iter_steps(step, f"jobs[{job_name}].plan[{index}]")
+    for hook in HOOKS:
+        if hook in job:
+            yield from iter_steps(job[hook], f"jobs[{job_name}].{hook}")
+
+def check_structure(pipeline, issues):
+    """Check names and references of a parsed pipeline"""
+    if pipeline is None:
+        issues.append("pipeline file is empty")
+        return
+    if not isinstance(pipeline, dict):
+        issues.append("pipeline must be a mapping")
+        return
+
+    for key in pipeline:
+        if key not in TOP_LEVEL_KEYS:
+            issues.append(f"unknown top-level key '{key}'")
+
+    resource_types = named_items(pipeline, "resource_types", issues)
+    resources = named_items(pipeline, "resources", issues)
+    jobs = named_items(pipeline, "jobs", issues)
+    groups = named_items(pipeline, "groups", issues)
+    named_items(pipeline, "var_sources", issues)
+
+    if not jobs:
+        issues.append("pipeline has no jobs")
+
+    for name, resource in resources.items():
+        resource_type = resource.get("type")
+        if not resource_type:
+            issues.append(f"resources[{name}]: missing type")
+        elif resource_type not in resource_types and resource_type not in BASE_RESOURCE_TYPES:
+            issues.append(f"resources[{name}]: unknown resource type '{resource_type}'")
+
+    # Resources each job gets or puts, for checking passed: constraints
+    job_resources = {}
+    constraints = []
+    for job_name, job in jobs.items():
+        if not isinstance(job.get("plan"), list):
+            issues.append(f"jobs[{job_name}]: missing plan")
+            continue
+
+        used = job_resources.setdefault(job_name, set())
+        for step, location in job_steps(job, job_name):
+            if not isinstance(step, dict):
+                issues.append(f"{location}: step must be a mapping")
+                continue
+
+            types = [step_type for step_type in STEP_TYPES if step_type in step]
+            if len(types) != 1:
+                issues.append(f"{location}: step must have exactly one of {', '.join(STEP_TYPES)}, found {types or 'none'}")
+                continue
+
+            if types[0] in ("get", "put"):
+                resource = step.get("resource", step[types[0]])
+                used.add(resource)
+                if resource not in resources:
+                    issues.append(f"{location}: {types[0]} refers to unknown resource '{resource}'")
+                if types[0] == "get":
+                    for passed in step.get("passed") or []:
+                        constraints.append((location, resource, passed))
+            elif types[0] == "task" and "file" not in step and "config" not in step:
+                issues.append(f"{location}: task '{step['task']}' needs a file or config")
+
+    for location, resource, passed in constraints:
+        if passed not in jobs:
+            issues.append(f"{location}: passed refers to unknown job '{passed}'")
+        elif resource not in job_resources.get(passed, set()):
+            issues.append(f"{location}: passed job '{passed}' does not get or put resource '{resource}'")
+
+    for group_name, group in groups.items():
+        for pattern in group.get("jobs") or []:
+            if not any(fnmatchcase(job_name, str(pattern)) for job_name in jobs):
+                issues.append(f"groups[{group_name}]: refers to unknown job '{pattern}'")
+
+def is_placeholder(content):
+    """Check whether a pipeline file holds nothing but blank lines and comments"""
+    return all(not line.strip() or line.lstrip().startswith("#") for line in content.splitlines())
+
+def validate_content(content):
+    """Validate the content of a pipeline file
+
+    Returns:
+        List of issue messages
+    """
+    if is_placeholder(content):
+        return []
+
+    issues = []
+    loader = PipelineLoader(content)
+    try:
+        pipeline = loader.get_single_data()
+    except yaml.YAMLError as e:
+        return [f"invalid YAML: {e}"]
+    finally:
+        loader.dispose()
+
+    for key, line in loader.duplicates:
+        issues.append(f"line {line}: duplicate key '{key}'")
+
+    var_sources = set()
+    if isinstance(pipeline, dict) and isinstance(pipeline.get("var_sources"), list):
+        var_sources = {str(source.get("name")) for source in pipeline["var_sources"] if isinstance(source, dict)}
+
+    check_var_syntax(content, var_sources, issues)
+    check_structure(pipeline, issues)
+    return issues
+
+def cache_path(cache_dir, digest):
+    return os.path.join(cache_dir, digest[:2], f"{digest}.json")
+
+def validate_files(paths, jobs, cache_dir):
+    """Validate pipeline files, reusing cached results for unchanged content
+
+    Returns:
+        Dictionary of path to list of issue messages
+    """
+    results = {}
+    pending = {}
+    for path in paths:
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                content = file.read()
+        except (OSError, UnicodeDecodeError) as e:
+            results[path] = [f"cannot read file: {e}"]
+            continue
+
+        digest = hashlib.sha256(f"{VALIDATOR_VERSION}\0{content}".encode("utf-8")).hexdigest()
+        if cache_dir:
+            try:
+                with open(cache_path(cache_dir, digest), "r") as file:
+                    results[path] = json.load(file)
+                    continue
+            except (OSError, ValueError):
+                pass
+        pending[path] = (digest, content)
+
+    if len(pending) > 1 and jobs > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(pending))) as executor:
+            validated = dict(zip(pending, executor.map(validate_content, [content for _, content in pending.values()])))
+    else:
+        validated = {path: validate_content(content) for path, (_, content) in pending.items()}
+
+    for path, issues in validated.items():
+        results[path] = issues
+        if cache_dir:
+            target = cache_path(cache_dir, pending[path][0])
+            try:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                with open(target, "w") as file:
+                    json.dump(issues, file)
+            except OSError:
+                pass
+
+    return results
+
+def default_cache_dir():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "fly-validate-pipelines")
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate Concourse pipeline files offline")
+    parser.add_argument("paths", nargs="+", help="Pipeline files to validate")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Number of files to parse in parallel")
+    parser.add_argument("--cache-dir", default=default_cache_dir(), help="Directory for cached results")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write cached results")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args()
+
+    results = validate_files(args.paths, args.jobs, None if args.no_cache else args.cache_dir)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for path in args.paths:
+            issues = results[path]
+            status = "INVALID" if issues else "VALID"
+            if not issues and os.path.isfile(path):
+                with open(path, "r", encoding="utf-8") as file:
+                    status = "EMPTY" if is_placeholder(file.read()) else status
+            print(f"{status}: {path}")
+            for issue in issues:
+                print(f"  - {issue}")
+
+    return 1 if any(results.values()) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+#!/usr/bin/env bash
+#
+# Tests for the apply planner of the kubectl-apply task (plan_apply.py)
+# Runs offline against the manifests in fixtures/apply-plan
+#
+
+# Get script directory for relative paths
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" &>/dev/null && pwd)"
+source "${SCRIPT_DIR}/test-framework.sh"
+PLANNER="${SCRIPT_DIR}/../../tasks/common/kubectl-apply/plan_apply.py"
+FIXTURES="${SCRIPT_DIR}/fixtures/apply-plan"
+
+# Print a value of the JSON plan, e.g. plan_value "--shards 2" "waves"
+function plan_value() {
+  local args="$1"
+  local expression="$2"
+  # shellcheck disable=SC2086
+  python3 "${PLANNER}" --manifests "${FIXTURES}" --dry-run --json ${args} |
+    python3 -c "import json, sys; plan = json.load(sys.stdin); print(${expression})"
+}
+
+function test_wave_order() {
+  start_test "waves follow the dependency order"
+  local result
+  result=$(plan_value "" "','.join(wave['name'] for wave in plan['waves'])")
+  assert_equals "crds,namespaces,cluster,rbac,config,workloads,webhooks" "${result}" "CRDs and namespaces come first, webhooks last"
+
+  result=$(plan_value "" "[obj for wave in plan['waves'] if wave['name'] == 'workloads' for shard in wave['shards'] for obj in shard['objects']]")
+  assert_contains "Widget/team-a/app-widget" "${result}" "Custom resources wait for their CRDs in the workloads wave"
+  assert_contains "ClusterWidget/shared" "${result}" "Cluster-scoped custom resources wait for their CRDs too"
+
+  result=$(plan_value "" "[obj for shard in plan['waves'][2]['shards'] for obj in shard['objects']]")
+  assert_equals "['ClusterRole/widget-reader']" "${result}" "Cluster-scoped RBAC is applied before namespaced objects"
+  test_pass "waves follow the dependency order"
+}
+
+function test_namespace_shards() {
+  start_test "namespaces are split into parallel shards"
+  local result
+  result=$(plan_value "--shards 2" "[shard['namespaces'] for wave in plan['waves'] if wave['name'] == 'workloads' for shard in wave['shards']]")
+  assert_equals "[[], ['team-a'], ['team-b', 'team-c']]" "${result}" "Cluster-scoped objects get their own shard, namespaces are balanced by object count"
+
+  result=$(plan_value "--shards 1" "max(len(wave['shards']) for wave in plan['waves'])")
+  assert_equals "2" "${result}" "One namespace shard plus the cluster-scoped shard"
+  test_pass "namespaces are split into parallel shards"
+}
+
+function test_kinds_and_namespace_limit() {
+  start_test "KINDS and NAMESPACE_LIMIT select the objects"
+  local result
+  result=$(plan_value "--kinds Namespace,configmap" "','.join(wave['name'] for wave in plan['waves'])")
+  assert_equals "namespaces,config" "${result}" "Only the listed kinds are planned, case-insensitively"
+
+  result=$(plan_value "--namespace-limit 1" "plan['namespaces']")
+  assert_equals "['team-a']" "${result}" "Only the first namespace by name is planned"
+
+  result=$(plan_value "--namespace-limit 1" "plan['skipped']['namespaces']")
+  assert_contains "Namespace/team-b" "${result}" "Namespaces over the limit are skipped with their objects"
+  assert_contains "Deployment/team-c/app" "${result}" "Objects of namespaces over the limit are skipped"
+  test_pass "KINDS and NAMESPACE_LIMIT select the objects"
+}
+
+function test_output_dir() {
+  start_test "the plan is written as one manifest per shard"
+  local output_dir="${__TESTS_DIR}/apply-plan"
+  python3 "${PLANNER}" --manifests "${FIXTURES}" --shards 2 --output-dir "${output_dir}" >/dev/null
+
+  assert_true "$([[ -f "${output_dir}/plan.json" ]] && echo true || echo false)" "plan.json is written"
+  assert_true "$([[ -f "${output_dir}/01-crds/shard-01.yaml" ]] && echo true || echo false)" "Waves are numbered in apply order"
+  assert_true "$([[ -f "${output_dir}/06-workloads/shard-03.yaml" ]] && echo true || echo false)" "Each shard is a manifest of its own"
+
+  local result
+  result=$(grep -c "^kind:" "${output_dir}/06-workloads/shard-02.yaml")
+  assert_equals "3" "${result}" "Shard manifests hold every object of their namespaces"
+  test_pass "the plan is written as one manifest per shard"
+}
+
+function test_invalid_manifest() {
+  start_test "invalid manifests fail the plan"
+  local bad_dir="${__TESTS_DIR}/bad-manifests"
+  mkdir -p "${bad_dir}"
+  printf 'apiVersion: v1\nkind: ConfigMap\nmetadata: {}\n' > "${bad_dir}/nameless.yaml"
+
+  local exit_code=0
+  python3 "${PLANNER}" --manifests "${bad_dir}" --dry-run >/dev/null 2>&1 || exit_code=$?
+  assert_equals "1" "${exit_code}" "Objects without a name are rejected"
+  test_pass "invalid manifests fail the plan"
+}
+
+# Run all tests
+run_test test_wave_order
+run_test test_namespace_shards
+run_test test_kinds_and_namespace_limit
+run_test test_output_dir
+run_test test_invalid_manifest
+
+# Report test results
+report_results
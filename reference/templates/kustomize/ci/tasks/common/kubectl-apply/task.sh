@@ -9,7 +9,9 @@
 #
 # Optional Environment Variables:
 #   - KINDS: Comma-separated list of kinds to apply (default: all)
-#   - NAMESPACE_LIMIT: Number of namespaces to process (default: 0 = all)
+#   - NAMESPACE_LIMIT: Number of namespaces to process, first by name (default: 0 = all)
+#   - APPLY_SHARDS: Namespace shards applied in parallel per wave (default: 4)
+#   - DRY_RUN: Print the apply plan without applying it (default: false)
 #   - VERBOSE: Enable verbose output (default: false)
 #
 
@@ -30,6 +32,8 @@ REPO_ROOT="$(cd "${__DIR}/../../../../.." &>/dev/null && pwd)"
 # Set defaults for optional variables
 KINDS="${KINDS:-all}"
 NAMESPACE_LIMIT="${NAMESPACE_LIMIT:-0}"
+APPLY_SHARDS="${APPLY_SHARDS:-4}"
+DRY_RUN="${DRY_RUN:-false}"
 VERBOSE="${VERBOSE:-false}"
 
 # Enable verbose output if requested
@@ -43,13 +47,44 @@ if [[ "${NAMESPACE_LIMIT}" -gt 0 ]]; then
   echo "Limiting to ${NAMESPACE_LIMIT} namespaces"
 fi
 
-# Call the repository's apply script with the appropriate arguments
-"${REPO_ROOT}/scripts/apply.sh" \
-  -f "${FOUNDATION}" \
-  -p "${PKS_PASSWORD}" \
-  -k "${KINDS}" \
-  -n "${NAMESPACE_LIMIT}" \
-  -m "manifests" \
-  ${VERBOSE} && { echo "Kubectl apply successful"; } || { echo "Kubectl apply failed"; exit 1; }
+# Plan the apply: dependency-ordered waves, each split into namespace shards
+# that are applied in parallel. The plan keeps the objects of the listed KINDS
+# and, with NAMESPACE_LIMIT, of the first NAMESPACE_LIMIT namespaces sorted by
+# name, plus every cluster-scoped object. (Without a plan, apply.sh stops after
+# NAMESPACE_LIMIT manifest files instead.)
+PLAN_ARGS=(
+  --manifests "manifests"
+  --kinds "${KINDS}"
+  --namespace-limit "${NAMESPACE_LIMIT}"
+  --shards "${APPLY_SHARDS}"
+)
+
+if [[ "${DRY_RUN}" == "true" ]]; then
+  python3 "${__DIR}/plan_apply.py" "${PLAN_ARGS[@]}" --dry-run || { echo "Apply planning failed"; exit 1; }
+  echo "Dry run, nothing applied"
+  exit 0
+fi
+
+APPLY_SCRIPT="${REPO_ROOT}/scripts/apply.sh"
+APPLY_ARGS=(
+  -f "${FOUNDATION}"
+  -p "${PKS_PASSWORD}"
+)
+
+# Apply the plan if the repository's apply script supports it (-P, --plan),
+# otherwise let it apply the manifests one file at a time as before
+if grep -q -- "--plan" "${APPLY_SCRIPT}"; then
+  python3 "${__DIR}/plan_apply.py" "${PLAN_ARGS[@]}" --output-dir "apply-plan" || { echo "Apply planning failed"; exit 1; }
+  APPLY_ARGS+=(-P "apply-plan")
+else
+  echo "scripts/apply.sh does not support -P, applying the manifests without a plan"
+  APPLY_ARGS+=(-k "${KINDS}" -n "${NAMESPACE_LIMIT}" -m "manifests")
+fi
+
+if [[ "${VERBOSE}" == "true" ]]; then
+  APPLY_ARGS+=(-v)
+fi
+
+"${APPLY_SCRIPT}" "${APPLY_ARGS[@]}" && { echo "Kubectl apply successful"; } || { echo "Kubectl apply failed"; exit 1; }
 
 echo "Task completed successfully"
\ No newline at end of file
@@ -11,6 +11,7 @@
 #   -k, --kinds KINDS             Comma-separated list of kinds to apply (default: all)
 #   -n, --namespace-limit LIMIT   Number of namespaces to process (default: 0 = all)
 #   -m, --manifests PATH          Path to manifests directory (default: ./build)
+#   -P, --plan PATH               Apply a plan written by plan_apply.py instead of the manifests
 #   -v, --verbose                 Enable verbose output
 #   -h, --help                    Show this help message
 #
@@ -35,6 +36,7 @@ PKS_PASSWORD=""
 KINDS="all"
 NAMESPACE_LIMIT=0
 MANIFESTS_DIR="${REPO_ROOT}/build"
+PLAN_DIR=""
 VERBOSE=false
 
 # Function to display usage
@@ -51,6 +53,7 @@ Options:
   -k, --kinds KINDS             Comma-separated list of kinds to apply (default: all)
   -n, --namespace-limit LIMIT   Number of namespaces to process (default: 0 = all)
   -m, --manifests PATH          Path to manifests directory (default: ./build)
+  -P, --plan PATH               Apply a plan written by plan_apply.py instead of the manifests
   -v, --verbose                 Enable verbose output
   -h, --help                    Show this help message
 EOF
@@ -80,6 +83,10 @@ while [[ $# -gt 0 ]]; do
       MANIFESTS_DIR="$2"
       shift 2
       ;;
+    -P|--plan)
+      PLAN_DIR="$2"
+      shift 2
+      ;;
     -v|--verbose)
       VERBOSE=true
       shift
@@ -173,9 +180,69 @@ function get_cluster_credentials() {
   return 0
 }
 
+# Apply a plan written by ci/tasks/common/kubectl-apply/plan_apply.py to cluster
+# Waves are applied in order and the shards of a wave in parallel
+function apply_plan() {
+  local cluster_name="$1"
+
+  info "Applying plan ${PLAN_DIR} to cluster: ${cluster_name}"
+
+  if ! validate_directory_exists "${PLAN_DIR}" "Plan directory"; then
+    return 1
+  fi
+
+  local wave_dir
+  local shard
+  local count=0
+  for wave_dir in "${PLAN_DIR}"/*/; do
+    [[ -d "${wave_dir}" ]] || continue
+    info "Applying wave $(basename "${wave_dir}")"
+
+    # Start every shard of the wave, keeping each shard's output apart
+    local pids=()
+    local shards=()
+    for shard in "${wave_dir}"shard-*.yaml; do
+      [[ -f "${shard}" ]] || continue
+      kubectl apply -f "${shard}" > "${shard%.yaml}.log" 2>&1 &
+      pids+=("$!")
+      shards+=("${shard}")
+    done
+
+    local failed=false
+    local i
+    for i in "${!pids[@]}"; do
+      local status=0
+      wait "${pids[$i]}" || status=$?
+      cat "${shards[$i]%.yaml}.log"
+      if [[ "${status}" -ne 0 ]]; then
+        error "Failed to apply shard: ${shards[$i]}"
+        failed=true
+      fi
+    done
+
+    if [[ "${failed}" == "true" ]]; then
+      return 1
+    fi
+    count=$((count + ${#shards[@]}))
+
+    # Custom resources in later waves need their definitions to be served first
+    if [[ "$(basename "${wave_dir}")" == *-crds ]]; then
+      kubectl wait --for condition=established --timeout=60s -f "${wave_dir}" || return 1
+    fi
+  done
+
+  success "Successfully applied ${count} shards to cluster: ${cluster_name}"
+  return 0
+}
+
 # Apply manifests to cluster
 function apply_manifests() {
   local cluster_name="$1"
+
+  if [[ -n "${PLAN_DIR}" ]]; then
+    apply_plan "${cluster_name}"
+    return $?
+  fi
   
   info "Applying manifests to cluster: ${cluster_name}"
   
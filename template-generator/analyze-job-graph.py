@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Pipeline Job Graph Analyzer
+
+This script builds the job graph of each pipeline in ci/pipelines/ from the
+passed: constraints of its get steps, weights the jobs with recorded build
+durations, and reports the critical path from trigger to the last job, the
+maximum number of jobs that can run at once, constraints already implied by
+a longer chain, and constraints on resources the upstream job does not use,
+with the lead time dropping each would save. Constraints on resources the
+upstream job only gets are promotion gates and are not reported.
+
+Durations come from a JSON file mapping "job" or "pipeline/job" to seconds (or
+durations such as "5m"), or from the output of `fly -t <target> builds --json`.
+Jobs without recorded timings count as --default-duration.
+
+Usage:
+    python analyze-job-graph.py --project-dir /path/to/project
+    fly -t prod builds --count 500 --json > builds.json
+    python analyze-job-graph.py --project-dir /path/to/project --durations builds.json --pipeline install
+
+Author: CI/CD Platform Team
+"""
+
+import argparse
+import json
+import os
+import sys
+from fnmatch import fnmatchcase
+from pathlib import Path, PurePosixPath
+from typing import Dict, Any
+
+import yaml
+
+SCRIPT_DIR = Path(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from template_tools.project_sources import FilesystemSource
+from template_tools.check_load import load_pipeline, parse_duration
+from template_tools.job_graph import Durations, JobGraph, format_seconds
+
+def parse_args() -> Dict[str, Any]:
+    """Parse command line arguments
+
+    Returns:
+        Dictionary of argument values
+    """
+    parser = argparse.ArgumentParser(
+        description="Analyze the critical path and parallelism of the job graphs of pipelines"
+    )
+
+    parser.add_argument(
+        "--project-dir",
+        required=True,
+        help="Directory of the project whose ci/pipelines to analyze"
+    )
+
+    parser.add_argument(
+        "--pipeline",
+        action="append",
+        help="Glob pattern of the pipeline names to analyze (repeatable, default: all ci/pipelines/*.yml)"
+    )
+
+    parser.add_argument(
+        "--durations",
+        help="JSON file of job durations, or the output of fly builds --json"
+    )
+
+    parser.add_argument(
+        "--default-duration",
+        default="1m",
+        help="Duration of jobs without recorded timings (default: 1m)"
+    )
+
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the analysis as JSON"
+    )
+
+    args = parser.parse_args()
+
+    default_duration = parse_duration(args.default_duration)
+    if default_duration is None:
+        parser.error(f"--default-duration must be a duration such as 90s or 5m, got {args.default_duration}")
+
+    return {
+        "project_dir": args.project_dir,
+        "pipelines": args.pipeline or ["*"],
+        "durations": args.durations,
+        "default_duration": default_duration,
+        "json": args.json
+    }
+
+def print_analysis(graph: JobGraph) -> None:
+    """Print the analysis of one pipeline"""
+    analysis = graph.to_dict()
+    print(f"📋 {graph.name}: {len(graph.jobs)} jobs, {format_seconds(analysis['total_seconds'])} of work")
+    if not graph.jobs:
+        return
+
+    recorded = len(graph.recorded)
+    if recorded < len(graph.jobs):
+        print(f"  ⚠️  {len(graph.jobs) - recorded} job(s) without recorded durations use the default")
+
+    print(f"  Critical path ({format_seconds(analysis['critical_path_seconds'])}): "
+          f"{' → '.join(analysis['critical_path'])}")
+    print(f"  Max parallelism: {analysis['max_parallelism']} jobs, average {analysis['average_parallelism']}")
+
+    for entry in analysis["unused"]:
+        saved = f", saves {format_seconds(entry['seconds_saved'])}" if entry["seconds_saved"] else ""
+        print(f"  ⏸  {entry['job']}: passed {entry['upstream']} on {', '.join(entry['resources'])}, "
+              f"which {entry['upstream']} does not use{saved}")
+
+    for entry in analysis["redundant"]:
+        print(f"  ↪  {entry['job']}: passed {entry['upstream']} is implied by another constraint")
+
+def main():
+    """Main entry point"""
+    options = parse_args()
+
+    try:
+        if not os.path.isdir(options["project_dir"]):
+            raise ValueError(f"Project directory {options['project_dir']} does not exist")
+        durations = Durations(default=options["default_duration"])
+        if options["durations"]:
+            durations = Durations.load(options["durations"], options["default_duration"])
+
+        source = FilesystemSource(options["project_dir"])
+        graphs = []
+        for path in sorted(source.glob("ci/pipelines/*.yml")):
+            name = PurePosixPath(path).stem
+            if not any(fnmatchcase(name, pattern) for pattern in options["pipelines"]):
+                continue
+            pipeline = load_pipeline(source, path)
+            if pipeline is not None:
+                graphs.append(JobGraph.from_pipeline(pipeline, name, durations))
+        analyses = [graph.to_dict() for graph in graphs]
+    except (OSError, ValueError, yaml.YAMLError) as e:
+        print(f"Error during job graph analysis: {str(e)}")
+        sys.exit(1)
+
+    if options["json"]:
+        print(json.dumps(analyses, indent=2))
+        return
+
+    for graph in graphs:
+        print_analysis(graph)
+        print()
+
+if __name__ == "__main__":
+    main()
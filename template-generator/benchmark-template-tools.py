@@ -0,0 +1,541 @@
+#!/usr/bin/env python3
+"""
+Template Tools Benchmark Suite
+
+This script measures how generate-reference-template.py and
+validate-template-compliance.py scale. For each scale it synthesizes a template
+tree from the reference templates, padded with generated scripts of varied
+sizes, deep ci/tasks hierarchies and a multi-MB main pipeline, then generates a
+project from it and validates that project.
+
+Every operation runs in a fresh worker process: the first iteration is the cold
+run (including loading the tool), the remaining iterations are warm runs. The
+throughput, peak RSS and per-phase times are appended to a JSON history file,
+and the script fails when a result is slower or larger than the median of the
+previous comparable runs by more than the regression threshold.
+
+Usage:
+    python benchmark-template-tools.py [--scales 100,1000] [--repeat 3] [--threshold 0.2]
+    python benchmark-template-tools.py --scales 10000,100000 --work-dir /dev/shm
+
+Author: CI/CD Platform Team
+"""
+
+import argparse
+import datetime
+import importlib
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+SCRIPT_DIR = Path(os.path.dirname(os.path.abspath(__file__)))
+REPO_ROOT = SCRIPT_DIR.parent
+
+DEFAULT_SCALES = [100, 1000]
+DEFAULT_HISTORY = SCRIPT_DIR / "benchmark-history.json"
+
+# Metrics compared against earlier runs, with the smallest change that counts as
+# a regression regardless of the relative threshold (to ignore timer noise)
+REGRESSION_METRICS = {
+    "cold_s": 0.05,
+    "warm_s": 0.02,
+    "peak_rss_mb": 5.0
+}
+
+# Script sizes cycled through when synthesizing scripts, in bytes
+SCRIPT_SIZES = [256, 1024, 4096, 16384]
+
+def parse_args() -> Dict[str, Any]:
+    """Parse command line arguments
+
+    Returns:
+        Dictionary of argument values
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark template generation and compliance validation at several scales"
+    )
+
+    parser.add_argument(
+        "--scales",
+        default=",".join(str(scale) for scale in DEFAULT_SCALES),
+        help="Comma-separated template tree sizes in files (default: 100,1000; use 10000,100000 for nightly runs)"
+    )
+
+    parser.add_argument(
+        "--template-type",
+        choices=["kustomize", "helm", "cli-tool"],
+        default="kustomize",
+        help="Template type to synthesize and benchmark (default: kustomize)"
+    )
+
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Iterations per operation; the first is the cold run (default: 3)"
+    )
+
+    parser.add_argument(
+        "--task-depth",
+        type=int,
+        default=4,
+        help="Directory levels below ci/tasks/<category> for synthesized tasks (default: 4)"
+    )
+
+    parser.add_argument(
+        "--pipeline-kb",
+        type=int,
+        default=2048,
+        help="Size of the synthesized main pipeline in KB (default: 2048)"
+    )
+
+    parser.add_argument(
+        "--work-dir",
+        help="Directory for synthesized trees and generated projects (default: system temp directory)"
+    )
+
+    parser.add_argument(
+        "--history",
+        default=str(DEFAULT_HISTORY),
+        help=f"JSON history file (default: {DEFAULT_HISTORY.name})"
+    )
+
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Allowed relative increase over the baseline before failing (default: 0.2)"
+    )
+
+    parser.add_argument(
+        "--baseline-runs",
+        type=int,
+        default=5,
+        help="Number of previous comparable runs whose median is the baseline (default: 5)"
+    )
+
+    parser.add_argument(
+        "--no-save",
+        action="store_true",
+        help="Compare against the history without recording this run"
+    )
+
+    parser.add_argument(
+        "--worker",
+        help=argparse.SUPPRESS
+    )
+
+    args = vars(parser.parse_args())
+    if args["worker"] is None:
+        try:
+            args["scales"] = [int(scale) for scale in args["scales"].split(",") if scale]
+        except ValueError:
+            parser.error(f"--scales must be a comma-separated list of integers: {args['scales']}")
+        if args["repeat"] < 1:
+            parser.error("--repeat must be at least 1")
+    return args
+
+def write_file(path: Path, content: str, executable: bool = False) -> int:
+    """Write a synthesized file
+
+    Args:
+        path: File path
+        content: File content
+        executable: Whether to set the executable bit
+
+    Returns:
+        Number of bytes written
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = content.encode("utf-8")
+    path.write_bytes(data)
+    if executable:
+        path.chmod(0o755)
+    return len(data)
+
+def synthesize_script(index: int, size: int) -> str:
+    """Build a standards-compliant bash script of roughly the given size"""
+    lines = [
+        "#!/usr/bin/env bash",
+        f"# Synthesized benchmark script {index}",
+        "set -o errexit",
+        "set -o pipefail",
+        "",
+        "function main() {"
+    ]
+    length = sum(len(line) + 1 for line in lines)
+    step = 0
+    while length < size:
+        line = f'  echo "step {step} of ${{FOUNDATION:-lab}} in ${{NAMESPACE:-default}}"'
+        lines.append(line)
+        length += len(line) + 1
+        step += 1
+    lines.extend(["}", "", 'main "$@"', ""])
+    return "\n".join(lines)
+
+def synthesize_task(rel_dir: str) -> str:
+    """Build a task.yml whose run.path points to the task.sh next to it"""
+    return (
+        "---\n"
+        "platform: linux\n\n"
+        "inputs:\n"
+        "  - name: repo\n\n"
+        "params:\n"
+        "  FOUNDATION:\n"
+        '  DEBUG: "false"\n\n'
+        "run:\n"
+        f"  path: repo/{rel_dir}/task.sh\n"
+    )
+
+def synthesize_pipeline(size: int) -> str:
+    """Build a pipeline with groups, resources and jobs of roughly the given size"""
+    header = [
+        "---",
+        "groups:",
+        "  - name: all",
+        "    jobs: [job-0]",
+        "",
+        "resources:",
+        "  - name: repo",
+        "    type: git",
+        "    source:",
+        "      uri: ((github_uri))",
+        "      branch: ((branch))",
+        "",
+        "jobs:"
+    ]
+    chunks = ["\n".join(header) + "\n"]
+    length = len(chunks[0])
+    job = 0
+    while length < size:
+        chunk = (
+            f"  - name: job-{job}\n"
+            "    plan:\n"
+            "      - get: repo\n"
+            "        trigger: true\n"
+            f"      - task: step-{job}\n"
+            "        file: repo/ci/tasks/common/kubectl-apply/task.yml\n"
+            "        params:\n"
+            "          FOUNDATION: ((foundation))\n"
+            f"          NAMESPACE: namespace-{job}\n"
+        )
+        chunks.append(chunk)
+        length += len(chunk)
+        job += 1
+    return "".join(chunks)
+
+def synthesize_tree(root: Path, scale: int, template_type: str, task_depth: int, pipeline_kb: int) -> Dict[str, Any]:
+    """Synthesize a repository root containing a template tree of about `scale` files
+
+    The reference templates are copied as-is, so the generated project is
+    compliant, and the tree is padded with synthesized files: half deep task
+    directories, half scripts of varied sizes. The main pipeline is replaced by
+    one of `pipeline_kb` KB, and extra pipelines of the same size are added for
+    every 10,000 files.
+
+    Args:
+        root: Directory to create the repository root in
+        scale: Target number of files in the template tree
+        template_type: Template type whose template directory is padded
+        task_depth: Directory levels below ci/tasks/<category> for synthesized tasks
+        pipeline_kb: Size of each synthesized pipeline in KB
+
+    Returns:
+        Dictionary describing the synthesized tree
+    """
+    reference = REPO_ROOT / "reference"
+    shutil.copytree(reference / "pipeline", root / "reference" / "pipeline", symlinks=True)
+    template_root = root / "reference" / "templates" / template_type
+    shutil.copytree(reference / "templates" / template_type, template_root, symlinks=True)
+
+    files = sum(1 for path in root.rglob("*") if path.is_file() or path.is_symlink())
+    total_bytes = 0
+
+    pipeline = synthesize_pipeline(pipeline_kb * 1024)
+    total_bytes += write_file(template_root / "ci" / "pipelines" / "main.yml", pipeline)
+    for index in range(scale // 10000):
+        total_bytes += write_file(template_root / "ci" / "pipelines" / f"extra-{index}.yml", pipeline)
+        files += 1
+
+    # Synthesized tasks go in a category every template type includes
+    category = "common"
+    padding = max(0, scale - files)
+    tasks = padding // 4
+    for index in range(tasks):
+        levels = [f"level-{depth}-{(index >> (2 * depth)) % 4}" for depth in range(task_depth)]
+        rel_dir = "/".join(["ci", "tasks", category] + levels + [f"task-{index}"])
+        total_bytes += write_file(template_root / rel_dir / "task.yml", synthesize_task(rel_dir))
+        total_bytes += write_file(template_root / rel_dir / "task.sh", synthesize_script(index, SCRIPT_SIZES[0]), executable=True)
+
+    scripts = padding - 2 * tasks
+    for index in range(scripts):
+        size = SCRIPT_SIZES[index % len(SCRIPT_SIZES)]
+        rel_path = f"ci/scripts/generated/batch-{index // 1000}/script-{index}.sh"
+        total_bytes += write_file(template_root / rel_path, synthesize_script(index, size), executable=True)
+
+    return {
+        "files": files + 2 * tasks + scripts,
+        "synthesized_bytes": total_bytes,
+        "tasks": tasks,
+        "scripts": scripts
+    }
+
+def load_tool(name: str):
+    """Import one of the modules of the template_tools package, e.g. generator"""
+    sys.path.insert(0, str(SCRIPT_DIR))
+    return importlib.import_module(f"template_tools.{name}")
+
+def peak_rss_mb() -> float:
+    """Get the peak resident set size of this process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def run_worker(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one benchmark operation repeatedly in this process
+
+    Args:
+        spec: Operation, template type, paths and number of iterations
+
+    Returns:
+        Timings of every iteration, phase times of the last one and peak RSS
+    """
+    from template_tools.template_profiler import Profiler
+
+    timings = []
+    phases = {}
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        for iteration in range(spec["repeat"]):
+            start = time.perf_counter()
+            if spec["operation"] == "generate":
+                generator_tool = load_tool("generator")
+
+                class SyntheticGenerator(generator_tool.TemplateGenerator):
+                    """Generator reading templates from the synthesized repository root"""
+
+                    def _get_script_dir(self) -> Path:
+                        return Path(spec["root"]) / "template-generator"
+
+                output_dir = Path(spec["output_dir"]) / f"iteration-{iteration}"
+                profiler = Profiler("generate-reference-template")
+                SyntheticGenerator({
+                    "template_type": spec["template_type"],
+                    "output_dir": str(output_dir)
+                }, profiler).generate_template()
+            else:
+                validator_tool = load_tool("validator")
+                profiler = Profiler("validate-template-compliance")
+                validator_tool.TemplateValidator(spec["project_dir"], spec["template_type"],
+                                                 collect=False, profiler=profiler).validate()
+            timings.append(time.perf_counter() - start)
+            phases = profiler.to_dict(top_n=0)["phases"]
+
+            # Keep only the last generated project, for the validate operation
+            if spec["operation"] == "generate" and iteration < spec["repeat"] - 1:
+                shutil.rmtree(output_dir)
+
+    return {
+        "timings": timings,
+        "phases": {name: stats["wall_ms"] for name, stats in phases.items()},
+        "peak_rss_mb": round(peak_rss_mb(), 1)
+    }
+
+def run_operation(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """Run a benchmark operation in a fresh worker process
+
+    Args:
+        spec: Worker specification
+
+    Returns:
+        Worker result
+    """
+    result = subprocess.run(
+        [sys.executable, str(Path(__file__).resolve()), "--worker", json.dumps(spec)],
+        stdout=subprocess.PIPE,
+        text=True,
+        check=True
+    )
+    return json.loads(result.stdout)
+
+def benchmark_scale(scale: int, args: Dict[str, Any], work_dir: str) -> List[Dict[str, Any]]:
+    """Synthesize a tree of the given scale and benchmark generate and validate on it
+
+    Args:
+        scale: Target number of files in the template tree
+        args: Command line arguments
+        work_dir: Directory for temporary trees, or None for the default
+
+    Returns:
+        List of result records, one per operation
+    """
+    template_type = args["template_type"]
+    with tempfile.TemporaryDirectory(prefix=f"benchmark-{scale}-", dir=work_dir) as temp_dir:
+        root = Path(temp_dir) / "repo"
+        start = time.perf_counter()
+        tree = synthesize_tree(root, scale, template_type, args["task_depth"], args["pipeline_kb"])
+        print(f"  synthesized {tree['files']} files in {time.perf_counter() - start:.2f}s")
+
+        tree_bytes = sum(path.stat().st_size for path in root.rglob("*") if path.is_file())
+        output_dir = Path(temp_dir) / "output"
+        project_dir = output_dir / f"iteration-{args['repeat'] - 1}"
+
+        records = []
+        for operation in ["generate", "validate"]:
+            spec = {
+                "operation": operation,
+                "template_type": template_type,
+                "root": str(root),
+                "output_dir": str(output_dir),
+                "project_dir": str(project_dir),
+                "repeat": args["repeat"]
+            }
+            result = run_operation(spec)
+            timings = result["timings"]
+            warm = statistics.median(timings[1:]) if len(timings) > 1 else None
+            seconds = warm if warm is not None else timings[0]
+            records.append({
+                "scale": scale,
+                "operation": operation,
+                "template_type": template_type,
+                "files": tree["files"],
+                "bytes": tree_bytes,
+                "cold_s": round(timings[0], 4),
+                "warm_s": round(warm, 4) if warm is not None else None,
+                "files_per_s": round(tree["files"] / seconds, 1),
+                "mb_per_s": round(tree_bytes / (1024 * 1024) / seconds, 2),
+                "peak_rss_mb": result["peak_rss_mb"],
+                "phases_ms": result["phases"]
+            })
+        return records
+
+def load_history(path: str) -> Dict[str, Any]:
+    """Load the benchmark history, or an empty one if the file does not exist"""
+    try:
+        with open(path, "r") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {"runs": []}
+
+def current_commit() -> Optional[str]:
+    """Get the commit being benchmarked, if this is a git checkout"""
+    result = subprocess.run(
+        ["git", "-C", str(REPO_ROOT), "rev-parse", "--short", "HEAD"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        check=False
+    )
+    return result.stdout.strip() or None
+
+def find_regressions(run: Dict[str, Any], history: Dict[str, Any], threshold: float, baseline_runs: int) -> List[str]:
+    """Compare a run with the median of the previous comparable runs
+
+    Runs are comparable when they were recorded on the same host with the same
+    Python version and synthesis settings.
+
+    Args:
+        run: Current run record
+        history: Benchmark history
+        threshold: Allowed relative increase over the baseline
+        baseline_runs: Number of previous runs to take the median of
+
+    Returns:
+        List of regression descriptions
+    """
+    comparable = [
+        previous for previous in history["runs"]
+        if previous["host"] == run["host"]
+        and previous["python"] == run["python"]
+        and previous["settings"] == run["settings"]
+    ][-baseline_runs:]
+
+    regressions = []
+    for result in run["results"]:
+        key = (result["scale"], result["operation"], result["template_type"])
+        for metric, noise_floor in REGRESSION_METRICS.items():
+            value = result.get(metric)
+            values = [
+                previous_result[metric]
+                for previous in comparable
+                for previous_result in previous["results"]
+                if (previous_result["scale"], previous_result["operation"], previous_result["template_type"]) == key
+                and previous_result.get(metric) is not None
+            ]
+            if value is None or not values:
+                continue
+
+            baseline = statistics.median(values)
+            if value > baseline * (1 + threshold) and value - baseline > noise_floor:
+                regressions.append(
+                    f"{result['operation']} at {result['scale']} files: {metric} {value} vs baseline {baseline} "
+                    f"(+{(value / baseline - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+def print_results(results: List[Dict[str, Any]]) -> None:
+    """Print a table of benchmark results"""
+    print(f"\n{'operation':<10} {'files':>8} {'MB':>8} {'cold s':>9} {'warm s':>9} {'files/s':>10} {'MB/s':>8} {'RSS MB':>8}")
+    for result in results:
+        warm = f"{result['warm_s']:.3f}" if result["warm_s"] is not None else "-"
+        print(f"{result['operation']:<10} {result['files']:>8} {result['bytes'] / (1024 * 1024):>8.1f} "
+              f"{result['cold_s']:>9.3f} {warm:>9} {result['files_per_s']:>10.1f} {result['mb_per_s']:>8.2f} "
+              f"{result['peak_rss_mb']:>8.1f}")
+
+def main():
+    """Main entry point"""
+    args = parse_args()
+
+    if args["worker"] is not None:
+        print(json.dumps(run_worker(json.loads(args["worker"]))))
+        return 0
+
+    results = []
+    for scale in args["scales"]:
+        print(f"Benchmarking {args['template_type']} at {scale} files...")
+        results.extend(benchmark_scale(scale, args, args["work_dir"]))
+
+    print_results(results)
+
+    run = {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "commit": current_commit(),
+        "host": platform.node(),
+        "python": platform.python_version(),
+        "settings": {
+            "repeat": args["repeat"],
+            "task_depth": args["task_depth"],
+            "pipeline_kb": args["pipeline_kb"]
+        },
+        "results": results
+    }
+
+    history = load_history(args["history"])
+    regressions = find_regressions(run, history, args["threshold"], args["baseline_runs"])
+
+    if not args["no_save"]:
+        history["runs"].append(run)
+        with open(args["history"], "w") as file:
+            json.dump(history, file, indent=2)
+        print(f"\nRecorded results in {args['history']}")
+
+    if regressions:
+        print(f"\n❌ Found {len(regressions)} performance regressions (threshold {args['threshold'] * 100:.0f}%):")
+        for regression in regressions:
+            print(f"  - {regression}")
+        return 1
+
+    print("\n✅ No performance regressions")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Single-File fly.sh Builder
+
+This script inlines the lib modules and the optional helpers.sh that
+ci/scripts/fly.sh sources into one self-contained script, so each invocation
+reads one file instead of five or more. The bundle records a sha256 of its
+content and of every module it inlined.
+
+--verify runs the project's test_fly*.sh suites against the original and the
+bundled script and fails if their exit codes or output differ. --check
+reports a bundle that was edited or whose modules changed since it was built.
+
+Usage:
+    python bundle-fly-script.py --project-dir /path/to/project --output dist/fly.sh
+    python bundle-fly-script.py --project-dir /path/to/project --strip-help --verify --output dist/fly.sh
+    python bundle-fly-script.py --project-dir /path/to/project --check dist/fly.sh
+
+Author: CI/CD Platform Team
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+SCRIPT_DIR = Path(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from template_tools.script_bundler import BundleError, bundle_script, check_bundle, verify_bundle
+
+def parse_args() -> Dict[str, Any]:
+    """Parse command line arguments
+
+    Returns:
+        Dictionary of argument values
+    """
+    parser = argparse.ArgumentParser(
+        description="Inline the modules fly.sh sources into one self-contained script"
+    )
+
+    parser.add_argument(
+        "--project-dir",
+        required=True,
+        help="Directory of the project whose ci/scripts/fly.sh to bundle"
+    )
+
+    parser.add_argument(
+        "--script",
+        default="ci/scripts/fly.sh",
+        help="Script to bundle, relative to the project directory (default: ci/scripts/fly.sh)"
+    )
+
+    parser.add_argument(
+        "--output",
+        help="File to write the bundle to (default: print it)"
+    )
+
+    parser.add_argument(
+        "--strip-help",
+        action="store_true",
+        help="Remove comments, blank lines and the help of unsupported commands"
+    )
+
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="Run the test_fly*.sh suites against the original and the bundled script and compare them"
+    )
+
+    parser.add_argument(
+        "--check",
+        metavar="BUNDLE",
+        help="Check an existing bundle for edits and for modules that changed since it was built"
+    )
+
+    args = parser.parse_args()
+    return {
+        "project_dir": Path(args.project_dir),
+        "script": args.script,
+        "output": args.output,
+        "strip_help": args.strip_help,
+        "verify": args.verify,
+        "check": args.check
+    }
+
+def source_reader(script_dir: Path):
+    """Build a reader for the modules of a script, relative to its directory"""
+    def read(rel_path: str) -> Optional[str]:
+        path = script_dir / rel_path
+        return path.read_text(encoding="utf-8") if path.is_file() else None
+    return read
+
+def main():
+    """Main entry point"""
+    options = parse_args()
+    script_path = options["project_dir"] / options["script"]
+    if not script_path.is_file():
+        print(f"Error: {script_path} does not exist")
+        sys.exit(1)
+    read_source = source_reader(script_path.parent)
+
+    if options["check"]:
+        problems = check_bundle(Path(options["check"]).read_text(encoding="utf-8"), read_source)
+        for problem in problems:
+            print(f"❌ {options['check']}: {problem}")
+        if problems:
+            sys.exit(1)
+        print(f"✅ {options['check']} is intact and up to date")
+        return
+
+    try:
+        bundle = bundle_script(script_path.read_text(encoding="utf-8"), read_source,
+                               script_path.name, options["strip_help"])
+    except BundleError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    if options["verify"]:
+        comparisons = verify_bundle(options["project_dir"], bundle.text, options["script"])
+        if not comparisons:
+            print("⚠️  No test_fly*.sh suites to verify the bundle with", file=sys.stderr)
+        for comparison in comparisons:
+            if comparison.equivalent:
+                print(f"✅ {comparison.test}: same result (exit {comparison.bundled_code})", file=sys.stderr)
+            else:
+                print(f"❌ {comparison.test}: exit {comparison.original_code} before, {comparison.bundled_code} bundled"
+                      + (f"; output differs at {comparison.difference}" if comparison.difference else ""), file=sys.stderr)
+        if not all(comparison.equivalent for comparison in comparisons):
+            sys.exit(1)
+
+    if options["output"]:
+        output = Path(options["output"])
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(bundle.text, encoding="utf-8")
+        output.chmod(output.stat().st_mode | 0o111)
+        print(f"📦 Bundled {script_path} and {len(bundle.sources)} modules into {output} "
+              f"({len(bundle.text.splitlines())} lines, sha256 {bundle.sha256[:12]})", file=sys.stderr)
+    else:
+        sys.stdout.write(bundle.text)
+
+if __name__ == "__main__":
+    main()
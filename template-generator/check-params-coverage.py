@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Params Coverage Checker
+
+This script reports, for every foundation of a params repository, which
+((vars)) referenced by the pipelines and task files of one or more projects
+have no value in the foundation's params files, and which params keys no
+project references. It reads the files fly.sh would pass to
+`fly set-pipeline`, so missing values are found before any pipeline is set,
+and checks a fleet of projects against all foundations in a single pass.
+
+Vars fly.sh supplies itself (foundation, branch, ...) are never reported as
+missing. Vars resolved by a credential manager can be skipped with --ignore.
+
+Usage:
+    python check-params-coverage.py --params-dir ~/git/params --project-dir /path/to/project
+    python check-params-coverage.py --params-dir ~/git/params --git-dir /mirrors/svc-a.git --git-dir /mirrors/svc-b.git
+    python check-params-coverage.py --params-dir ~/git/params --project-dir . --ignore '*_private_key' --missing-only
+
+Author: CI/CD Platform Team
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Dict, Any, List
+
+SCRIPT_DIR = Path(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from template_tools.project_sources import FilesystemSource, GitCatFile, GitObjectSource
+from template_tools.params_coverage import FLY_VARS, CoverageReport, ParamsTree, VarIndex, check_coverage
+
+def parse_args() -> Dict[str, Any]:
+    """Parse command line arguments
+
+    Returns:
+        Dictionary of argument values
+    """
+    parser = argparse.ArgumentParser(
+        description="Report params missing or unused for each foundation by the ((vars)) of pipelines and tasks"
+    )
+
+    parser.add_argument(
+        "--params-dir",
+        required=True,
+        help="Directory of the params repository"
+    )
+
+    project = parser.add_mutually_exclusive_group(required=True)
+
+    project.add_argument(
+        "--project-dir",
+        action="append",
+        help="Directory of a project to check (repeatable)"
+    )
+
+    project.add_argument(
+        "--git-dir",
+        action="append",
+        help="Local bare or mirrored repository to check without a checkout (repeatable)"
+    )
+
+    parser.add_argument(
+        "--rev",
+        default="HEAD",
+        help="Commit, branch or tag to check with --git-dir (default: HEAD)"
+    )
+
+    parser.add_argument(
+        "--foundation",
+        action="append",
+        help="Foundation to check (repeatable, default: every <datacenter>/<foundation>.yml in the params directory)"
+    )
+
+    parser.add_argument(
+        "--var",
+        action="append",
+        default=[],
+        help="Additional var supplied on the command line rather than by params files (repeatable)"
+    )
+
+    parser.add_argument(
+        "--ignore",
+        action="append",
+        default=[],
+        help="Glob pattern of var names resolved elsewhere, e.g. by a credential manager (repeatable)"
+    )
+
+    parser.add_argument(
+        "--missing-only",
+        action="store_true",
+        help="Do not report unused params keys"
+    )
+
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the reports as JSON"
+    )
+
+    args = parser.parse_args()
+    if args.rev != "HEAD" and not args.git_dir:
+        parser.error("--rev can only be used with --git-dir")
+
+    return {
+        "params_dir": args.params_dir,
+        "project_dirs": args.project_dir or [],
+        "git_dirs": args.git_dir or [],
+        "rev": args.rev,
+        "foundations": args.foundation,
+        "supplied": FLY_VARS | set(args.var),
+        "ignore": args.ignore,
+        "missing_only": args.missing_only,
+        "json": args.json
+    }
+
+def index_projects(options: Dict[str, Any]) -> List[VarIndex]:
+    """Build the var index of every project
+
+    Returns:
+        One index per project
+    """
+    indexes = []
+    for project_dir in options["project_dirs"]:
+        if not os.path.isdir(project_dir):
+            raise ValueError(f"Project directory {project_dir} does not exist")
+        indexes.append(VarIndex.from_source(FilesystemSource(project_dir)))
+
+    for git_dir in options["git_dirs"]:
+        cat_file = GitCatFile(git_dir)
+        try:
+            indexes.append(VarIndex.from_source(GitObjectSource(git_dir, options["rev"], cat_file=cat_file)))
+        finally:
+            cat_file.close()
+    return indexes
+
+def print_report(report: CoverageReport, params: ParamsTree, missing_only: bool) -> None:
+    """Print the coverage report of one foundation"""
+    if not params.foundations[report.foundation]:
+        print(f"⚠️  {report.foundation}: no params files found")
+
+    if report.missing:
+        print(f"❌ {report.foundation}: {len(report.missing)} missing params")
+        for name, paths in report.missing.items():
+            print(f"  - (({name})) used in {', '.join(paths)}")
+    else:
+        print(f"✅ {report.foundation}: all params present")
+
+    if not missing_only and report.unused:
+        print(f"  {len(report.unused)} unused params:")
+        for key, layers in report.unused.items():
+            print(f"  ? {key} ({', '.join(layers)})")
+
+def main():
+    """Main entry point"""
+    options = parse_args()
+
+    try:
+        params = ParamsTree.load(options["params_dir"], options["foundations"])
+        indexes = index_projects(options)
+    except Exception as e:
+        print(f"Error during params coverage check: {str(e)}")
+        sys.exit(1)
+
+    if not params.foundations:
+        print(f"Error: no foundations found in {options['params_dir']}")
+        sys.exit(1)
+
+    reports = check_coverage(indexes, params, options["supplied"], options["ignore"])
+    if options["missing_only"]:
+        for report in reports:
+            report.unused = {}
+
+    if options["json"]:
+        print(json.dumps([report.to_dict() for report in reports], indent=2))
+    else:
+        for report in reports:
+            print_report(report, params, options["missing_only"])
+        failed = [report for report in reports if report.missing]
+        print(f"\nChecked {len(indexes)} project(s) against {len(reports)} foundation(s): "
+              f"{len(failed)} foundation(s) with missing params")
+
+    # Exit with non-zero code if any foundation is missing params
+    if any(report.missing for report in reports):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Compliance History Queries
+
+This script answers fleet reporting questions from the compliance history
+database that validate-template-compliance.py writes with --history-db,
+instead of validating the fleet again:
+
+- runs: the most recent runs with their repo, compliant and issue counts
+- top-rules: the rules failing in the most repos
+- regressions: issues a repo has in one run but did not have in an earlier one
+- rate: the share of compliant repos per template type
+
+Usage:
+    python compliance-history.py --db compliance.db runs
+    python compliance-history.py --db compliance.db top-rules --days 7 --template-type helm
+    python compliance-history.py --db compliance.db regressions --days 7 --rule '*strict mode*'
+    python compliance-history.py --db compliance.db rate --json
+
+Author: CI/CD Platform Team
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Dict, Any, List
+
+SCRIPT_DIR = Path(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from template_tools.compliance_history import HistoryStore
+
+def parse_args() -> Dict[str, Any]:
+    """Parse command line arguments
+
+    Returns:
+        Dictionary of argument values
+    """
+    parser = argparse.ArgumentParser(
+        description="Query the compliance history recorded by validate-template-compliance.py --history-db"
+    )
+
+    parser.add_argument(
+        "--db",
+        required=True,
+        help="Compliance history database"
+    )
+
+    # Options shared by every query
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the results as JSON"
+    )
+
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    runs = commands.add_parser("runs", parents=[common], help="List the most recent runs")
+    runs.add_argument(
+        "--limit",
+        type=int,
+        default=20,
+        help="Number of runs to list (default: 20)"
+    )
+
+    top_rules = commands.add_parser("top-rules", parents=[common], help="List the rules failing in the most repos")
+    top_rules.add_argument(
+        "--run",
+        type=int,
+        help="Only count this run (default: every finished run)"
+    )
+    top_rules.add_argument(
+        "--days",
+        type=float,
+        help="Only count runs started in the last number of days"
+    )
+    top_rules.add_argument(
+        "--template-type",
+        choices=["kustomize", "helm", "cli-tool"],
+        help="Only count repos validated against this template type"
+    )
+    top_rules.add_argument(
+        "--limit",
+        type=int,
+        default=10,
+        help="Number of rules to list (default: 10)"
+    )
+
+    regressions = commands.add_parser("regressions", parents=[common], help="List issues that are new since an earlier run")
+    regressions.add_argument(
+        "--run",
+        type=int,
+        help="Run to check for new issues (default: the latest finished run)"
+    )
+    base = regressions.add_mutually_exclusive_group()
+    base.add_argument(
+        "--base",
+        type=int,
+        help="Run to compare against (default: the run before --run)"
+    )
+    base.add_argument(
+        "--days",
+        type=float,
+        help="Compare against the latest run started at least this many days before --run"
+    )
+    regressions.add_argument(
+        "--rule",
+        help="Glob pattern of the rules to include, e.g. '*strict mode*'"
+    )
+
+    rate = commands.add_parser("rate", parents=[common], help="Show the share of compliant repos per template type")
+    rate.add_argument(
+        "--run",
+        type=int,
+        help="Only count this run (default: every finished run)"
+    )
+    rate.add_argument(
+        "--days",
+        type=float,
+        help="Only count runs started in the last number of days"
+    )
+
+    args = parser.parse_args()
+    if not os.path.isfile(args.db):
+        parser.error(f"History database {args.db} does not exist")
+
+    return vars(args)
+
+def print_rows(rows: List[Dict[str, Any]], columns: List[str]) -> None:
+    """Print result rows as an aligned table"""
+    if not rows:
+        print("No results")
+        return
+    cells = [["-" if row[column] is None else str(row[column]) for column in columns] for row in rows]
+    widths = [max(len(column), *(len(cell[index]) for cell in cells)) for index, column in enumerate(columns)]
+    print("  ".join(column.ljust(width) for column, width in zip(columns, widths)).rstrip())
+    for cell in cells:
+        print("  ".join(value.ljust(width) for value, width in zip(cell, widths)).rstrip())
+
+def regressions(store: HistoryStore, options: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Find the regressions between the selected runs"""
+    run_id = options["run"] or store.latest_run()
+    if run_id is None:
+        raise ValueError("No finished runs recorded")
+    if options["base"] is not None:
+        base = options["base"]
+    elif options["days"] is not None:
+        base = store.run_before(run_id, options["days"])
+    else:
+        base = store.latest_run(before=run_id)
+    if base is None:
+        raise ValueError(f"No earlier finished run to compare run {run_id} against")
+    return store.regressions(base, run_id, options["rule"])
+
+def main():
+    """Main entry point"""
+    options = parse_args()
+    command = options["command"]
+
+    store = HistoryStore(options["db"])
+    try:
+        if command == "runs":
+            rows = store.runs(options["limit"])
+            columns = ["run", "started_at", "template_type", "repos", "compliant", "issues"]
+        elif command == "top-rules":
+            rows = store.top_rules(options["run"], options["days"], options["template_type"], options["limit"])
+            columns = ["repos", "issues", "check", "rule"]
+        elif command == "regressions":
+            rows = regressions(store, options)
+            columns = ["repo", "rev", "check", "message"]
+        else:
+            rows = store.compliance_rate(options["run"], options["days"])
+            columns = ["template_type", "repo_runs", "compliant", "rate"]
+    except Exception as e:
+        print(f"Error during history query: {str(e)}")
+        sys.exit(1)
+    finally:
+        store.close()
+
+    if options["json"]:
+        print(json.dumps(rows, indent=2))
+    else:
+        print_rows(rows, columns)
+
+if __name__ == "__main__":
+    main()
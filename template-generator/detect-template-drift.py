@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Template Drift Detector
+
+This script compares projects against the output generate-reference-template.py
+would render for them, and reports files that were added, removed or modified
+since the project was generated. The expected output and each project are
+hashed into Merkle trees and only subtrees whose hashes differ are compared, so
+checking a fleet of repositories costs roughly the number of differing files.
+
+Usage:
+    python detect-template-drift.py --project-dir /path/to/project --template-type kustomize --diff
+    python detect-template-drift.py --git-dir /mirrors/svc-a.git --git-dir /mirrors/svc-b.git --rev develop
+
+Author: CI/CD Platform Team
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import yaml
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple, Union
+
+SCRIPT_DIR = Path(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from template_tools.project_sources import FilesystemSource, GitCatFile, GitObjectSource, ProjectSource
+from template_tools.template_drift import DEFAULT_EXCLUDES, DriftReport, MerkleTree, compare_project, unified_diff
+from template_tools import generator
+
+def parse_args() -> Dict[str, Any]:
+    """Parse command line arguments
+
+    Returns:
+        Dictionary of argument values
+    """
+    parser = argparse.ArgumentParser(
+        description="Detect drift between projects and the reference template output for their configuration"
+    )
+
+    project = parser.add_mutually_exclusive_group(required=True)
+
+    project.add_argument(
+        "--project-dir",
+        action="append",
+        help="Directory of a project to check (repeatable)"
+    )
+
+    project.add_argument(
+        "--git-dir",
+        action="append",
+        help="Local bare or mirrored repository to check without a checkout (repeatable)"
+    )
+
+    parser.add_argument(
+        "--rev",
+        action="append",
+        help="Commit, branch or tag to check with --git-dir (repeatable, default: HEAD)"
+    )
+
+    parser.add_argument(
+        "--template-type",
+        choices=["kustomize", "helm", "cli-tool"],
+        default="kustomize",
+        help="Type of template the projects were generated from (default: kustomize)"
+    )
+
+    parser.add_argument(
+        "--config",
+        help="Generator configuration file (YAML or JSON) the projects were generated with"
+    )
+
+    parser.add_argument(
+        "--org-name",
+        help="GitHub organization name used when generating"
+    )
+
+    parser.add_argument(
+        "--repo-name",
+        help="Repository name used when generating (default: the project directory name)"
+    )
+
+    parser.add_argument(
+        "--default-branch",
+        help="Default git branch used when generating"
+    )
+
+    parser.add_argument(
+        "--default-foundation",
+        help="Default foundation used when generating"
+    )
+
+    parser.add_argument(
+        "--output-dir",
+        help="Output directory passed to the generator, which templates can reference as ${OUTPUT_DIR} "
+             "(default: the --project-dir path as given)"
+    )
+
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        help=f"Glob pattern of paths to ignore (repeatable, always ignored: {', '.join(DEFAULT_EXCLUDES)})"
+    )
+
+    parser.add_argument(
+        "--diff",
+        action="store_true",
+        help="Print a unified diff for each modified file"
+    )
+
+    parser.add_argument(
+        "--ndjson-file",
+        help="Write one JSON drift report per project to this file ('-' for stdout)"
+    )
+
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Show how many tree nodes were compared per project"
+    )
+
+    args = parser.parse_args()
+    if args.rev and not args.git_dir:
+        parser.error("--rev can only be used with --git-dir")
+
+    config = {}
+    if args.config:
+        with open(args.config, 'r') as file:
+            if args.config.endswith('.yaml') or args.config.endswith('.yml'):
+                config = yaml.safe_load(file) or {}
+            elif args.config.endswith('.json'):
+                config = json.load(file)
+            else:
+                parser.error(f"Unsupported config file format: {args.config}")
+
+    config['template_type'] = args.template_type
+    if args.org_name:
+        config['org_name'] = args.org_name
+    if args.repo_name:
+        config['repo_name'] = args.repo_name
+    if args.default_branch:
+        config['default_branch'] = args.default_branch
+    if args.default_foundation:
+        config['default_foundation'] = args.default_foundation
+    if args.output_dir:
+        config['output_dir'] = args.output_dir
+
+    return {
+        "project_dirs": args.project_dir or [],
+        "git_dirs": args.git_dir or [],
+        "revs": args.rev or ["HEAD"],
+        "config": config,
+        "excludes": DEFAULT_EXCLUDES + args.exclude,
+        "diff": args.diff,
+        "ndjson_file": args.ndjson_file,
+        "verbose": args.verbose
+    }
+
+class ExpectedTrees:
+    """Rendered template output and its Merkle tree, cached per configuration"""
+
+    def __init__(self, excludes: List[str]):
+        self.generator_tool = generator
+        self.excludes = excludes
+        self.cache: Dict[str, Tuple[Dict[str, Union[str, bytes]], MerkleTree]] = {}
+
+    def get(self, config: Dict[str, Any], object_format: str) -> Tuple[Dict[str, Union[str, bytes]], MerkleTree]:
+        """Render the template for a configuration, or reuse an earlier rendering
+
+        Args:
+            config: Generator configuration
+            object_format: Object format of the repository the tree is compared with
+
+        Returns:
+            Rendered contents and their Merkle tree
+        """
+        key = json.dumps([config, object_format], sort_keys=True, default=str)
+        if key not in self.cache:
+            with redirect_stdout(io.StringIO()):
+                contents = self.generator_tool.TemplateGenerator(config).render_tree()
+            self.cache[key] = (contents, MerkleTree.from_contents(contents, object_format, self.excludes))
+        return self.cache[key]
+
+def project_config(config: Dict[str, Any], name: str, output_dir: Optional[str] = None) -> Dict[str, Any]:
+    """Get the generator configuration of a project
+
+    Defaults repo_name to the project's name and output_dir to the directory
+    it was generated into, so a project generated with
+    `--output-dir ~/my-service` is compared with `--project-dir ~/my-service`
+    without repeating the options.
+
+    Args:
+        config: Configuration from --config and the command line
+        name: Name of the project directory or repository
+        output_dir: Project directory as given on the command line, if any
+
+    Returns:
+        Generator configuration
+    """
+    defaults = {"repo_name": name}
+    if output_dir is not None:
+        defaults["output_dir"] = output_dir
+    return {**defaults, **config}
+
+def print_report(report: DriftReport, contents: Dict[str, Union[str, bytes]], source: ProjectSource,
+                 options: Dict[str, Any]) -> None:
+    """Print a drift report for one project"""
+    if not report.total:
+        print(f"✅ {report.project} matches the {options['config']['template_type']} template output")
+    else:
+        print(f"❌ {report.project} has drifted from the {options['config']['template_type']} template output "
+              f"({len(report.added)} added, {len(report.removed)} removed, {len(report.modified)} modified)")
+        for label, paths in (("A", report.added), ("D", report.removed), ("M", report.modified)):
+            for path in paths:
+                print(f"  {label} {path}")
+
+        if options["diff"]:
+            for path in report.modified:
+                sys.stdout.writelines(unified_diff(path, contents[path], source))
+
+    if options["verbose"]:
+        print(f"  compared {report.nodes_compared} tree nodes")
+
+def check_source(source: ProjectSource, name: str, expected_trees: ExpectedTrees, options: Dict[str, Any],
+                 ndjson: Optional[io.TextIOBase], output_dir: Optional[str] = None) -> int:
+    """Check one project for drift and report the result
+
+    Returns:
+        Number of differing files
+    """
+    config = project_config(options["config"], name, output_dir)
+    contents, expected = expected_trees.get(config, source.object_format)
+    report = compare_project(expected, source, options["excludes"])
+
+    if ndjson is not sys.stdout:
+        print_report(report, contents, source, options)
+    if ndjson:
+        ndjson.write(json.dumps(report.to_dict()) + "\n")
+        ndjson.flush()
+    return report.total
+
+def main():
+    """Main entry point"""
+    options = parse_args()
+    expected_trees = ExpectedTrees(options["excludes"])
+
+    ndjson = None
+    if options["ndjson_file"] == "-":
+        ndjson = sys.stdout
+    elif options["ndjson_file"]:
+        ndjson = open(options["ndjson_file"], "w")
+
+    total = 0
+    try:
+        for project_dir in options["project_dirs"]:
+            if not os.path.isdir(project_dir):
+                raise ValueError(f"Project directory {project_dir} does not exist")
+            source = FilesystemSource(project_dir)
+            total += check_source(source, Path(project_dir).resolve().name, expected_trees, options, ndjson,
+                                  output_dir=project_dir)
+
+        for git_dir in options["git_dirs"]:
+            name = Path(git_dir).resolve().name
+            name = name[:-len(".git")] if name.endswith(".git") else name
+            cat_file = GitCatFile(git_dir)
+            try:
+                for rev in options["revs"]:
+                    source = GitObjectSource(git_dir, rev, cat_file=cat_file)
+                    total += check_source(source, name, expected_trees, options, ndjson)
+            finally:
+                cat_file.close()
+
+    except Exception as e:
+        print(f"Error during drift detection: {str(e)}")
+        sys.exit(1)
+    finally:
+        if ndjson and ndjson is not sys.stdout:
+            ndjson.close()
+
+    # Exit with non-zero code if any project has drifted
+    if total:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Concourse Check Load Estimator
+
+This script forecasts the resource check load that the pipelines of one or
+more projects put on the Concourse web/ATC nodes when they are set for every
+foundation. Pipelines are resolved the way fly.sh sets them: with the
+foundation's params files and the timer duration and branch defaults of the
+template generator.
+
+The report lists the checks per minute of each pipeline and of the fleet,
+resources with identical configs that Concourse checks only once when global
+resources are enabled, and resources where a webhook or a longer check_every
+would cut the load.
+
+Usage:
+    python estimate-check-load.py --project-dir /path/to/project --params-dir ~/git/params
+    python estimate-check-load.py --git-dir /mirrors/svc-a.git --git-dir /mirrors/svc-b.git --foundation cml-k8s-n-01
+    python estimate-check-load.py --project-dir . --max-checks-per-minute 500
+
+Author: CI/CD Platform Team
+"""
+
+import argparse
+import json
+import os
+import sys
+from fnmatch import fnmatchcase
+from pathlib import Path, PurePosixPath
+from typing import Dict, Any, List
+
+import yaml
+
+SCRIPT_DIR = Path(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from template_tools.project_sources import FilesystemSource, GitCatFile, GitObjectSource, ProjectSource
+from template_tools.params_coverage import ParamsTree
+from template_tools.check_load import (DEFAULT_CHECK_EVERY, FleetForecast, ResourceLoad, format_duration, foundation_vars,
+                        load_pipeline, parse_duration, pipeline_loads)
+from template_tools.generator import DEFAULTS
+
+def parse_args() -> Dict[str, Any]:
+    """Parse command line arguments
+
+    Returns:
+        Dictionary of argument values
+    """
+    parser = argparse.ArgumentParser(
+        description="Estimate the Concourse resource check load of pipelines across foundations"
+    )
+
+    project = parser.add_mutually_exclusive_group(required=True)
+
+    project.add_argument(
+        "--project-dir",
+        action="append",
+        help="Directory of a project to analyze (repeatable)"
+    )
+
+    project.add_argument(
+        "--git-dir",
+        action="append",
+        help="Local bare or mirrored repository to analyze without a checkout (repeatable)"
+    )
+
+    parser.add_argument(
+        "--rev",
+        default="HEAD",
+        help="Commit, branch or tag to analyze with --git-dir (default: HEAD)"
+    )
+
+    parser.add_argument(
+        "--params-dir",
+        help="Directory of the params repository used to resolve ((vars))"
+    )
+
+    parser.add_argument(
+        "--foundation",
+        action="append",
+        help="Foundation the pipelines are set for (repeatable, default: every foundation of --params-dir, "
+             f"or {DEFAULTS['default_foundation']})"
+    )
+
+    parser.add_argument(
+        "--pipeline",
+        action="append",
+        help="Glob pattern of the pipeline names to include (repeatable, default: all ci/pipelines/*.yml)"
+    )
+
+    parser.add_argument(
+        "--timer-duration",
+        default=DEFAULTS["default_timer_duration"],
+        help=f"Value of ((timer_duration)) (default: {DEFAULTS['default_timer_duration']})"
+    )
+
+    parser.add_argument(
+        "--branch",
+        default=DEFAULTS["default_branch"],
+        help=f"Value of ((branch)) (default: {DEFAULTS['default_branch']})"
+    )
+
+    parser.add_argument(
+        "--var",
+        action="append",
+        default=[],
+        help="Additional var as NAME=VALUE, as passed to fly set-pipeline -v (repeatable)"
+    )
+
+    parser.add_argument(
+        "--default-check-every",
+        default=format_duration(DEFAULT_CHECK_EVERY),
+        help="Check interval of resources without check_every, the web node's --resource-checking-interval (default: 1m)"
+    )
+
+    parser.add_argument(
+        "--max-checks-per-minute",
+        type=float,
+        help="Exit non-zero if the forecast without shared configs exceeds this many checks per minute"
+    )
+
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=10,
+        help="Number of pipelines, shared configs and suggestions to list (default: 10)"
+    )
+
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the forecast as JSON"
+    )
+
+    args = parser.parse_args()
+    if args.rev != "HEAD" and not args.git_dir:
+        parser.error("--rev can only be used with --git-dir")
+
+    default_check_every = parse_duration(args.default_check_every)
+    if not default_check_every:
+        parser.error(f"--default-check-every must be a duration such as 1m, got {args.default_check_every}")
+
+    variables = {"timer_duration": args.timer_duration, "branch": args.branch}
+    for assignment in args.var:
+        name, separator, value = assignment.partition("=")
+        if not separator:
+            parser.error(f"--var must look like NAME=VALUE, got {assignment}")
+        variables[name] = yaml.safe_load(value) if value else ""
+
+    return {
+        "project_dirs": args.project_dir or [],
+        "git_dirs": args.git_dir or [],
+        "rev": args.rev,
+        "params_dir": args.params_dir,
+        "foundations": args.foundation or ([] if args.params_dir else [DEFAULTS["default_foundation"]]),
+        "pipelines": args.pipeline or ["*"],
+        "variables": variables,
+        "default_check_every": default_check_every,
+        "max_checks_per_minute": args.max_checks_per_minute,
+        "top": args.top,
+        "json": args.json
+    }
+
+def analyze_source(source: ProjectSource, name: str, params: ParamsTree, foundations: List[str],
+                   options: Dict[str, Any]) -> List[ResourceLoad]:
+    """Estimate the check load of every pipeline of a project for every foundation"""
+    loads = []
+    for path in sorted(source.glob("ci/pipelines/*.yml")):
+        pipeline_name = PurePosixPath(path).stem
+        if not any(fnmatchcase(pipeline_name, pattern) for pattern in options["pipelines"]):
+            continue
+        try:
+            pipeline = load_pipeline(source, path)
+        except yaml.YAMLError as e:
+            print(f"Warning: skipping {name}:{path}: invalid YAML: {e}", file=sys.stderr)
+            continue
+        if pipeline is None:
+            continue
+
+        for foundation in foundations:
+            values = params.values(foundation) if params and foundation in params.foundations else {}
+            # Vars passed with -v take precedence over the params files
+            variables = {**values, **foundation_vars(foundation), **options["variables"]}
+            loads.extend(pipeline_loads(pipeline, variables, name, pipeline_name, foundation,
+                                        options["default_check_every"]))
+    return loads
+
+def analyze_projects(options: Dict[str, Any]) -> List[ResourceLoad]:
+    """Estimate the check load of every project"""
+    params = None
+    foundations = options["foundations"]
+    if options["params_dir"]:
+        params = ParamsTree.load(options["params_dir"], foundations or None)
+        foundations = list(params.foundations)
+    if not foundations:
+        raise ValueError(f"No foundations found in {options['params_dir']}")
+
+    loads = []
+    for project_dir in options["project_dirs"]:
+        if not os.path.isdir(project_dir):
+            raise ValueError(f"Project directory {project_dir} does not exist")
+        source = FilesystemSource(project_dir)
+        loads.extend(analyze_source(source, Path(project_dir).resolve().name, params, foundations, options))
+
+    for git_dir in options["git_dirs"]:
+        name = Path(git_dir).resolve().name
+        name = name[:-len(".git")] if name.endswith(".git") else name
+        cat_file = GitCatFile(git_dir)
+        try:
+            source = GitObjectSource(git_dir, options["rev"], cat_file=cat_file)
+            loads.extend(analyze_source(source, name, params, foundations, options))
+        finally:
+            cat_file.close()
+    return loads
+
+def print_forecast(forecast: FleetForecast, top: int) -> None:
+    """Print the fleet forecast"""
+    summary = forecast.to_dict()
+    print(f"Fleet: {summary['pipelines']} pipeline(s), {summary['checked_resources']} checked resource(s), "
+          f"{summary['unique_configs']} unique resource config(s)")
+
+    print("\nChecks per minute by pipeline (all foundations):")
+    for key, value in sorted(summary["by_pipeline"].items(), key=lambda item: -item[1])[:top]:
+        print(f"  {value:10.2f}  {key}")
+
+    shared = forecast.shared_configs()
+    if shared:
+        print(f"\nResource configs shared by several resources ({len(shared)}):")
+        for group in shared[:top]:
+            # Unresolved vars may differ between foundations, so the sharing is not certain
+            unresolved = " (unresolved vars)" if "((" in group[0].config else ""
+            print(f"  {len(group):4d} x {group[0].type}{unresolved}: {', '.join(load.id for load in group[:3])}"
+                  f"{', ...' if len(group) > 3 else ''}")
+
+    suggestions = forecast.suggestions()
+    if suggestions:
+        print(f"\nSuggested check intervals ({len(suggestions)}):")
+        for entry in suggestions[:top]:
+            action = f"add a webhook_token, then raise check_every to {entry['suggested_check_every']}" \
+                if entry["needs_webhook"] else f"set check_every: {entry['suggested_check_every']}"
+            print(f"  {entry['resource']} ({entry['type']}, every {entry['check_every']}): {action} "
+                  f"(-{entry['checks_saved_per_minute']:.2f} checks/min)")
+
+    print("\nForecast:")
+    print(f"  {forecast.checks_per_minute:12.2f} checks/min ({forecast.checks_per_minute * 1440:,.0f}/day) as configured")
+    print(f"  {forecast.shared_checks_per_minute:12.2f} checks/min with global resources sharing identical configs")
+    print(f"  {forecast.tuned_checks_per_minute:12.2f} checks/min with shared configs and the suggested check intervals")
+
+def main():
+    """Main entry point"""
+    options = parse_args()
+
+    try:
+        loads = analyze_projects(options)
+    except Exception as e:
+        print(f"Error during check load estimation: {str(e)}")
+        sys.exit(1)
+
+    forecast = FleetForecast(loads)
+    if options["json"]:
+        print(json.dumps(forecast.to_dict(), indent=2))
+    else:
+        print_forecast(forecast, options["top"])
+
+    # Exit with non-zero code if the forecast exceeds the budget
+    budget = options["max_checks_per_minute"]
+    if budget is not None and forecast.checks_per_minute > budget:
+        if not options["json"]:
+            print(f"\n❌ Forecast of {forecast.checks_per_minute:.2f} checks/min exceeds the budget of {budget:g}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
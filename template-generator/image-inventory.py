@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Container Image Inventory
+
+This script indexes every container image used by the pipelines and task files
+of one or more projects: `image_resource` configs of inline tasks and task.yml
+files, and `registry-image`/`docker-image` resources and resource types. It
+counts the distinct images and the references to mutable tags such as
+`latest`, estimates the cold pulls needed to warm the workers and the cache
+misses of each job build, and suggests how to consolidate onto a small set of
+pinned images shared as pipeline resources.
+
+Usage:
+    python image-inventory.py --project-dir /path/to/project
+    python image-inventory.py --git-dir /mirrors/svc-a.git --git-dir /mirrors/svc-b.git --workers 8
+    python image-inventory.py --project-dir . --fail-on-mutable --json
+
+Author: CI/CD Platform Team
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Dict, Any
+
+SCRIPT_DIR = Path(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from template_tools.project_sources import FilesystemSource, GitCatFile, GitObjectSource
+from template_tools.image_inventory import ImageInventory
+
+def parse_args() -> Dict[str, Any]:
+    """Parse command line arguments
+
+    Returns:
+        Dictionary of argument values
+    """
+    parser = argparse.ArgumentParser(
+        description="Inventory the container images of pipelines and tasks and report their pull cost"
+    )
+
+    project = parser.add_mutually_exclusive_group(required=True)
+
+    project.add_argument(
+        "--project-dir",
+        action="append",
+        help="Directory of a project to index (repeatable)"
+    )
+
+    project.add_argument(
+        "--git-dir",
+        action="append",
+        help="Local bare or mirrored repository to index without a checkout (repeatable)"
+    )
+
+    parser.add_argument(
+        "--rev",
+        default="HEAD",
+        help="Commit, branch or tag to index with --git-dir (default: HEAD)"
+    )
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of Concourse workers the pipelines run on, to estimate cold pulls (default: 1)"
+    )
+
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=10,
+        help="Number of images, jobs and suggestions to list (default: 10)"
+    )
+
+    parser.add_argument(
+        "--fail-on-mutable",
+        action="store_true",
+        help="Exit non-zero if any image is referenced by a mutable tag"
+    )
+
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the inventory as JSON"
+    )
+
+    args = parser.parse_args()
+    if args.rev != "HEAD" and not args.git_dir:
+        parser.error("--rev can only be used with --git-dir")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    return {
+        "project_dirs": args.project_dir or [],
+        "git_dirs": args.git_dir or [],
+        "rev": args.rev,
+        "workers": args.workers,
+        "top": args.top,
+        "fail_on_mutable": args.fail_on_mutable,
+        "json": args.json
+    }
+
+def build_inventory(options: Dict[str, Any]) -> ImageInventory:
+    """Index the images of every project"""
+    inventory = ImageInventory()
+    for project_dir in options["project_dirs"]:
+        if not os.path.isdir(project_dir):
+            raise ValueError(f"Project directory {project_dir} does not exist")
+        inventory.add_source(FilesystemSource(project_dir), Path(project_dir).resolve().name)
+
+    for git_dir in options["git_dirs"]:
+        name = Path(git_dir).resolve().name
+        name = name[:-len(".git")] if name.endswith(".git") else name
+        cat_file = GitCatFile(git_dir)
+        try:
+            inventory.add_source(GitObjectSource(git_dir, options["rev"], cat_file=cat_file), name)
+        finally:
+            cat_file.close()
+    return inventory
+
+def print_inventory(inventory: ImageInventory, workers: int, top: int) -> None:
+    """Print the inventory and its suggestions"""
+    summary = inventory.to_dict(workers)
+    print(f"Images: {summary['distinct_images']} distinct image(s) in {summary['references']} reference(s), "
+          f"{summary['mutable_references']} with mutable tags")
+
+    print("\nImages by number of references:")
+    images = sorted(inventory.images().items(), key=lambda item: (-len(item[1]), item[0]))
+    for image, refs in images[:top]:
+        marker = " (mutable)" if refs[0].mutable else ""
+        print(f"  {len(refs):4d}  {image}{marker}")
+
+    misses = sorted(((count, job) for job, count in summary["misses_per_build"].items() if count), reverse=True)
+    if misses:
+        print("\nWorst-case cache misses per build once mutable tags move:")
+        for count, job in misses[:top]:
+            print(f"  {count:4d}  {job}")
+
+    suggestions = summary["suggestions"]
+    if suggestions:
+        print(f"\nSuggestions ({len(suggestions)}):")
+        for entry in suggestions[:top]:
+            print(f"  - {entry['message']}")
+
+    print(f"\nCold pulls to warm {workers} worker(s): {summary['cold_pulls']}")
+    print(f"Task runs sharing a pipeline image resource: {summary['shared_image_runs']} of {summary['task_runs']}")
+
+def main():
+    """Main entry point"""
+    options = parse_args()
+
+    try:
+        inventory = build_inventory(options)
+    except Exception as e:
+        print(f"Error during image inventory: {str(e)}")
+        sys.exit(1)
+
+    if options["json"]:
+        print(json.dumps(inventory.to_dict(options["workers"]), indent=2))
+    else:
+        print_inventory(inventory, options["workers"], options["top"])
+
+    # Exit with non-zero code if mutable tags are not allowed
+    if options["fail_on_mutable"] and inventory.mutable():
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+In-Parallel Plan Advisor
+
+This script finds consecutive steps in the job plans of ci/pipelines/*.yml that
+do not depend on each other's artifacts and can run in an in_parallel block,
+and can rewrite the pipelines to group them. Rewriting keeps comments and
+formatting: only the grouped steps are re-indented under a new in_parallel
+item.
+
+By default only get steps are grouped. Puts with declared inputs and tasks can
+be included with --step-types, but tasks that share no artifacts may still
+depend on each other's side effects, so review those suggestions.
+
+Usage:
+    python parallelize-plans.py --project-dir /path/to/project
+    python parallelize-plans.py --project-dir /path/to/project --limit 3 --diff
+    python parallelize-plans.py --project-dir /path/to/project --step-types get,put --write
+
+Author: CI/CD Platform Team
+"""
+
+import argparse
+import difflib
+import os
+import sys
+from fnmatch import fnmatchcase
+from pathlib import Path, PurePosixPath
+from typing import Dict, Any, Optional
+
+import yaml
+
+SCRIPT_DIR = Path(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from template_tools.plan_parallelizer import STEP_TYPES, parallelize
+
+def parse_args() -> Dict[str, Any]:
+    """Parse command line arguments
+
+    Returns:
+        Dictionary of argument values
+    """
+    parser = argparse.ArgumentParser(
+        description="Find independent job plan steps and group them in in_parallel blocks"
+    )
+
+    parser.add_argument(
+        "--project-dir",
+        required=True,
+        help="Directory of the project whose ci/pipelines to analyze"
+    )
+
+    parser.add_argument(
+        "--pipeline",
+        action="append",
+        help="Glob pattern of the pipeline names to analyze (repeatable, default: all ci/pipelines/*.yml)"
+    )
+
+    parser.add_argument(
+        "--step-types",
+        default="get",
+        help=f"Comma-separated step types that may be grouped, of {', '.join(STEP_TYPES)} (default: get)"
+    )
+
+    parser.add_argument(
+        "--limit",
+        type=int,
+        help="Maximum number of steps each in_parallel block runs at once (default: no limit)"
+    )
+
+    parser.add_argument(
+        "--diff",
+        action="store_true",
+        help="Print a unified diff of the rewritten pipelines"
+    )
+
+    parser.add_argument(
+        "--write",
+        action="store_true",
+        help="Rewrite the pipeline files in place"
+    )
+
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Exit non-zero if any steps could be grouped"
+    )
+
+    args = parser.parse_args()
+
+    step_types = [step_type.strip() for step_type in args.step_types.split(",") if step_type.strip()]
+    unknown = [step_type for step_type in step_types if step_type not in STEP_TYPES]
+    if unknown or not step_types:
+        parser.error(f"--step-types must be a comma-separated list of {', '.join(STEP_TYPES)}")
+    if args.limit is not None and args.limit < 1:
+        parser.error("--limit must be at least 1")
+
+    return {
+        "project_dir": Path(args.project_dir),
+        "pipelines": args.pipeline or ["*"],
+        "step_types": step_types,
+        "limit": args.limit,
+        "diff": args.diff,
+        "write": args.write,
+        "check": args.check
+    }
+
+def task_config_lookup(project_dir: Path):
+    """Build a lookup that reads task files from the project itself
+
+    A task file such as repo/ci/tasks/x/task.yml is looked up as
+    ci/tasks/x/task.yml of the project.
+    """
+    def lookup(task_file: str) -> Optional[Dict[str, Any]]:
+        parts = PurePosixPath(task_file).parts[1:]
+        path = project_dir.joinpath(*parts) if parts else None
+        if not path or not path.is_file():
+            return None
+        try:
+            with open(path, "r") as file:
+                config = yaml.safe_load(file)
+        except (OSError, yaml.YAMLError):
+            return None
+        return config if isinstance(config, dict) else None
+    return lookup
+
+def main():
+    """Main entry point"""
+    options = parse_args()
+    pipelines_dir = options["project_dir"] / "ci" / "pipelines"
+    if not pipelines_dir.is_dir():
+        print(f"Error: {pipelines_dir} does not exist")
+        sys.exit(1)
+
+    lookup = task_config_lookup(options["project_dir"])
+    total = 0
+    for path in sorted(pipelines_dir.glob("*.yml")):
+        if not any(fnmatchcase(path.stem, pattern) for pattern in options["pipelines"]):
+            continue
+
+        content = path.read_text(encoding="utf-8")
+        try:
+            rewritten, suggestions = parallelize(content, options["step_types"], options["limit"], lookup)
+        except (ValueError, yaml.YAMLError) as e:
+            print(f"⚠️  Skipping {path}: {e}")
+            continue
+        if not suggestions:
+            continue
+
+        total += len(suggestions)
+        print(f"📋 {path}")
+        for suggestion in suggestions:
+            print(f"  line {suggestion.line}, job {suggestion.job}: run {', '.join(suggestion.steps)} in parallel")
+
+        if options["diff"]:
+            sys.stdout.writelines(difflib.unified_diff(
+                content.splitlines(keepends=True), rewritten.splitlines(keepends=True),
+                fromfile=f"a/{path.name}", tofile=f"b/{path.name}"
+            ))
+        if options["write"]:
+            path.write_text(rewritten, encoding="utf-8")
+            print(f"  ✏️  Rewrote {path}")
+
+    if not total:
+        print("✅ No independent consecutive steps found")
+    elif options["check"] and not options["write"]:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
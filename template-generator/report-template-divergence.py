@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Template Divergence Report
+
+This script reads the reference pipeline and the kustomize, helm and cli-tool
+templates through the content-addressed template store and lists the files
+that every template type is supposed to share (ci/scripts/lib/*, fly.sh,
+test-framework.sh, the common task directories) but whose copies have
+diverged. Each diverged file is shown with its variants and the layers using
+them; the variant used by most layers is the canonical one.
+
+Usage:
+    python report-template-divergence.py
+    python report-template-divergence.py --layer kustomize --layer helm --diff
+    python report-template-divergence.py --shared 'ci/scripts/lib/*.sh' --fail-on-divergence --json
+
+Author: CI/CD Platform Team
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Dict, Any, List
+
+SCRIPT_DIR = Path(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from template_tools.template_store import (SHARED_PATTERNS, TEMPLATE_TYPES, Divergence, TemplateStore, divergence,
+                            divergence_to_dict, reference_layers, variant_diff)
+
+def parse_args() -> Dict[str, Any]:
+    """Parse command line arguments
+
+    Returns:
+        Dictionary of argument values
+    """
+    parser = argparse.ArgumentParser(
+        description="List shared template files whose copies have diverged between template types"
+    )
+
+    parser.add_argument(
+        "--reference-dir",
+        default=str(SCRIPT_DIR.parent / "reference"),
+        help="Reference directory with pipeline/ and templates/ (default: the repository's reference directory)"
+    )
+
+    parser.add_argument(
+        "--layer",
+        action="append",
+        choices=["pipeline"] + TEMPLATE_TYPES,
+        help="Layer to compare (repeatable, default: pipeline and every template type)"
+    )
+
+    parser.add_argument(
+        "--shared",
+        action="append",
+        help=f"Glob pattern of the files to compare (repeatable, default: {', '.join(SHARED_PATTERNS)})"
+    )
+
+    parser.add_argument(
+        "--diff",
+        action="store_true",
+        help="Show a unified diff of each variant against the canonical one"
+    )
+
+    parser.add_argument(
+        "--fail-on-divergence",
+        action="store_true",
+        help="Exit non-zero if any shared file has diverged"
+    )
+
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the report as JSON"
+    )
+
+    args = parser.parse_args()
+    if not os.path.isdir(args.reference_dir):
+        parser.error(f"Reference directory {args.reference_dir} does not exist")
+
+    return {
+        "reference_dir": Path(args.reference_dir),
+        "layers": args.layer,
+        "patterns": args.shared or SHARED_PATTERNS,
+        "diff": args.diff,
+        "fail_on_divergence": args.fail_on_divergence,
+        "json": args.json
+    }
+
+def print_report(store: TemplateStore, report: List[Divergence], layers: List[str], diff: bool) -> None:
+    """Print the diverged files and the store statistics"""
+    stats = store.stats()
+    print(f"Layers: {', '.join(layers)}")
+    print(f"Files: {stats['files']} ({stats['file_bytes']} bytes) stored as "
+          f"{stats['blobs']} distinct blobs ({stats['blob_bytes']} bytes)")
+
+    if not report:
+        print("\n✅ No shared files have diverged")
+        return
+
+    print(f"\n❌ {len(report)} shared file(s) have diverged:")
+    for item in report:
+        print(f"\n  {item.path}")
+        for index, (blob, names) in enumerate(item.variants):
+            label = "canonical" if index == 0 else "variant"
+            print(f"    {label:9s} {blob[:12]}  {', '.join(names)}")
+        if item.missing:
+            print(f"    missing             {', '.join(item.missing)}")
+        if diff:
+            for blob, _ in item.variants[1:]:
+                sys.stdout.writelines(variant_diff(store, item, blob))
+
+def main():
+    """Main entry point"""
+    options = parse_args()
+
+    try:
+        store = TemplateStore()
+        layers = reference_layers(options["reference_dir"], options["layers"])
+        if len(layers) < 2:
+            raise ValueError(f"Need at least two layers to compare, found {', '.join(layers) or 'none'}")
+        report = divergence(store, layers, options["patterns"])
+    except Exception as e:
+        print(f"Error during divergence report: {str(e)}")
+        sys.exit(1)
+
+    if options["json"]:
+        print(json.dumps({
+            "layers": list(layers),
+            "store": store.stats(),
+            "diverged": [divergence_to_dict(store, item) for item in report]
+        }, indent=2))
+    else:
+        print_report(store, report, list(layers), options["diff"])
+
+    # Exit with non-zero code if diverged files are not allowed
+    if options["fail_on_divergence"] and report:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
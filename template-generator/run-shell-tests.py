@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Parallel Shell Test Runner
+
+This script discovers the ci/scripts/tests/test_*.sh files of the reference
+pipeline and every reference template (or of the given projects) and runs them
+concurrently. Each test runs in its own temporary copy of the project, so tests
+cannot interfere with each other or with the source tree, and the whole matrix
+takes about as long as its slowest test.
+
+Tests are started longest first, using the durations recorded by earlier runs,
+and can be split across CI agents with --shard. Results can be written as JUnit
+XML with per-test timings.
+
+Usage:
+    python run-shell-tests.py [--jobs N] [--shard 1/3] [--junit-xml results.xml]
+    python run-shell-tests.py --project-dir ./my-new-project
+
+Author: CI/CD Platform Team
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Any, List, NamedTuple, Tuple
+
+SCRIPT_DIR = Path(os.path.dirname(os.path.abspath(__file__)))
+REPO_ROOT = SCRIPT_DIR.parent
+
+TESTS_DIR = Path("ci") / "scripts" / "tests"
+
+# Color escape sequences and other control characters are not allowed in XML
+ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;]*[A-Za-z]")
+XML_INVALID_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+# State kept between test runs; TEMPLATE_TOOLS_STATE_DIR moves it, e.g. to a CI cache
+STATE_DIR = Path(os.environ.get("TEMPLATE_TOOLS_STATE_DIR") or SCRIPT_DIR / ".test-state")
+
+# Durations recorded by earlier runs, used to start the slowest tests first
+DEFAULT_DURATIONS_FILE = STATE_DIR / "shell-test-durations.json"
+
+class ShellTest(NamedTuple):
+    """A test_*.sh file of one project"""
+
+    suite: str
+    project_dir: Path
+    name: str
+
+    @property
+    def id(self) -> str:
+        return f"{self.suite}/{self.name}"
+
+class TestResult(NamedTuple):
+    """Outcome of running a shell test"""
+
+    test: ShellTest
+    passed: bool
+    seconds: float
+    output: str
+
+def parse_args() -> Dict[str, Any]:
+    """Parse command line arguments
+
+    Returns:
+        Dictionary of argument values
+    """
+    parser = argparse.ArgumentParser(
+        description="Run the ci/scripts/tests shell test suites in parallel"
+    )
+
+    parser.add_argument(
+        "--project-dir",
+        action="append",
+        help="Project whose ci/scripts/tests suite to run (repeatable, default: the reference pipeline and templates)"
+    )
+
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Number of tests to run concurrently (default: number of CPUs)"
+    )
+
+    parser.add_argument(
+        "--shard",
+        default="1/1",
+        help="Run only shard i of n, e.g. 2/4, to split the tests across CI agents (default: 1/1)"
+    )
+
+    parser.add_argument(
+        "--timeout",
+        type=int,
+        default=300,
+        help="Seconds before a test is killed and reported as failed (default: 300)"
+    )
+
+    parser.add_argument(
+        "--junit-xml",
+        help="Write the results as JUnit XML to this file"
+    )
+
+    parser.add_argument(
+        "--durations",
+        default=str(DEFAULT_DURATIONS_FILE),
+        help="JSON file of test durations used to order the tests (default: .test-state/shell-test-durations.json)"
+    )
+
+    parser.add_argument(
+        "--list",
+        action="store_true",
+        help="List the tests of the selected shard without running them"
+    )
+
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Print the output of passing tests as well as failing ones"
+    )
+
+    args = vars(parser.parse_args())
+    try:
+        index, count = (int(part) for part in args["shard"].split("/"))
+    except ValueError:
+        parser.error(f"--shard must look like i/n, got {args['shard']}")
+    if not 1 <= index <= count:
+        parser.error(f"--shard index must be between 1 and {count}")
+    args["shard"] = (index, count)
+    return args
+
+def default_projects() -> List[Tuple[str, Path]]:
+    """Get the reference pipeline and every reference template that has shell tests
+
+    Returns:
+        List of (suite name, project directory)
+    """
+    projects = [("pipeline", REPO_ROOT / "reference" / "pipeline")]
+    templates_dir = REPO_ROOT / "reference" / "templates"
+    for template_dir in sorted(templates_dir.iterdir()):
+        if (template_dir / TESTS_DIR).is_dir():
+            projects.append((template_dir.name, template_dir))
+    return projects
+
+def discover_tests(projects: List[Tuple[str, Path]]) -> List[ShellTest]:
+    """Find the test_*.sh files of each project
+
+    Args:
+        projects: List of (suite name, project directory)
+
+    Returns:
+        Tests sorted by id
+    """
+    tests = []
+    for suite, project_dir in projects:
+        for test_file in sorted((project_dir / TESTS_DIR).glob("test_*.sh")):
+            if test_file.is_file():
+                tests.append(ShellTest(suite, project_dir, test_file.name))
+    return sorted(tests, key=lambda test: test.id)
+
+def select_shard(tests: List[ShellTest], index: int, count: int) -> List[ShellTest]:
+    """Select the tests of one shard
+
+    Tests are dealt round-robin in id order, so every agent computes the same
+    split regardless of its local duration history.
+
+    Args:
+        tests: Tests sorted by id
+        index: Shard number, starting at 1
+        count: Number of shards
+
+    Returns:
+        Tests of the shard
+    """
+    return [test for position, test in enumerate(tests) if position % count == index - 1]
+
+def load_durations(path: str) -> Dict[str, float]:
+    """Load recorded test durations, or none if the file is missing or unreadable"""
+    try:
+        with open(path, "r") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+def save_durations(path: str, durations: Dict[str, float], results: List[TestResult]) -> None:
+    """Record the durations of this run for ordering future runs"""
+    durations = {**durations, **{result.test.id: round(result.seconds, 3) for result in results}}
+    try:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as file:
+            json.dump(durations, file, indent=2, sort_keys=True)
+    except OSError as e:
+        print(f"Warning: could not record test durations in {path}: {e}")
+
+def run_test(test: ShellTest, timeout: int) -> TestResult:
+    """Run a shell test in a temporary copy of its project
+
+    Like run_tests.sh, the copy gets a placeholder ci/pipelines/main.yml if the
+    project has none.
+
+    Args:
+        test: Test to run
+        timeout: Seconds before the test is killed
+
+    Returns:
+        Result of the test
+    """
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix="shell-test-") as temp_dir:
+        work_dir = Path(temp_dir) / "project"
+        shutil.copytree(test.project_dir, work_dir, symlinks=True, ignore=shutil.ignore_patterns(".git"))
+
+        main_pipeline = work_dir / "ci" / "pipelines" / "main.yml"
+        if not main_pipeline.exists():
+            main_pipeline.parent.mkdir(parents=True, exist_ok=True)
+            main_pipeline.write_text("# Dummy pipeline file for testing\n")
+
+        tests_dir = work_dir / TESTS_DIR
+        test_file = tests_dir / test.name
+        test_file.chmod(test_file.stat().st_mode | 0o111)
+
+        tmp_dir = Path(temp_dir) / "tmp"
+        tmp_dir.mkdir()
+
+        try:
+            completed = subprocess.run(
+                [str(test_file)],
+                cwd=tests_dir,
+                env={**os.environ, "TMPDIR": str(tmp_dir)},
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                timeout=timeout,
+                check=False
+            )
+            passed = completed.returncode == 0
+            output = completed.stdout.decode("utf-8", "replace")
+        except subprocess.TimeoutExpired as e:
+            passed = False
+            output = (e.stdout or b"").decode("utf-8", "replace") + f"\nTest timed out after {timeout}s\n"
+
+    return TestResult(test, passed, time.perf_counter() - start, output)
+
+def xml_text(output: str) -> str:
+    """Strip color codes and characters XML cannot represent from test output"""
+    return XML_INVALID_CHARS.sub("", ANSI_ESCAPE.sub("", output))
+
+def write_junit(path: str, results: List[TestResult]) -> None:
+    """Write the results as JUnit XML, with one test suite per project
+
+    Args:
+        path: Output file path
+        results: Test results
+    """
+    root = ET.Element("testsuites")
+    suites: Dict[str, ET.Element] = {}
+    for result in sorted(results, key=lambda result: result.test.id):
+        suite = suites.get(result.test.suite)
+        if suite is None:
+            suite = suites[result.test.suite] = ET.SubElement(root, "testsuite", name=result.test.suite)
+        testcase = ET.SubElement(suite, "testcase", classname=result.test.suite,
+                                 name=result.test.name, time=f"{result.seconds:.3f}")
+        if not result.passed:
+            failure = ET.SubElement(testcase, "failure", message=f"{result.test.name} failed")
+            failure.text = xml_text(result.output)
+        else:
+            ET.SubElement(testcase, "system-out").text = xml_text(result.output)
+
+    for name, suite in suites.items():
+        cases = [result for result in results if result.test.suite == name]
+        suite.set("tests", str(len(cases)))
+        suite.set("failures", str(sum(1 for result in cases if not result.passed)))
+        suite.set("time", f"{sum(result.seconds for result in cases):.3f}")
+
+    ET.ElementTree(root).write(path, encoding="utf-8", xml_declaration=True)
+
+def main():
+    """Main entry point"""
+    args = parse_args()
+
+    if args["project_dir"]:
+        projects = []
+        for project_dir in args["project_dir"]:
+            path = Path(project_dir).resolve()
+            if not (path / TESTS_DIR).is_dir():
+                print(f"Error: {path / TESTS_DIR} does not exist")
+                sys.exit(1)
+            projects.append((path.name, path))
+    else:
+        projects = default_projects()
+
+    index, count = args["shard"]
+    tests = select_shard(discover_tests(projects), index, count)
+
+    # Start the slowest tests first; tests without history go first as well
+    durations = load_durations(args["durations"])
+    tests.sort(key=lambda test: -durations.get(test.id, float("inf")))
+
+    if args["list"]:
+        for test in tests:
+            print(test.id)
+        return
+
+    print(f"Running {len(tests)} shell tests (shard {index}/{count}) with {args['jobs']} jobs...")
+
+    start = time.perf_counter()
+    results = []
+    with ThreadPoolExecutor(max_workers=max(1, args["jobs"])) as executor:
+        futures = [executor.submit(run_test, test, args["timeout"]) for test in tests]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            status = "✅ PASS" if result.passed else "❌ FAIL"
+            print(f"{status} {result.test.id} ({result.seconds:.2f}s)")
+            if args["verbose"] or not result.passed:
+                for line in result.output.splitlines():
+                    print(f"    {line}")
+
+    save_durations(args["durations"], durations, results)
+    if args["junit_xml"]:
+        write_junit(args["junit_xml"], results)
+
+    # Print summary
+    failed = [result for result in results if not result.passed]
+    elapsed = time.perf_counter() - start
+    slowest = max((result.seconds for result in results), default=0.0)
+    print(f"\nRan {len(results)} tests in {elapsed:.2f}s (slowest test {slowest:.2f}s)")
+    if failed:
+        print(f"❌ {len(failed)} test(s) failed: {', '.join(result.test.id for result in failed)}")
+        sys.exit(1)
+    print("✅ All tests passed!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""
+Template Tools
+
+Importable package of the template generator and the compliance validator:
+
+- template_tools.generator: TemplateGenerator, DEFAULTS and the
+  generate-reference-template command
+- template_tools.validator: TemplateValidator, the issue sinks and the
+  validate-template-compliance command
+
+Submodules are imported on first access, so importing the package itself is
+free. The helper modules the tools share (template_tools.project_sources,
+template_tools.template_profiler, ...) live in the package as well; the
+hyphenated scripts in the template-generator directory are thin wrappers
+around them.
+
+Usage:
+    from template_tools import generator
+    generator.TemplateGenerator({"template_type": "helm", "output_dir": "./out"}).generate_template()
+
+Author: CI/CD Platform Team
+"""
+
+import importlib
+
+__all__ = ["generator", "validator"]
+
+def __getattr__(name):
+    if name in __all__:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,308 @@
+"""
+Resource Check Load Estimation for Concourse Pipelines
+
+This module estimates how many resource checks the pipelines of a project put
+on the Concourse web/ATC nodes once they are set for a set of foundations.
+Concourse checks every resource that a job gets at its `check_every` interval
+(the cluster default, 1m, unless set), independently of a time resource's
+`interval`, so a 3h timer is still checked 180 times between two versions.
+
+Each pipeline file is parsed once and interpolated per foundation with the
+params values and the vars fly.sh passes to `fly set-pipeline`. Resources
+whose type and interpolated source are identical have the same resource
+config, which Concourse checks only once when global resources are enabled, so
+the fleet forecast reports the load both with and without that sharing, and
+after applying the suggested `check_every` and webhook changes.
+
+Usage:
+    pipeline = load_pipeline(source, "ci/pipelines/main.yml")
+    loads = pipeline_loads(pipeline, variables, labels)
+    forecast = FleetForecast(loads)
+
+Author: CI/CD Platform Team
+"""
+
+import json
+import re
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+import yaml
+
+from .project_sources import ProjectSource
+
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Default --resource-checking-interval of the Concourse web node
+DEFAULT_CHECK_EVERY = 60.0
+
+# Resource types whose checks can be triggered by a webhook from the git server
+WEBHOOK_TYPES = {"git", "github-release", "pull-request"}
+
+# Polling interval suggested for resources that are also triggered by a webhook
+WEBHOOK_CHECK_EVERY = 3600.0
+
+# A time resource checked this many times per interval fires at most interval / N late
+TIME_CHECKS_PER_INTERVAL = 10
+
+DURATION_PART = re.compile(r'(\d+(?:\.\d+)?)(ns|us|µs|ms|s|m|h)')
+DURATION_UNITS = {"ns": 1e-9, "us": 1e-6, "µs": 1e-6, "ms": 1e-3, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+# ((var)) or ((var.field)) of a params var, but not shell arithmetic $((...))
+VAR_REFERENCE = re.compile(r'(?<!\$)\(\(\s*([-\w/]+)((?:\.[-\w/]+)*)\s*\)\)')
+
+def parse_duration(text: Any) -> Optional[float]:
+    """Parse a Go duration such as 3h, 1h30m or 90s
+
+    Args:
+        text: Duration text
+
+    Returns:
+        Duration in seconds, or None if the text is not a duration
+    """
+    text = str(text).strip()
+    parts = DURATION_PART.findall(text)
+    if not parts or "".join(value + unit for value, unit in parts) != text:
+        return None
+    return sum(float(value) * DURATION_UNITS[unit] for value, unit in parts)
+
+def format_duration(seconds: float) -> str:
+    """Format seconds as a Go duration, e.g. 5400 as 1h30m"""
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    text = "".join(f"{value}{unit}" for value, unit in ((hours, "h"), (minutes, "m"), (seconds, "s")) if value)
+    return text or "0s"
+
+def interpolate(value: Any, variables: Dict[str, Any]) -> Any:
+    """Replace ((vars)) in a parsed pipeline value
+
+    A string that is a single ((var)) takes the var's value as is; vars inside
+    longer strings are substituted as text. Unknown vars are left in place.
+
+    Args:
+        value: Parsed YAML value
+        variables: Dictionary of var names to values
+
+    Returns:
+        Interpolated copy of the value
+    """
+    if isinstance(value, dict):
+        return {key: interpolate(item, variables) for key, item in value.items()}
+    if isinstance(value, list):
+        return [interpolate(item, variables) for item in value]
+    if not isinstance(value, str) or "((" not in value:
+        return value
+
+    def lookup(match):
+        resolved = variables.get(match.group(1), match.group(0))
+        for field in filter(None, match.group(2).split(".")):
+            if not isinstance(resolved, dict) or field not in resolved:
+                return match.group(0)
+            resolved = resolved[field]
+        return resolved
+
+    whole = VAR_REFERENCE.fullmatch(value.strip())
+    if whole:
+        return lookup(whole)
+    return VAR_REFERENCE.sub(lambda match: str(lookup(match)), value)
+
+def foundation_vars(foundation: str) -> Dict[str, str]:
+    """Get the vars fly.sh derives from the foundation name"""
+    parts = foundation.split("-")
+    datacenter = parts[0]
+    return {
+        "foundation": foundation,
+        "dc": datacenter,
+        "dc_type": parts[1] if len(parts) > 1 else "",
+        "foundation_path": f"{datacenter}/{foundation}"
+    }
+
+def load_pipeline(source: ProjectSource, rel_path: str) -> Optional[Dict[str, Any]]:
+    """Parse a pipeline file, or return None if it is empty or not a mapping"""
+    pipeline = yaml.load(source.read_text(rel_path), Loader=_Loader)
+    return pipeline if isinstance(pipeline, dict) else None
+
+def _get_steps(value: Any) -> Iterator[Dict[str, Any]]:
+    """Yield every get step nested anywhere in a job"""
+    if isinstance(value, dict):
+        if "get" in value:
+            yield value
+        for item in value.values():
+            yield from _get_steps(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _get_steps(item)
+
+def checked_resources(pipeline: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Get the resources of a pipeline that Concourse checks
+
+    Resources that are only put, never fetched with a get step, are not checked.
+    """
+    fetched = {step.get("resource", step["get"]) for job in pipeline.get("jobs") or [] for step in _get_steps(job)}
+    return [resource for resource in pipeline.get("resources") or []
+            if isinstance(resource, dict) and resource.get("name") in fetched]
+
+class ResourceLoad(NamedTuple):
+    """Check load of one resource of a pipeline set for one foundation"""
+
+    project: str
+    pipeline: str
+    foundation: str
+    name: str
+    type: str
+    config: str
+    check_every: Optional[float]
+    interval: Optional[float]
+    webhook: bool
+
+    @property
+    def checks_per_minute(self) -> float:
+        return 60.0 / self.check_every if self.check_every else 0.0
+
+    @property
+    def id(self) -> str:
+        return f"{self.project}:{self.pipeline}[{self.foundation}].{self.name}"
+
+def pipeline_loads(pipeline: Dict[str, Any], variables: Dict[str, Any], project: str, pipeline_name: str,
+                   foundation: str, default_check_every: float = DEFAULT_CHECK_EVERY) -> List[ResourceLoad]:
+    """Estimate the check load of a pipeline set for one foundation
+
+    Args:
+        pipeline: Parsed pipeline
+        variables: Vars the pipeline is set with
+        project: Project label
+        pipeline_name: Pipeline name
+        foundation: Foundation the pipeline is set for
+        default_check_every: Check interval of resources without check_every, in seconds
+
+    Returns:
+        One entry per checked resource
+    """
+    loads = []
+    for resource in checked_resources(pipeline):
+        resource = interpolate(resource, variables)
+        source = resource.get("source") or {}
+        check_every = resource.get("check_every")
+        if check_every is None:
+            seconds = default_check_every
+        elif str(check_every) == "never":
+            seconds = None
+        else:
+            seconds = parse_duration(check_every) or default_check_every
+
+        interval = parse_duration(source.get("interval")) if resource.get("type") == "time" and isinstance(source, dict) else None
+        config = json.dumps({"type": resource.get("type"), "source": source}, sort_keys=True, default=str)
+        loads.append(ResourceLoad(project, pipeline_name, foundation, str(resource.get("name")), str(resource.get("type")),
+                                  config, seconds, interval, bool(resource.get("webhook_token"))))
+    return loads
+
+def suggested_check_every(load: ResourceLoad) -> Optional[float]:
+    """Suggest a longer check interval for a resource, if one would cut its load
+
+    Time resources only need to be checked a few times per interval, and
+    resources the git server can notify through a webhook only need a slow
+    fallback poll. For a resource without a webhook_token the fallback is
+    only safe once its webhook is set up (see FleetForecast.suggestions).
+
+    Returns:
+        Suggested check_every in seconds, or None to keep the current one
+    """
+    if not load.check_every:
+        return None
+    if load.interval:
+        suggestion = min(max(load.interval / TIME_CHECKS_PER_INTERVAL, 60.0), 3600.0)
+    elif load.type in WEBHOOK_TYPES:
+        suggestion = WEBHOOK_CHECK_EVERY
+    else:
+        return None
+    return suggestion if suggestion > load.check_every else None
+
+def shared_load(loads: Iterable[ResourceLoad], check_every=lambda load: load.check_every) -> float:
+    """Checks per minute when resources with the same config are checked once
+
+    A shared resource config is checked at the shortest interval of the
+    resources using it.
+    """
+    fastest: Dict[str, float] = {}
+    for load in loads:
+        seconds = check_every(load)
+        if seconds:
+            fastest[load.config] = min(fastest.get(load.config, seconds), seconds)
+    return sum(60.0 / seconds for seconds in fastest.values())
+
+class FleetForecast:
+    """Check load of a set of pipelines across foundations"""
+
+    def __init__(self, loads: List[ResourceLoad]):
+        self.loads = loads
+
+    @property
+    def checks_per_minute(self) -> float:
+        """Checks per minute when every resource is checked on its own"""
+        return sum(load.checks_per_minute for load in self.loads)
+
+    @property
+    def shared_checks_per_minute(self) -> float:
+        """Checks per minute when resources with identical configs share checks"""
+        return shared_load(self.loads)
+
+    @property
+    def tuned_checks_per_minute(self) -> float:
+        """Checks per minute with shared configs and the suggested check intervals"""
+        return shared_load(self.loads, lambda load: suggested_check_every(load) or load.check_every)
+
+    def by_pipeline(self) -> Dict[str, float]:
+        """Checks per minute of each pipeline, summed over its foundations"""
+        totals: Dict[str, float] = {}
+        for load in self.loads:
+            key = f"{load.project}:{load.pipeline}"
+            totals[key] = totals.get(key, 0.0) + load.checks_per_minute
+        return totals
+
+    def shared_configs(self) -> List[List[ResourceLoad]]:
+        """Groups of checked resources that have identical configs, largest first"""
+        groups: Dict[str, List[ResourceLoad]] = {}
+        for load in self.loads:
+            if load.check_every:
+                groups.setdefault(load.config, []).append(load)
+        return sorted((group for group in groups.values() if len(group) > 1), key=lambda group: (-len(group), group[0].id))
+
+    def suggestions(self) -> List[Dict[str, Any]]:
+        """Suggested check interval changes, one per pipeline resource, by checks saved
+
+        needs_webhook marks resources that have no webhook_token yet, whose
+        check_every may only be raised once the git server calls the webhook.
+        """
+        suggestions: Dict[str, Dict[str, Any]] = {}
+        for load in self.loads:
+            suggestion = suggested_check_every(load)
+            if suggestion is None:
+                continue
+            key = f"{load.project}:{load.pipeline}.{load.name}"
+            entry = suggestions.setdefault(key, {
+                "resource": key,
+                "type": load.type,
+                "check_every": format_duration(load.check_every),
+                "suggested_check_every": format_duration(suggestion),
+                "needs_webhook": False,
+                "checks_saved_per_minute": 0.0
+            })
+            if load.type in WEBHOOK_TYPES and not load.interval and not load.webhook:
+                entry["needs_webhook"] = True
+            entry["checks_saved_per_minute"] += load.checks_per_minute - 60.0 / suggestion
+        return sorted(suggestions.values(), key=lambda entry: -entry["checks_saved_per_minute"])
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the forecast to a JSON-serializable dictionary"""
+        return {
+            "pipelines": len({(load.project, load.pipeline, load.foundation) for load in self.loads}),
+            "checked_resources": len(self.loads),
+            "unique_configs": len({load.config for load in self.loads if load.check_every}),
+            "checks_per_minute": round(self.checks_per_minute, 3),
+            "shared_checks_per_minute": round(self.shared_checks_per_minute, 3),
+            "tuned_checks_per_minute": round(self.tuned_checks_per_minute, 3),
+            "by_pipeline": {key: round(value, 3) for key, value in sorted(self.by_pipeline().items())},
+            "shared_configs": [[load.id for load in group] for group in self.shared_configs()],
+            "suggestions": [{**entry, "checks_saved_per_minute": round(entry["checks_saved_per_minute"], 3)}
+                            for entry in self.suggestions()]
+        }
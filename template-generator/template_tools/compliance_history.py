@@ -0,0 +1,292 @@
+"""
+Compliance History Store
+
+This module keeps the results of template compliance runs in a local SQLite
+database, so fleet questions such as "which repos regressed on strict mode
+this week" are answered from stored history instead of a fresh sweep:
+
+- runs: one row per validator invocation
+- repos: one row per project directory or repository
+- repo_runs: the result of one repo (and rev) in one run, with its issue count
+- rules: one row per check and message template, such as
+  "Script {path} missing strict mode (...)"
+- issues: one row per issue of a repo run
+
+Repo results and issues are written in batched transactions, the issues with
+executemany, and the tables are indexed for the queries below (top failing
+rules, regressions between two runs, compliance rate per template type). Only
+finished runs are queried, so an interrupted run never shows up half-written.
+
+Usage:
+    store = HistoryStore("compliance.db")
+    run_id = store.start_run("kustomize", "validate-template-compliance.py ...")
+    repo_run = store.start_repo_run(run_id, "/src/my-service", None, "kustomize")
+    store.add_issues(repo_run, [("script_standards", "Script ...", "ci/fly.sh")])
+    store.finish_repo_run(repo_run, 1)
+    store.finish_run(run_id)
+
+Author: CI/CD Platform Team
+"""
+
+import re
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from fnmatch import fnmatchcase
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    template_type TEXT NOT NULL,
+    command TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_started_at ON runs (started_at);
+
+CREATE TABLE IF NOT EXISTS repos (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS repo_runs (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    repo_id INTEGER NOT NULL REFERENCES repos (id),
+    rev TEXT,
+    template_type TEXT NOT NULL,
+    issue_count INTEGER
+);
+CREATE INDEX IF NOT EXISTS repo_runs_run ON repo_runs (run_id);
+CREATE INDEX IF NOT EXISTS repo_runs_repo ON repo_runs (repo_id, rev, run_id);
+
+CREATE TABLE IF NOT EXISTS rules (
+    id INTEGER PRIMARY KEY,
+    check_name TEXT NOT NULL,
+    template TEXT NOT NULL,
+    UNIQUE (check_name, template)
+);
+
+CREATE TABLE IF NOT EXISTS issues (
+    id INTEGER PRIMARY KEY,
+    repo_run_id INTEGER NOT NULL REFERENCES repo_runs (id),
+    rule_id INTEGER NOT NULL REFERENCES rules (id),
+    path TEXT,
+    message TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS issues_repo_run ON issues (repo_run_id, rule_id);
+CREATE INDEX IF NOT EXISTS issues_rule ON issues (rule_id, repo_run_id);
+"""
+
+# Issues buffered before they are written in one transaction
+DEFAULT_BATCH_SIZE = 500
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+def rule_template(message: str, path: Optional[str] = None) -> str:
+    """Reduce an issue message to the rule it reports, e.g. "Script {path} missing strict mode"
+
+    The issue's path, counts and exception details are replaced so the same
+    rule has the same template in every repo.
+    """
+    if path:
+        message = message.replace(path, "{path}")
+    if message.startswith("Error "):
+        message = message.split(": ", 1)[0] + ": {error}"
+    return re.sub(r"\b\d+\b", "{n}", message)
+
+class HistoryStore:
+    """SQLite database of compliance runs and their issues"""
+
+    def __init__(self, path: str, batch_size: int = DEFAULT_BATCH_SIZE):
+        """Open the database, creating the tables if needed
+
+        Args:
+            path: Database file
+            batch_size: Number of issues buffered before they are written
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        self._rules: Dict[Tuple[str, str], int] = {}
+        self._pending: List[Tuple[int, str, str, Optional[str], str]] = []
+
+    def close(self) -> None:
+        """Close the database, discarding the results of unfinished runs that were not flushed"""
+        self.connection.close()
+
+    def start_run(self, template_type: str, command: str = "") -> int:
+        """Record the start of a validator invocation
+
+        Returns:
+            Run id
+        """
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO runs (started_at, template_type, command) VALUES (?, ?, ?)",
+                (_now(), template_type, command))
+        return cursor.lastrowid
+
+    def finish_run(self, run_id: int) -> None:
+        self.connection.execute("UPDATE runs SET finished_at = ? WHERE id = ?", (_now(), run_id))
+        self.flush()
+        # Refresh the planner statistics as the tables grow
+        self.connection.execute("PRAGMA optimize")
+
+    def start_repo_run(self, run_id: int, repo: str, rev: Optional[str], template_type: str) -> int:
+        """Record the start of the validation of one repo in a run
+
+        Returns:
+            Repo run id
+        """
+        self.connection.execute("INSERT OR IGNORE INTO repos (name) VALUES (?)", (repo,))
+        repo_id = self.connection.execute("SELECT id FROM repos WHERE name = ?", (repo,)).fetchone()[0]
+        cursor = self.connection.execute(
+            "INSERT INTO repo_runs (run_id, repo_id, rev, template_type) VALUES (?, ?, ?, ?)",
+            (run_id, repo_id, rev, template_type))
+        return cursor.lastrowid
+
+    def finish_repo_run(self, repo_run_id: int, issue_count: int) -> None:
+        self.connection.execute("UPDATE repo_runs SET issue_count = ? WHERE id = ?", (issue_count, repo_run_id))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def add_issues(self, repo_run_id: int, issues: Iterable[Tuple[str, str, Optional[str]]]) -> None:
+        """Buffer issues of a repo run, writing them once a batch is full
+
+        Args:
+            repo_run_id: Repo run id
+            issues: (check, message, path) tuples
+        """
+        for check, message, path in issues:
+            self._pending.append((repo_run_id, check, rule_template(message, path), path, message))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the buffered issues and commit the open transaction"""
+        with self.connection:
+            rows = [(repo_run_id, self._rule_id(check, template), path, message)
+                    for repo_run_id, check, template, path, message in self._pending]
+            self.connection.executemany(
+                "INSERT INTO issues (repo_run_id, rule_id, path, message) VALUES (?, ?, ?, ?)", rows)
+        self._pending = []
+
+    def _rule_id(self, check: str, template: str) -> int:
+        key = (check, template)
+        if key not in self._rules:
+            self.connection.execute("INSERT OR IGNORE INTO rules (check_name, template) VALUES (?, ?)", key)
+            self._rules[key] = self.connection.execute(
+                "SELECT id FROM rules WHERE check_name = ? AND template = ?", key).fetchone()[0]
+        return self._rules[key]
+
+    # Queries
+
+    def runs(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Most recent runs with their repo and issue counts"""
+        rows = self.connection.execute("""
+            SELECT runs.id, runs.started_at, runs.finished_at, runs.template_type,
+                   COUNT(repo_runs.id), SUM(repo_runs.issue_count = 0), COALESCE(SUM(repo_runs.issue_count), 0)
+            FROM runs LEFT JOIN repo_runs ON repo_runs.run_id = runs.id
+            GROUP BY runs.id ORDER BY runs.id DESC LIMIT ?""", (limit,)).fetchall()
+        return [{"run": row[0], "started_at": row[1], "finished_at": row[2], "template_type": row[3],
+                 "repos": row[4], "compliant": row[5] or 0, "issues": row[6]} for row in rows]
+
+    def latest_run(self, before: Optional[int] = None) -> Optional[int]:
+        """Id of the latest finished run, optionally before another run"""
+        query = "SELECT MAX(id) FROM runs WHERE finished_at IS NOT NULL"
+        params: Tuple[Any, ...] = ()
+        if before is not None:
+            query += " AND id < ?"
+            params = (before,)
+        return self.connection.execute(query, params).fetchone()[0]
+
+    def run_before(self, run_id: int, days: float) -> Optional[int]:
+        """Id of the latest finished run started at least a number of days before a run"""
+        started = self.connection.execute("SELECT started_at FROM runs WHERE id = ?", (run_id,)).fetchone()
+        if started is None:
+            return None
+        cutoff = (datetime.fromisoformat(started[0]) - timedelta(days=days)).isoformat(timespec="seconds")
+        row = self.connection.execute(
+            "SELECT MAX(id) FROM runs WHERE finished_at IS NOT NULL AND started_at <= ?", (cutoff,)).fetchone()
+        return row[0]
+
+    def top_rules(self, run_id: Optional[int] = None, days: Optional[float] = None,
+                  template_type: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        """Rules failing in the most repos
+
+        Args:
+            run_id: Only count this run (default: every run, or those of the last days)
+            days: Only count runs started in this many days
+            template_type: Only count repos validated against this template type
+            limit: Number of rules to return
+        """
+        where, params = self._filters(run_id, days, template_type)
+        rows = self.connection.execute(f"""
+            SELECT rules.check_name, rules.template, COUNT(DISTINCT repo_runs.repo_id), COUNT(issues.id)
+            FROM issues
+            JOIN rules ON rules.id = issues.rule_id
+            JOIN repo_runs ON repo_runs.id = issues.repo_run_id
+            JOIN runs ON runs.id = repo_runs.run_id
+            WHERE {where}
+            GROUP BY rules.id ORDER BY COUNT(DISTINCT repo_runs.repo_id) DESC, COUNT(issues.id) DESC, rules.template
+            LIMIT ?""", (*params, limit)).fetchall()
+        return [{"check": row[0], "rule": row[1], "repos": row[2], "issues": row[3]} for row in rows]
+
+    def compliance_rate(self, run_id: Optional[int] = None, days: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Share of repo runs without issues, per template type"""
+        where, params = self._filters(run_id, days, None)
+        rows = self.connection.execute(f"""
+            SELECT repo_runs.template_type, COUNT(*), SUM(repo_runs.issue_count = 0)
+            FROM repo_runs JOIN runs ON runs.id = repo_runs.run_id
+            WHERE {where} AND repo_runs.issue_count IS NOT NULL
+            GROUP BY repo_runs.template_type ORDER BY repo_runs.template_type""", params).fetchall()
+        return [{"template_type": row[0], "repo_runs": row[1], "compliant": row[2],
+                 "rate": round(row[2] / row[1], 4) if row[1] else 0.0} for row in rows]
+
+    def regressions(self, base_run: int, run_id: int, rule: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Issues of a run that the same repo did not have in an earlier run
+
+        Each repo of the run is compared with its latest result up to the base
+        run, so sweeps that split the fleet over several runs compare correctly.
+
+        Args:
+            base_run: Run to compare against
+            run_id: Run to check for new issues
+            rule: Glob pattern of the rule templates to include
+        """
+        rows = self.connection.execute("""
+            SELECT repos.name, current.rev, rules.check_name, rules.template, issues.path, issues.message
+            FROM repo_runs AS current
+            JOIN repos ON repos.id = current.repo_id
+            JOIN repo_runs AS base ON base.id = (
+                SELECT MAX(id) FROM repo_runs
+                WHERE repo_id = current.repo_id AND rev IS current.rev AND run_id <= ? AND issue_count IS NOT NULL
+                  AND run_id IN (SELECT id FROM runs WHERE finished_at IS NOT NULL))
+            JOIN issues ON issues.repo_run_id = current.id
+            JOIN rules ON rules.id = issues.rule_id
+            WHERE current.run_id = ? AND NOT EXISTS (
+                SELECT 1 FROM issues AS old
+                WHERE old.repo_run_id = base.id AND old.rule_id = issues.rule_id AND old.path IS issues.path)
+            ORDER BY repos.name, rules.template, issues.path""", (base_run, run_id)).fetchall()
+        return [{"repo": row[0], "rev": row[1], "check": row[2], "rule": row[3], "path": row[4], "message": row[5]}
+                for row in rows if rule is None or fnmatchcase(row[3], rule)]
+
+    def _filters(self, run_id: Optional[int], days: Optional[float],
+                 template_type: Optional[str]) -> Tuple[str, Tuple[Any, ...]]:
+        clauses = ["runs.finished_at IS NOT NULL"]
+        params: List[Any] = []
+        if run_id is not None:
+            clauses.append("runs.id = ?")
+            params.append(run_id)
+        if days is not None:
+            clauses.append("runs.started_at >= ?")
+            params.append((datetime.now(timezone.utc) - timedelta(days=days)).isoformat(timespec="seconds"))
+        if template_type:
+            clauses.append("repo_runs.template_type = ?")
+            params.append(template_type)
+        return " AND ".join(clauses), tuple(params)
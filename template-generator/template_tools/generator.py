@@ -0,0 +1,666 @@
+"""
+Template Generator for Pipeline Standards
+
+This module generates a standardized reference template for CI/CD pipelines
+based on the tkgi-pipeline-standards. It copies template files from the reference
+directory and customizes them with the provided configuration.
+
+Template files are read through the content-addressed template store
+(template_store.py), so files shared by several template types are read,
+tokenized and rendered once per process. yaml, json, datetime and the plan
+parallelizer are imported by the code paths that use them, so --help and
+JSON configs start without them.
+
+Usage:
+    generate-reference-template --output-dir ./my-project --config ./my-config.yaml
+    python generate-reference-template.py --output-dir ./my-project --template-type kustomize --org-name "MyOrg" --repo-name "my-service"
+
+Author: CI/CD Platform Team
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+import re
+from typing import Dict, Any, Iterator, NamedTuple, Optional, List, Union
+
+from .template_profiler import NullProfiler
+
+# Default values
+DEFAULTS = {
+    "org_name": "Utilities-tkgieng",
+    "repo_name": "my-service",
+    "default_branch": "develop",
+    "release_branch": "release",
+    "default_environment": "lab",
+    "default_foundation": "cml-k8s-n-01",
+    "default_pipeline": "main",
+    "default_timer_duration": "3h",
+    "github_domain": "github.com",
+    "datacenter_pattern": r"^([a-z]{3})-([a-z0-9]+)-([np])-(\d+)$",  # e.g., cml-k8s-n-01
+    "env_variables": {
+        "TEST_MODE": "false",
+        "DEBUG": "false",
+        "VERBOSE": "false"
+    }
+}
+
+# Script that bundle_fly_script replaces with a single-file build
+BUNDLED_SCRIPT = Path("ci/scripts/fly.sh")
+
+class PlannedFile(NamedTuple):
+    """A template file selected for the generated project"""
+
+    source: Path
+    path: Path
+    fallback: bool
+    blob: str
+    executable: bool
+
+class TemplateGenerator:
+    """Generator for CI/CD pipeline reference templates"""
+
+    def __init__(self, config: Dict[str, Any], profiler: Optional[NullProfiler] = None):
+        """Initialize the generator with configuration
+
+        Args:
+            config: Dictionary containing configuration values
+            profiler: Profiler recording phase and file timings (default: disabled)
+        """
+        from .template_store import shared_store
+
+        self.config = {**DEFAULTS, **config}
+        self.profiler = profiler or NullProfiler()
+        # Template files are read through the store shared by every generator of the process
+        self.store = shared_store()
+        script_dir = self._get_script_dir()
+        repo_root = script_dir.parent
+        self.repo_root = repo_root
+
+        # Set up template directories
+        template_type = self.config.get("template_type", "kustomize").lower()
+        self.template_type = template_type
+
+        # Primary template directory - specific to the template type
+        self.template_dir = repo_root / "reference" / "templates" / template_type
+
+        # Fallback directory - common reference pipeline
+        self.fallback_dir = repo_root / "reference" / "pipeline"
+
+        # Validate template directories
+        if not self.template_dir.exists():
+            print(f"Warning: Template directory {self.template_dir} does not exist.")
+            if self.fallback_dir.exists():
+                print(f"Will use {self.fallback_dir} as primary source.")
+                # Swap template and fallback if template doesn't exist
+                self.template_dir, self.fallback_dir = self.fallback_dir, None
+            else:
+                print("Error: Could not find any template directory. Make sure the templates exist.")
+                sys.exit(1)
+        elif not self.fallback_dir.exists():
+            print(f"Warning: Fallback directory {self.fallback_dir} does not exist.")
+            print("Will only use template-specific files.")
+            self.fallback_dir = None
+
+        print(f"Using template from: {self.template_dir}")
+        if self.fallback_dir:
+            print(f"Using fallback source: {self.fallback_dir}")
+
+        self.output_dir = Path(self.config.get("output_dir", "./output"))
+
+    def _get_script_dir(self) -> Path:
+        """Get the template-generator directory, which contains this package
+
+        Returns:
+            Path to the template-generator directory
+        """
+        return Path(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    def _render_template(self, content: str) -> str:
+        """Replace template variables with configuration values
+
+        Args:
+            content: Content of the template file
+
+        Returns:
+            Rendered content with variables replaced
+        """
+        # Replace ${VAR_NAME} style variables
+        pattern = r'\$\{([A-Za-z0-9_]+)\}'
+        return re.sub(pattern, lambda match: self._resolve_var(match.group(1)), content)
+
+    def _resolve_var(self, var_name: str) -> str:
+        """Get the value of a template variable, or the variable itself if it is not configured
+
+        Args:
+            var_name: Variable name, e.g. REPO_NAME
+
+        Returns:
+            Replacement text
+        """
+        if var_name.lower() in self.config:
+            return str(self.config.get(var_name.lower(), f"${{{var_name}}}"))
+        else:
+            # Look for a case-insensitive match
+            for key in self.config:
+                if key.lower() == var_name.lower():
+                    return str(self.config[key])
+        return f"${{{var_name}}}"
+
+    def render_file(self, entry: PlannedFile) -> Union[str, bytes]:
+        """Render a planned template file in memory
+
+        Args:
+            entry: Planned file
+
+        Returns:
+            Rendered text, or the raw bytes for binary files
+        """
+        rendered = self.store.render(entry.blob, self._resolve_var)
+        if rendered is None:
+            return self.store.read_bytes(entry.blob)
+        if entry.path == BUNDLED_SCRIPT and self.config.get("bundle_fly_script"):
+            return self._bundle_fly_script(rendered)
+        return self._fan_out_set_pipeline(entry.source, self._parallelize_pipeline(entry.source, rendered))
+
+    def _bundle_fly_script(self, content: str) -> str:
+        """Inline the rendered modules that fly.sh sources into a single script
+
+        Args:
+            content: Rendered fly.sh
+
+        Returns:
+            Bundled script, or the script unchanged if it cannot be bundled
+        """
+        from .script_bundler import BundleError, bundle_script
+
+        planned = {entry.path: entry for entry in self.copy_plan()}
+
+        def read_source(rel_path: str) -> Optional[str]:
+            entry = planned.get(BUNDLED_SCRIPT.parent / rel_path)
+            return self.store.render(entry.blob, self._resolve_var) if entry else None
+
+        try:
+            return bundle_script(content, read_source, BUNDLED_SCRIPT.name,
+                                 bool(self.config.get("bundle_strip_help"))).text
+        except BundleError as e:
+            print(f"Warning: not bundling {BUNDLED_SCRIPT}: {e}")
+            return content
+
+    def _task_config(self, task_file: str) -> Optional[Dict[str, Any]]:
+        """Look up the rendered config of a task file referenced by a pipeline
+
+        Args:
+            task_file: Task file path inside an artifact, e.g. repo/ci/tasks/x/task.yml
+
+        Returns:
+            Task config, or None if the template does not provide the file
+        """
+        import yaml
+
+        rel_path = Path(*Path(task_file).parts[1:]) if len(Path(task_file).parts) > 1 else None
+        for base_dir in (self.template_dir, self.fallback_dir):
+            if rel_path and base_dir and (base_dir / rel_path).is_file():
+                try:
+                    config = yaml.safe_load(self._render_template((base_dir / rel_path).read_text(encoding='utf-8')))
+                except (UnicodeDecodeError, yaml.YAMLError):
+                    return None
+                return config if isinstance(config, dict) else None
+        return None
+
+    def _parallelize_pipeline(self, src_path: Path, content: str) -> str:
+        """Group independent plan steps of a pipeline in in_parallel blocks, if configured
+
+        Args:
+            src_path: Source file path
+            content: Rendered file content
+
+        Returns:
+            Rewritten content, or the content unchanged for other files
+        """
+        step_types = self.config.get("parallelize_steps")
+        if not step_types or src_path.suffix != ".yml" or src_path.parent.name != "pipelines":
+            return content
+        if isinstance(step_types, str):
+            step_types = [step_type.strip() for step_type in step_types.split(",")]
+
+        import yaml
+        from .plan_parallelizer import parallelize
+
+        try:
+            rewritten, _ = parallelize(content, step_types, self.config.get("parallel_limit"), self._task_config)
+        except (ValueError, yaml.YAMLError) as e:
+            print(f"Warning: not parallelizing {src_path.name}: {e}")
+            return content
+        return rewritten
+
+    def _fan_out_set_pipeline(self, src_path: Path, content: str) -> str:
+        """Set the pipelines of the set-pipeline pipeline across foundations, if configured
+
+        Args:
+            src_path: Source file path
+            content: Rendered file content
+
+        Returns:
+            Rewritten content, or the content unchanged for other files
+        """
+        foundations = self.config.get("fanout_foundations")
+        if not foundations or src_path.name != "set-pipeline.yml" or src_path.parent.name != "pipelines":
+            return content
+        if isinstance(foundations, str):
+            foundations = [foundation.strip() for foundation in foundations.split(",") if foundation.strip()]
+
+        import yaml
+        from .set_pipeline_fanout import fan_out, parse_foundations
+
+        try:
+            targets = parse_foundations(foundations, self.config["datacenter_pattern"])
+            rewritten, _ = fan_out(content, targets, int(self.config.get("fanout_max_in_flight") or 4))
+        except (ValueError, yaml.YAMLError) as e:
+            print(f"Warning: not fanning out {src_path.name}: {e}")
+            return content
+        return rewritten
+
+    def _copy_file(self, entry: PlannedFile, dest_path: Path) -> None:
+        """Write a planned file to its destination, with variable replacement if it's a text file
+
+        Args:
+            entry: Planned file
+            dest_path: Destination file path
+        """
+        # Make sure the parent directory exists
+        dest_path.parent.mkdir(parents=True, exist_ok=True)
+
+        profiler = self.profiler
+        with profiler.file(str(dest_path.relative_to(self.output_dir))):
+            profiler.add_bytes(str(dest_path.relative_to(self.output_dir)), len(self.store.read_bytes(entry.blob)))
+
+            with profiler.phase("render", trace=False):
+                content = self.render_file(entry)
+
+            with profiler.phase("write", trace=False):
+                if isinstance(content, bytes):
+                    # Binary files are written unchanged
+                    dest_path.write_bytes(content)
+                else:
+                    with open(dest_path, 'w', encoding='utf-8') as file:
+                        file.write(content)
+
+                # Preserve executable permissions
+                if entry.executable:
+                    mode = os.stat(dest_path).st_mode
+                    os.chmod(dest_path, mode | 0o111)  # Add executable bit
+
+        print(f"Generated {dest_path}")
+
+    def _should_copy_task_directory(self, rel_path: Path) -> bool:
+        """Determine if a task directory should be copied based on template type
+
+        Args:
+            rel_path: Path relative to the source directory
+
+        Returns:
+            True if the directory should be copied, False otherwise
+        """
+        # If not in the tasks directory, always copy
+        if not str(rel_path).startswith("ci/tasks/"):
+            return True
+
+        # Handle shallow scripts in the tasks directory
+        if len(rel_path.parts) == 2:  # Just "ci/tasks"
+            return True
+
+        # Get specific task category
+        task_category = rel_path.parts[2] if len(rel_path.parts) > 2 else None
+
+        # Common categories that should always be included
+        common_categories = ["common", "tkgi", "testing"]
+        if task_category in common_categories:
+            return True
+
+        # Template-specific task directories
+        template_type_tasks = {
+            "kustomize": ["k8s"],  # kustomize uses tasks in the common directory and k8s
+            "helm": ["helm", "k8s"],
+            "cli-tool": ["cli-tool"]
+        }
+
+        # Check if task category is relevant for the current template type
+        return task_category in template_type_tasks.get(self.template_type, [])
+
+    def _plan_directory(self, src_dir: Path, fallback: bool) -> Iterator[PlannedFile]:
+        """List the files of a template directory that apply to the template type
+
+        Args:
+            src_dir: Source directory path
+            fallback: Whether the directory is the fallback directory
+
+        Yields:
+            Planned files, sorted by path
+        """
+        for rel_posix, store_entry in self.store.manifest(src_dir).items():
+            rel_path = Path(rel_posix)
+            # Skip task directories that don't apply to the current template type
+            if self._should_copy_task_directory(rel_path.parent):
+                yield PlannedFile(src_dir / rel_path, rel_path, fallback, store_entry.blob, store_entry.executable)
+
+    def copy_plan(self) -> List[PlannedFile]:
+        """Compute which template files make up the generated project
+
+        Files from the template directory come first. Files from the fallback
+        directory are only included when the template does not provide them.
+
+        Returns:
+            List of planned files, in copy order
+        """
+        with self.profiler.phase("traverse:template"):
+            plan = list(self._plan_directory(self.template_dir, False))
+
+        if self.fallback_dir:
+            planned = {entry.path for entry in plan}
+            with self.profiler.phase("traverse:fallback"):
+                plan.extend(entry for entry in self._plan_directory(self.fallback_dir, True)
+                            if entry.path not in planned)
+
+        return plan
+
+    def render_tree(self) -> Dict[str, Union[str, bytes]]:
+        """Render the complete reference template in memory, without writing files
+
+        Returns:
+            Dictionary of POSIX paths relative to the project root to file content
+        """
+        tree = {}
+        for entry in self.copy_plan():
+            rel_path = entry.path.as_posix()
+            with self.profiler.file(rel_path):
+                tree[rel_path] = self.render_file(entry)
+
+        if "GUIDE.md" not in tree:
+            tree["GUIDE.md"] = self._guide_content()
+
+        return tree
+
+    def generate_template(self) -> None:
+        """Generate the complete reference template"""
+        print(f"Generating template with the following configuration:")
+        for key, value in self.config.items():
+            if isinstance(value, dict):
+                print(f"  {key}:")
+                for subkey, subvalue in value.items():
+                    print(f"    {subkey}: {subvalue}")
+            else:
+                print(f"  {key}: {value}")
+
+        # Display which task categories will be included
+        common_categories = ["common", "tkgi", "testing"]
+        template_specific_tasks = {
+            "kustomize": ["k8s"],  # kustomize uses tasks in the common directory and k8s
+            "helm": ["helm", "k8s"],
+            "cli-tool": ["cli-tool"]
+        }
+
+        template_type_tasks = common_categories + template_specific_tasks.get(self.template_type, [])
+
+        print(f"\nIncluding task categories for {self.template_type} template:")
+        for task in template_type_tasks:
+            print(f"  - {task}")
+
+        # Ensure the output directory exists
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+        # Copy the template directory, then any missing files from the fallback directory
+        for entry in self.copy_plan():
+            dest_path = self.output_dir / entry.path
+            if entry.fallback and dest_path.exists():
+                # Keep files that already exist in the output
+                continue
+
+            # Copy and render file
+            self._copy_file(entry, dest_path)
+
+        # Generate a GUIDE.md file
+        guide_md_path = self.output_dir / "GUIDE.md"
+        if not guide_md_path.exists():
+            with open(guide_md_path, 'w') as file:
+                file.write(self._guide_content())
+            print(f"Generated {guide_md_path}")
+
+        print("\nTemplate generation complete!")
+        print(f"Template generated at: {self.output_dir}")
+        print("\nNext steps:")
+        print("1. Review the generated files and customize as needed")
+        print("2. Add your specific pipeline YAML files to ci/pipelines/")
+        print("3. Test the scripts using the included test framework: cd my-new-project/ci/scripts/tests && ./run_tests.sh")
+
+    def _guide_content(self) -> str:
+        """Build the content of the generated GUIDE.md file
+
+        Returns:
+            GUIDE.md content
+        """
+        import datetime
+
+        return f"""# GUIDE.md
+
+This file provides guidance to Engineers when working with code in this repository.
+
+## Build/Test Commands
+- `./ci/scripts/tests/run_tests.sh` - Run all tests
+- `./ci/scripts/tests/test_*.sh` - Run individual test (e.g., test_fly.sh)
+- `./ci/scripts/fly.sh -f <foundation> [options] [command]` - Deploy pipeline
+- `./ci/scripts/fly.sh validate all` - Validate all pipeline YAML
+- `./ci/scripts/fly.sh -f <foundation> -r` - Deploy release pipeline
+- `./ci/scripts/fly.sh -f <foundation> --dry-run` - Test without executing
+
+## Code Style Guidelines
+- **Shebang**: Use `#!/usr/bin/env bash` for all scripts
+- **Strict Mode**: Include `set -o errexit` and `set -o pipefail` at start
+- **Script Directory**: Define with `__DIR="$(cd "$(dirname "${{BASH_SOURCE[0]}}")" &>/dev/null && pwd)"`
+- **Documentation**: Include function descriptions and usage examples
+- **Error Handling**: Fail fast with descriptive messages, use standardized logging functions
+- **Parameter Validation**: Check required parameters before execution
+- **Testing**: Create test files for critical functions, use test-framework.sh
+
+## Directory Structure
+- `ci/pipelines/`: Pipeline definition YAML files
+- `ci/scripts/`: Pipeline control scripts with lib/ subdirectory
+- `ci/tasks/`: Task definitions organized by category
+- `scripts/`: Repository-level scripts
+- `tests/`: Test scripts for repository functionality
+
+## Common Patterns
+- Script functions should use descriptive names (cmd_set_pipeline, validate_file_exists)
+- Use standardized output functions: info, error, success, warning
+- Follow command pattern: command + required_params + optional_params + flags
+- Structure task folders as category/task-name/task.yml and task.sh
+- Use consistent foundation-based configuration
+
+Generated by template-generator on {datetime.datetime.now().strftime('%Y-%m-%d')}
+"""
+
+def parse_args() -> Dict[str, Any]:
+    """Parse command line arguments
+
+    Returns:
+        Dictionary of argument values
+    """
+    parser = argparse.ArgumentParser(
+        description="Generate a reference template for CI/CD pipelines"
+    )
+
+    parser.add_argument(
+        "--output-dir",
+        required=True,
+        help="Directory where the template should be generated"
+    )
+
+    parser.add_argument(
+        "--config",
+        help="Path to configuration file (YAML or JSON)"
+    )
+
+    parser.add_argument(
+        "--template-type",
+        choices=["kustomize", "helm", "cli-tool"],
+        default="kustomize",
+        help="Type of template to generate (default: kustomize)"
+    )
+
+    parser.add_argument(
+        "--org-name",
+        help=f"GitHub organization name (default: {DEFAULTS['org_name']})"
+    )
+
+    parser.add_argument(
+        "--repo-name",
+        help=f"Repository name (default: {DEFAULTS['repo_name']})"
+    )
+
+    parser.add_argument(
+        "--default-branch",
+        help=f"Default git branch (default: {DEFAULTS['default_branch']})"
+    )
+
+    parser.add_argument(
+        "--default-foundation",
+        help=f"Default foundation (default: {DEFAULTS['default_foundation']})"
+    )
+
+    parser.add_argument(
+        "--default-pipeline",
+        help=f"Default pipeline name (default: {DEFAULTS['default_pipeline']})"
+    )
+
+    parser.add_argument(
+        "--parallelize-steps",
+        nargs="?",
+        const="get",
+        help="Group independent consecutive plan steps of the pipelines in in_parallel blocks; "
+             "optionally a comma-separated list of get, put, task (default when given: get)"
+    )
+
+    parser.add_argument(
+        "--parallel-limit",
+        type=int,
+        help="Maximum number of steps each generated in_parallel block runs at once"
+    )
+
+    parser.add_argument(
+        "--fanout-foundations",
+        help="Comma-separated list of foundations the set-pipeline pipeline sets the pipelines of "
+             "in one build, with a set_pipeline step across them"
+    )
+
+    parser.add_argument(
+        "--fanout-max-in-flight",
+        type=int,
+        help="Maximum number of foundations the set-pipeline fan-out sets at once (default: 4)"
+    )
+
+    parser.add_argument(
+        "--bundle-fly-script",
+        action="store_true",
+        help="Generate ci/scripts/fly.sh as one self-contained script with its lib modules inlined"
+    )
+
+    parser.add_argument(
+        "--strip-help",
+        action="store_true",
+        help="Remove comments, blank lines and unused help text from the bundled fly.sh (requires --bundle-fly-script)"
+    )
+
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print wall/CPU time per phase and the slowest files to stderr"
+    )
+
+    parser.add_argument(
+        "--profile-trace",
+        help="Write a Chrome trace-event JSON file (implies --profile)"
+    )
+
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=10,
+        help="Number of slowest files to report when profiling (default: 10)"
+    )
+
+    args = parser.parse_args()
+    if args.strip_help and not args.bundle_fly_script:
+        parser.error("--strip-help requires --bundle-fly-script")
+    config = {}
+
+    # Load configuration from file if provided
+    if args.config:
+        with open(args.config, 'r') as file:
+            if args.config.endswith('.yaml') or args.config.endswith('.yml'):
+                import yaml
+                config = yaml.safe_load(file)
+            elif args.config.endswith('.json'):
+                import json
+                config = json.load(file)
+            else:
+                print(f"Unsupported config file format: {args.config}")
+                sys.exit(1)
+
+    # Override with command line arguments
+    if args.output_dir:
+        config['output_dir'] = args.output_dir
+    if args.template_type:
+        config['template_type'] = args.template_type
+    if args.org_name:
+        config['org_name'] = args.org_name
+    if args.repo_name:
+        config['repo_name'] = args.repo_name
+    if args.default_branch:
+        config['default_branch'] = args.default_branch
+    if args.default_foundation:
+        config['default_foundation'] = args.default_foundation
+    if args.default_pipeline:
+        config['default_pipeline'] = args.default_pipeline
+    if args.parallelize_steps:
+        config['parallelize_steps'] = args.parallelize_steps
+    if args.parallel_limit:
+        config['parallel_limit'] = args.parallel_limit
+    if args.fanout_foundations:
+        config['fanout_foundations'] = args.fanout_foundations
+    if args.fanout_max_in_flight:
+        config['fanout_max_in_flight'] = args.fanout_max_in_flight
+    if args.bundle_fly_script:
+        config['bundle_fly_script'] = True
+    if args.strip_help:
+        config['bundle_strip_help'] = True
+
+    # Profiling options are not template variables, keep them out of the config
+    if args.profile or args.profile_trace:
+        config['_profile'] = {
+            "trace": args.profile_trace,
+            "top": args.profile_top
+        }
+
+    return config
+
+def main():
+    """Main entry point"""
+    config = parse_args()
+    profile = config.pop('_profile', None)
+    profiler = None
+    if profile:
+        from .template_profiler import Profiler
+        profiler = Profiler("generate-reference-template")
+
+    generator = TemplateGenerator(config, profiler=profiler)
+    generator.generate_template()
+
+    if profiler:
+        profiler.print_summary(profile["top"])
+        if profile["trace"]:
+            profiler.write_trace(profile["trace"], profile["top"])
+            print(f"Profile trace written to {profile['trace']}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+"""
+Container Image Inventory for Concourse Pipelines and Tasks
+
+This module indexes every container image a project's pipelines and tasks run
+on: the `image_resource` of inline task configs and task.yml files, and the
+`registry-image`/`docker-image` resources and resource types of pipelines.
+
+Workers cache an image by its version, so an image is pulled cold once per
+worker and again whenever its version changes. A mutable tag such as `latest`
+is checked on every build and moves whenever the upstream image is pushed,
+which turns the next build of every task using it into a cold pull on every
+worker. Each distinct image adds another cold pull per worker.
+
+The usage of each job is derived from its task steps: a task that takes its
+image from a get step (`image:`) shares the pipeline resource's cached
+version, while each task with its own `image_resource` checks and fetches the
+image itself. The inventory reports:
+
+- distinct images and the references using mutable tags
+- cold pulls needed to warm every worker, and per job build the worst case
+  of cache misses when mutable tags have moved
+- suggestions to pin tags, converge on one version per repository and declare
+  images used by several tasks once as a pipeline resource
+
+Usage:
+    inventory = ImageInventory()
+    inventory.add_source(source, "my-service")
+    inventory.to_dict(workers=4)
+
+Author: CI/CD Platform Team
+"""
+
+import re
+from collections import Counter
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+import yaml
+
+from .project_sources import ProjectSource
+
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Resource types whose source names a container image
+IMAGE_TYPES = {"registry-image", "docker-image"}
+
+# Prefixes of Docker Hub repository names that refer to the same image
+DOCKER_HUB_PREFIXES = ("docker.io/", "index.docker.io/", "registry-1.docker.io/")
+
+# Tags that name a release channel rather than a version
+CHANNEL_TAGS = {"latest", "stable", "edge", "main", "master", "develop", "nightly"}
+
+class ImageRef(NamedTuple):
+    """A container image declared by a pipeline or task file"""
+
+    project: str
+    path: str
+    location: str
+    kind: str
+    type: str
+    repository: str
+    tag: str
+    digest: str
+
+    @property
+    def image(self) -> str:
+        """Image name with the tag or digest, e.g. golang:1.22"""
+        return f"{self.repository}@{self.digest}" if self.digest else f"{self.repository}:{self.tag}"
+
+    @property
+    def unresolved(self) -> bool:
+        """Whether the repository or tag is set through a ((var))"""
+        return "((" in self.repository or "((" in self.tag
+
+    @property
+    def mutable(self) -> bool:
+        """Whether the tag can move to a different image without the reference changing"""
+        if self.digest or self.unresolved:
+            return False
+        return self.tag in CHANNEL_TAGS or not re.search(r"\d", self.tag)
+
+    @property
+    def id(self) -> str:
+        return f"{self.project}:{self.path}:{self.location}"
+
+class TaskRun(NamedTuple):
+    """A task step of a job and the image it runs on"""
+
+    project: str
+    pipeline: str
+    job: str
+    task: str
+    image: Optional[ImageRef]
+    shared: bool
+
+def normalize_repository(repository: str) -> str:
+    """Strip the Docker Hub registry and library/ prefixes, e.g. docker.io/library/golang to golang"""
+    for prefix in DOCKER_HUB_PREFIXES:
+        if repository.startswith(prefix):
+            repository = repository[len(prefix):]
+            break
+    if repository.startswith("library/"):
+        repository = repository[len("library/"):]
+    return repository
+
+def image_ref(project: str, path: str, location: str, kind: str, config: Any) -> Optional[ImageRef]:
+    """Build the reference of an image_resource, resource or resource type config
+
+    Args:
+        project: Project label
+        path: File declaring the image
+        location: Place of the declaration in the file
+        kind: One of task, inline, resource, resource_type
+        config: Mapping with type and source
+
+    Returns:
+        Image reference, or None if the config does not name a container image
+    """
+    if not isinstance(config, dict) or config.get("type") not in IMAGE_TYPES:
+        return None
+    source = config.get("source")
+    if not isinstance(source, dict) or not source.get("repository"):
+        return None
+
+    repository = str(source["repository"])
+    tag = str(source.get("tag") or "")
+    digest = str(source.get("digest") or "")
+    if "@" in repository:
+        repository, digest = repository.split("@", 1)
+    elif re.search(r":[^/]+$", repository):
+        repository, tag = repository.rsplit(":", 1)
+    return ImageRef(project, path, location, kind, str(config["type"]), normalize_repository(repository),
+                    tag or "latest", digest)
+
+def _task_steps(value: Any) -> Iterator[Dict[str, Any]]:
+    """Yield every task step nested anywhere in a job"""
+    if isinstance(value, dict):
+        if "task" in value:
+            yield value
+        for item in value.values():
+            yield from _task_steps(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _task_steps(item)
+
+class ImageInventory:
+    """Images declared and used across the pipelines and tasks of a fleet"""
+
+    def __init__(self):
+        self.refs: List[ImageRef] = []
+        self.runs: List[TaskRun] = []
+
+    def add_source(self, source: ProjectSource, project: str) -> None:
+        """Index the task files and pipelines of a project
+
+        Args:
+            source: Project source
+            project: Project label
+        """
+        task_images: Dict[str, Optional[ImageRef]] = {}
+        for path in sorted(source.glob("ci/tasks/**/task.yml")):
+            task = self._load(source, project, path)
+            ref = image_ref(project, path, "image_resource", "task", task.get("image_resource")) if task else None
+            task_images[path] = ref
+            if ref:
+                self.refs.append(ref)
+
+        for path in sorted(source.glob("ci/pipelines/*.yml")):
+            pipeline = self._load(source, project, path)
+            if pipeline:
+                self._add_pipeline(pipeline, project, path, task_images)
+
+    def _load(self, source: ProjectSource, project: str, path: str) -> Optional[Dict[str, Any]]:
+        try:
+            data = yaml.load(source.read_text(path), Loader=_Loader)
+        except yaml.YAMLError as e:
+            raise ValueError(f"Invalid YAML in {project}:{path}: {e}")
+        return data if isinstance(data, dict) else None
+
+    def _add_pipeline(self, pipeline: Dict[str, Any], project: str, path: str,
+                      task_images: Dict[str, Optional[ImageRef]]) -> None:
+        for kind, key in (("resource_type", "resource_types"), ("resource", "resources")):
+            for item in pipeline.get(key) or []:
+                ref = image_ref(project, path, f"{key}.{item.get('name')}", kind, item) if isinstance(item, dict) else None
+                if ref:
+                    self.refs.append(ref)
+
+        name = path.rsplit("/", 1)[-1][:-len(".yml")]
+        for job in pipeline.get("jobs") or []:
+            if not isinstance(job, dict):
+                continue
+            for step in _task_steps(job.get("plan")):
+                task = str(step["task"])
+                if step.get("image"):
+                    # The image comes from a get step of a pipeline resource, fetched once per version
+                    self.runs.append(TaskRun(project, name, str(job.get("name")), task, None, True))
+                    continue
+
+                config = step.get("config")
+                if isinstance(config, dict):
+                    ref = image_ref(project, path, f"{job.get('name')}/{task}", "inline", config.get("image_resource"))
+                    if ref:
+                        self.refs.append(ref)
+                elif isinstance(step.get("file"), str):
+                    # A task file such as repo/ci/tasks/x/task.yml is ci/tasks/x/task.yml of the project
+                    ref = task_images.get(step["file"].split("/", 1)[-1])
+                else:
+                    ref = None
+                self.runs.append(TaskRun(project, name, str(job.get("name")), task, ref, False))
+
+    def images(self) -> Dict[str, List[ImageRef]]:
+        """References by image, e.g. golang:latest"""
+        images: Dict[str, List[ImageRef]] = {}
+        for ref in self.refs:
+            images.setdefault(ref.image, []).append(ref)
+        return dict(sorted(images.items()))
+
+    def mutable(self) -> List[ImageRef]:
+        """References using mutable tags"""
+        return [ref for ref in self.refs if ref.mutable]
+
+    def cold_pulls(self, workers: int = 1) -> int:
+        """Pulls needed to warm the image cache of every worker"""
+        return len(self.images()) * workers
+
+    def misses_per_build(self) -> Dict[str, int]:
+        """Worst-case cache misses of one build of each job, after its mutable tags moved
+
+        Every distinct image a job's tasks fetch through a mutable image_resource
+        is checked on each build and pulled cold once the tag has moved.
+        """
+        misses: Dict[str, Set[str]] = {}
+        for run in self.runs:
+            key = f"{run.project}:{run.pipeline}/{run.job}"
+            misses.setdefault(key, set())
+            if run.image and run.image.mutable:
+                misses[key].add(run.image.image)
+        return {key: len(images) for key, images in sorted(misses.items())}
+
+    def suggestions(self) -> List[Dict[str, Any]]:
+        """Changes that would cut the number of images and cold pulls"""
+        suggestions = []
+        by_repository: Dict[str, List[ImageRef]] = {}
+        for ref in self.refs:
+            if not ref.unresolved:
+                by_repository.setdefault(ref.repository, []).append(ref)
+
+        for repository, refs in sorted(by_repository.items()):
+            mutable = [ref for ref in refs if ref.mutable]
+            if mutable:
+                suggestions.append({
+                    "action": "pin",
+                    "image": repository,
+                    "message": f"pin {repository} to a version tag or digest instead of "
+                               f"{', '.join(sorted({ref.tag for ref in mutable}))}",
+                    "references": [ref.id for ref in mutable]
+                })
+
+            versions = Counter(ref.image for ref in refs if not ref.mutable)
+            if len({ref.image for ref in refs}) > 1:
+                target = versions.most_common(1)[0][0] if versions else f"{repository}:<version>"
+                suggestions.append({
+                    "action": "converge",
+                    "image": repository,
+                    "message": f"use {target} for all {len(refs)} references to {repository} "
+                               f"({len({ref.image for ref in refs})} versions in use)",
+                    "references": [ref.id for ref in refs if ref.image != target]
+                })
+
+        # Images that several tasks of a pipeline fetch through their own image_resource
+        repeated: Dict[Tuple[str, str], List[TaskRun]] = {}
+        for run in self.runs:
+            if run.image and run.image.kind in ("inline", "task"):
+                repeated.setdefault((f"{run.project}:{run.pipeline}", run.image.image), []).append(run)
+        for (pipeline, image), runs in sorted(repeated.items()):
+            if len(runs) > 1:
+                suggestions.append({
+                    "action": "share",
+                    "image": image,
+                    "message": f"declare {image} once as a registry-image resource of {pipeline} and pass it "
+                               f"to its {len(runs)} tasks with image:, so it is checked once per pipeline",
+                    "references": [f"{pipeline}/{run.job}/{run.task}" for run in runs]
+                })
+
+        docker_image = [ref for ref in self.refs if ref.type == "docker-image"]
+        if docker_image:
+            suggestions.append({
+                "action": "registry-image",
+                "image": "docker-image",
+                "message": f"switch {len(docker_image)} docker-image reference(s) to registry-image, "
+                           "which fetches images without running a Docker daemon",
+                "references": [ref.id for ref in docker_image]
+            })
+        return suggestions
+
+    def to_dict(self, workers: int = 1) -> Dict[str, Any]:
+        """Convert the inventory to a JSON-serializable dictionary"""
+        misses = self.misses_per_build()
+        return {
+            "references": len(self.refs),
+            "distinct_images": len(self.images()),
+            "mutable_references": len(self.mutable()),
+            "task_runs": len(self.runs),
+            "shared_image_runs": sum(1 for run in self.runs if run.shared),
+            "workers": workers,
+            "cold_pulls": self.cold_pulls(workers),
+            "misses_per_build": misses,
+            "images": {image: {"mutable": refs[0].mutable, "references": [ref.id for ref in refs]}
+                       for image, refs in self.images().items()},
+            "suggestions": self.suggestions()
+        }
@@ -0,0 +1,311 @@
+"""
+Job Graph Analysis for Concourse Pipelines
+
+This module builds the job graph of a pipeline from the `passed:` constraints
+of its get steps: a job depends on every job listed in the `passed:` of one of
+its gets. Each job is weighted with a duration taken from recorded build
+timings, and the graph is analyzed for:
+
+- the critical path, the longest chain of dependent jobs from trigger to the
+  last job, which bounds the lead time of a change
+- the maximum parallelism, the largest set of jobs that no constraint orders
+  against each other (the width of the graph)
+- redundant constraints, which are already implied by a longer chain
+- unused constraints, which name a resource the upstream job neither gets
+  nor puts, together with the time dropping each one would save
+
+A constraint on an upstream job that gets a resource without putting it is a
+gate, such as deploying only versions that passed validation, and is never
+reported: dropping it would change what the pipeline promises.
+
+Usage:
+    graph = JobGraph.from_pipeline(pipeline, "main", durations)
+    path, seconds = graph.critical_path()
+
+Author: CI/CD Platform Team
+"""
+
+import json
+import statistics
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from .check_load import parse_duration
+
+def _steps(value: Any, step_type: str) -> Iterator[Dict[str, Any]]:
+    """Yield every step of a type nested anywhere in a job"""
+    if isinstance(value, dict):
+        if step_type in value:
+            yield value
+        for item in value.values():
+            yield from _steps(item, step_type)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _steps(item, step_type)
+
+class Durations:
+    """Recorded job durations, in seconds
+
+    The file is either a mapping of "job" or "pipeline/job" to seconds, a
+    duration such as "5m", or a list of samples, or the output of
+    `fly -t <target> builds --json`, whose succeeded builds are used. Pipelines
+    set per foundation (main-cml-k8s-n-01) count as samples of their pipeline
+    file (main).
+    """
+
+    def __init__(self, samples: Optional[Dict[str, List[float]]] = None, default: float = 60.0):
+        self.samples = samples or {}
+        self.default = default
+
+    @classmethod
+    def load(cls, path: str, default: float = 60.0) -> "Durations":
+        """Load durations from a JSON file
+
+        Args:
+            path: JSON file path
+            default: Duration of jobs without recorded timings
+
+        Returns:
+            Loaded durations
+        """
+        with open(path, "r") as file:
+            data = json.load(file)
+
+        samples: Dict[str, List[float]] = {}
+        if isinstance(data, list):
+            for build in data:
+                if not isinstance(build, dict) or build.get("status") != "succeeded":
+                    continue
+                if not build.get("job_name") or not build.get("start_time") or not build.get("end_time"):
+                    continue
+                key = f"{build.get('pipeline_name', '')}/{build['job_name']}"
+                samples.setdefault(key, []).append(float(build["end_time"]) - float(build["start_time"]))
+        elif isinstance(data, dict):
+            for key, value in data.items():
+                values = value if isinstance(value, list) else [value]
+                seconds = [item if isinstance(item, (int, float)) else parse_duration(item) for item in values]
+                if any(item is None for item in seconds):
+                    raise ValueError(f"Invalid duration for {key} in {path}: {value}")
+                samples[key] = [float(item) for item in seconds]
+        else:
+            raise ValueError(f"Durations file {path} must contain a mapping or a list of builds")
+        return cls(samples, default)
+
+    def get(self, pipeline: str, job: str) -> Tuple[float, bool]:
+        """Get the median duration of a job
+
+        Returns:
+            Duration in seconds, and whether it was recorded rather than defaulted
+        """
+        exact = self.samples.get(f"{pipeline}/{job}")
+        if exact:
+            return statistics.median(exact), True
+
+        # Samples of the pipeline set for any foundation, e.g. main-cml-k8s-n-01/job
+        matching = [sample for key, values in self.samples.items() for sample in values
+                    if key.endswith(f"/{job}") and key.split("/", 1)[0].startswith(f"{pipeline}-")]
+        if matching:
+            return statistics.median(matching), True
+
+        if self.samples.get(job):
+            return statistics.median(self.samples[job]), True
+        return self.default, False
+
+class JobGraph:
+    """Jobs of a pipeline and the passed: constraints between them"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.durations: Dict[str, float] = {}
+        self.recorded: Set[str] = set()
+        # Job to the jobs it waits for, with the resources constrained through each
+        self.upstream: Dict[str, Dict[str, Set[str]]] = {}
+        self.gets: Dict[str, Set[str]] = {}
+        self.puts: Dict[str, Set[str]] = {}
+
+    @classmethod
+    def from_pipeline(cls, pipeline: Dict[str, Any], name: str, durations: Optional[Durations] = None) -> "JobGraph":
+        """Build the job graph of a parsed pipeline
+
+        Args:
+            pipeline: Parsed pipeline
+            name: Pipeline name, used to look up durations
+            durations: Recorded job durations (default: 60s per job)
+
+        Returns:
+            Job graph
+        """
+        durations = durations or Durations()
+        graph = cls(name)
+        jobs = [job for job in pipeline.get("jobs") or [] if isinstance(job, dict) and job.get("name")]
+        names = {str(job["name"]) for job in jobs}
+
+        for job in jobs:
+            job_name = str(job["name"])
+            graph.durations[job_name], recorded = durations.get(name, job_name)
+            if recorded:
+                graph.recorded.add(job_name)
+            graph.upstream[job_name] = {}
+            graph.gets[job_name] = set()
+            graph.puts[job_name] = {str(step.get("resource", step["put"])) for step in _steps(job.get("plan"), "put")}
+
+            for step in _steps(job.get("plan"), "get"):
+                resource = str(step.get("resource", step["get"]))
+                graph.gets[job_name].add(resource)
+                for passed in step.get("passed") or []:
+                    if str(passed) in names:
+                        graph.upstream[job_name].setdefault(str(passed), set()).add(resource)
+        return graph
+
+    @property
+    def jobs(self) -> List[str]:
+        return sorted(self.durations)
+
+    def edges(self) -> Iterator[Tuple[str, str]]:
+        """Yield (upstream, downstream) job pairs"""
+        for job in self.jobs:
+            for upstream in sorted(self.upstream[job]):
+                yield upstream, job
+
+    def topological_order(self, skip: Optional[Tuple[str, str]] = None) -> List[str]:
+        """Order the jobs so that every job comes after the jobs it waits for
+
+        Args:
+            skip: Edge to leave out
+
+        Raises:
+            ValueError: If the passed: constraints form a cycle
+        """
+        remaining = {job: {up for up in self.upstream[job] if (up, job) != skip} for job in self.jobs}
+        order = []
+        ready = sorted(job for job, ups in remaining.items() if not ups)
+        while ready:
+            job = ready.pop(0)
+            order.append(job)
+            for downstream in self.jobs:
+                if job in remaining[downstream]:
+                    remaining[downstream].discard(job)
+                    if not remaining[downstream]:
+                        ready.append(downstream)
+            ready.sort()
+        if len(order) != len(self.jobs):
+            cycle = sorted(job for job in self.jobs if job not in order)
+            raise ValueError(f"Pipeline {self.name} has a cycle of passed: constraints between {', '.join(cycle)}")
+        return order
+
+    def critical_path(self, skip: Optional[Tuple[str, str]] = None) -> Tuple[List[str], float]:
+        """Find the longest chain of dependent jobs, weighted by duration
+
+        Args:
+            skip: Edge to leave out, to measure what dropping it would save
+
+        Returns:
+            Jobs of the path in order, and its total duration in seconds
+        """
+        finish: Dict[str, float] = {}
+        previous: Dict[str, Optional[str]] = {}
+        for job in self.topological_order(skip):
+            ups = [up for up in self.upstream[job] if (up, job) != skip]
+            before = max(ups, key=lambda up: (finish[up], up), default=None)
+            previous[job] = before
+            finish[job] = (finish[before] if before else 0.0) + self.durations[job]
+
+        if not finish:
+            return [], 0.0
+        job = max(finish, key=lambda name: (finish[name], name))
+        total = finish[job]
+        path = []
+        while job:
+            path.append(job)
+            job = previous[job]
+        return list(reversed(path)), total
+
+    def ancestors(self) -> Dict[str, Set[str]]:
+        """Get every job each job waits for, directly or transitively"""
+        result: Dict[str, Set[str]] = {}
+        for job in self.topological_order():
+            result[job] = set()
+            for upstream in self.upstream[job]:
+                result[job] |= {upstream} | result[upstream]
+        return result
+
+    def max_parallelism(self) -> int:
+        """Size of the largest set of jobs not ordered against each other
+
+        By Dilworth's theorem this is the number of jobs minus a maximum
+        matching between jobs and their transitive descendants.
+        """
+        ancestors = self.ancestors()
+        descendants = {job: [other for other in self.jobs if job in ancestors[other]] for job in self.jobs}
+        matched: Dict[str, str] = {}
+
+        def augment(job: str, seen: Set[str]) -> bool:
+            for other in descendants[job]:
+                if other in seen:
+                    continue
+                seen.add(other)
+                if other not in matched or augment(matched[other], seen):
+                    matched[other] = job
+                    return True
+            return False
+
+        matching = sum(1 for job in self.jobs if augment(job, set()))
+        return len(self.jobs) - matching
+
+    def redundant_edges(self) -> List[Tuple[str, str]]:
+        """Constraints already implied by a longer chain of constraints"""
+        ancestors = self.ancestors()
+        return [(upstream, job) for upstream, job in self.edges()
+                if any(upstream in ancestors[other] for other in self.upstream[job] if other != upstream)]
+
+    def unused_constraints(self) -> List[Dict[str, Any]]:
+        """Constraints naming resources the upstream job neither gets nor puts
+
+        Returns:
+            One entry per constraint, with the unused resources and the
+            critical path saved by dropping them (zero while another resource
+            still orders the jobs)
+        """
+        _, total = self.critical_path()
+        entries = []
+        for upstream, job in self.edges():
+            constrained = self.upstream[job][upstream]
+            unused = constrained - self.gets[upstream] - self.puts[upstream]
+            if not unused:
+                continue
+            saved = 0.0
+            if unused == constrained:
+                _, without = self.critical_path(skip=(upstream, job))
+                saved = total - without
+            entries.append({
+                "upstream": upstream,
+                "job": job,
+                "resources": sorted(unused),
+                "seconds_saved": saved
+            })
+        return sorted(entries, key=lambda entry: (-entry["seconds_saved"], entry["upstream"], entry["job"]))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the analysis to a JSON-serializable dictionary"""
+        path, total = self.critical_path()
+        work = sum(self.durations.values())
+        return {
+            "pipeline": self.name,
+            "jobs": {job: {"seconds": self.durations[job], "recorded": job in self.recorded,
+                           "passed": sorted(self.upstream[job])} for job in self.jobs},
+            "critical_path": path,
+            "critical_path_seconds": total,
+            "total_seconds": work,
+            "max_parallelism": self.max_parallelism(),
+            "average_parallelism": round(work / total, 2) if total else 0.0,
+            "unused": self.unused_constraints(),
+            "redundant": [{"upstream": upstream, "job": job} for upstream, job in self.redundant_edges()]
+        }
+
+def format_seconds(seconds: float) -> str:
+    """Format seconds for display, e.g. 1h02m or 4m30s"""
+    seconds = int(round(seconds))
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
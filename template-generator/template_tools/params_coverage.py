@@ -0,0 +1,265 @@
+"""
+Params Coverage Index for Pipeline Vars
+
+This module answers "which ((vars)) would fly set-pipeline fail to resolve for
+which foundation" without calling fly. Every ((var)) of the pipelines and task
+files of a project is extracted into an inverted index of var name to the files
+that reference it, and the params repository is loaded once into a set of keys
+per foundation, layered the way fly.sh passes the files to `fly set-pipeline`:
+
+    <params>/<datacenter>/<foundation>.yml
+    <params>/<datacenter>/<datacenter>-<datacenter_type>.yml
+    <params>/<datacenter>/<datacenter>.yml
+    <params>/<datacenter_type>-global.yml
+    <params>/global.yml
+
+fly lets a file passed later with -l override the files before it, so when
+several files define a key, the value of the last one (global.yml before
+<datacenter_type>-global.yml and so on) is the one the pipeline is set with.
+
+Each params file is parsed once and shared by every foundation that uses it, so
+checking many projects against many foundations is a handful of set
+differences per pair.
+
+Usage:
+    params = ParamsTree.load("/path/to/params")
+    index = VarIndex.from_source(FilesystemSource("/path/to/project"))
+    for foundation in params.foundations:
+        missing = index.names - params.keys(foundation)
+
+Author: CI/CD Platform Team
+"""
+
+import re
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set
+
+import yaml
+
+from .project_sources import ProjectSource
+
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# ((var)), ((var.field)) and ((source:var)), but not shell arithmetic $((...))
+VAR_REFERENCE = re.compile(r'(?<!\$)\(\(([^()]*)\)\)')
+VAR_NAME = re.compile(r'^(?:([-\w/.]+):)?("[^"]*"|[-\w/]+)(?:\.(?:"[^"]*"|[-\w/]+))*$')
+
+# Vars fly.sh passes to `fly set-pipeline` with -v instead of reading them from params
+FLY_VARS = frozenset({
+    "branch", "config_git_branch", "config_git_uri", "dc", "dc_type", "environment",
+    "foundation", "foundation_path", "git_release_branch", "git_uri", "params_git_branch",
+    "repository", "timer_duration", "verbose", "version", "version_file"
+})
+
+PIPELINE_GLOB = "ci/pipelines/*.yml"
+TASK_GLOB = "ci/tasks/**/task.yml"
+
+def extract_vars(content: str) -> Set[str]:
+    """Extract the names of the params vars referenced in pipeline or task YAML
+
+    Only the top-level name is returned for ((var.field)). Vars read from a
+    named var source (((source:var))), commented-out lines and malformed
+    references are skipped.
+
+    Args:
+        content: File content
+
+    Returns:
+        Set of var names
+    """
+    names = set()
+    for line in content.splitlines():
+        if "((" not in line or line.lstrip().startswith("#"):
+            continue
+        for reference in VAR_REFERENCE.findall(line):
+            match = VAR_NAME.match(reference.strip())
+            if match and not match.group(1):
+                names.add(match.group(2).strip('"'))
+    return names
+
+class VarIndex:
+    """Inverted index of var names to the files that reference them"""
+
+    def __init__(self, label: str = ""):
+        self.label = label
+        self.files: Dict[str, Set[str]] = {}
+
+    @classmethod
+    def from_source(cls, source: ProjectSource) -> "VarIndex":
+        """Index the pipelines and task files of a project
+
+        Args:
+            source: Project to read
+
+        Returns:
+            Index of the project
+        """
+        index = cls(source.label)
+        paths = sorted(set(source.glob(PIPELINE_GLOB)) | set(source.glob(TASK_GLOB)))
+        for path in paths:
+            try:
+                content = source.read_text(path)
+            except (OSError, UnicodeDecodeError):
+                continue
+            index.add(path, extract_vars(content))
+        return index
+
+    def add(self, path: str, names: Iterable[str]) -> None:
+        """Record that a file references the given vars"""
+        for name in names:
+            self.files.setdefault(name, set()).add(path)
+
+    @property
+    def names(self) -> FrozenSet[str]:
+        """Names of all referenced vars"""
+        return frozenset(self.files)
+
+class ParamsTree:
+    """Keys defined for each foundation by a params repository"""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.file_keys: Dict[str, FrozenSet[str]] = {}
+        self.file_data: Dict[str, Dict[str, Any]] = {}
+        self.foundations: Dict[str, List[str]] = {}
+        self._keys: Dict[str, FrozenSet[str]] = {}
+
+    @classmethod
+    def load(cls, root: str, foundations: Optional[Iterable[str]] = None) -> "ParamsTree":
+        """Load the params files of every foundation
+
+        Foundations are discovered as <datacenter>/<foundation>.yml files
+        unless given explicitly.
+
+        Args:
+            root: Directory of the params repository
+            foundations: Names of the foundations to load (default: all)
+
+        Returns:
+            Loaded params tree
+        """
+        tree = cls(root)
+        if not tree.root.is_dir():
+            raise ValueError(f"Params directory {root} does not exist")
+
+        for foundation in sorted(foundations or tree.discover_foundations()):
+            layers = tree.layer_files(foundation)
+            tree.foundations[foundation] = [layer for layer in layers if (tree.root / layer).is_file()]
+            tree._keys[foundation] = frozenset().union(*(tree.read_keys(layer) for layer in tree.foundations[foundation]))
+        return tree
+
+    def discover_foundations(self) -> List[str]:
+        """Find the foundation files below the datacenter directories
+
+        A datacenter directory holds <dc>.yml, <dc>-<type>.yml and one
+        <dc>-<type>-...yml file per foundation.
+        """
+        foundations = []
+        for dc_dir in sorted(path for path in self.root.iterdir() if path.is_dir() and not path.name.startswith(".")):
+            for params_file in sorted(dc_dir.glob("*.yml")):
+                parts = params_file.stem.split("-")
+                if parts[0] == dc_dir.name and len(parts) > 2:
+                    foundations.append(params_file.stem)
+        return foundations
+
+    @staticmethod
+    def layer_files(foundation: str) -> List[str]:
+        """Get the params files fly.sh loads for a foundation, in its -l order (most specific first)"""
+        parts = foundation.split("-")
+        datacenter = parts[0]
+        datacenter_type = parts[1] if len(parts) > 1 else ""
+        return [
+            f"{datacenter}/{foundation}.yml",
+            f"{datacenter}/{datacenter}-{datacenter_type}.yml",
+            f"{datacenter}/{datacenter}.yml",
+            f"{datacenter_type}-global.yml",
+            "global.yml"
+        ]
+
+    def read_keys(self, rel_path: str) -> FrozenSet[str]:
+        """Get the top-level keys of a params file, parsing each file only once"""
+        if rel_path not in self.file_keys:
+            with open(self.root / rel_path, "r") as file:
+                data = yaml.load(file, Loader=_Loader)
+            if data is not None and not isinstance(data, dict):
+                raise ValueError(f"Params file {self.root / rel_path} must be a mapping")
+            self.file_data[rel_path] = {str(key): value for key, value in (data or {}).items()}
+            self.file_keys[rel_path] = frozenset(self.file_data[rel_path])
+        return self.file_keys[rel_path]
+
+    def keys(self, foundation: str) -> FrozenSet[str]:
+        """Get every key defined for a foundation across its params files"""
+        return self._keys[foundation]
+
+    def values(self, foundation: str) -> Dict[str, Any]:
+        """Get the params values of a foundation as fly resolves them
+
+        The files are merged in the order fly.sh passes them with -l, and fly
+        lets later files override earlier ones, so a key defined in both
+        global.yml and the foundation file gets the global.yml value.
+        """
+        merged: Dict[str, Any] = {}
+        for layer in self.foundations[foundation]:
+            merged.update(self.file_data[layer])
+        return merged
+
+    def defined_in(self, foundation: str, key: str) -> List[str]:
+        """Get the params files of a foundation that define a key"""
+        return [layer for layer in self.foundations[foundation] if key in self.file_keys[layer]]
+
+def is_ignored(name: str, patterns: Iterable[str]) -> bool:
+    """Check whether a var name matches any ignore pattern"""
+    return any(fnmatchcase(name, pattern) for pattern in patterns)
+
+class CoverageReport:
+    """Missing and unused params of one foundation"""
+
+    def __init__(self, foundation: str):
+        self.foundation = foundation
+        # Var name to the project files that reference it
+        self.missing: Dict[str, List[str]] = {}
+        # Key to the params files that define it
+        self.unused: Dict[str, List[str]] = {}
+
+    def to_dict(self):
+        """Convert the report to a JSON-serializable dictionary"""
+        return {
+            "foundation": self.foundation,
+            "missing": self.missing,
+            "unused": self.unused
+        }
+
+def check_coverage(indexes: List[VarIndex], params: ParamsTree, supplied: Iterable[str] = FLY_VARS,
+                   ignore: Iterable[str] = ()) -> List[CoverageReport]:
+    """Compare the vars of projects with the params of every foundation
+
+    Args:
+        indexes: Var indexes of the projects to check
+        params: Loaded params tree
+        supplied: Var names provided without params files, e.g. by fly.sh
+        ignore: Glob patterns of var names resolved elsewhere, e.g. by a credential manager
+
+    Returns:
+        One report per foundation
+    """
+    supplied = frozenset(supplied)
+    ignore = list(ignore)
+    referenced = frozenset().union(*(index.names for index in indexes))
+    needed = {name for name in referenced - supplied if not is_ignored(name, ignore)}
+
+    # Files referencing each var, labelled with their project when checking several
+    locations: Dict[str, List[str]] = {}
+    for index in indexes:
+        prefix = f"{index.label}:" if len(indexes) > 1 else ""
+        for name in needed & index.names:
+            locations.setdefault(name, []).extend(f"{prefix}{path}" for path in sorted(index.files[name]))
+
+    reports = []
+    for foundation in params.foundations:
+        keys = params.keys(foundation)
+        report = CoverageReport(foundation)
+        report.missing = {name: locations[name] for name in sorted(needed - keys)}
+        report.unused = {key: params.defined_in(foundation, key) for key in sorted(keys - referenced)}
+        reports.append(report)
+    return reports
@@ -0,0 +1,178 @@
+"""
+Size and Complexity Budgets for Concourse Pipelines
+
+Concourse stores the config of every pipeline in its database as JSON and
+evaluates it again on each scheduling tick, so an oversized pipeline slows the
+web nodes for every team on the cluster. This module measures a pipeline as
+fly would set it, after interpolating the foundation's params:
+
+- config_bytes: size of the config serialized as compact JSON
+- jobs, steps, resources, resource_types: counts, with steps including nested
+  in_parallel/do/try steps and hooks
+- passed_fan_in: the most upstream jobs any one job names in the `passed:`
+  constraints of its get steps, each of which the scheduler resolves together
+
+Each metric is compared with a budget, and the jobs contributing most to a
+metric over its budget are reported so teams know what to split or slim.
+
+Usage:
+    metrics = measure_pipeline(interpolate(pipeline, variables), "main", "cml-k8s-n-01")
+    for metric, value, budget in over_budget(metrics, DEFAULT_BUDGETS):
+        print(metric, value, budget, contributors(metrics, metric))
+
+Author: CI/CD Platform Team
+"""
+
+import json
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+# Budgets that leave room for a well-factored pipeline of the reference templates to grow
+DEFAULT_BUDGETS = {
+    "config_bytes": 256 * 1024,
+    "jobs": 50,
+    "steps": 500,
+    "resources": 100,
+    "resource_types": 10,
+    "passed_fan_in": 10
+}
+
+METRIC_LABELS = {
+    "config_bytes": "bytes of config",
+    "jobs": "jobs",
+    "steps": "steps",
+    "resources": "resources",
+    "resource_types": "resource types",
+    "passed_fan_in": "upstream jobs in the passed constraints of one job"
+}
+
+# Keys that make a plan item a step
+STEP_TYPES = ("get", "put", "task", "set_pipeline", "load_var", "in_parallel", "do", "try")
+
+# Keys of a step or job holding further steps
+NESTED_STEP_KEYS = ("in_parallel", "do", "try", "steps", "on_success", "on_failure", "on_error", "on_abort", "ensure")
+
+class JobMetrics(NamedTuple):
+    """Size and complexity of one job"""
+
+    name: str
+    config_bytes: int
+    steps: int
+    upstream: Tuple[str, ...]
+
+class PipelineMetrics(NamedTuple):
+    """Size and complexity of a pipeline set for one foundation"""
+
+    pipeline: str
+    foundation: Optional[str]
+    config_bytes: int
+    resources: int
+    resource_types: int
+    jobs: List[JobMetrics]
+
+    @property
+    def values(self) -> Dict[str, int]:
+        """Value of every metric"""
+        return {
+            "config_bytes": self.config_bytes,
+            "jobs": len(self.jobs),
+            "steps": sum(job.steps for job in self.jobs),
+            "resources": self.resources,
+            "resource_types": self.resource_types,
+            "passed_fan_in": max((len(job.upstream) for job in self.jobs), default=0)
+        }
+
+def _serialized_size(value: Any) -> int:
+    return len(json.dumps(value, separators=(",", ":"), default=str).encode("utf-8"))
+
+def _steps(value: Any) -> Iterator[Dict[str, Any]]:
+    """Yield every step nested in a plan, hook or step container"""
+    if isinstance(value, list):
+        for item in value:
+            yield from _steps(item)
+    elif isinstance(value, dict):
+        if any(key in value for key in STEP_TYPES):
+            yield value
+        for key in NESTED_STEP_KEYS:
+            if key in value:
+                yield from _steps(value[key])
+
+def measure_job(job: Dict[str, Any]) -> JobMetrics:
+    """Measure one job of a pipeline"""
+    steps = list(_steps(job.get("plan")))
+    for hook in ("on_success", "on_failure", "on_error", "on_abort", "ensure"):
+        steps.extend(_steps(job.get(hook)))
+
+    upstream = set()
+    for step in steps:
+        passed = step.get("passed") if "get" in step else None
+        if isinstance(passed, list):
+            upstream.update(str(name) for name in passed)
+    return JobMetrics(str(job.get("name")), _serialized_size(job), len(steps), tuple(sorted(upstream)))
+
+def measure_pipeline(pipeline: Dict[str, Any], name: str, foundation: Optional[str] = None) -> PipelineMetrics:
+    """Measure a parsed, interpolated pipeline
+
+    Args:
+        pipeline: Pipeline config
+        name: Pipeline name
+        foundation: Foundation the pipeline was interpolated for
+
+    Returns:
+        Pipeline metrics
+    """
+    return PipelineMetrics(
+        name,
+        foundation,
+        _serialized_size(pipeline),
+        len(pipeline.get("resources") or []),
+        len(pipeline.get("resource_types") or []),
+        [measure_job(job) for job in pipeline.get("jobs") or [] if isinstance(job, dict)]
+    )
+
+def parse_budgets(assignments: Iterable[str]) -> Dict[str, int]:
+    """Parse budget overrides such as jobs=30 on top of the defaults
+
+    Args:
+        assignments: NAME=VALUE strings
+
+    Returns:
+        Budget of every metric
+
+    Raises:
+        ValueError: If a name is unknown or a value is not a positive integer
+    """
+    budgets = dict(DEFAULT_BUDGETS)
+    for assignment in assignments:
+        name, separator, value = assignment.partition("=")
+        if not separator or name not in DEFAULT_BUDGETS:
+            raise ValueError(f"Budget must be NAME=VALUE with NAME one of {', '.join(DEFAULT_BUDGETS)}, got {assignment}")
+        if not value.isdigit() or int(value) < 1:
+            raise ValueError(f"Budget {name} must be a positive integer, got {value}")
+        budgets[name] = int(value)
+    return budgets
+
+def over_budget(metrics: PipelineMetrics, budgets: Dict[str, int]) -> List[Tuple[str, int, int]]:
+    """Get the metrics of a pipeline that exceed their budget
+
+    Returns:
+        List of (metric, value, budget)
+    """
+    return [(metric, value, budgets[metric]) for metric, value in metrics.values.items()
+            if metric in budgets and value > budgets[metric]]
+
+def contributors(metrics: PipelineMetrics, metric: str, top: int = 3) -> List[str]:
+    """Describe the jobs contributing most to a metric, e.g. "deploy (12,345 bytes)"
+
+    Returns:
+        Descriptions of up to top jobs, or an empty list for metrics not made up of jobs
+    """
+    if metric == "config_bytes":
+        ranked = sorted(metrics.jobs, key=lambda job: -job.config_bytes)
+        return [f"{job.name} ({job.config_bytes:,} bytes)" for job in ranked[:top]]
+    if metric == "steps":
+        ranked = sorted(metrics.jobs, key=lambda job: -job.steps)
+        return [f"{job.name} ({job.steps} steps)" for job in ranked[:top]]
+    if metric == "passed_fan_in":
+        ranked = sorted(metrics.jobs, key=lambda job: -len(job.upstream))
+        return [f"{job.name} ({len(job.upstream)} upstream jobs)" for job in ranked[:top] if job.upstream]
+    return []
@@ -0,0 +1,255 @@
+"""
+In-Parallel Advisor and Rewriter for Job Plans
+
+This module finds runs of consecutive steps in job plans that have no data
+dependency on each other and can be grouped in an `in_parallel` block, so
+their latencies overlap instead of adding up on every build:
+
+- get steps fetch distinct artifacts and read none
+- put steps to distinct resources read only their declared `inputs:`
+- tasks read their `inputs` (and `image`) and write their `outputs`; tasks
+  loaded with `file:` are resolved through a callback, and are left alone
+  when their config cannot be read
+
+Steps with hooks, `across` and all other step types end a run. Which step
+types may be grouped is configurable, since tasks without shared artifacts can
+still depend on each other's side effects (a deploy after a test).
+
+Rewriting works on the text rather than re-serializing the YAML: the grouped
+steps are indented under a new `- in_parallel:` item and every other line,
+including comments, is kept as is. The result is parsed again and compared
+with the expected structure before it is returned.
+
+Usage:
+    text, suggestions = parallelize(content, step_types=("get",), limit=2)
+
+Author: CI/CD Platform Team
+"""
+
+import copy
+import re
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
+
+import yaml
+
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+STEP_TYPES = ("get", "put", "task")
+HOOKS = ("on_success", "on_failure", "on_error", "on_abort", "ensure")
+
+# Looks up the config of a task loaded with file:, e.g. "repo/ci/tasks/x/task.yml"
+TaskConfigLookup = Callable[[str], Optional[Dict[str, Any]]]
+
+class StepAccess(NamedTuple):
+    """Artifacts a step reads and writes; reads is None when it may read any artifact"""
+
+    kind: str
+    reads: Optional[FrozenSet[str]]
+    writes: FrozenSet[str]
+
+class Suggestion(NamedTuple):
+    """A run of plan steps that can be grouped in an in_parallel block"""
+
+    job: str
+    start: int
+    end: int
+    steps: List[str]
+    line: int
+
+def _mapped(names: Iterable[str], mapping: Any) -> FrozenSet[str]:
+    mapping = mapping if isinstance(mapping, dict) else {}
+    return frozenset(str(mapping.get(name, name)) for name in names)
+
+def _names(items: Any) -> List[str]:
+    return [str(item["name"]) for item in items or [] if isinstance(item, dict) and item.get("name")]
+
+def step_access(step: Any, task_config: Optional[TaskConfigLookup] = None) -> Optional[StepAccess]:
+    """Work out the artifacts a plan step reads and writes
+
+    Args:
+        step: Plan step
+        task_config: Callback returning the config of a task file
+
+    Returns:
+        Artifact access of the step, or None if it cannot run in parallel with its neighbours
+    """
+    if not isinstance(step, dict) or "across" in step or any(hook in step for hook in HOOKS):
+        return None
+
+    if "get" in step:
+        return StepAccess("get", frozenset(), frozenset({str(step["get"])}))
+
+    if "put" in step:
+        inputs = step.get("inputs")
+        reads = frozenset(str(name) for name in inputs) if isinstance(inputs, list) else None
+        return StepAccess("put", reads, frozenset({str(step["put"])}))
+
+    if "task" in step:
+        config = step.get("config")
+        reads = set()
+        if config is None and isinstance(step.get("file"), str):
+            # The task file is read from an artifact, e.g. repo/ci/tasks/x/task.yml
+            reads.add(step["file"].split("/", 1)[0])
+            config = task_config(step["file"]) if task_config else None
+        if not isinstance(config, dict):
+            return StepAccess("task", None, frozenset())
+
+        reads |= _mapped(_names(config.get("inputs")), step.get("input_mapping"))
+        if step.get("image"):
+            reads.add(str(step["image"]))
+        writes = _mapped(_names(config.get("outputs")), step.get("output_mapping"))
+        return StepAccess("task", frozenset(reads), writes)
+
+    return None
+
+def parallel_runs(plan: List[Any], step_types: Iterable[str] = ("get",),
+                  task_config: Optional[TaskConfigLookup] = None) -> List[Tuple[int, int]]:
+    """Find runs of consecutive independent steps in a plan
+
+    Args:
+        plan: Steps of a job plan
+        step_types: Step types that may be grouped
+        task_config: Callback returning the config of a task file
+
+    Returns:
+        (start, end) index ranges of runs with at least two steps
+    """
+    step_types = set(step_types)
+    runs = []
+    start = 0
+    reads: set = set()
+    writes: set = set()
+
+    def close(end):
+        if end - start > 1:
+            runs.append((start, end))
+
+    for index, step in enumerate(plan):
+        access = step_access(step, task_config)
+        if access is None or access.kind not in step_types or access.reads is None:
+            close(index)
+            start, reads, writes = index + 1, set(), set()
+            continue
+
+        if access.reads & writes or access.writes & (reads | writes):
+            close(index)
+            start, reads, writes = index, set(), set()
+
+        reads |= access.reads
+        writes |= access.writes
+    close(len(plan))
+    return runs
+
+def _step_label(step: Dict[str, Any]) -> str:
+    for step_type in STEP_TYPES:
+        if step_type in step:
+            return f"{step_type}: {step[step_type]}"
+    return "step"
+
+def _job_plans(root: yaml.Node) -> List[Tuple[int, yaml.SequenceNode]]:
+    """Find the block-style plan sequences of the jobs of a composed pipeline
+
+    Returns:
+        (job index, plan node) pairs
+    """
+    if not isinstance(root, yaml.MappingNode):
+        return []
+    plans = []
+    for key, value in root.value:
+        if key.value != "jobs" or not isinstance(value, yaml.SequenceNode):
+            continue
+        for index, job in enumerate(value.value):
+            if not isinstance(job, yaml.MappingNode):
+                continue
+            for job_key, job_value in job.value:
+                if job_key.value == "plan" and isinstance(job_value, yaml.SequenceNode) and not job_value.flow_style:
+                    plans.append((index, job_value))
+    return plans
+
+def _item_lines(lines: List[str], node: yaml.Node) -> Optional[Tuple[int, int, int]]:
+    """Find the lines of a block sequence item
+
+    Returns:
+        First line, end line (exclusive) and the column of the item's dash, or
+        None if the item does not start on the line of its dash
+    """
+    start = node.start_mark.line
+    dash = re.fullmatch(r"(\s*)-\s+", lines[start][:node.start_mark.column])
+    if not dash:
+        return None
+
+    # The end mark is the start of the next token, which may be on a later line
+    end = node.end_mark.line
+    if end >= len(lines):
+        end = len(lines)
+    elif lines[end][:node.end_mark.column].strip():
+        end += 1
+    # Leave trailing blank lines and comments at the item's level to what follows
+    while end > start + 1:
+        line = lines[end - 1]
+        stripped = line.strip()
+        if stripped and not (stripped.startswith("#") and len(line) - len(line.lstrip()) <= node.start_mark.column):
+            break
+        end -= 1
+    return start, end, len(dash.group(1))
+
+def _indent(lines: List[str], spaces: int) -> List[str]:
+    return [" " * spaces + line if line.strip() else line for line in lines]
+
+def parallelize(text: str, step_types: Iterable[str] = ("get",), limit: Optional[int] = None,
+                task_config: Optional[TaskConfigLookup] = None) -> Tuple[str, List[Suggestion]]:
+    """Group independent consecutive steps of every job plan in in_parallel blocks
+
+    Args:
+        text: Pipeline YAML
+        step_types: Step types that may be grouped
+        limit: Maximum number of steps each block runs at once (default: no limit)
+        task_config: Callback returning the config of a task file
+
+    Returns:
+        Rewritten pipeline text, and the runs that were grouped
+
+    Raises:
+        ValueError: If the rewritten pipeline does not parse to the expected structure
+    """
+    pipeline = yaml.load(text, Loader=_Loader)
+    if not isinstance(pipeline, dict) or not isinstance(pipeline.get("jobs"), list):
+        return text, []
+
+    lines = text.splitlines(keepends=True)
+
+    expected = copy.deepcopy(pipeline)
+    suggestions = []
+    edits = []
+    for job_index, plan_node in _job_plans(yaml.compose(text, Loader=_Loader)):
+        job = pipeline["jobs"][job_index]
+        plan = job.get("plan") or []
+        runs = parallel_runs(plan, step_types, task_config)
+
+        # Rewrite later runs first so earlier indexes stay valid
+        for start, end in reversed(runs):
+            spans = [_item_lines(lines, node) for node in plan_node.value[start:end]]
+            if any(span is None for span in spans) or len({span[2] for span in spans}) != 1:
+                continue
+            first, last, column = spans[0][0], spans[-1][1], spans[0][2]
+
+            steps = plan[start:end]
+            grouped = {"in_parallel": {"limit": limit, "steps": steps}} if limit else {"in_parallel": steps}
+            expected["jobs"][job_index]["plan"][start:end] = [copy.deepcopy(grouped)]
+
+            header = [" " * column + "- in_parallel:\n"]
+            if limit:
+                header += [" " * (column + 4) + f"limit: {limit}\n", " " * (column + 4) + "steps:\n"]
+            edits.append((first, last, header + _indent(lines[first:last], 6 if limit else 4)))
+            suggestions.append(Suggestion(str(job.get("name")), start, end, [_step_label(step) for step in steps], first + 1))
+
+    if not edits:
+        return text, []
+
+    for first, last, replacement in sorted(edits, key=lambda edit: -edit[0]):
+        lines[first:last] = replacement
+    rewritten = "".join(lines)
+
+    if yaml.load(rewritten, Loader=_Loader) != expected:
+        raise ValueError("Rewritten pipeline does not match the original plan structure")
+    return rewritten, sorted(suggestions, key=lambda suggestion: suggestion.line)
@@ -0,0 +1,476 @@
+"""
+Project Sources for the Template Compliance Validator
+
+The validator reads projects through a small source interface instead of the
+filesystem directly. FilesystemSource reads a checked-out working tree,
+MemorySource reads a project rendered in memory by the generator, and
+GitObjectSource reads a commit of a local (bare or mirrored) repository by
+listing its tree once and streaming blobs through a persistent
+`git cat-file --batch` process, so fleet audits do not need a checkout per repo.
+
+Paths passed to and returned by a source are POSIX paths relative to the
+project root. Every source can identify file content by its git blob id, which
+GitObjectSource takes from the tree listing without reading the blob.
+
+Usage:
+    source = GitObjectSource("/mirrors/my-service.git", "develop")
+    validator = TemplateValidator(source.label, "kustomize", source=source, blob_cache=cache)
+
+Author: CI/CD Platform Team
+"""
+
+import hashlib
+import os
+import posixpath
+import subprocess
+from bisect import bisect_left
+from fnmatch import fnmatchcase
+from pathlib import Path, PurePosixPath
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+class ProjectSource:
+    """Read-only view of a project tree"""
+
+    label = ""
+
+    def exists(self, rel_path: str) -> bool:
+        """Check whether a file or directory exists"""
+        return self.is_file(rel_path) or self.is_dir(rel_path)
+
+    def is_dir(self, rel_path: str) -> bool:
+        """Check whether a directory exists"""
+        raise NotImplementedError
+
+    def is_file(self, rel_path: str) -> bool:
+        """Check whether a file exists"""
+        raise NotImplementedError
+
+    def glob(self, pattern: str) -> Iterator[str]:
+        """Find files and directories matching a pathlib-style glob pattern
+
+        Args:
+            pattern: Glob pattern relative to the project root, e.g. "ci/tasks/**/task.yml"
+
+        Yields:
+            Matching relative paths
+        """
+        raise NotImplementedError
+
+    def files(self, prefix: str = "") -> Iterator[str]:
+        """List all files, optionally below a directory
+
+        Args:
+            prefix: Directory relative to the project root, or "" for the whole project
+
+        Yields:
+            Relative file paths
+        """
+        raise NotImplementedError
+
+    def read_text(self, rel_path: str) -> str:
+        """Read a file as text"""
+        return self.read_bytes(rel_path).decode("utf-8")
+
+    def read_bytes(self, rel_path: str) -> bytes:
+        """Read a file as bytes"""
+        raise NotImplementedError
+
+    object_format = "sha1"
+
+    def content_id(self, rel_path: str) -> str:
+        """Get the git blob id of a file, hashing its content if the source has no id
+
+        Returns:
+            Object id in the source's object format
+        """
+        return git_blob_id(self.read_bytes(rel_path), self.object_format)
+
+    def blob_id(self, rel_path: str) -> Optional[str]:
+        """Get a content identifier for a file, if the source has one
+
+        Sources that return an identifier allow check results to be reused for
+        identical content across repositories and commits.
+
+        Returns:
+            Object id of the file content, or None if not available
+        """
+        return None
+
+    def close(self) -> None:
+        """Release any resources held by the source"""
+
+class FilesystemSource(ProjectSource):
+    """Source reading a checked-out working tree"""
+
+    def __init__(self, root: str):
+        """Initialize the source
+
+        Args:
+            root: Path to the project directory
+        """
+        self.root = Path(root)
+        self.label = str(root)
+
+    def is_dir(self, rel_path: str) -> bool:
+        return (self.root / rel_path).is_dir()
+
+    def is_file(self, rel_path: str) -> bool:
+        return (self.root / rel_path).is_file()
+
+    def glob(self, pattern: str) -> Iterator[str]:
+        for path in self.root.glob(pattern):
+            yield path.relative_to(self.root).as_posix()
+
+    def files(self, prefix: str = "") -> Iterator[str]:
+        top = self.root / prefix
+        if top.is_file() or top.is_symlink():
+            yield prefix
+            return
+        for dirpath, dirnames, filenames in os.walk(top):
+            dirnames[:] = sorted(name for name in dirnames if name != ".git")
+            rel_dir = Path(dirpath).relative_to(self.root)
+            for name in sorted(filenames):
+                yield (rel_dir / name).as_posix()
+
+    def read_text(self, rel_path: str) -> str:
+        with open(self.root / rel_path, "r") as f:
+            return f.read()
+
+    def read_bytes(self, rel_path: str) -> bytes:
+        path = self.root / rel_path
+        if path.is_symlink():
+            # Git stores the link target as the content of a symlink
+            return os.readlink(path).encode()
+        with open(path, "rb") as f:
+            return f.read()
+
+class MemorySource(ProjectSource):
+    """Source reading a project rendered in memory, e.g. by TemplateGenerator.render_tree()"""
+
+    def __init__(self, files: Dict[str, Union[str, bytes]], label: str = "<memory>"):
+        """Initialize the source
+
+        Args:
+            files: Dictionary of POSIX paths relative to the project root to file content
+            label: Name of the project used in reports
+        """
+        self.contents = files
+        self.label = label
+        self.dirs: Set[str] = {""}
+        for path in files:
+            parent = PurePosixPath(path).parent
+            while parent.as_posix() not in self.dirs and parent.as_posix() != ".":
+                self.dirs.add(parent.as_posix())
+                parent = parent.parent
+        self.index = PathIndex(self.dirs | set(files))
+
+    def is_dir(self, rel_path: str) -> bool:
+        return rel_path.strip("/") in self.dirs
+
+    def is_file(self, rel_path: str) -> bool:
+        return rel_path in self.contents
+
+    def glob(self, pattern: str) -> Iterator[str]:
+        yield from self.index.glob(pattern)
+
+    def files(self, prefix: str = "") -> Iterator[str]:
+        yield from _paths_below(prefix, self.contents)
+
+    def read_text(self, rel_path: str) -> str:
+        content = self.contents[rel_path]
+        return content.decode("utf-8") if isinstance(content, bytes) else content
+
+    def read_bytes(self, rel_path: str) -> bytes:
+        content = self.contents[rel_path]
+        return content.encode("utf-8") if isinstance(content, str) else content
+
+def git_blob_id(data: bytes, object_format: str = "sha1") -> str:
+    """Compute the id git assigns to a blob with the given content
+
+    Args:
+        data: File content
+        object_format: Repository object format, "sha1" or "sha256"
+
+    Returns:
+        Hex object id
+    """
+    digest = hashlib.new(object_format)
+    digest.update(f"blob {len(data)}\0".encode())
+    digest.update(data)
+    return digest.hexdigest()
+
+def _paths_below(prefix: str, paths: Iterable[str]) -> Iterator[str]:
+    """Filter relative paths to those equal to or below a directory
+
+    Args:
+        prefix: Directory or file relative to the project root, or "" for all paths
+        paths: Relative POSIX paths
+
+    Yields:
+        Matching paths, sorted
+    """
+    prefix = prefix.strip("/")
+    for path in sorted(paths):
+        if not prefix or path == prefix or path.startswith(prefix + "/"):
+            yield path
+
+def glob_paths(pattern: str, paths: Iterable[str]) -> Iterator[str]:
+    """Filter relative paths with a pathlib-style glob pattern
+
+    Args:
+        pattern: Glob pattern, e.g. "ci/tasks/**/task.yml"
+        paths: Relative POSIX paths of all files and directories
+
+    Yields:
+        Matching paths, sorted
+    """
+    pattern_parts = PurePosixPath(pattern).parts
+    for path in sorted(paths):
+        if path and _match_parts(pattern_parts, PurePosixPath(path).parts):
+            yield path
+
+def _match_parts(pattern: Tuple[str, ...], parts: Tuple[str, ...]) -> bool:
+    """Match path components against glob components, supporting "**"
+
+    Args:
+        pattern: Glob pattern split into components
+        parts: Path split into components
+
+    Returns:
+        True if the path matches the pattern
+    """
+    if not pattern:
+        return not parts
+    if pattern[0] == "**":
+        # "**" matches zero or more directories
+        return any(_match_parts(pattern[1:], parts[i:]) for i in range(len(parts) + 1))
+    if not parts or not fnmatchcase(parts[0], pattern[0]):
+        return False
+    return _match_parts(pattern[1:], parts[1:])
+
+class PathIndex:
+    """Paths of a tree listed once, for sources that are globbed many times
+
+    The validator globs the tree once per task directory (e.g.
+    "ci/tasks/deploy/task.*"), so matching every path of the tree on each
+    call would make validating a large project quadratic. The index keeps
+    the paths sorted and the children of each directory, so a pattern only
+    walks the directories below its literal prefix.
+    """
+
+    def __init__(self, paths: Iterable[str]):
+        """Index paths
+
+        Args:
+            paths: Relative POSIX paths of all files and directories
+        """
+        self.paths = sorted(path for path in paths if path)
+        self.children: Dict[str, List[str]] = {}
+        for path in self.paths:
+            self.children.setdefault(posixpath.dirname(path), []).append(path)
+
+    def below(self, prefix: str) -> List[str]:
+        """Get the paths below a directory, sorted
+
+        Args:
+            prefix: Directory relative to the project root, or "" for all paths
+        """
+        if not prefix:
+            return self.paths
+        # Paths below prefix sort between "prefix/" and "prefix0", "0" following "/"
+        start = bisect_left(self.paths, prefix + "/")
+        return self.paths[start:bisect_left(self.paths, prefix + "0", start)]
+
+    def glob(self, pattern: str) -> Iterator[str]:
+        """Find paths matching a pathlib-style glob pattern, like glob_paths
+
+        Yields:
+            Matching paths, sorted
+        """
+        parts = PurePosixPath(pattern).parts
+        literal = 0
+        while literal < len(parts) and parts[literal] != "**" and not _has_magic(parts[literal]):
+            literal += 1
+        base = "/".join(parts[:literal])
+        rest = parts[literal:]
+
+        matches = [base] if not base or self._exists(base) else []
+        if "**" in rest:
+            # Recursive patterns only need the literal prefix and the paths below it
+            yield from glob_paths(pattern, matches + self.below(base))
+            return
+
+        for part in rest:
+            matches = [child for parent in matches for child in self.children.get(parent, ())
+                       if fnmatchcase(posixpath.basename(child), part)]
+        yield from sorted(path for path in matches if path)
+
+    def _exists(self, path: str) -> bool:
+        """Check whether a path is in the index"""
+        siblings = self.children.get(posixpath.dirname(path), ())
+        i = bisect_left(siblings, path)
+        return i < len(siblings) and siblings[i] == path
+
+def _has_magic(part: str) -> bool:
+    """Check whether a glob component has wildcards"""
+    return any(char in part for char in "*?[")
+
+class GitCatFile:
+    """Persistent `git cat-file --batch` process for one repository"""
+
+    def __init__(self, git_dir: str):
+        """Start the batch process
+
+        Args:
+            git_dir: Path to the repository (bare, mirror or .git directory)
+        """
+        self.git_dir = git_dir
+        self.process = subprocess.Popen(
+            ["git", "--git-dir", git_dir, "cat-file", "--batch"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE
+        )
+        self.bytes_read = 0
+
+    def read(self, oid: str) -> bytes:
+        """Read the content of an object
+
+        Args:
+            oid: Object id
+
+        Returns:
+            Object content
+        """
+        self.process.stdin.write(f"{oid}\n".encode())
+        self.process.stdin.flush()
+
+        header = self.process.stdout.readline().decode().split()
+        if len(header) != 3:
+            raise ValueError(f"Object {oid} not found in {self.git_dir}")
+
+        size = int(header[2])
+        content = self.process.stdout.read(size)
+        # Each object is followed by a newline
+        self.process.stdout.read(1)
+        self.bytes_read += size
+        return content
+
+    def close(self) -> None:
+        """Stop the batch process"""
+        if self.process.poll() is None:
+            self.process.stdin.close()
+            self.process.wait()
+
+class GitObjectSource(ProjectSource):
+    """Source reading a commit of a local repository without a checkout"""
+
+    def __init__(self, git_dir: str, rev: str = "HEAD", cat_file: Optional[GitCatFile] = None):
+        """List the tree of a commit
+
+        Args:
+            git_dir: Path to the repository (bare, mirror or .git directory)
+            rev: Commit, branch or tag to validate
+            cat_file: Batch process to share between commits of the same repository
+        """
+        self.git_dir = git_dir
+        self.rev = rev
+        self.label = f"{git_dir}@{rev}"
+        self._owns_cat_file = cat_file is None
+        self.cat_file = cat_file
+
+        result = subprocess.run(
+            ["git", "--git-dir", git_dir, "ls-tree", "-r", "-t", "-z", "--full-tree", rev],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            check=False
+        )
+        if result.returncode != 0:
+            raise ValueError(f"Cannot list {rev} in {git_dir}: {result.stderr.decode().strip()}")
+
+        format_result = subprocess.run(
+            ["git", "--git-dir", git_dir, "rev-parse", "--show-object-format"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            check=False
+        )
+        self.object_format = format_result.stdout.strip() or "sha1"
+
+        self.blobs: Dict[str, str] = {}
+        self.dirs: Set[str] = {""}
+        for entry in result.stdout.decode("utf-8", "surrogateescape").split("\0"):
+            if not entry:
+                continue
+            meta, path = entry.split("\t", 1)
+            _, obj_type, oid = meta.split()
+            if obj_type == "tree":
+                self.dirs.add(path)
+            elif obj_type == "blob":
+                self.blobs[path] = oid
+        self.index = PathIndex(self.dirs | set(self.blobs))
+
+    def is_dir(self, rel_path: str) -> bool:
+        return rel_path.strip("/") in self.dirs
+
+    def is_file(self, rel_path: str) -> bool:
+        return rel_path in self.blobs
+
+    def glob(self, pattern: str) -> Iterator[str]:
+        yield from self.index.glob(pattern)
+
+    def files(self, prefix: str = "") -> Iterator[str]:
+        yield from _paths_below(prefix, self.blobs)
+
+    def read_bytes(self, rel_path: str) -> bytes:
+        if self.cat_file is None:
+            self.cat_file = GitCatFile(self.git_dir)
+        return self.cat_file.read(self.blobs[rel_path])
+
+    def content_id(self, rel_path: str) -> str:
+        # The tree listing already has the object id, no need to read the blob
+        return self.blobs[rel_path]
+
+    def blob_id(self, rel_path: str) -> Optional[str]:
+        return self.blobs.get(rel_path)
+
+    def close(self) -> None:
+        if self._owns_cat_file and self.cat_file is not None:
+            self.cat_file.close()
+            self.cat_file = None
+
+class BlobResultCache:
+    """Check results keyed by content, shared across repositories and commits
+
+    Results depend on a file's path as well as its content, so entries are keyed
+    by check name, template type, path and object id.
+    """
+
+    def __init__(self):
+        self.results: Dict[Tuple[str, str, str, str], List[Any]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple[str, str, str, str]) -> Optional[List[Any]]:
+        """Look up cached results
+
+        Args:
+            key: (check, template type, path, object id)
+
+        Returns:
+            Cached results, or None on a miss
+        """
+        results = self.results.get(key)
+        if results is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return results
+
+    def put(self, key: Tuple[str, str, str, str], results: List[Any]) -> None:
+        """Store results
+
+        Args:
+            key: (check, template type, path, object id)
+            results: Results to store
+        """
+        self.results[key] = results
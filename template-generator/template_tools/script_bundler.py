@@ -0,0 +1,297 @@
+"""
+Single-File Bundler for fly.sh
+
+This module inlines the modules fly.sh sources (lib/utils.sh, lib/help.sh,
+lib/parsing.sh, lib/commands.sh, ... and the optional helpers.sh) into one
+self-contained script, so every invocation reads a single file and the script
+keeps working when it is copied away from its lib directory.
+
+Only `source "${LIB_DIR}/x.sh"` and `source "${SCRIPT_DIR}/x.sh"` lines are
+resolved, recursively. A source guarded by `if [[ -f ... ]]; then ... fi` is
+inlined when the file exists at build time and kept as is otherwise. Other
+files in lib (validate_pipelines.py) are still read at run time through
+LIB_DIR.
+
+The bundle records the sha256 of each module it inlined and a sha256 of its
+own content, so a copy can be checked for edits and for modules that changed
+since it was built. With strip_help, comment and blank lines outside here
+documents are removed, together with the help texts of commands that are not
+in SUPPORTED_COMMANDS.
+
+verify_bundle runs the test_fly*.sh suites of a project against the original
+and the bundled script and compares their exit codes and output, as well as
+the help output of the bundle copied without its modules.
+
+Usage:
+    bundle = bundle_script(text, read_source, strip_help=True)
+    comparisons = verify_bundle(project_dir, bundle.text)
+
+Author: CI/CD Platform Team
+"""
+
+import hashlib
+import re
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+# Reads a module relative to the script directory, e.g. "lib/utils.sh", or returns None
+SourceReader = Callable[[str], Optional[str]]
+
+SOURCE_LINE = re.compile(r'^\s*(?:source|\.)\s+"?\$\{(LIB_DIR|SCRIPT_DIR)\}/([\w./-]+\.sh)"?\s*$')
+GUARD_LINE = re.compile(r'^\s*if\s+\[\[\s+-f\s+"?\$\{(LIB_DIR|SCRIPT_DIR)\}/([\w./-]+\.sh)"?\s+\]\];\s*then\s*$')
+HEREDOC = re.compile(r"<<(-?)\s*(['\"]?)(\w+)\2")
+SUPPORTED_COMMANDS = re.compile(r'SUPPORTED_COMMANDS="([^"]*)"')
+USAGE_ARM = re.compile(r"^\s+([\w|-]+)\)\s*$")
+
+HASH_HEADER = "# bundle-sha256: "
+SOURCE_HEADER = "# bundle-source: "
+
+# Invocations compared between the original script and the bundle copied on its own
+STANDALONE_ARGS = (["--help"], ["set", "--help"])
+
+# Normalized away before comparing test output: timestamps and caller file:line
+VOLATILE_OUTPUT = re.compile(r"\[\d{4}-\d\d-\d\d[ T][\d:]+\]|\[[\w.-]+\.sh:\d+\]")
+
+class BundleError(Exception):
+    """A script that cannot be bundled"""
+
+class Bundle(NamedTuple):
+    """A bundled script and the modules inlined into it"""
+
+    text: str
+    # (path relative to the script directory, sha256) of each inlined module
+    sources: List[Tuple[str, str]]
+    sha256: str
+
+class TestComparison(NamedTuple):
+    """Result of one test suite against the original and the bundled script"""
+
+    test: str
+    original_code: int
+    bundled_code: int
+    # First differing output line, or None if the output matches
+    difference: Optional[str]
+
+    @property
+    def equivalent(self) -> bool:
+        return self.original_code == self.bundled_code and self.difference is None
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def _module_path(variable: str, name: str) -> str:
+    return f"lib/{name}" if variable == "LIB_DIR" else name
+
+def _inline(text: str, read_source: SourceReader, stack: List[str], sources: List[Tuple[str, str]]) -> List[str]:
+    """Replace the source lines of a script with the modules they read"""
+    lines = text.splitlines(keepends=True)
+    out: List[str] = []
+
+    def module(path: str) -> List[str]:
+        if path in stack:
+            raise BundleError(f"{path} sources itself through {' -> '.join(stack)}")
+        content = read_source(path)
+        if content is None:
+            raise BundleError(f"{stack[-1]} sources {path}, which does not exist")
+        sources.append((path, _sha256(content)))
+        body = content.splitlines(keepends=True)
+        if body and body[0].startswith("#!"):
+            body = body[1:]
+        inlined = _inline("".join(body), read_source, stack + [path], sources)
+        if inlined and not inlined[-1].endswith("\n"):
+            inlined[-1] += "\n"
+        return [f"# >>> {path}\n"] + inlined + [f"# <<< {path}\n"]
+
+    index = 0
+    while index < len(lines):
+        line = lines[index]
+        guard = GUARD_LINE.match(line)
+        if guard and index + 2 < len(lines):
+            source = SOURCE_LINE.match(lines[index + 1])
+            if source and source.groups() == guard.groups() and lines[index + 2].strip() == "fi":
+                path = _module_path(*guard.groups())
+                if read_source(path) is not None:
+                    out.extend(module(path))
+                else:
+                    out.extend(lines[index:index + 3])
+                index += 3
+                continue
+
+        source = SOURCE_LINE.match(line)
+        if source:
+            out.extend(module(_module_path(*source.groups())))
+        else:
+            out.append(line)
+        index += 1
+    return out
+
+def _strip_dead_usage(lines: List[str], supported: List[str]) -> List[str]:
+    """Remove the show_command_usage arms of commands that are not supported"""
+    out: List[str] = []
+    in_usage = False
+    skipping = False
+    for line in lines:
+        if re.match(r"^\s*(function\s+)?show_command_usage\s*(\(\))?\s*\{", line):
+            in_usage = True
+        elif in_usage and line.startswith("}"):
+            in_usage = False
+
+        if in_usage and not skipping:
+            arm = USAGE_ARM.match(line)
+            if arm and arm.group(1) != "*" and not set(arm.group(1).split("|")) & set(supported):
+                skipping = True
+                continue
+        if skipping:
+            if line.strip() == ";;":
+                skipping = False
+            continue
+        out.append(line)
+    return out
+
+def _strip_comments(lines: List[str]) -> List[str]:
+    """Remove comment and blank lines, keeping the shebang and here documents"""
+    out: List[str] = []
+    delimiter: Optional[Tuple[str, bool]] = None
+    for number, line in enumerate(lines):
+        if delimiter:
+            out.append(line)
+            word, dash = delimiter
+            if (line.strip() if dash else line.rstrip("\n")) == word:
+                delimiter = None
+            continue
+        stripped = line.strip()
+        if number > 0 and (not stripped or stripped.startswith("#")):
+            continue
+        out.append(line)
+        heredoc = HEREDOC.search(line) if "<<<" not in line else None
+        if heredoc:
+            delimiter = (heredoc.group(3), heredoc.group(1) == "-")
+    return out
+
+def bundle_script(text: str, read_source: SourceReader, script_name: str = "fly.sh",
+                  strip_help: bool = False) -> Bundle:
+    """Inline the modules a script sources into a single script
+
+    Args:
+        text: Script to bundle
+        read_source: Reads a module relative to the script directory
+        script_name: Name of the script, for the header and error messages
+        strip_help: Whether to remove comments, blank lines and the help of unsupported commands
+
+    Returns:
+        The bundle
+
+    Raises:
+        BundleError: If the script is already a bundle, or a module is missing or sources itself
+    """
+    if HASH_HEADER in text:
+        raise BundleError(f"{script_name} is already a bundle")
+
+    sources: List[Tuple[str, str]] = []
+    lines = _inline(text, read_source, [script_name], sources)
+    shebang = lines.pop(0) if lines and lines[0].startswith("#!") else "#!/usr/bin/env bash\n"
+
+    if strip_help:
+        supported = SUPPORTED_COMMANDS.search("".join(lines))
+        if supported:
+            lines = _strip_dead_usage(lines, supported.group(1).split("|"))
+        lines = [line for line in _strip_comments([shebang] + lines)[1:]]
+
+    header = [
+        shebang,
+        f"# {script_name} bundled with the modules it sources; do not edit.\n",
+        "# Edit the modules and bundle again (template-generator/bundle-fly-script.py or --bundle-fly-script).\n",
+    ] + [f"{SOURCE_HEADER}{path} {digest}\n" for path, digest in sources]
+    unhashed = "".join(header + lines)
+    digest = _sha256(unhashed)
+    header.append(f"{HASH_HEADER}{digest}\n")
+    return Bundle("".join(header + lines), sources, digest)
+
+def check_bundle(text: str, read_source: Optional[SourceReader] = None) -> List[str]:
+    """Check a bundle for edits and, given its modules, for modules that changed since it was built
+
+    Args:
+        text: Bundled script
+        read_source: Reads the current modules relative to the script directory
+
+    Returns:
+        Problems found; empty if the bundle is intact and up to date
+    """
+    lines = text.splitlines(keepends=True)
+    recorded = [line[len(HASH_HEADER):].strip() for line in lines if line.startswith(HASH_HEADER)]
+    if len(recorded) != 1:
+        return ["not a bundle (no bundle-sha256 header)"]
+
+    problems = []
+    if _sha256("".join(line for line in lines if not line.startswith(HASH_HEADER))) != recorded[0]:
+        problems.append("content does not match its bundle-sha256; it was edited after bundling")
+
+    if read_source:
+        for line in lines:
+            if line.startswith(SOURCE_HEADER):
+                path, digest = line[len(SOURCE_HEADER):].split()
+                content = read_source(path)
+                if content is None:
+                    problems.append(f"{path} no longer exists")
+                elif _sha256(content) != digest:
+                    problems.append(f"{path} changed since the bundle was built")
+    return problems
+
+def _run(command: List[str], cwd: Path, project_dir: Path) -> Tuple[int, List[str]]:
+    result = subprocess.run(command, cwd=cwd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                            stderr=subprocess.STDOUT, text=True, errors="replace", timeout=300)
+    output = result.stdout.replace(str(project_dir), "<project>")
+    return result.returncode, VOLATILE_OUTPUT.sub("", output).splitlines()
+
+def _compare(name: str, original: Tuple[int, List[str]], bundled: Tuple[int, List[str]]) -> TestComparison:
+    (original_code, original_lines), (bundled_code, bundled_lines) = original, bundled
+    difference = None
+    for number, (before, after) in enumerate(zip(original_lines + [None] * len(bundled_lines),
+                                                 bundled_lines + [None] * len(original_lines)), 1):
+        if before != after:
+            difference = f"line {number}: {before!r} != {after!r}"
+            break
+    return TestComparison(name, original_code, bundled_code, difference)
+
+def verify_bundle(project_dir: Path, bundle_text: str, script: str = "ci/scripts/fly.sh",
+                  pattern: str = "test_fly*.sh") -> List[TestComparison]:
+    """Run the fly.sh test suites of a project against the original and the bundled script
+
+    Both runs use copies of the project's ci directory under the same project
+    name. In the bundled copy, the script is replaced by the bundle. The help
+    output of the original is also compared with that of the bundle copied
+    without any of its modules, which shows the bundle reads no other script.
+
+    Args:
+        project_dir: Project directory
+        bundle_text: Bundled script
+        script: Path of the script in the project
+        pattern: Glob pattern of the test suites in ci/scripts/tests
+
+    Returns:
+        One comparison per test suite and per standalone invocation
+    """
+    tests = sorted(path.name for path in (project_dir / "ci" / "scripts" / "tests").glob(pattern))
+    name = project_dir.resolve().name
+    comparisons = []
+    with tempfile.TemporaryDirectory(prefix="bundle-verify-") as temp_dir:
+        original_dir, bundled_dir, standalone_dir = (Path(temp_dir) / variant / name
+                                                     for variant in ("original", "bundled", "standalone"))
+        for copy_dir in (original_dir, bundled_dir):
+            shutil.copytree(project_dir / "ci", copy_dir / "ci", symlinks=True)
+        (bundled_dir / script).write_text(bundle_text, encoding="utf-8")
+        (standalone_dir / script).parent.mkdir(parents=True)
+        (standalone_dir / script).write_text(bundle_text, encoding="utf-8")
+
+        tests_dir = Path("ci") / "scripts" / "tests"
+        for test in tests:
+            comparisons.append(_compare(test, _run(["bash", test], original_dir / tests_dir, original_dir),
+                                        _run(["bash", test], bundled_dir / tests_dir, bundled_dir)))
+        for args in STANDALONE_ARGS:
+            comparisons.append(_compare(f"{Path(script).name} {' '.join(args)} (standalone)",
+                                        _run(["bash", script] + args, original_dir, original_dir),
+                                        _run(["bash", script] + args, standalone_dir, standalone_dir)))
+    return comparisons
@@ -0,0 +1,231 @@
+"""
+Set-Pipeline Fan-Out for Foundations
+
+This module rewrites the jobs of a set-pipeline pipeline so that one build
+sets the pipeline of every foundation, instead of fly.sh setting them one
+`fly set-pipeline` at a time. The per-foundation steps of a job (the steps
+from the first one that uses ((foundation)), ((dc)) or ((dc_type)) through
+its last set_pipeline step) are wrapped in a `do` step with `across` over the
+foundations, bounded by `max_in_flight`:
+
+    - across:
+        - var: target
+          values:
+            - {foundation: cml-k8s-n-01, dc: cml, dc_type: k8s}
+          max_in_flight: 4
+      do:
+        - task: get-pipeline ...
+        - set_pipeline: ((pipeline))-((.:target.foundation))
+
+Inside the block the foundation vars become fields of the across var, and
+each iteration sets the pipeline named ${pipeline}-${foundation}, the name
+fly.sh gives it. The dc and dc_type of each foundation are parsed from its
+name with the datacenter pattern.
+
+Like the in_parallel rewriter, the rewrite works on the text and keeps every
+other line, and the result is checked against the expected structure.
+
+Usage:
+    targets = parse_foundations(["cml-k8s-n-01", "cml-k8s-n-02"], DEFAULTS["datacenter_pattern"])
+    text, jobs = fan_out(content, targets, max_in_flight=4)
+
+Author: CI/CD Platform Team
+"""
+
+import copy
+import re
+from typing import Any, Dict, Iterable, List, Tuple
+
+import yaml
+
+from .plan_parallelizer import _Loader, _indent, _item_lines, _job_plans
+
+# Name of the across var holding the current foundation
+ACROSS_VAR = "target"
+
+# Vars fly.sh derives from the foundation, which differ per iteration
+FOUNDATION_VARS = ("foundation", "dc", "dc_type")
+
+FOUNDATION_VAR_REFERENCE = re.compile(r"\(\((" + "|".join(FOUNDATION_VARS) + r")\)\)")
+
+# Pipeline each iteration sets, named like fly.sh names it
+PIPELINE_NAME = f"((pipeline))-((.:{ACROSS_VAR}.foundation))"
+
+def parse_foundations(foundations: Iterable[str], pattern: str) -> List[Dict[str, str]]:
+    """Parse foundation names into across values
+
+    Args:
+        foundations: Foundation names, e.g. cml-k8s-n-01
+        pattern: Datacenter pattern whose first two groups are the dc and dc_type
+
+    Returns:
+        List of {foundation, dc, dc_type} dictionaries, in the given order
+
+    Raises:
+        ValueError: If a name does not match the pattern or is listed twice
+    """
+    targets = []
+    for foundation in foundations:
+        match = re.match(pattern, foundation)
+        if not match or len(match.groups()) < 2:
+            raise ValueError(f"Foundation {foundation} does not match the datacenter pattern {pattern}")
+        if any(target["foundation"] == foundation for target in targets):
+            raise ValueError(f"Foundation {foundation} is listed more than once")
+        targets.append({"foundation": foundation, "dc": match.group(1), "dc_type": match.group(2)})
+    return targets
+
+def _local_vars(value: Any) -> Any:
+    """Replace the foundation vars in every string of a value with fields of the across var"""
+    if isinstance(value, str):
+        return FOUNDATION_VAR_REFERENCE.sub(rf"((.:{ACROSS_VAR}.\1))", value)
+    if isinstance(value, dict):
+        return {key: _local_vars(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_local_vars(item) for item in value]
+    return value
+
+def _uses_foundation(step: Any) -> bool:
+    return bool(FOUNDATION_VAR_REFERENCE.search(yaml.safe_dump(step)))
+
+def fan_out(text: str, targets: List[Dict[str, str]], max_in_flight: int) -> Tuple[str, List[str]]:
+    """Set the pipelines of every job with set_pipeline steps across the foundations
+
+    Args:
+        text: Set-pipeline pipeline YAML
+        targets: Across values from parse_foundations
+        max_in_flight: Maximum number of foundations set at once
+
+    Returns:
+        Rewritten pipeline text, and the names of the jobs that were fanned out
+
+    Raises:
+        ValueError: If max_in_flight is not positive, or the rewritten pipeline
+            does not parse to the expected structure
+    """
+    if max_in_flight < 1:
+        raise ValueError(f"max_in_flight must be at least 1, got {max_in_flight}")
+
+    pipeline = yaml.load(text, Loader=_Loader)
+    if not targets or not isinstance(pipeline, dict) or not isinstance(pipeline.get("jobs"), list):
+        return text, []
+
+    lines = text.splitlines(keepends=True)
+    expected = copy.deepcopy(pipeline)
+    jobs = []
+    edits = []
+    for job_index, plan_node in _job_plans(yaml.compose(text, Loader=_Loader)):
+        job = pipeline["jobs"][job_index]
+        plan = job.get("plan") or []
+        set_steps = [index for index, step in enumerate(plan) if isinstance(step, dict) and "set_pipeline" in step]
+        if not set_steps or any(isinstance(step, dict) and "across" in step for step in plan):
+            continue
+
+        end = set_steps[-1] + 1
+        start = next((index for index in range(end) if _uses_foundation(plan[index])), set_steps[0])
+        spans = [_item_lines(lines, node) for node in plan_node.value[start:end]]
+        if any(span is None for span in spans) or len({span[2] for span in spans}) != 1:
+            continue
+        first, last, column = spans[0][0], spans[-1][1], spans[0][2]
+
+        steps = _local_vars(plan[start:end])
+        for step in steps:
+            if "set_pipeline" in step:
+                step["set_pipeline"] = PIPELINE_NAME
+        across = {"var": ACROSS_VAR, "values": copy.deepcopy(targets), "max_in_flight": max_in_flight}
+        expected["jobs"][job_index]["plan"][start:end] = [{"across": [across], "do": steps}]
+
+        body = []
+        for line in lines[first:last]:
+            line = FOUNDATION_VAR_REFERENCE.sub(rf"((.:{ACROSS_VAR}.\1))", line)
+            body.append(re.sub(r"^(\s*(?:-\s+)?set_pipeline:\s*).*$", rf"\g<1>{PIPELINE_NAME}", line))
+
+        pad = " " * column
+        header = [f"{pad}- across:\n", f"{pad}    - var: {ACROSS_VAR}\n", f"{pad}      values:\n"]
+        header += [f"{pad}        - {{foundation: {target['foundation']}, dc: {target['dc']}, dc_type: {target['dc_type']}}}\n"
+                   for target in targets]
+        header += [f"{pad}      max_in_flight: {max_in_flight}\n", f"{pad}  do:\n"]
+        edits.append((first, last, header + _indent(body, 4)))
+        jobs.append(str(job.get("name")))
+
+    if not edits:
+        return text, []
+
+    for first, last, replacement in sorted(edits, key=lambda edit: -edit[0]):
+        lines[first:last] = replacement
+    rewritten = "".join(lines)
+
+    if yaml.load(rewritten, Loader=_Loader) != expected:
+        raise ValueError("Rewritten pipeline does not match the expected fan-out structure")
+    return rewritten, jobs
+
+def fanout_issues(pipeline: Any, pattern: str) -> List[str]:
+    """Check the set_pipeline steps of a pipeline that run across foundations
+
+    A fan-out needs a bounded max_in_flight above 1 (Concourse runs across
+    values one at a time by default), values that are foundations of the
+    datacenter pattern, and a pipeline name that differs per foundation.
+
+    Args:
+        pipeline: Parsed pipeline
+        pattern: Datacenter pattern
+
+    Returns:
+        Issue messages
+    """
+    issues = []
+    if not isinstance(pipeline, dict):
+        return issues
+
+    def check(step: Dict[str, Any], job: str, across: List[Any]) -> None:
+        where = f"set_pipeline step of job '{job}'"
+        across_vars = []
+        for entry in across:
+            if not isinstance(entry, dict) or not entry.get("var"):
+                issues.append(f"{where} has an across entry without a var")
+                continue
+            var = str(entry["var"])
+            across_vars.append(var)
+            limit = entry.get("max_in_flight")
+            if limit is None or limit == 1:
+                issues.append(f"{where} sets the pipelines across '{var}' one at a time; set max_in_flight above 1")
+            elif limit == "all" or not isinstance(limit, int) or limit < 1:
+                issues.append(f"{where} has an unbounded or invalid max_in_flight ({limit}) across '{var}'")
+
+            values = entry.get("values")
+            if not isinstance(values, list) or not values:
+                issues.append(f"{where} has no values to set the pipelines across '{var}'")
+                continue
+            for value in values:
+                name = value.get("foundation") if isinstance(value, dict) else value
+                if not isinstance(name, str):
+                    issues.append(f"{where} has an across value without a foundation: {value}")
+                    continue
+                match = re.match(pattern, name)
+                if not match:
+                    issues.append(f"{where} fans out to {name}, which does not match the datacenter pattern")
+                elif isinstance(value, dict) and len(match.groups()) >= 2 and \
+                        (value.get("dc"), value.get("dc_type")) != (match.group(1), match.group(2)):
+                    issues.append(f"{where} has dc/dc_type {value.get('dc')}/{value.get('dc_type')} "
+                                  f"for {name}, expected {match.group(1)}/{match.group(2)}")
+
+        name = str(step.get("set_pipeline", ""))
+        if across_vars and not any(f"((.:{var}" in name for var in across_vars) and not step.get("instance_vars"):
+            issues.append(f"{where} sets the same pipeline '{name}' for every foundation; "
+                          f"name it after the across var, e.g. {PIPELINE_NAME}")
+
+    def walk(value: Any, job: str, across: List[Any]) -> None:
+        if isinstance(value, list):
+            for item in value:
+                walk(item, job, across)
+        elif isinstance(value, dict):
+            scope = across + (value["across"] if isinstance(value.get("across"), list) else [])
+            if "set_pipeline" in value and scope:
+                check(value, job, scope)
+            for key in ("do", "in_parallel", "steps", "try", "on_success", "on_failure", "on_error", "on_abort", "ensure"):
+                if key in value:
+                    walk(value[key], job, scope)
+
+    for job in pipeline.get("jobs") or []:
+        if isinstance(job, dict):
+            walk(job.get("plan"), str(job.get("name")), [])
+    return issues
@@ -0,0 +1,283 @@
+"""
+Task Cache Advisor for Concourse Task Files
+
+This module classifies Concourse tasks by their image and script content and
+finds the ones that refetch the same dependencies on every build:
+
+- go: golang images, or scripts running go build/test/mod/get
+- pip: python images, or scripts running pip install
+- helm: scripts adding helm repos or building chart dependencies
+- download: scripts downloading binaries with curl or wget
+
+Scripts in the project that a task script calls (e.g. scripts/download.sh)
+are classified with it. Each kind maps to a Concourse `caches:` path, which is
+kept on the worker between builds of the same task, and to the env vars that
+point the tool at it.
+
+Inserting the caches works on the text rather than re-serializing the YAML,
+so comments are kept: the `caches:` entries go before `run:` and the env vars
+are appended to `params:`. The result is parsed again and compared with the
+expected structure before it is returned. Cache paths are relative to the
+build directory, so the task script is given lines resolving the env vars to
+absolute paths (go refuses relative ones) before it changes directory.
+
+Usage:
+    task, script_path, kinds = classify_task_file(source, "ci/tasks/x/task.yml")
+    text = insert_caches(task_text, kinds)
+    script = wire_script(script, kinds)
+
+Author: CI/CD Platform Team
+"""
+
+import copy
+import re
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import yaml
+
+from .project_sources import ProjectSource
+
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+class CacheKind(NamedTuple):
+    """A kind of dependency a task can keep in a worker-local cache"""
+
+    name: str
+    description: str
+    path: str
+    env: Dict[str, str]
+    images: Tuple[str, ...]
+    commands: str
+
+CACHE_KINDS = [
+    CacheKind("go", "go modules and build cache", "go-cache",
+              {"GOMODCACHE": "go-cache/mod", "GOCACHE": "go-cache/build"},
+              ("golang",), r"\bgo\s+(?:build|test|vet|install|get|generate|run|mod\s+(?:download|tidy|vendor))\b"),
+    CacheKind("pip", "pip packages", "pip-cache",
+              {"PIP_CACHE_DIR": "pip-cache"},
+              ("python",), r"\bpip3?\s+install\b|\bpython3?\s+-m\s+pip\s+install\b"),
+    CacheKind("helm", "helm repository indexes and charts", "helm-cache",
+              {"HELM_CACHE_HOME": "helm-cache"},
+              (), r"\bhelm\s+(?:repo\s+(?:add|update)|dependency\s+(?:build|update)|dep\s+(?:build|update)|pull)\b"),
+    CacheKind("download", "downloaded binaries", "download-cache",
+              {"DOWNLOAD_CACHE_DIR": "download-cache"},
+              (), r"\b(?:curl|wget)\s"),
+]
+
+CACHE_KINDS_BY_NAME = {kind.name: kind for kind in CACHE_KINDS}
+
+# Project scripts a task script runs, e.g. "${REPO_ROOT}/scripts/download.sh"
+SCRIPT_REFERENCE = re.compile(r'((?:ci/)?scripts/[-\w./]+\.sh)\b')
+
+# Marks the lines added to a task script by wire_script
+WIRING_COMMENT = "# Resolve task cache directories against the build directory"
+
+def _image(task: Dict[str, Any]) -> str:
+    image = task.get("image_resource")
+    source = image.get("source") if isinstance(image, dict) else None
+    return str(source.get("repository", "")) if isinstance(source, dict) else ""
+
+def _strip_comments(script: str) -> str:
+    return "\n".join(line for line in script.splitlines() if not line.lstrip().startswith("#"))
+
+def referenced_scripts(script: str) -> List[str]:
+    """Get the project scripts a task script runs, relative to the project root"""
+    return sorted(set(SCRIPT_REFERENCE.findall(_strip_comments(script))))
+
+def inline_script(task: Dict[str, Any]) -> str:
+    """Get the script of a task config that runs its code through run.args"""
+    run = task.get("run")
+    args = run.get("args") if isinstance(run, dict) else None
+    return "\n".join(str(arg) for arg in args) if isinstance(args, list) else ""
+
+def classify_task(task: Dict[str, Any], script: str = "") -> List[CacheKind]:
+    """Find the kinds of dependencies a task fetches
+
+    Args:
+        task: Parsed task config
+        script: Content of the task script and the project scripts it runs
+
+    Returns:
+        Cache kinds of the task, in CACHE_KINDS order
+    """
+    image = _image(task).rsplit("/", 1)[-1]
+    script = _strip_comments(script)
+    return [kind for kind in CACHE_KINDS
+            if any(image.startswith(prefix) for prefix in kind.images) or re.search(kind.commands, script)]
+
+def task_script_path(task: Dict[str, Any]) -> Optional[str]:
+    """Get the project path of a task's run.path script, e.g. ci/tasks/x/task.sh for repo/ci/tasks/x/task.sh"""
+    run = task.get("run")
+    path = run.get("path") if isinstance(run, dict) else None
+    if not isinstance(path, str) or not path.endswith(".sh") or "/" not in path:
+        return None
+    return path.split("/", 1)[1]
+
+def classify_task_file(source: ProjectSource, rel_path: str) -> Tuple[Dict[str, Any], Optional[str], List[CacheKind]]:
+    """Classify a task.yml file of a project by its image, script and the project scripts it runs
+
+    Args:
+        source: Project source
+        rel_path: Path of the task.yml file
+
+    Returns:
+        Parsed task, path of its script if the project has it, and its cache kinds
+    """
+    task = yaml.load(source.read_text(rel_path), Loader=_Loader)
+    if not isinstance(task, dict):
+        return {}, None, []
+
+    script_path = task_script_path(task)
+    if script_path is None or not source.is_file(script_path):
+        script_path = None
+    script = source.read_text(script_path) if script_path else inline_script(task)
+    scripts = [script] + [source.read_text(path) for path in referenced_scripts(script) if source.is_file(path)]
+    return task, script_path, classify_task(task, "\n".join(scripts))
+
+def declared_caches(task: Dict[str, Any]) -> List[str]:
+    """Get the cache paths a task config declares"""
+    return [str(cache["path"]) for cache in task.get("caches") or [] if isinstance(cache, dict) and cache.get("path")]
+
+def missing_caches(task: Dict[str, Any], kinds: Iterable[CacheKind]) -> List[CacheKind]:
+    """Get the kinds whose cache path or env vars a task config does not declare yet"""
+    caches = set(declared_caches(task))
+    params = task.get("params") if isinstance(task.get("params"), dict) else {}
+    return [kind for kind in kinds if kind.path not in caches or any(name not in params for name in kind.env)]
+
+def _top_level_block(lines: List[str], key: str) -> Optional[Tuple[int, int]]:
+    """Find the lines of a top-level key and its indented value
+
+    Returns:
+        First line and end line (exclusive, before trailing blank lines and
+        comments), or None if the key is not present
+    """
+    start = next((index for index, line in enumerate(lines) if re.match(rf"{key}:(\s|$)", line)), None)
+    if start is None:
+        return None
+    end = start + 1
+    last = start + 1
+    while end < len(lines):
+        line = lines[end]
+        if line.strip() and not line[0].isspace() and not line.startswith(("#", "-")):
+            break
+        end += 1
+        if line.strip() and not line.lstrip().startswith("#"):
+            last = end
+    return start, last
+
+def _child_indent(lines: List[str], block: Optional[Tuple[int, int]], default: str) -> str:
+    if block:
+        for line in lines[block[0] + 1:block[1]]:
+            if line.strip() and not line.lstrip().startswith("#"):
+                return line[:len(line) - len(line.lstrip())]
+    return default
+
+def _insert(lines: List[str], position: int, entries: List[str]) -> None:
+    """Insert lines, ending the previous line first if it is the unterminated last line"""
+    if position and not lines[position - 1].endswith("\n"):
+        lines[position - 1] += "\n"
+    lines[position:position] = entries
+
+def insert_caches(text: str, kinds: Iterable[CacheKind]) -> str:
+    """Declare the caches of the given kinds in a task file
+
+    Args:
+        text: task.yml content
+        kinds: Cache kinds to declare
+
+    Returns:
+        Rewritten task file, unchanged if everything is declared already
+
+    Raises:
+        ValueError: If the rewritten task does not parse to the expected structure
+    """
+    task = yaml.load(text, Loader=_Loader)
+    if not isinstance(task, dict):
+        raise ValueError("Task file is not a mapping")
+    kinds = missing_caches(task, kinds)
+    if not kinds:
+        return text
+
+    lines = text.splitlines(keepends=True)
+    # Separate the new sections with blank lines if the file does
+    spaced = ["\n"] if any(not line.strip() for line in lines) else []
+    expected = copy.deepcopy(task)
+    caches = declared_caches(task)
+    params = task.get("params") if isinstance(task.get("params"), dict) else {}
+    # Follow the indentation of the inputs list, e.g. "  - name: repo"
+    item_indent = _child_indent(lines, _top_level_block(lines, "inputs"), "  ")
+
+    new_caches = [kind.path for kind in kinds if kind.path not in caches]
+    new_params = {name: value for kind in kinds for name, value in kind.env.items() if name not in params}
+
+    # Append the env vars first so the line numbers of the caches block stay valid
+    if new_params:
+        expected["params"] = {**params, **new_params}
+        block = _top_level_block(lines, "params")
+        indent = _child_indent(lines, block, "  ")
+        entries = [f"{indent}{name}: {value}\n" for name, value in new_params.items()]
+        if block is None or lines[block[0]].split(":", 1)[1].strip() in ("{}", "~", "null"):
+            entries = ["params:\n"] + entries
+            if block is None:
+                _insert(lines, len(lines), spaced + entries)
+            else:
+                lines[block[0]:block[0] + 1] = entries
+        else:
+            _insert(lines, block[1], entries)
+
+    if new_caches:
+        expected["caches"] = [*(task.get("caches") or []), *({"path": path} for path in new_caches)]
+        entries = [f"{item_indent}- path: {path}\n" for path in new_caches]
+        block = _top_level_block(lines, "caches")
+        if block is not None:
+            _insert(lines, block[1], entries)
+        else:
+            run = _top_level_block(lines, "run")
+            position = run[0] if run else len(lines)
+            _insert(lines, position, ["caches:\n"] + entries + (spaced if run else []))
+
+    rewritten = "".join(lines)
+    if yaml.load(rewritten, Loader=_Loader) != expected:
+        raise ValueError("Rewritten task does not match the expected structure")
+    return rewritten
+
+def wire_script(script: str, kinds: Iterable[CacheKind]) -> str:
+    """Resolve the cache env vars of a task script to absolute paths
+
+    The lines are added after the strict mode settings, or after the leading
+    comments when there are none.
+
+    Args:
+        script: task.sh content
+        kinds: Cache kinds the task declares
+
+    Returns:
+        Rewritten task script, unchanged if every env var is resolved already
+    """
+    names = [name for kind in kinds for name in kind.env
+             if not re.search(rf'export {name}="\$\{{PWD\}}/', script)]
+    if not names:
+        return script
+
+    lines = script.splitlines(keepends=True)
+    wiring = [] if WIRING_COMMENT in script else [WIRING_COMMENT + "\n"]
+    wiring += [f'[[ -z "${{{name}:-}}" || "${{{name}}}" == /* ]] || export {name}="${{PWD}}/${{{name}}}"\n'
+               for name in names]
+
+    existing = next((index for index, line in enumerate(lines) if line.startswith(WIRING_COMMENT)), None)
+    if existing is not None:
+        position = existing + 1
+        while position < len(lines) and lines[position].startswith("[["):
+            position += 1
+        lines[position:position] = wiring
+        return "".join(lines)
+
+    strict = [index for index, line in enumerate(lines) if re.match(r"set\s+(-o\s+\w+|-\w+)", line)]
+    if strict:
+        position = strict[-1] + 1
+    else:
+        position = 0
+        while position < len(lines) and (lines[position].startswith("#") or not lines[position].strip()):
+            position += 1
+    _insert(lines, position, ["\n"] + wiring + (["\n"] if position < len(lines) and lines[position].strip() else []))
+    return "".join(lines)
@@ -0,0 +1,251 @@
+"""
+Merkle-Tree Drift Detection for Generated Projects
+
+This module compares a project against the output the template generator would
+render for the project's configuration. Both sides are turned into Merkle trees
+whose leaves are git blob ids and whose directory hashes cover the names and
+hashes of their children. The comparison descends only into subtrees whose
+hashes differ, so identical directories are skipped with a single comparison.
+
+For projects read from git objects the leaf ids come straight from the tree
+listing, so checking a repository for drift costs roughly the number of
+differing files: only those blobs are read, and only when a diff is requested.
+
+Usage:
+    expected = MerkleTree.from_contents(generator.render_tree())
+    report = compare_project(expected, source, excludes=DEFAULT_EXCLUDES)
+    for path in report.modified:
+        ...
+
+Author: CI/CD Platform Team
+"""
+
+import difflib
+import hashlib
+from fnmatch import fnmatchcase
+from pathlib import PurePosixPath
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Union
+
+from .project_sources import ProjectSource, git_blob_id
+
+# Paths never compared: git metadata, and GUIDE.md, which records the generation date
+DEFAULT_EXCLUDES = [".git", "GUIDE.md"]
+
+class MerkleTree:
+    """Directory node of a Merkle tree
+
+    Files are stored as leaf hashes in `files`, subdirectories as nested trees
+    in `dirs`.
+    """
+
+    __slots__ = ("files", "dirs", "_hash")
+
+    def __init__(self):
+        self.files: Dict[str, str] = {}
+        self.dirs: Dict[str, "MerkleTree"] = {}
+        self._hash: Optional[str] = None
+
+    @classmethod
+    def from_leaves(cls, leaves: Mapping[str, str]) -> "MerkleTree":
+        """Build a tree from file paths and their content hashes
+
+        Args:
+            leaves: Dictionary of relative POSIX paths to content hashes
+
+        Returns:
+            Root of the tree
+        """
+        root = cls()
+        for path, leaf_hash in leaves.items():
+            node = root
+            *parents, name = PurePosixPath(path).parts
+            for part in parents:
+                node = node.dirs.setdefault(part, cls())
+            node.files[name] = leaf_hash
+        return root
+
+    @classmethod
+    def from_contents(cls, contents: Mapping[str, Union[str, bytes]], object_format: str = "sha1",
+                      excludes: Iterable[str] = ()) -> "MerkleTree":
+        """Build a tree from in-memory file contents, e.g. TemplateGenerator.render_tree()
+
+        Args:
+            contents: Dictionary of relative POSIX paths to file content
+            object_format: Object format of the repository the tree is compared with
+            excludes: Glob patterns of paths to leave out
+
+        Returns:
+            Root of the tree
+        """
+        excludes = list(excludes)
+        return cls.from_leaves({
+            path: git_blob_id(content.encode("utf-8") if isinstance(content, str) else content, object_format)
+            for path, content in contents.items()
+            if not is_excluded(path, excludes)
+        })
+
+    @property
+    def hash(self) -> str:
+        """Hash of the directory, covering the names and hashes of all children"""
+        if self._hash is None:
+            digest = hashlib.sha256()
+            for name, leaf_hash in sorted(self.files.items()):
+                digest.update(f"file\0{name}\0{leaf_hash}\n".encode())
+            for name, subtree in sorted(self.dirs.items()):
+                digest.update(f"dir\0{name}\0{subtree.hash}\n".encode())
+            self._hash = digest.hexdigest()
+        return self._hash
+
+    def leaves(self, prefix: str = "") -> Iterator[str]:
+        """List the paths of all files in the tree
+
+        Args:
+            prefix: Path of this node relative to the root
+
+        Yields:
+            Relative file paths
+        """
+        for name in sorted(self.files):
+            yield _join(prefix, name)
+        for name, subtree in sorted(self.dirs.items()):
+            yield from subtree.leaves(_join(prefix, name))
+
+class DriftReport:
+    """Differences between a project and its expected rendered output"""
+
+    def __init__(self, project: str):
+        self.project = project
+        self.added: List[str] = []
+        self.removed: List[str] = []
+        self.modified: List[str] = []
+        self.nodes_compared = 0
+
+    @property
+    def total(self) -> int:
+        """Number of differing files"""
+        return len(self.added) + len(self.removed) + len(self.modified)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the report to a JSON-serializable dictionary"""
+        return {
+            "project": self.project,
+            "added": self.added,
+            "removed": self.removed,
+            "modified": self.modified,
+            "nodes_compared": self.nodes_compared
+        }
+
+def is_excluded(path: str, excludes: List[str]) -> bool:
+    """Check whether any component or the whole of a path matches an exclude pattern"""
+    parts = PurePosixPath(path).parts
+    return any(fnmatchcase(path, pattern) or any(fnmatchcase(part, pattern) for part in parts)
+               for pattern in excludes)
+
+def _join(prefix: str, name: str) -> str:
+    return f"{prefix}/{name}" if prefix else name
+
+def project_tree(source: ProjectSource, scope: Iterable[str], excludes: Iterable[str] = ()) -> MerkleTree:
+    """Build a Merkle tree of the parts of a project covered by the template
+
+    Only the top-level files and directories that the template generates are
+    included, so application code elsewhere in the repository is never read.
+
+    Args:
+        source: Project to read
+        scope: Top-level names to include, usually those of the expected tree
+        excludes: Glob patterns of paths to leave out
+
+    Returns:
+        Root of the tree
+    """
+    excludes = list(excludes)
+    leaves = {}
+    for top in scope:
+        if not source.exists(top):
+            continue
+        for path in source.files(top):
+            if not is_excluded(path, excludes):
+                leaves[path] = source.content_id(path)
+    return MerkleTree.from_leaves(leaves)
+
+def compare_trees(expected: MerkleTree, actual: MerkleTree, report: DriftReport, prefix: str = "") -> None:
+    """Record the differences between two trees, skipping identical subtrees
+
+    Args:
+        expected: Tree of the expected rendered output
+        actual: Tree of the project
+        report: Report to add differences to
+        prefix: Path of the compared nodes relative to the root
+    """
+    report.nodes_compared += 1
+    if expected.hash == actual.hash:
+        return
+
+    for name in sorted(set(expected.files) | set(actual.files)):
+        path = _join(prefix, name)
+        if name not in actual.files:
+            if name in actual.dirs:
+                report.added.extend(actual.dirs[name].leaves(path))
+            report.removed.append(path)
+        elif name not in expected.files:
+            if name in expected.dirs:
+                report.removed.extend(expected.dirs[name].leaves(path))
+            report.added.append(path)
+        elif expected.files[name] != actual.files[name]:
+            report.modified.append(path)
+
+    for name in sorted(set(expected.dirs) | set(actual.dirs)):
+        path = _join(prefix, name)
+        if name not in actual.dirs:
+            if name not in actual.files:
+                report.removed.extend(expected.dirs[name].leaves(path))
+        elif name not in expected.dirs:
+            if name not in expected.files:
+                report.added.extend(actual.dirs[name].leaves(path))
+        else:
+            compare_trees(expected.dirs[name], actual.dirs[name], report, path)
+
+def compare_project(expected: MerkleTree, source: ProjectSource, excludes: Iterable[str] = DEFAULT_EXCLUDES) -> DriftReport:
+    """Compare a project with the Merkle tree of its expected rendered output
+
+    Args:
+        expected: Tree of the expected rendered output
+        source: Project to compare
+        excludes: Glob patterns of paths to leave out
+
+    Returns:
+        Drift report, with sorted file lists
+    """
+    actual = project_tree(source, list(expected.files) + list(expected.dirs), excludes)
+    report = DriftReport(source.label)
+    compare_trees(expected, actual, report)
+    report.added.sort()
+    report.removed.sort()
+    report.modified.sort()
+    return report
+
+def unified_diff(path: str, expected: Union[str, bytes], source: ProjectSource, context: int = 3) -> List[str]:
+    """Build a unified diff from the expected content of a file to the project's version
+
+    Args:
+        path: Relative file path
+        expected: Expected rendered content
+        source: Project to read the actual content from
+        context: Number of context lines
+
+    Returns:
+        Diff lines, or a single note for binary files
+    """
+    try:
+        expected_text = expected.decode("utf-8") if isinstance(expected, bytes) else expected
+        actual_text = source.read_bytes(path).decode("utf-8")
+    except UnicodeDecodeError:
+        return [f"Binary files expected/{path} and project/{path} differ\n"]
+
+    return list(difflib.unified_diff(
+        expected_text.splitlines(keepends=True),
+        actual_text.splitlines(keepends=True),
+        fromfile=f"expected/{path}",
+        tofile=f"project/{path}",
+        n=context
+    ))
@@ -0,0 +1,316 @@
+"""
+Profiling Support for the Template Tools
+
+This module records where the template generator and the compliance validator
+spend their time. It collects wall and CPU time per phase, per-file timings and
+simple counters (files, bytes read, regex evaluations), prints a summary and
+exports a trace in the Chrome trace-event format, which can be loaded into
+chrome://tracing or https://ui.perfetto.dev.
+
+Usage:
+    profiler = Profiler()
+    with profiler.phase("render"):
+        ...
+    profiler.print_summary()
+    profiler.write_trace("trace.json")
+
+Author: CI/CD Platform Team
+"""
+
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO
+
+class PhaseStats:
+    """Accumulated timings for one phase, rule or file"""
+
+    __slots__ = ("count", "wall", "cpu", "bytes")
+
+    def __init__(self):
+        self.count = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.bytes = 0
+
+    def add(self, wall: float, cpu: float) -> None:
+        """Add a single timing sample
+
+        Args:
+            wall: Wall-clock seconds
+            cpu: CPU seconds
+        """
+        self.count += 1
+        self.wall += wall
+        self.cpu += cpu
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the stats to a JSON-serializable dictionary"""
+        return {
+            "count": self.count,
+            "wall_ms": round(self.wall * 1000, 3),
+            "cpu_ms": round(self.cpu * 1000, 3),
+            "bytes": self.bytes
+        }
+
+class NullProfiler:
+    """Profiler that records nothing, used when profiling is disabled"""
+
+    enabled = False
+
+    @contextmanager
+    def phase(self, name: str, category: str = "phase", trace: bool = True) -> Iterator[None]:
+        yield
+
+    @contextmanager
+    def file(self, path: str) -> Iterator[None]:
+        yield
+
+    def rule(self, name: str):
+        return self.phase(name)
+
+    def iterate(self, name: str, iterable: Iterable, category: str = "phase") -> Iterator:
+        return iter(iterable)
+
+    def count(self, name: str, value: int = 1) -> None:
+        pass
+
+    def add_bytes(self, path: str, size: int) -> None:
+        pass
+
+class Profiler(NullProfiler):
+    """Collects phase, rule and per-file timings plus counters"""
+
+    enabled = True
+
+    def __init__(self, name: str = "template-tools"):
+        """Initialize the profiler
+
+        Args:
+            name: Process name shown in the trace viewer
+        """
+        self.name = name
+        self.phases: Dict[str, PhaseStats] = {}
+        self.rules: Dict[str, PhaseStats] = {}
+        self.files: Dict[str, PhaseStats] = {}
+        self.counters: Dict[str, int] = {}
+        self.events: List[Dict[str, Any]] = []
+        self._origin = time.perf_counter()
+        self._pid = os.getpid()
+
+    def _timestamp(self, perf: float) -> float:
+        """Convert a perf_counter value to trace microseconds"""
+        return round((perf - self._origin) * 1_000_000, 3)
+
+    def _record(self, table: Dict[str, PhaseStats], name: str, category: str, trace: bool,
+                start: float, wall: float, cpu: float) -> None:
+        stats = table.get(name)
+        if stats is None:
+            stats = table[name] = PhaseStats()
+        stats.add(wall, cpu)
+
+        if trace:
+            self.events.append({
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": self._timestamp(start),
+                "dur": round(wall * 1_000_000, 3),
+                "pid": self._pid,
+                "tid": threading.get_ident(),
+                "args": {"cpu_ms": round(cpu * 1000, 3)}
+            })
+
+    @contextmanager
+    def phase(self, name: str, category: str = "phase", trace: bool = True) -> Iterator[None]:
+        """Time a phase of work
+
+        Args:
+            name: Phase name, e.g. "render" or "validate_task_files"
+            category: Trace category
+            trace: Whether to emit a trace event for every occurrence
+        """
+        start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            self._record(self.phases, name, category, trace, start,
+                         time.perf_counter() - start, time.process_time() - cpu_start)
+
+    @contextmanager
+    def rule(self, name: str) -> Iterator[None]:
+        """Time a single rule evaluation
+
+        Rules run once per file, so they are aggregated without trace events.
+
+        Args:
+            name: Rule name, e.g. "script_standards.shebang"
+        """
+        start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            self._record(self.rules, name, "rule", False, start,
+                         time.perf_counter() - start, time.process_time() - cpu_start)
+
+    @contextmanager
+    def file(self, path: str) -> Iterator[None]:
+        """Time the processing of a single file
+
+        Args:
+            path: File path, relative to the project or template root
+        """
+        start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            self._record(self.files, path, "file", True, start,
+                         time.perf_counter() - start, time.process_time() - cpu_start)
+            self.count("files")
+
+    def iterate(self, name: str, iterable: Iterable, category: str = "phase") -> Iterator:
+        """Time a generator phase, excluding the time spent by its consumer
+
+        The time of every resume of the generator is added up, so time spent
+        by the caller between items is not attributed to the phase, and the
+        phase is recorded once, as a single sample and trace event, when the
+        generator is exhausted or closed.
+
+        Args:
+            name: Phase name
+            iterable: Generator to time
+            category: Trace category
+
+        Yields:
+            Items produced by the generator
+        """
+        iterator = iter(iterable)
+        start = time.perf_counter()
+        wall = cpu = 0.0
+        try:
+            while True:
+                resumed = time.perf_counter()
+                cpu_resumed = time.process_time()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    wall += time.perf_counter() - resumed
+                    cpu += time.process_time() - cpu_resumed
+                yield item
+        finally:
+            self._record(self.phases, name, category, True, start, wall, cpu)
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Increment a counter
+
+        Args:
+            name: Counter name, e.g. "regex_evaluations"
+            value: Amount to add
+        """
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def add_bytes(self, path: str, size: int) -> None:
+        """Record bytes read for a file
+
+        Args:
+            path: File path
+            size: Number of bytes read
+        """
+        self.count("bytes_read", size)
+        stats = self.files.get(path)
+        if stats is None:
+            stats = self.files[path] = PhaseStats()
+        stats.bytes += size
+
+    def slowest_files(self, top_n: int = 10) -> List[Dict[str, Any]]:
+        """Get the slowest files by wall time
+
+        Args:
+            top_n: Number of files to return
+
+        Returns:
+            List of file timing dictionaries, slowest first
+        """
+        ranked = sorted(self.files.items(), key=lambda item: item[1].wall, reverse=True)
+        return [{"path": path, **stats.to_dict()} for path, stats in ranked[:top_n]]
+
+    def to_dict(self, top_n: int = 10) -> Dict[str, Any]:
+        """Convert the collected data to a JSON-serializable summary
+
+        Args:
+            top_n: Number of slowest files to include
+        """
+        return {
+            "phases": {name: stats.to_dict() for name, stats in self.phases.items()},
+            "rules": {name: stats.to_dict() for name, stats in self.rules.items()},
+            "slowest_files": self.slowest_files(top_n),
+            "counters": dict(self.counters)
+        }
+
+    def print_summary(self, top_n: int = 10, stream: Optional[TextIO] = None) -> None:
+        """Print a human-readable profile summary
+
+        Args:
+            top_n: Number of slowest files to show
+            stream: Stream to print to (default: sys.stderr)
+        """
+        out = stream or sys.stderr
+
+        print("\n## PROFILE", file=out)
+        for title, table in (("Phases", self.phases), ("Rules", self.rules)):
+            if not table:
+                continue
+            print(f"\n{title}:", file=out)
+            print(f"  {'name':<40} {'count':>8} {'wall ms':>10} {'cpu ms':>10}", file=out)
+            for name, stats in sorted(table.items(), key=lambda item: item[1].wall, reverse=True):
+                print(f"  {name:<40} {stats.count:>8} {stats.wall * 1000:>10.2f} {stats.cpu * 1000:>10.2f}", file=out)
+
+        slowest = self.slowest_files(top_n)
+        if slowest:
+            print(f"\nSlowest {len(slowest)} files:", file=out)
+            for entry in slowest:
+                print(f"  {entry['wall_ms']:>10.2f} ms {entry['bytes']:>10} B  {entry['path']}", file=out)
+
+        if self.counters:
+            print("\nCounters:", file=out)
+            for name, value in sorted(self.counters.items()):
+                print(f"  {name}: {value}", file=out)
+
+    def write_trace(self, path: str, top_n: int = 10) -> None:
+        """Write a Chrome trace-event JSON file
+
+        Args:
+            path: Output file path
+            top_n: Number of slowest files to include in the metadata
+        """
+        import json
+
+        end = self._timestamp(time.perf_counter())
+        events = [{
+            "name": "process_name",
+            "ph": "M",
+            "pid": self._pid,
+            "args": {"name": self.name}
+        }]
+        events.extend(self.events)
+        events.extend({
+            "name": name,
+            "ph": "C",
+            "ts": end,
+            "pid": self._pid,
+            "args": {name: value}
+        } for name, value in self.counters.items())
+
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({
+                "traceEvents": events,
+                "displayTimeUnit": "ms",
+                "otherData": self.to_dict(top_n)
+            }, file)
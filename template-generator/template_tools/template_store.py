@@ -0,0 +1,260 @@
+"""
+Content-Addressed Store for Reference Templates
+
+The reference pipeline and the kustomize, helm and cli-tool templates each
+carry their own copy of the shared files (ci/scripts/lib/*, test-framework.sh,
+fly.sh, the common task directories). This module reads every template
+directory as a layer: a manifest of relative path to git blob id. The content
+of each blob is stored once, however many layers contain it, and is decoded
+and split into its ${VAR} tokens once. Rendering a blob is cached by the values
+of the variables it uses, so a shared file renders to the same string object
+for every template type using the same configuration values.
+
+Since identical files share a blob id, comparing the manifests also shows
+where files that should be shared have diverged between template types.
+
+Usage:
+    store = shared_store()
+    manifest = store.manifest(Path("reference/templates/helm"))
+    text = store.render(manifest["ci/scripts/fly.sh"].blob, resolve)
+    report = divergence(store, reference_layers(Path("reference")), SHARED_PATTERNS)
+
+Author: CI/CD Platform Team
+"""
+
+import difflib
+import os
+import re
+import threading
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .project_sources import git_blob_id
+
+# Template variables, e.g. ${REPO_NAME}; the name is captured so splitting
+# alternates literal text and variable names
+VARIABLE_PATTERN = re.compile(r'\$\{([A-Za-z0-9_]+)\}')
+
+# Files every template type is supposed to share
+SHARED_PATTERNS = [
+    "ci/fly.sh",
+    "ci/scripts/fly.sh",
+    "ci/scripts/lib/*",
+    "ci/scripts/tests/test-framework.sh",
+    "ci/tasks/common/*",
+    "ci/tasks/tkgi/*",
+    "ci/tasks/testing/*",
+]
+
+TEMPLATE_TYPES = ["kustomize", "helm", "cli-tool"]
+
+class StoreEntry(NamedTuple):
+    """A file of a layer"""
+
+    blob: str
+    executable: bool
+
+class TemplateStore:
+    """Blobs of the template layers, stored, decoded and tokenized once"""
+
+    def __init__(self):
+        self.blobs: Dict[str, bytes] = {}
+        self.manifests: Dict[Path, Dict[str, StoreEntry]] = {}
+        self._texts: Dict[str, Optional[str]] = {}
+        self._tokens: Dict[str, Optional[Tuple[str, ...]]] = {}
+        self._rendered: Dict[Tuple[str, Tuple[str, ...]], str] = {}
+        self._lock = threading.Lock()
+
+    def manifest(self, directory: Path) -> Dict[str, StoreEntry]:
+        """Read a template directory as a layer, once
+
+        Args:
+            directory: Template directory
+
+        Returns:
+            Dictionary of relative POSIX paths to their entries, sorted by path
+        """
+        key = directory.resolve()
+        with self._lock:
+            manifest = self.manifests.get(key)
+            if manifest is None:
+                manifest = self.manifests[key] = self._read_layer(key)
+        return manifest
+
+    def _read_layer(self, directory: Path) -> Dict[str, StoreEntry]:
+        entries = {}
+        for dirpath, dirnames, filenames in os.walk(directory):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                path = os.path.join(dirpath, filename)
+                with open(path, "rb") as file:
+                    data = file.read()
+                blob = git_blob_id(data)
+                self.blobs.setdefault(blob, data)
+                rel_path = Path(path).relative_to(directory).as_posix()
+                entries[rel_path] = StoreEntry(blob, os.access(path, os.X_OK))
+        return dict(sorted(entries.items()))
+
+    def read_bytes(self, blob: str) -> bytes:
+        """Get the content of a blob"""
+        return self.blobs[blob]
+
+    def text(self, blob: str) -> Optional[str]:
+        """Get the unrendered text of a blob, or None for binary blobs"""
+        if blob not in self._texts:
+            data = self.blobs[blob]
+            text = None
+            if b"\0" not in data[:1024]:
+                try:
+                    text = data.decode("utf-8")
+                except UnicodeDecodeError:
+                    pass
+            self._texts[blob] = text
+        return self._texts[blob]
+
+    def tokens(self, blob: str) -> Optional[Tuple[str, ...]]:
+        """Split a text blob into literal text (even indices) and variable names (odd indices)
+
+        Returns:
+            Tokens, or None for binary blobs
+        """
+        if blob not in self._tokens:
+            text = self.text(blob)
+            self._tokens[blob] = tuple(VARIABLE_PATTERN.split(text)) if text is not None else None
+        return self._tokens[blob]
+
+    def variables(self, blob: str) -> Tuple[str, ...]:
+        """Get the names of the variables a blob uses, in order of appearance"""
+        tokens = self.tokens(blob)
+        return tokens[1::2] if tokens else ()
+
+    def render(self, blob: str, resolve: Callable[[str], str]) -> Optional[str]:
+        """Replace the variables of a text blob
+
+        Args:
+            blob: Blob id
+            resolve: Function returning the replacement of a variable name
+
+        Returns:
+            Rendered text, or None for binary blobs
+        """
+        tokens = self.tokens(blob)
+        if tokens is None:
+            return None
+        if len(tokens) == 1:
+            return tokens[0]
+
+        values = tuple(resolve(name) for name in tokens[1::2])
+        key = (blob, values)
+        rendered = self._rendered.get(key)
+        if rendered is None:
+            parts = list(tokens)
+            parts[1::2] = values
+            rendered = self._rendered.setdefault(key, "".join(parts))
+        return rendered
+
+    def stats(self) -> Dict[str, int]:
+        """Count the files and bytes of all layers read, and what the store keeps of them"""
+        entries = [entry for manifest in self.manifests.values() for entry in manifest.values()]
+        return {
+            "layers": len(self.manifests),
+            "files": len(entries),
+            "file_bytes": sum(len(self.blobs[entry.blob]) for entry in entries),
+            "blobs": len(self.blobs),
+            "blob_bytes": sum(len(data) for data in self.blobs.values())
+        }
+
+_SHARED_STORE = TemplateStore()
+
+def shared_store() -> TemplateStore:
+    """Get the store shared by every generator of the process"""
+    return _SHARED_STORE
+
+def reference_layers(reference_dir: Path, names: Optional[Iterable[str]] = None) -> Dict[str, Path]:
+    """Get the directories of the reference pipeline and the template types
+
+    Args:
+        reference_dir: The repository's reference directory
+        names: Layers to include (default: pipeline and every template type)
+
+    Returns:
+        Dictionary of layer names to existing directories
+    """
+    layers = {"pipeline": reference_dir / "pipeline"}
+    layers.update((template_type, reference_dir / "templates" / template_type) for template_type in TEMPLATE_TYPES)
+    selected = list(names) if names else list(layers)
+    return {name: layers[name] for name in selected if layers[name].is_dir()}
+
+class Divergence(NamedTuple):
+    """A shared file whose content differs between layers"""
+
+    path: str
+    variants: List[Tuple[str, List[str]]]
+    missing: List[str]
+
+    @property
+    def canonical(self) -> str:
+        """Blob of the variant most layers use"""
+        return self.variants[0][0]
+
+def _rank_variants(layers_by_blob: Dict[str, List[str]], order: List[str]) -> List[Tuple[str, List[str]]]:
+    """Sort variants by number of layers, then by the position of their first layer"""
+    return sorted(layers_by_blob.items(), key=lambda item: (-len(item[1]), min(order.index(name) for name in item[1])))
+
+def divergence(store: TemplateStore, layers: Dict[str, Path], patterns: Iterable[str]) -> List[Divergence]:
+    """Find the shared files whose content differs between layers
+
+    Args:
+        store: Template store
+        layers: Layer names and directories, in order of preference for the canonical variant
+        patterns: Glob patterns of the shared paths
+
+    Returns:
+        Diverged files, sorted by path
+    """
+    patterns = list(patterns)
+    manifests = {name: store.manifest(directory) for name, directory in layers.items()}
+    order = list(manifests)
+    paths = sorted({path for manifest in manifests.values() for path in manifest
+                    if any(fnmatchcase(path, pattern) for pattern in patterns)})
+
+    report = []
+    for path in paths:
+        layers_by_blob: Dict[str, List[str]] = {}
+        for name, manifest in manifests.items():
+            if path in manifest:
+                layers_by_blob.setdefault(manifest[path].blob, []).append(name)
+        if len(layers_by_blob) > 1:
+            missing = [name for name in order if path not in manifests[name]]
+            report.append(Divergence(path, _rank_variants(layers_by_blob, order), missing))
+    return report
+
+def variant_diff(store: TemplateStore, item: Divergence, blob: str) -> List[str]:
+    """Diff a variant of a diverged file against its canonical variant
+
+    Args:
+        store: Template store
+        item: Diverged file
+        blob: Blob of the variant
+
+    Returns:
+        Unified diff lines
+    """
+    layers = dict(item.variants)
+    old, new = store.text(item.canonical), store.text(blob)
+    if old is None or new is None:
+        return [f"Binary files {item.path} differ\n"]
+    return list(difflib.unified_diff(old.splitlines(keepends=True), new.splitlines(keepends=True),
+                                     f"{'+'.join(layers[item.canonical])}/{item.path}",
+                                     f"{'+'.join(layers[blob])}/{item.path}"))
+
+def divergence_to_dict(store: TemplateStore, item: Divergence) -> Dict[str, Any]:
+    """Convert a diverged file to a JSON-serializable dictionary"""
+    return {
+        "path": item.path,
+        "canonical": item.canonical,
+        "variants": [{"blob": blob, "layers": names, "bytes": len(store.read_bytes(blob))}
+                     for blob, names in item.variants],
+        "missing": item.missing
+    }
@@ -0,0 +1,1432 @@
+"""
+Template Compliance Validator
+
+This module validates an existing project against the reference template standards,
+identifying any areas where the project doesn't conform to the standards.
+
+yaml, json, the task cache advisor and the history store are imported by the
+checks and options that use them, so --help starts without them.
+
+Usage:
+    validate-template-compliance --project-dir /path/to/project --template-type kustomize
+    python validate-template-compliance.py --project-dir /path/to/project --template-type helm --verbose
+    python validate-template-compliance.py --project-dir /path/to/project --template-type cli-tool --fix-caches
+    python validate-template-compliance.py --project-dir . --budget-ms 200 ci/pipelines/main.yml ci/scripts/fly.sh
+
+Author: CI/CD Platform Team
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path, PurePosixPath
+import re
+import time
+from typing import TYPE_CHECKING, Dict, Any, Iterable, Iterator, List, NamedTuple, Optional, TextIO, Tuple
+
+from .project_sources import BlobResultCache, FilesystemSource, GitCatFile, GitObjectSource, ProjectSource, glob_paths
+from .template_profiler import NullProfiler
+
+if TYPE_CHECKING:
+    from .compliance_history import HistoryStore
+    from .params_coverage import ParamsTree
+
+# Define file structures for each template type
+TEMPLATE_STRUCTURES = {
+    "kustomize": {
+        "required_dirs": [
+            "ci/pipelines",
+            "ci/scripts",
+            "ci/scripts/lib",
+            "ci/scripts/tests",
+            "ci/tasks",
+            "ci/tasks/common",
+            "ci/tasks/testing",
+            "ci/tasks/tkgi",
+            "ci/tasks/k8s",
+            "scripts"
+        ],
+        "required_files": [
+            "ci/fly.sh",
+            "ci/pipelines/main.yml",
+            "ci/pipelines/release.yml",
+            "ci/pipelines/set-pipeline.yml",
+            "ci/scripts/fly.sh",
+            "ci/scripts/lib/commands.sh",
+            "ci/scripts/lib/help.sh",
+            "ci/scripts/lib/parsing.sh",
+            "ci/scripts/lib/utils.sh",
+            "ci/scripts/tests/run_tests.sh",
+            "ci/scripts/tests/test-framework.sh",
+            "README.md"
+        ],
+        "critical_task_dirs": [
+            "ci/tasks/common/kubectl-apply",
+            "ci/tasks/tkgi/tkgi-login"
+        ],
+        "script_patterns": {
+            "shebang": r"^#!/usr/bin/env bash$",
+            "strict_mode": r"set -o errexit.*set -o pipefail",
+            "script_dir": r"[A-Za-z_]+(DIR|_DIR)=.*\$\(cd.*\$\{BASH_SOURCE\[0\]\}.*pwd\)"
+        }
+    },
+    "helm": {
+        "required_dirs": [
+            "ci/pipelines",
+            "ci/scripts",
+            "ci/scripts/lib",
+            "ci/scripts/tests",
+            "ci/tasks",
+            "ci/tasks/common",
+            "ci/tasks/testing",
+            "ci/tasks/tkgi",
+            "ci/tasks/helm",
+            "ci/tasks/k8s",
+            "scripts"
+        ],
+        "required_files": [
+            "ci/fly.sh",
+            "ci/pipelines/main.yml",
+            "ci/pipelines/release.yml",
+            "ci/scripts/fly.sh",
+            "ci/scripts/lib/commands.sh",
+            "ci/scripts/lib/help.sh",
+            "ci/scripts/lib/parsing.sh",
+            "ci/scripts/lib/utils.sh",
+            "ci/scripts/tests/run_tests.sh",
+            "ci/scripts/tests/test-framework.sh",
+            "README.md"
+        ],
+        "critical_task_dirs": [
+            "ci/tasks/helm/helm-deploy",
+            "ci/tasks/tkgi/tkgi-login"
+        ],
+        "script_patterns": {
+            "shebang": r"^#!/usr/bin/env bash$",
+            "strict_mode": r"set -o errexit.*set -o pipefail",
+            "script_dir": r"[A-Za-z_]+(DIR|_DIR)=.*\$\(cd.*\$\{BASH_SOURCE\[0\]\}.*pwd\)"
+        }
+    },
+    "cli-tool": {
+        "required_dirs": [
+            "ci/pipelines",
+            "ci/scripts",
+            "ci/scripts/lib",
+            "ci/scripts/tests",
+            "ci/tasks",
+            "ci/tasks/common",
+            "ci/tasks/testing",
+            "ci/tasks/tkgi",
+            "ci/tasks/cli-tool",
+            "scripts"
+        ],
+        "required_files": [
+            "ci/fly.sh",
+            "ci/pipelines/main.yml",
+            "ci/pipelines/release.yml",
+            "ci/scripts/fly.sh",
+            "ci/scripts/lib/commands.sh",
+            "ci/scripts/lib/help.sh",
+            "ci/scripts/lib/parsing.sh",
+            "ci/scripts/lib/utils.sh",
+            "ci/scripts/tests/run_tests.sh",
+            "ci/scripts/tests/test-framework.sh",
+            "README.md"
+        ],
+        "critical_task_dirs": [
+            "ci/tasks/cli-tool/download-tool",
+            "ci/tasks/cli-tool/install-tool",
+            "ci/tasks/tkgi/tkgi-login"
+        ],
+        "script_patterns": {
+            "shebang": r"^#!/usr/bin/env bash$",
+            "strict_mode": r"set -o errexit.*set -o pipefail",
+            "script_dir": r"[A-Za-z_]+(DIR|_DIR)=.*\$\(cd.*\$\{BASH_SOURCE\[0\]\}.*pwd\)"
+        }
+    }
+}
+
+# Define expected fly.sh commands
+FLY_COMMANDS = ["set", "unpause", "destroy", "validate", "release", "set-pipeline"]
+
+# Define expected fly.sh options
+FLY_OPTIONS = [
+    "-f, --foundation",
+    "-t, --target",
+    "-e, --environment",
+    "-b, --branch",
+    "-c, --config-branch",
+    "-d, --params-branch",
+    "-p, --pipeline",
+    "-o, --github-org",
+    "-v, --version",
+    "--dry-run",
+    "--verbose",
+    "--timer",
+    "-h, --help"
+]
+
+# Cost tiers of the checks, cheapest first: stat calls, single-file regexes,
+# YAML parsing, and checks relating several files
+TIERS = ["stat", "regex", "parse", "graph"]
+
+# Time a check of each tier needs at least, in milliseconds, including its imports
+TIER_ESTIMATES_MS = {"stat": 5.0, "regex": 10.0, "parse": 40.0, "graph": 80.0}
+
+class CheckSpec(NamedTuple):
+    """Cost tier of a check and the files it reads"""
+
+    tier: str
+    # Glob patterns of the files the check reads; empty for checks that always run
+    scope: Tuple[str, ...] = ()
+
+CHECKS = {
+    "directory_structure": CheckSpec("stat"),
+    "required_files": CheckSpec("stat"),
+    "script_standards": CheckSpec("regex", ("**/*.sh",)),
+    "fly_script": CheckSpec("regex", ("ci/scripts/lib/parsing.sh",)),
+    "pipeline_files": CheckSpec("parse", ("ci/pipelines/*.yml",)),
+    "pipeline_budgets": CheckSpec("parse", ("ci/pipelines/*.yml",)),
+    "set_pipeline_fanout": CheckSpec("parse", ("ci/pipelines/*.yml",)),
+    "task_files": CheckSpec("parse", ("ci/tasks/**/task.yml",)),
+    "task_caches": CheckSpec("graph", ("ci/tasks/**/*", "ci/pipelines/*.yml", "**/scripts/**/*.sh")),
+    "test_framework": CheckSpec("regex", ("ci/scripts/tests/*.sh",)),
+}
+
+class SkippedCheck(NamedTuple):
+    """A check, or the rest of its files, left out to stay within the latency budget"""
+
+    check: str
+    tier: str
+    reason: str
+
+# Report categories, in the order they are printed
+ISSUE_CATEGORIES = ["directory", "file", "script", "fly", "pipeline", "task", "test"]
+
+def categorize_issue(message: str) -> str:
+    """Determine the report category of an issue message
+
+    Args:
+        message: Issue message
+
+    Returns:
+        One of ISSUE_CATEGORIES
+    """
+    lowered = message.lower()
+    if "directory" in lowered:
+        return "directory"
+    elif "file" in lowered:
+        return "file"
+    elif "script" in lowered and "fly.sh" not in lowered:
+        return "script"
+    elif "fly.sh" in lowered:
+        return "fly"
+    elif "pipeline" in lowered or ".yml" in lowered:
+        return "pipeline"
+    elif "task" in lowered:
+        return "task"
+    elif "test" in lowered:
+        return "test"
+    # Default to script category
+    return "script"
+
+class Issue(NamedTuple):
+    """A single compliance issue found by a validation check"""
+
+    check: str
+    message: str
+    path: Optional[str] = None
+
+    @property
+    def category(self) -> str:
+        """Report category of the issue"""
+        return categorize_issue(self.message)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the issue to a JSON-serializable dictionary"""
+        return {
+            "check": self.check,
+            "category": self.category,
+            "message": self.message,
+            "path": self.path
+        }
+
+    def __str__(self) -> str:
+        return self.message
+
+class IssueSink:
+    """Consumer of issues streamed from TemplateValidator.validate()
+
+    Sinks receive each issue as soon as it is found, so they must not rely on
+    seeing the full list of issues before producing output.
+    """
+
+    def start(self, validator: "TemplateValidator") -> None:
+        """Called once before the first issue is emitted
+
+        Args:
+            validator: Validator that is about to stream issues
+        """
+
+    def emit(self, issue: Issue) -> None:
+        """Consume a single issue
+
+        Args:
+            issue: Issue found by a validation check
+        """
+        raise NotImplementedError
+
+    def close(self, summary: "CountingSink") -> None:
+        """Called once after the last issue has been emitted
+
+        Args:
+            summary: Counts of all issues emitted during the run
+        """
+
+    def finish(self) -> None:
+        """Called once after every validator using the sink has finished"""
+
+class CountingSink(IssueSink):
+    """Aggregating sink that keeps only issue counts, and the checks that were skipped"""
+
+    def __init__(self):
+        self.total = 0
+        self.by_category = {category: 0 for category in ISSUE_CATEGORIES}
+        self.by_check: Dict[str, int] = {}
+        self.skipped: List[SkippedCheck] = []
+
+    def emit(self, issue: Issue) -> None:
+        self.total += 1
+        self.by_category[issue.category] = self.by_category.get(issue.category, 0) + 1
+        self.by_check[issue.check] = self.by_check.get(issue.check, 0) + 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the counts to a JSON-serializable dictionary"""
+        return {
+            "total": self.total,
+            "by_category": {k: v for k, v in self.by_category.items() if v},
+            "by_check": dict(self.by_check),
+            "skipped": [skipped._asdict() for skipped in self.skipped]
+        }
+
+class CollectingSink(IssueSink):
+    """Sink that keeps every issue in memory, for library callers"""
+
+    def __init__(self, issues: Optional[List[Issue]] = None):
+        self.issues = issues if issues is not None else []
+
+    def emit(self, issue: Issue) -> None:
+        self.issues.append(issue)
+
+class ConsoleSink(IssueSink):
+    """Sink that prints issues to the console as they are found"""
+
+    def __init__(self, stream: Optional[TextIO] = None, show_issues: bool = True):
+        """Initialize the sink
+
+        Args:
+            stream: Stream to print to (default: sys.stdout)
+            show_issues: Whether to print each issue, or only the final summary
+        """
+        self.stream = stream
+        self.show_issues = show_issues
+        self.project_dir = None
+        self.template_type = None
+        self.project_args = None
+        self.changed_files = None
+        self.check_caches = False
+
+    def _print(self, message: str = "") -> None:
+        print(message, file=self.stream or sys.stdout, flush=True)
+
+    def start(self, validator: "TemplateValidator") -> None:
+        self.project_dir = validator.project_dir
+        self.template_type = validator.template_type
+        self.project_args = validator.project_args()
+        self.changed_files = validator.changed_files
+        self.check_caches = validator.check_caches
+
+    def emit(self, issue: Issue) -> None:
+        if self.show_issues:
+            self._print(f"[{issue.category.upper()}] {issue.message}")
+
+    def close(self, summary: CountingSink) -> None:
+        if summary.skipped:
+            tiers = [tier for tier in TIERS if any(skipped.tier == tier for skipped in summary.skipped)]
+            self._print(f"\n⏭  Skipped {len(summary.skipped)} check(s) to stay within the latency budget:")
+            for skipped in summary.skipped:
+                self._print(f"  - {skipped.check} ({skipped.tier}): {skipped.reason}")
+            command = (f"python validate-template-compliance.py {self.project_args} "
+                       f"--template-type {self.template_type} --tier {','.join(tiers)}")
+            if self.check_caches:
+                command += " --check-caches"
+            if self.changed_files is not None:
+                # Changed files are relative to the project directory, the command to the working directory
+                command += "".join(f" {self.project_dir / rel_path}" for rel_path in self.changed_files)
+            self._print(f"Run them later with: {command}")
+
+        if not summary.total:
+            if summary.skipped:
+                self._print(f"\n✅ No compliance issues found by the checks that ran on {self.project_dir}")
+            else:
+                self._print(f"\n✅ Project {self.project_dir} is compliant with {self.template_type} template standards!")
+            return
+
+        self._print(f"\n❌ Found {summary.total} compliance issues:")
+        for category in ISSUE_CATEGORIES:
+            if summary.by_category.get(category):
+                self._print(f"  {category.upper()} ISSUES: {summary.by_category[category]}")
+
+        # Print summary suggestion
+        self._print("\n## NEXT STEPS")
+        self._print("Compare your project with the output the template generator renders for it to identify the specific changes needed:")
+        self._print(f"python detect-template-drift.py {self.project_args} --template-type {self.template_type} --diff")
+
+class NdjsonSink(IssueSink):
+    """Sink that writes one JSON object per line, with a summary record per project"""
+
+    def __init__(self, path: str):
+        """Initialize the sink
+
+        Args:
+            path: File to write to, or "-" for stdout
+        """
+        self.path = path
+        self.file = sys.stdout if path == "-" else open(path, "w", encoding="utf-8")
+        self.project = None
+
+    def start(self, validator: "TemplateValidator") -> None:
+        self.project = str(validator.project_dir)
+
+    def emit(self, issue: Issue) -> None:
+        import json
+
+        record = {"type": "issue", "project": self.project, **issue.to_dict()}
+        self.file.write(json.dumps(record) + "\n")
+        self.file.flush()
+
+    def close(self, summary: CountingSink) -> None:
+        import json
+
+        record = {"type": "summary", "project": self.project, **summary.to_dict()}
+        self.file.write(json.dumps(record) + "\n")
+        self.file.flush()
+
+    def finish(self) -> None:
+        if self.file is not sys.stdout:
+            self.file.close()
+
+class HistorySink(IssueSink):
+    """Sink that records each project's issues in a compliance history database"""
+
+    def __init__(self, store: "HistoryStore", run_id: int):
+        """Initialize the sink
+
+        Args:
+            store: History database, closed when the sink finishes
+            run_id: Run the results belong to
+        """
+        self.store = store
+        self.run_id = run_id
+        self.repo_run_id = None
+
+    def start(self, validator: "TemplateValidator") -> None:
+        if isinstance(validator.source, GitObjectSource):
+            repo, rev = str(Path(validator.source.git_dir).resolve()), validator.source.rev
+        else:
+            repo, rev = str(validator.project_dir.resolve()), None
+        self.repo_run_id = self.store.start_repo_run(self.run_id, repo, rev, validator.template_type)
+
+    def emit(self, issue: Issue) -> None:
+        self.store.add_issues(self.repo_run_id, [(issue.check, issue.message, issue.path)])
+
+    def close(self, summary: CountingSink) -> None:
+        self.store.finish_repo_run(self.repo_run_id, summary.total)
+
+    def finish(self) -> None:
+        self.store.close()
+
+def _task_steps(value: Any) -> Iterator[Dict[str, Any]]:
+    """Yield every task step with an inline config nested anywhere in a job plan"""
+    if isinstance(value, dict):
+        if "task" in value and isinstance(value.get("config"), dict):
+            yield value
+        for item in value.values():
+            yield from _task_steps(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _task_steps(item)
+
+def fix_task_caches(project_dir: str, verbose: bool = False) -> List[str]:
+    """Declare the missing task caches in the task.yml files of a project
+
+    The cache env vars are also resolved to absolute paths in the task scripts.
+
+    Args:
+        project_dir: Directory of the project to fix
+        verbose: Whether to print each changed file
+
+    Returns:
+        Paths of the changed files, relative to the project directory
+    """
+    from .task_caches import classify_task_file, insert_caches, missing_caches, wire_script
+
+    if not os.path.isdir(project_dir):
+        raise ValueError(f"Project directory {project_dir} does not exist")
+    source = FilesystemSource(project_dir)
+    changed = []
+    for rel_path in source.glob("ci/tasks/**/task.yml"):
+        task, script_path, kinds = classify_task_file(source, rel_path)
+        kinds = missing_caches(task, kinds)
+        if not kinds:
+            continue
+
+        updates = {rel_path: insert_caches(source.read_text(rel_path), kinds)}
+        if script_path:
+            updates[script_path] = wire_script(source.read_text(script_path), kinds)
+        for path, content in updates.items():
+            if content != source.read_text(path):
+                (Path(project_dir) / path).write_text(content)
+                changed.append(path)
+                if verbose:
+                    print(f"Declared {', '.join(kind.path for kind in kinds)} in {path}")
+    return changed
+
+class TemplateValidator:
+    """Validator for CI/CD template compliance"""
+
+    def __init__(self, project_dir: str, template_type: str, verbose: bool = False,
+                 sinks: Optional[List[IssueSink]] = None, collect: bool = True,
+                 profiler: Optional[NullProfiler] = None, source: Optional[ProjectSource] = None,
+                 blob_cache: Optional[BlobResultCache] = None, check_caches: bool = False,
+                 params: Optional["ParamsTree"] = None, foundations: Optional[List[str]] = None,
+                 budgets: Optional[Dict[str, int]] = None, tiers: Optional[Iterable[str]] = None,
+                 changed_files: Optional[Iterable[str]] = None, budget_ms: Optional[float] = None):
+        """Initialize the validator
+
+        Args:
+            project_dir: Path to the project directory to validate
+            template_type: Type of template to validate against (kustomize, helm, cli-tool)
+            verbose: Whether to print verbose output
+            sinks: Sinks that receive each issue as soon as it is found
+            collect: Whether to also keep every issue in self.issues. Disable for
+                large runs so that memory does not grow with the number of issues.
+            profiler: Profiler recording check, rule and file timings (default: disabled)
+            source: Source to read the project from (default: the project_dir working tree)
+            blob_cache: Cache of per-file check results shared between validators,
+                used when the source provides content ids (e.g. git objects)
+            check_caches: Whether to report tasks that would benefit from task caches
+            params: Params repository used to render pipelines before measuring them
+            foundations: Foundations to render pipelines for (default: every
+                foundation of params, or none)
+            budgets: Pipeline size and complexity budgets (default: DEFAULT_BUDGETS)
+            tiers: Cost tiers of the checks to run (default: all of TIERS)
+            changed_files: Changed paths relative to the project directory. Checks
+                whose files did not change are not run, and per-file checks only
+                read the changed files. Graph checks still read the whole project.
+            budget_ms: Latency budget in milliseconds. Checks are run cheapest tier
+                first, and checks or files that no longer fit are skipped and
+                recorded in self.summary.skipped.
+        """
+        self.project_dir = Path(project_dir)
+        self.template_type = template_type.lower()
+        self.verbose = verbose
+
+        if source is None:
+            if not self.project_dir.exists():
+                raise ValueError(f"Project directory {project_dir} does not exist")
+            source = FilesystemSource(project_dir)
+        self.source = source
+        self.blob_cache = blob_cache
+
+        if self.template_type not in TEMPLATE_STRUCTURES:
+            raise ValueError(f"Unknown template type: {template_type}, must be one of: {', '.join(TEMPLATE_STRUCTURES.keys())}")
+
+        self.structure = TEMPLATE_STRUCTURES[self.template_type]
+        self.issues: List[Issue] = []
+        self.summary = CountingSink()
+        self.sinks = list(sinks or [])
+        if collect:
+            self.sinks.append(CollectingSink(self.issues))
+        self.profiler = profiler or NullProfiler()
+        self.check_caches = check_caches
+        self.params = params
+        self.foundations = foundations or (list(params.foundations) if params else [])
+        self.budgets = budgets
+        self.tiers = list(tiers or TIERS)
+        self.changed_files = sorted(set(changed_files)) if changed_files is not None else None
+        self.budget_ms = budget_ms
+        # The budget starts when the validator is created, so loading params counts too
+        self.deadline = time.perf_counter() + budget_ms / 1000 if budget_ms is not None else None
+        self._documents: Dict[str, Any] = {}
+
+    def project_args(self) -> str:
+        """Get the command line arguments that select this project in the template tools"""
+        if isinstance(self.source, GitObjectSource):
+            return f"--git-dir {self.source.git_dir} --rev {self.source.rev}"
+        return f"--project-dir {self.project_dir}"
+
+    def _log(self, message: str) -> None:
+        """Log a message if verbose mode is enabled
+
+        Args:
+            message: Message to log
+        """
+        if self.verbose:
+            print(message)
+
+    def _read_text(self, rel_path: str) -> str:
+        """Read a project file, recording the bytes read when profiling
+
+        Args:
+            rel_path: Path relative to the project directory
+
+        Returns:
+            File content
+        """
+        content = self.source.read_text(rel_path)
+        self.profiler.add_bytes(rel_path, len(content))
+        return content
+
+    def _load_yaml(self, rel_path: str) -> Any:
+        """Parse a YAML file, with libyaml when it is available
+
+        Several checks read the pipelines, so parsed pipelines are shared
+        between them until iter_issues finishes; checks must not modify them.
+        Other files, such as task.yml, are read by a single check and are not
+        kept.
+
+        Args:
+            rel_path: Path relative to the project directory
+
+        Returns:
+            Parsed document
+        """
+        if rel_path in self._documents:
+            return self._documents[rel_path]
+
+        import yaml
+        loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+        document = yaml.load(self._read_text(rel_path), Loader=loader)
+        if rel_path.startswith("ci/pipelines/"):
+            self._documents[rel_path] = document
+        return document
+
+    def _remaining_ms(self) -> float:
+        """Get the time left of the latency budget, or infinity without a budget"""
+        if self.deadline is None:
+            return float("inf")
+        return (self.deadline - time.perf_counter()) * 1000
+
+    def _skip(self, check: str, reason: str) -> None:
+        """Record a check, or the rest of its files, as skipped"""
+        self.summary.skipped.append(SkippedCheck(check, CHECKS[check].tier, reason))
+
+    def _files(self, check: str, pattern: str) -> Iterator[str]:
+        """List the files a check reads, stopping when the latency budget runs out
+
+        Only the changed files matching the pattern are listed when the run is
+        limited to changed files, except for graph checks, which relate files
+        to each other.
+
+        Args:
+            check: Name of the check
+            pattern: Glob pattern of the files, e.g. "ci/tasks/**/task.yml"
+
+        Yields:
+            File paths relative to the project directory
+        """
+        if self.changed_files is not None and CHECKS[check].tier != "graph":
+            paths: Iterable[str] = (path for path in glob_paths(pattern, self.changed_files) if self.source.is_file(path))
+        else:
+            paths = self.source.glob(pattern)
+
+        for count, rel_path in enumerate(paths):
+            if self._remaining_ms() <= 0:
+                self._skip(check, f"latency budget used up after {count} of its files")
+                return
+            yield rel_path
+
+    def _check_file(self, check: str, rel_path: str, file_check) -> List[Issue]:
+        """Run a per-file check, reusing cached results for identical content
+
+        Args:
+            check: Name of the check, part of the cache key
+            rel_path: Path relative to the project directory
+            file_check: Function taking rel_path and yielding issues
+
+        Returns:
+            Issues found in the file
+        """
+        blob_id = self.source.blob_id(rel_path) if self.blob_cache is not None else None
+        if blob_id is None:
+            with self.profiler.file(rel_path):
+                return list(file_check(rel_path))
+
+        key = (check, self.template_type, rel_path, blob_id)
+        issues = self.blob_cache.get(key)
+        if issues is None:
+            with self.profiler.file(rel_path):
+                issues = list(file_check(rel_path))
+            self.blob_cache.put(key, issues)
+        else:
+            self.profiler.count("cached_files")
+        return issues
+
+    def _search(self, rule: str, pattern: str, content: str, flags: int = 0) -> Optional[re.Match]:
+        """Evaluate a rule's regular expression, timing it when profiling
+
+        Args:
+            rule: Rule name used in the profile
+            pattern: Regular expression
+            content: Text to search
+            flags: Regular expression flags
+
+        Returns:
+            Match object, or None if the pattern does not match
+        """
+        with self.profiler.rule(rule):
+            self.profiler.count("regex_evaluations")
+            return re.search(pattern, content, flags)
+
+    def validate_directory_structure(self) -> Iterator[Issue]:
+        """Validate the directory structure of the project"""
+        self._log("Validating directory structure...")
+
+        # Check required directories
+        for dir_path in self.structure["required_dirs"]:
+            if not self.source.is_dir(dir_path):
+                yield Issue("directory_structure", f"Missing required directory: {dir_path}", path=dir_path)
+
+        # Check task directories - each task should have task.yml and task.sh
+        # But only validate directories that actually exist
+        for task_dir in self.source.glob("ci/tasks/**/*"):
+            name = PurePosixPath(task_dir).name
+            # Only check leaf directories (task directories)
+            if self.source.is_dir(task_dir) and not name.startswith(".") and name not in ["common", "testing", "tkgi", "k8s", "helm", "cli-tool"]:
+                # Skip if the directory doesn't have at least one task file (may be a category directory)
+                if next(self.source.glob(f"{task_dir}/task.*"), None) is None:
+                    continue
+
+                if not self.source.exists(f"{task_dir}/task.yml"):
+                    yield Issue("directory_structure", f"Task directory {task_dir} missing task.yml", path=task_dir)
+
+                if not self.source.exists(f"{task_dir}/task.sh"):
+                    yield Issue("directory_structure", f"Task directory {task_dir} missing task.sh", path=task_dir)
+
+        # Check critical task directories
+        for task_dir in self.structure["critical_task_dirs"]:
+            if not self.source.is_dir(task_dir):
+                yield Issue("directory_structure", f"Missing critical task directory: {task_dir}", path=task_dir)
+            else:
+                # Check if task.yml and task.sh exist
+                if not self.source.exists(f"{task_dir}/task.yml"):
+                    yield Issue("directory_structure", f"Critical task {task_dir} missing task.yml", path=task_dir)
+                if not self.source.exists(f"{task_dir}/task.sh"):
+                    yield Issue("directory_structure", f"Critical task {task_dir} missing task.sh", path=task_dir)
+
+    def validate_required_files(self) -> Iterator[Issue]:
+        """Validate the presence of required files"""
+        self._log("Validating required files...")
+
+        for file_path in self.structure["required_files"]:
+            if not self.source.is_file(file_path):
+                yield Issue("required_files", f"Missing required file: {file_path}", path=file_path)
+
+    def validate_script_standards(self) -> Iterator[Issue]:
+        """Validate that scripts follow the required standards"""
+        self._log("Validating script standards...")
+
+        # Find all shell scripts, lazily so that issues are reported while traversing
+        for rel_path in self._files("script_standards", "**/*.sh"):
+            # Skip files in .git directory
+            if ".git" in rel_path or not self.source.is_file(rel_path):
+                continue
+
+            yield from self._check_file("script_standards", rel_path, self._check_script)
+
+    def _check_script(self, rel_path: str) -> Iterator[Issue]:
+        """Check a single shell script against the script standards
+
+        Args:
+            rel_path: Path relative to the project directory
+
+        Yields:
+            Issues found in the script
+        """
+        # Leading slash so that top-level directories match like nested ones
+        sh_file = PurePosixPath("/", rel_path)
+        try:
+            content = self._read_text(rel_path)
+
+            # Check if file is sourced (doesn't have a shebang)
+            # Files meant to be sourced don't need to have strict mode or script directory
+            is_sourced_file = not self._search("script_standards.sourced", r'^#!/', content, re.MULTILINE)
+
+            # Check path to detect lib files that are meant to be sourced
+            is_lib_file = "lib/" in str(sh_file)
+
+            # Check if file is a mock file (used for testing) or in tests directory
+            is_mock_file = "mock" in sh_file.name.lower() or self._search("script_standards.mock", r'mock.*function', content, re.IGNORECASE)
+            is_test_file = "/tests/" in str(sh_file) or "test_" in sh_file.name.lower()
+
+            # Check shebang, but skip for files that are meant to be sourced
+            if not is_sourced_file and not self._search("script_standards.shebang", self.structure["script_patterns"]["shebang"], content, re.MULTILINE):
+                yield Issue("script_standards", f"Script {rel_path} missing proper shebang (#!/usr/bin/env bash)", path=rel_path)
+
+            # Check strict mode, but skip for files that are meant to be sourced, mocks, or test files
+            if not is_sourced_file and not is_lib_file and not is_mock_file and not is_test_file and not self._search("script_standards.strict_mode", self.structure["script_patterns"]["strict_mode"], content, re.MULTILINE | re.DOTALL):
+                yield Issue("script_standards", f"Script {rel_path} missing strict mode (set -o errexit and set -o pipefail)", path=rel_path)
+
+            # Check script directory definition, but skip for files that are meant to be sourced, mocks, or test files
+            script_dir_pattern = r'(DIR|[A-Za-z_]+DIR|[A-Za-z_]+_DIR|SCRIPT_DIR|CURRENT_DIR)\s*=.*\$\(cd.*dirname.*BASH_SOURCE.*pwd\)'
+            if not is_sourced_file and not is_lib_file and not is_mock_file and not is_test_file and not self._search("script_standards.script_dir", script_dir_pattern, content, re.MULTILINE | re.DOTALL):
+                yield Issue("script_standards", f"Script {rel_path} missing script directory definition", path=rel_path)
+        except Exception as e:
+            yield Issue("script_standards", f"Error reading script {rel_path}: {str(e)}", path=rel_path)
+
+    def validate_fly_script(self) -> Iterator[Issue]:
+        """Validate the fly.sh script for required commands and options"""
+        self._log("Validating fly.sh script...")
+
+        fly_args = "ci/scripts/lib/parsing.sh"
+        if not self.source.exists(fly_args):
+            yield Issue("fly_script", f"Missing {fly_args}", path=fly_args)
+            return
+
+        try:
+            content = self._read_text(fly_args)
+
+            # Check for required commands
+            missing_commands = []
+            for cmd in FLY_COMMANDS:
+                # Look for evidence of command implementation
+                if not self._search("fly_script.command", rf"(cmd_{cmd}|command.*{cmd}|case.*{cmd})", content, re.MULTILINE | re.DOTALL):
+                    missing_commands.append(cmd)
+
+            if missing_commands:
+                yield Issue("fly_script", f"fly.sh missing required commands: {', '.join(missing_commands)}")
+
+            # Check for required options
+            missing_options = []
+            for opt in FLY_OPTIONS:
+                # Extract just the short and long option names
+                opt_parts = opt.split(",")
+                short_opt = opt_parts[0].strip()
+
+                # Look for evidence of option parsing - more flexible pattern
+                if not self._search("fly_script.option", rf"{short_opt}\)|{short_opt}[ \"#]|\"{short_opt.replace('-', '')}", content, re.MULTILINE):
+                    missing_options.append(opt)
+
+            if missing_options:
+                yield Issue("fly_script", f"fly.sh missing required options: {', '.join(missing_options)}")
+
+        except Exception as e:
+            yield Issue("fly_script", f"Error validating fly.sh script: {str(e)}")
+
+    def validate_pipeline_files(self) -> Iterator[Issue]:
+        """Validate pipeline YAML files for required structure"""
+        self._log("Validating pipeline files...")
+
+        pipeline_dir = "ci/pipelines"
+        if not self.source.exists(pipeline_dir):
+            yield Issue("pipeline_files", "Missing ci/pipelines directory")
+            return
+
+        main_pipeline = f"{pipeline_dir}/main.yml"
+        if not self.source.exists(main_pipeline):
+            yield Issue("pipeline_files", "Missing ci/pipelines/main.yml file")
+        else:
+            try:
+                with self.profiler.rule("pipeline_files.parse"):
+                    pipeline = self._load_yaml(main_pipeline)
+
+                # Make sure pipeline is not None (empty file)
+                if pipeline is None:
+                    yield Issue("pipeline_files", "main.yml pipeline is empty")
+                    return
+
+                # Check for groups to organize jobs
+                if "groups" not in pipeline:
+                    yield Issue("pipeline_files", "main.yml pipeline missing 'groups' section")
+
+                # Check for jobs
+                if "jobs" not in pipeline:
+                    yield Issue("pipeline_files", "main.yml pipeline missing 'jobs' section")
+
+                # Check for resources
+                if "resources" not in pipeline:
+                    yield Issue("pipeline_files", "main.yml pipeline missing 'resources' section")
+
+            except Exception as e:
+                yield Issue("pipeline_files", f"Error validating main.yml: {str(e)}")
+
+        # Check that all task references in pipelines refer to task.yml files
+        yaml_files = list(self._files("pipeline_files", f"{pipeline_dir}/*.yml"))
+        for rel_path in yaml_files:
+            yaml_file = PurePosixPath(rel_path)
+            try:
+                content = self._read_text(rel_path)
+
+                # Check for inline task definitions
+                with self.profiler.rule("pipeline_files.inline_tasks"):
+                    self.profiler.count("regex_evaluations")
+                    inline_tasks = re.findall(r"task:.*\n.*platform: linux", content, re.MULTILINE)
+                if inline_tasks:
+                    yield Issue("pipeline_files", f"{yaml_file.name} contains {len(inline_tasks)} inline task definitions instead of referencing task.yml files")
+
+            except Exception as e:
+                yield Issue("pipeline_files", f"Error checking task references in {yaml_file.name}: {str(e)}")
+
+    def validate_pipeline_budgets(self) -> Iterator[Issue]:
+        """Check the size and complexity of each pipeline, rendered for each foundation, against the budgets"""
+        from .check_load import foundation_vars, interpolate
+        from .pipeline_budget import DEFAULT_BUDGETS, METRIC_LABELS, contributors, measure_pipeline, over_budget
+
+        self._log("Validating pipeline budgets...")
+        budgets = self.budgets or DEFAULT_BUDGETS
+
+        for rel_path in self._files("pipeline_budgets", "ci/pipelines/*.yml"):
+            name = PurePosixPath(rel_path).stem
+            try:
+                with self.profiler.rule("pipeline_budgets.parse"):
+                    pipeline = self._load_yaml(rel_path)
+                if not isinstance(pipeline, dict):
+                    continue
+
+                # Report each metric once, for the foundation where it is largest
+                worst: Dict[str, Tuple[int, Any]] = {}
+                for foundation in self.foundations or [None]:
+                    rendered = pipeline
+                    if foundation:
+                        values = self.params.values(foundation) if self.params and foundation in self.params.foundations else {}
+                        rendered = interpolate(pipeline, {**values, **foundation_vars(foundation)})
+                    with self.profiler.rule("pipeline_budgets.measure"):
+                        metrics = measure_pipeline(rendered, name, foundation)
+                    self._log(f"  {rel_path}{f' ({foundation})' if foundation else ''}: "
+                              + ", ".join(f"{metric}={value}" for metric, value in metrics.values.items()))
+                    for metric, value, _ in over_budget(metrics, budgets):
+                        if metric not in worst or value > worst[metric][0]:
+                            worst[metric] = (value, metrics)
+
+                for metric, (value, metrics) in worst.items():
+                    where = f" for {metrics.foundation}" if metrics.foundation else ""
+                    top = contributors(metrics, metric)
+                    yield Issue("pipeline_budgets", f"{rel_path} pipeline has {value:,} {METRIC_LABELS[metric]}{where}, "
+                                f"over the budget of {budgets[metric]:,}"
+                                + (f"; largest jobs: {', '.join(top)}" if top else ""), path=rel_path)
+            except Exception as e:
+                yield Issue("pipeline_budgets", f"Error measuring pipeline {rel_path}: {str(e)}", path=rel_path)
+
+    def validate_set_pipeline_fanout(self) -> Iterator[Issue]:
+        """Check that set_pipeline steps across foundations are bounded and set one pipeline per foundation"""
+        from .set_pipeline_fanout import fanout_issues
+        from .generator import DEFAULTS
+
+        self._log("Validating set-pipeline fan-out...")
+
+        for rel_path in self._files("set_pipeline_fanout", "ci/pipelines/*.yml"):
+            try:
+                pipeline = self._load_yaml(rel_path)
+                for message in fanout_issues(pipeline, DEFAULTS["datacenter_pattern"]):
+                    yield Issue("set_pipeline_fanout", f"{rel_path} {message}", path=rel_path)
+            except Exception as e:
+                yield Issue("set_pipeline_fanout", f"Error checking set_pipeline steps of {rel_path}: {str(e)}", path=rel_path)
+
+    def validate_task_files(self) -> Iterator[Issue]:
+        """Validate task.yml files for required structure"""
+        self._log("Validating task files...")
+
+        for rel_path in self._files("task_files", "ci/tasks/**/task.yml"):
+            yield from self._check_file("task_files", rel_path, self._check_task_file)
+
+    def _check_task_file(self, rel_path: str) -> Iterator[Issue]:
+        """Check a single task.yml file for required structure
+
+        Args:
+            rel_path: Path relative to the project directory
+
+        Yields:
+            Issues found in the task file
+        """
+        task_yml = PurePosixPath(rel_path)
+        try:
+            with self.profiler.rule("task_files.parse"):
+                task = self._load_yaml(rel_path)
+
+            # Check for platform: linux
+            if task.get("platform") != "linux":
+                yield Issue("task_files", f"{rel_path} missing or incorrect 'platform: linux'", path=rel_path)
+
+            # Check for inputs
+            if "inputs" not in task:
+                yield Issue("task_files", f"{rel_path} missing 'inputs' section", path=rel_path)
+
+            # Check for run section
+            if "run" not in task:
+                yield Issue("task_files", f"{rel_path} missing 'run' section", path=rel_path)
+            else:
+                # Check that run.path points to task.sh in the same directory
+                run_path = task["run"].get("path", "")
+                if not run_path.endswith(f"{task_yml.parent.name}/task.sh"):
+                    yield Issue("task_files", f"{rel_path} run.path doesn't point to task.sh in the correct location", path=rel_path)
+
+        except Exception as e:
+            yield Issue("task_files", f"Error validating {rel_path}: {str(e)}", path=rel_path)
+
+    def validate_task_caches(self) -> Iterator[Issue]:
+        """Report tasks that refetch dependencies a task cache would keep on the worker"""
+        from .task_caches import classify_task, classify_task_file, inline_script, missing_caches
+
+        self._log("Validating task caches...")
+
+        # Results depend on the task scripts too, so they are not cached per task.yml blob
+        for rel_path in self._files("task_caches", "ci/tasks/**/task.yml"):
+            try:
+                with self.profiler.file(rel_path):
+                    task, _, kinds = classify_task_file(self.source, rel_path)
+                for kind in missing_caches(task, kinds):
+                    yield Issue("task_caches", f"{rel_path} refetches {kind.description} on every build; "
+                                f"declare a '{kind.path}' task cache and {', '.join(kind.env)}", path=rel_path)
+            except Exception as e:
+                yield Issue("task_caches", f"Error checking task caches of {rel_path}: {str(e)}", path=rel_path)
+
+        # Inline task configs cannot be fixed in place, they have to move to a task.yml first
+        for rel_path in self._files("task_caches", "ci/pipelines/*.yml"):
+            try:
+                pipeline = self._load_yaml(rel_path) or {}
+                for job in pipeline.get("jobs") or []:
+                    for step in _task_steps(job.get("plan")):
+                        for kind in missing_caches(step["config"], classify_task(step["config"], inline_script(step["config"]))):
+                            yield Issue("task_caches", f"{rel_path} task '{step['task']}' of job '{job.get('name')}' "
+                                        f"refetches {kind.description} on every build; move it to a task.yml "
+                                        f"with a '{kind.path}' task cache", path=rel_path)
+            except Exception as e:
+                yield Issue("task_caches", f"Error checking task caches of {rel_path}: {str(e)}", path=rel_path)
+
+    def validate_test_framework(self) -> Iterator[Issue]:
+        """Validate the test framework implementation"""
+        self._log("Validating test framework...")
+
+        if not self.source.exists("ci/scripts/tests/test-framework.sh"):
+            yield Issue("test_framework", "Missing test framework (ci/scripts/tests/test-framework.sh)")
+
+        if not self.source.exists("ci/scripts/tests/run_tests.sh"):
+            yield Issue("test_framework", "Missing test runner (ci/scripts/tests/run_tests.sh)")
+
+        # Check for test files
+        test_files = list(self.source.glob("ci/scripts/tests/test_*.sh"))
+        if not test_files:
+            yield Issue("test_framework", "No test files found (ci/scripts/tests/test_*.sh)")
+
+        # Check that test files use the test framework
+        for rel_path in test_files:
+            try:
+                content = self._read_text(rel_path)
+
+                if not self._search("test_framework.source", r"source.*test-framework\.sh", content, re.MULTILINE):
+                    yield Issue("test_framework", f"Test file {rel_path} doesn't source the test framework", path=rel_path)
+
+                # Check for test functions and assertions
+                if not self._search("test_framework.functions", r"function test_", content, re.MULTILINE):
+                    yield Issue("test_framework", f"Test file {rel_path} doesn't contain test functions", path=rel_path)
+
+                if not self._search("test_framework.assertions", r"assert_", content, re.MULTILINE):
+                    yield Issue("test_framework", f"Test file {rel_path} doesn't contain assertions", path=rel_path)
+
+            except Exception as e:
+                yield Issue("test_framework", f"Error checking test file {rel_path}: {str(e)}", path=rel_path)
+
+    def iter_issues(self) -> Iterator[Issue]:
+        """Run all validation checks, yielding issues as they are found
+
+        Yields:
+            Issues found during validation
+        """
+        self._log(f"Validating project at {self.project_dir} against {self.template_type} template standards...")
+
+        checks = [
+            self.validate_directory_structure,
+            self.validate_required_files,
+            self.validate_script_standards,
+            self.validate_fly_script,
+            self.validate_pipeline_files,
+            self.validate_pipeline_budgets,
+            self.validate_set_pipeline_fanout,
+            self.validate_task_files,
+            # self.validate_test_framework,
+        ]
+        if self.check_caches:
+            checks.append(self.validate_task_caches)
+
+        # Cheapest tiers first, so a latency budget is spent on as many checks as possible
+        checks.sort(key=lambda check: TIERS.index(CHECKS[check.__name__[len("validate_"):]].tier))
+
+        try:
+            for check in checks:
+                name = check.__name__[len("validate_"):]
+                spec = CHECKS[name]
+                if spec.tier not in self.tiers:
+                    continue
+                if self.changed_files is not None and spec.scope and \
+                        not any(next(glob_paths(pattern, self.changed_files), None) for pattern in spec.scope):
+                    # None of the files the check reads changed
+                    continue
+                if self._remaining_ms() < TIER_ESTIMATES_MS[spec.tier]:
+                    self._skip(name, f"needs about {TIER_ESTIMATES_MS[spec.tier]:.0f}ms, "
+                                     f"{max(0.0, self._remaining_ms()):.0f}ms of the latency budget left")
+                    continue
+                yield from self.profiler.iterate(check.__name__, check())
+        finally:
+            # The parsed pipelines are only shared within one run
+            self._documents.clear()
+
+    def validate(self) -> List[Issue]:
+        """Run all validation checks, streaming each issue to the sinks
+
+        The issue counts in self.summary are updated as issues are found, so
+        the exit code and summary do not depend on keeping the issues around.
+
+        Returns:
+            List of issues found during validation (empty if collect is disabled)
+        """
+        for sink in self.sinks:
+            sink.start(self)
+
+        try:
+            for issue in self.iter_issues():
+                self.summary.emit(issue)
+                for sink in self.sinks:
+                    sink.emit(issue)
+        finally:
+            for sink in self.sinks:
+                sink.close(self.summary)
+
+        return self.issues
+
+    def print_report(self) -> None:
+        """Print a compliance report grouped by category
+
+        Requires the validator to have been created with collect enabled.
+        """
+        if not self.issues:
+            print(f"\n✅ Project {self.project_dir} is compliant with {self.template_type} template standards!")
+            return
+
+        print(f"\n❌ Found {len(self.issues)} compliance issues:")
+
+        # Group issues by category
+        categories = {category: [] for category in ISSUE_CATEGORIES}
+        for issue in self.issues:
+            categories[issue.category].append(issue)
+
+        # Print issues by category
+        for category, issues in categories.items():
+            if issues:
+                print(f"\n## {category.upper()} ISSUES ({len(issues)})")
+                for idx, issue in enumerate(issues, 1):
+                    print(f"{idx}. {issue}")
+
+        # Print summary suggestion
+        print("\n## NEXT STEPS")
+        print("Compare your project with the output the template generator renders for it to identify the specific changes needed:")
+        print(f"python detect-template-drift.py {self.project_args()} --template-type {self.template_type} --diff")
+
+def parse_args() -> Dict[str, Any]:
+    """Parse command line arguments
+
+    Returns:
+        Dictionary of argument values
+    """
+    parser = argparse.ArgumentParser(
+        description="Validate a project against reference template standards"
+    )
+
+    project = parser.add_mutually_exclusive_group(required=True)
+
+    project.add_argument(
+        "--project-dir",
+        help="Directory of the project to validate"
+    )
+
+    project.add_argument(
+        "--git-dir",
+        action="append",
+        help="Local bare or mirrored repository to validate without a checkout (repeatable)"
+    )
+
+    parser.add_argument(
+        "--rev",
+        action="append",
+        help="Commit, branch or tag to validate with --git-dir (repeatable, default: HEAD)"
+    )
+
+    parser.add_argument(
+        "--template-type",
+        choices=["kustomize", "helm", "cli-tool"],
+        default="kustomize",
+        help="Type of template to validate against (default: kustomize)"
+    )
+
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Print verbose validation information"
+    )
+
+    parser.add_argument(
+        "--check-caches",
+        action="store_true",
+        help="Also report tasks that refetch go modules, pip packages, helm charts or binaries on every build"
+    )
+
+    parser.add_argument(
+        "--fix-caches",
+        action="store_true",
+        help="Declare the missing task caches in task.yml files and their scripts before validating (implies --check-caches)"
+    )
+
+    parser.add_argument(
+        "--params-dir",
+        help="Params repository used to render pipelines before checking their size and complexity budgets"
+    )
+
+    parser.add_argument(
+        "--foundation",
+        action="append",
+        help="Foundation to render pipelines for (repeatable, default: every foundation of --params-dir)"
+    )
+
+    parser.add_argument(
+        "--pipeline-budget",
+        action="append",
+        default=[],
+        help="Pipeline budget as NAME=VALUE, e.g. jobs=30 (repeatable; names: config_bytes, jobs, steps, "
+             "resources, resource_types, passed_fan_in)"
+    )
+
+    parser.add_argument(
+        "--tier",
+        action="append",
+        help=f"Cost tiers of the checks to run, comma-separated or repeatable (tiers: {', '.join(TIERS)}; default: all)"
+    )
+
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        help="Latency budget in milliseconds; checks and files that do not fit are skipped and listed to run later"
+    )
+
+    parser.add_argument(
+        "files",
+        nargs="*",
+        help="Changed files, as passed by a pre-commit hook; only the checks reading them are run (requires --project-dir)"
+    )
+
+    parser.add_argument(
+        "--ndjson-file",
+        help="Also stream issues as newline-delimited JSON to this file ('-' for stdout)"
+    )
+
+    parser.add_argument(
+        "--history-db",
+        help="Also record the results in this SQLite compliance history database (see compliance-history.py)"
+    )
+
+    parser.add_argument(
+        "--summary-only",
+        action="store_true",
+        help="Only print issue counts instead of each issue"
+    )
+
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print wall/CPU time per check, rule and the slowest files to stderr"
+    )
+
+    parser.add_argument(
+        "--profile-trace",
+        help="Write a Chrome trace-event JSON file (implies --profile)"
+    )
+
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=10,
+        help="Number of slowest files to report when profiling (default: 10)"
+    )
+
+    args = parser.parse_args()
+
+    if args.rev and not args.git_dir:
+        parser.error("--rev requires --git-dir")
+    if args.fix_caches and not args.project_dir:
+        parser.error("--fix-caches requires --project-dir")
+
+    if args.files and not args.project_dir:
+        parser.error("Changed files require --project-dir")
+    if args.budget_ms is not None and args.budget_ms <= 0:
+        parser.error("--budget-ms must be positive")
+
+    tiers = None
+    if args.tier:
+        tiers = [tier.strip() for value in args.tier for tier in value.split(",") if tier.strip()]
+        unknown = [tier for tier in tiers if tier not in TIERS]
+        if unknown:
+            parser.error(f"Unknown tier {', '.join(unknown)}, choose from {', '.join(TIERS)}")
+
+    # Changed files are given relative to the working directory, like pre-commit does
+    changed_files = None
+    if args.files:
+        changed_files = []
+        for path in args.files:
+            rel_path = os.path.relpath(os.path.abspath(path), os.path.abspath(args.project_dir))
+            if rel_path == ".." or rel_path.startswith(".." + os.sep):
+                parser.error(f"Changed file {path} is outside {args.project_dir}")
+            changed_files.append(PurePosixPath(*Path(rel_path).parts).as_posix())
+
+    budgets = None
+    if args.pipeline_budget:
+        from .pipeline_budget import parse_budgets
+        try:
+            budgets = parse_budgets(args.pipeline_budget)
+        except ValueError as e:
+            parser.error(str(e))
+
+    # Convert to dictionary for return
+    return {
+        "project_dir": args.project_dir,
+        "git_dirs": args.git_dir or [],
+        "revs": args.rev or ["HEAD"],
+        "template_type": args.template_type,
+        "verbose": args.verbose,
+        "check_caches": args.check_caches or args.fix_caches,
+        "fix_caches": args.fix_caches,
+        "params_dir": args.params_dir,
+        "foundations": args.foundation or [],
+        "budgets": budgets,
+        "tiers": tiers,
+        "changed_files": changed_files,
+        "budget_ms": args.budget_ms,
+        "ndjson_file": args.ndjson_file,
+        "history_db": args.history_db,
+        "summary_only": args.summary_only,
+        "profile": args.profile or bool(args.profile_trace),
+        "profile_trace": args.profile_trace,
+        "profile_top": args.profile_top
+    }
+
+def validate_git_repositories(git_dirs: List[str], revs: List[str], options: Dict[str, Any]) -> int:
+    """Validate commits of local repositories straight from their object stores
+
+    One `git cat-file --batch` process is kept per repository, and per-file
+    results are shared between all repositories and commits, so blobs that are
+    identical across branches or repositories are only checked once.
+
+    Args:
+        git_dirs: Paths to bare or mirrored repositories
+        revs: Commits, branches or tags to validate in each repository
+        options: Keyword arguments for TemplateValidator
+
+    Returns:
+        Total number of issues found
+    """
+    blob_cache = BlobResultCache()
+    total = 0
+
+    for git_dir in git_dirs:
+        cat_file = GitCatFile(git_dir)
+        try:
+            for rev in revs:
+                source = GitObjectSource(git_dir, rev, cat_file=cat_file)
+                validator = TemplateValidator(
+                    project_dir=source.label,
+                    source=source,
+                    blob_cache=blob_cache,
+                    **options
+                )
+                validator.validate()
+                total += validator.summary.total
+        finally:
+            cat_file.close()
+
+    if options["verbose"]:
+        print(f"Checked {blob_cache.misses} unique files, reused results for {blob_cache.hits}")
+
+    return total
+
+def main():
+    """Main entry point"""
+    args = parse_args()
+
+    # Stream issues as they are found instead of collecting them
+    sinks = []
+    if args["ndjson_file"] != "-":
+        sinks.append(ConsoleSink(show_issues=not args["summary_only"]))
+    if args["ndjson_file"]:
+        sinks.append(NdjsonSink(args["ndjson_file"]))
+    history = None
+    if args["history_db"]:
+        from .compliance_history import HistoryStore
+        store = HistoryStore(args["history_db"])
+        history = HistorySink(store, store.start_run(args["template_type"], " ".join(sys.argv)))
+        sinks.append(history)
+
+    profiler = None
+    if args["profile"]:
+        from .template_profiler import Profiler
+        profiler = Profiler("validate-template-compliance")
+
+    options = {
+        "template_type": args["template_type"],
+        "verbose": args["verbose"],
+        "check_caches": args["check_caches"],
+        "foundations": args["foundations"],
+        "budgets": args["budgets"],
+        "tiers": args["tiers"],
+        "budget_ms": args["budget_ms"],
+        "sinks": sinks,
+        "collect": False,
+        "profiler": profiler
+    }
+
+    try:
+        if args["params_dir"]:
+            from .params_coverage import ParamsTree
+            options["params"] = ParamsTree.load(args["params_dir"], args["foundations"] or None)
+
+        if args["fix_caches"]:
+            changed = fix_task_caches(args["project_dir"], args["verbose"])
+            print(f"Declared task caches in {len(changed)} file(s)", file=sys.stderr)
+
+        if args["git_dirs"]:
+            total = validate_git_repositories(args["git_dirs"], args["revs"], options)
+        else:
+            validator = TemplateValidator(project_dir=args["project_dir"], changed_files=args["changed_files"], **options)
+            validator.validate()
+            total = validator.summary.total
+
+        # Only completed runs are used by the history queries
+        if history:
+            history.store.finish_run(history.run_id)
+
+        if profiler:
+            profiler.print_summary(args["profile_top"])
+            if args["profile_trace"]:
+                profiler.write_trace(args["profile_trace"], args["profile_top"])
+                print(f"Profile trace written to {args['profile_trace']}", file=sys.stderr)
+
+    except Exception as e:
+        print(f"Error during validation: {str(e)}")
+        sys.exit(1)
+    finally:
+        for sink in sinks:
+            sink.finish()
+
+    # Exit with non-zero code if issues were found
+    if total:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Check Load Tests
+
+This script checks template_tools.check_load against a small pipeline set for
+two foundations: which resources are checked, how often, which resource
+configs the foundations share, and which check_every and webhook changes are
+suggested.
+
+Usage:
+    python test-check-load.py
+
+Author: CI/CD Platform Team
+"""
+
+import os
+import sys
+from pathlib import Path
+from typing import List
+
+import yaml
+
+SCRIPT_DIR = Path(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from template_tools.check_load import (FleetForecast, ResourceLoad, format_duration, foundation_vars, interpolate,
+                                       parse_duration, pipeline_loads)
+from tool_checks import expect, run_checks
+
+PIPELINE = yaml.safe_load("""---
+resources:
+  - name: repo
+    type: git
+    webhook_token: ((webhook_token))
+    source:
+      uri: ((git_uri))
+      branch: main
+  - name: params
+    type: git
+    source:
+      uri: ((params_uri))
+      paths: [((foundation_path))]
+  - name: nightly
+    type: time
+    source:
+      interval: 3h
+  - name: image
+    type: registry-image
+    check_every: never
+    source:
+      repository: registry.example.com/app
+  - name: notify
+    type: slack-notification
+    source:
+      url: ((slack_url))
+jobs:
+  - name: deploy
+    plan:
+      - in_parallel:
+          - get: repo
+            trigger: true
+          - get: params
+          - get: nightly
+            trigger: true
+          - get: app-image
+            resource: image
+      - put: notify
+""")
+
+VARIABLES = {"git_uri": "git@example.com:demo.git", "params_uri": "git@example.com:params.git"}
+
+FOUNDATIONS = ["cml-k8s-n-01", "cml-k8s-n-02"]
+
+def fleet_loads() -> List[ResourceLoad]:
+    """Get the loads of the pipeline set for every foundation"""
+    loads = []
+    for foundation in FOUNDATIONS:
+        loads.extend(pipeline_loads(PIPELINE, {**VARIABLES, **foundation_vars(foundation)}, "demo", "main", foundation))
+    return loads
+
+def check_durations() -> None:
+    """Go durations are parsed and formatted"""
+    expect(parse_duration("1h30m"), 5400.0, "1h30m")
+    expect(parse_duration("90s"), 90.0, "90s")
+    expect(parse_duration("3 hours"), None, "an invalid duration")
+    expect(format_duration(5400), "1h30m", "5400 seconds")
+    expect(format_duration(0), "0s", "0 seconds")
+
+def check_interpolate() -> None:
+    """A whole ((var)) keeps its type, fields are followed and unknown vars stay in place"""
+    variables = {"replicas": 3, "registry": {"host": "registry.example.com"}}
+    expect(interpolate("((replicas))", variables), 3, "a whole var")
+    expect(interpolate("((registry.host))/app", variables), "registry.example.com/app", "a var field in text")
+    expect(interpolate("((unknown))", variables), "((unknown))", "an unknown var")
+    expect(interpolate("echo $((1 + 2))", variables), "echo $((1 + 2))", "shell arithmetic")
+
+def check_pipeline_loads() -> None:
+    """Only fetched resources are checked, at their check_every or the default"""
+    loads = {load.name: load for load in pipeline_loads(PIPELINE, VARIABLES, "demo", "main", "cml-k8s-n-01")}
+    expect(sorted(loads), ["image", "nightly", "params", "repo"], "checked resources (notify is only put)")
+    expect(loads["repo"].check_every, 60.0, "check_every of repo")
+    expect(loads["repo"].webhook, True, "webhook of repo")
+    expect(loads["params"].webhook, False, "webhook of params")
+    expect(loads["image"].check_every, None, "check_every of image (never)")
+    expect(loads["image"].checks_per_minute, 0.0, "checks per minute of image")
+    expect(loads["nightly"].interval, 10800.0, "interval of nightly")
+
+def check_shared_configs() -> None:
+    """Resources with the same interpolated config are checked once across foundations"""
+    forecast = FleetForecast(fleet_loads())
+    expect(forecast.checks_per_minute, 6.0, "checks per minute")
+    expect(forecast.shared_checks_per_minute, 4.0, "checks per minute with shared configs")
+    expect([[load.id for load in group] for group in forecast.shared_configs()],
+           [["demo:main[cml-k8s-n-01].nightly", "demo:main[cml-k8s-n-02].nightly"],
+            ["demo:main[cml-k8s-n-01].repo", "demo:main[cml-k8s-n-02].repo"]], "shared configs")
+    expect(forecast.by_pipeline(), {"demo:main": 6.0}, "checks per minute by pipeline")
+
+def check_suggestions() -> None:
+    """Slower checks are suggested, with a webhook only where the resource has no webhook_token"""
+    forecast = FleetForecast(fleet_loads())
+    suggestions = {entry["resource"]: entry for entry in forecast.suggestions()}
+    expect(sorted(suggestions), ["demo:main.nightly", "demo:main.params", "demo:main.repo"], "suggested resources")
+
+    expect(suggestions["demo:main.repo"]["suggested_check_every"], "1h", "suggestion for repo")
+    expect(suggestions["demo:main.repo"]["needs_webhook"], False, "repo already has a webhook_token")
+    expect(suggestions["demo:main.params"]["suggested_check_every"], "1h", "suggestion for params")
+    expect(suggestions["demo:main.params"]["needs_webhook"], True, "params has no webhook_token")
+    expect(suggestions["demo:main.nightly"]["suggested_check_every"], "18m", "suggestion for a 3h timer")
+    expect(suggestions["demo:main.nightly"]["needs_webhook"], False, "a time resource needs no webhook")
+    expect(round(suggestions["demo:main.repo"]["checks_saved_per_minute"], 3), 1.967, "checks saved for repo")
+    expect(round(forecast.tuned_checks_per_minute, 3), 0.106, "checks per minute with the suggestions")
+
+CHECKS = [
+    check_durations,
+    check_interpolate,
+    check_pipeline_loads,
+    check_shared_configs,
+    check_suggestions,
+]
+
+def main():
+    """Main entry point"""
+    run_checks("check load", CHECKS)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Compliance History Tests
+
+This script checks template_tools.compliance_history against a small history
+of runs stored in a temporary database: how issue messages are reduced to
+rules, the top failing rules, the compliance rate per template type, the
+regressions between two runs, and that unfinished runs are never queried.
+
+Usage:
+    python test-compliance-history.py
+
+Author: CI/CD Platform Team
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import List, Tuple
+
+SCRIPT_DIR = Path(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from template_tools.compliance_history import HistoryStore, rule_template
+from tool_checks import expect, run_checks, temp_tree
+
+STRICT_MODE = "script_standards"
+TASKS = "task_structure"
+
+def strict_mode_issue(path: str) -> Tuple[str, str, str]:
+    """Build a strict mode issue of a script"""
+    return STRICT_MODE, f"Script {path} missing strict mode (set -o errexit)", path
+
+def record_run(store: HistoryStore, results: List[Tuple[str, str, List[Tuple[str, str, str]]]],
+               finish: bool = True) -> int:
+    """Record a run of (repo, template type, issues) results"""
+    run_id = store.start_run("kustomize", "validate-template-compliance.py --batch repos.txt")
+    for repo, template_type, issues in results:
+        repo_run = store.start_repo_run(run_id, repo, None, template_type)
+        store.add_issues(repo_run, issues)
+        store.finish_repo_run(repo_run, len(issues))
+    if finish:
+        store.finish_run(run_id)
+    return run_id
+
+def open_history(work_dir: Path) -> Tuple[HistoryStore, int, int]:
+    """Record two finished runs and one unfinished run
+
+    svc-b regresses on strict mode and svc-a gains a task issue between the
+    two finished runs; svc-c is only validated in the second one. The issues
+    of the unfinished run fill a batch, so they are written to the database.
+    """
+    store = HistoryStore(str(work_dir / "compliance.db"), batch_size=2)
+    base = record_run(store, [
+        ("svc-a", "kustomize", [strict_mode_issue("ci/scripts/fly.sh")]),
+        ("svc-b", "kustomize", []),
+    ])
+    current = record_run(store, [
+        ("svc-a", "kustomize", [strict_mode_issue("ci/scripts/fly.sh"),
+                                (TASKS, "Task ci/tasks/deploy/task.yml has 12 params", "ci/tasks/deploy/task.yml")]),
+        ("svc-b", "kustomize", [strict_mode_issue("ci/scripts/helpers.sh")]),
+        ("svc-c", "helm", [strict_mode_issue("ci/scripts/fly.sh")]),
+    ])
+    record_run(store, [("svc-b", "kustomize", [strict_mode_issue("ci/scripts/a.sh"), strict_mode_issue("ci/scripts/b.sh")])],
+               finish=False)
+    return store, base, current
+
+def check_rule_template(work_dir: Path) -> None:
+    """Issue messages are reduced to their rule by replacing the path, numbers and error details"""
+    expect(rule_template("Script ci/fly.sh missing strict mode (set -o errexit)", "ci/fly.sh"),
+           "Script {path} missing strict mode (set -o errexit)", "strict mode message")
+    expect(rule_template("Task ci/tasks/x/task.yml has 12 params", "ci/tasks/x/task.yml"),
+           "Task {path} has {n} params", "message with a count")
+    expect(rule_template("Error reading ci/x.yml: [Errno 2] No such file", "ci/x.yml"),
+           "Error reading {path}: {error}", "error message")
+
+def check_latest_run(work_dir: Path) -> None:
+    """The latest run is the latest finished one"""
+    store, base, current = open_history(work_dir)
+    expect(store.latest_run(), current, "latest run")
+    expect(store.latest_run(before=current), base, "latest run before the current one")
+    expect([(run["run"], run["repos"], run["compliant"], run["issues"]) for run in store.runs()],
+           [(current + 1, 1, 0, 2), (current, 3, 0, 4), (base, 2, 1, 1)], "runs")
+
+    eight_days_ago = (datetime.now(timezone.utc) - timedelta(days=8)).isoformat(timespec="seconds")
+    with store.connection:
+        store.connection.execute("UPDATE runs SET started_at = ? WHERE id = ?", (eight_days_ago, base))
+    expect(store.run_before(current, days=7), base, "run a week before the current one")
+    expect(store.run_before(current, days=10), None, "run ten days before the current one")
+    store.close()
+
+def check_top_rules(work_dir: Path) -> None:
+    """Rules are ranked by the repos they fail in, without unfinished runs"""
+    store, base, current = open_history(work_dir)
+    expect(store.top_rules(run_id=current), [
+        {"check": STRICT_MODE, "rule": "Script {path} missing strict mode (set -o errexit)", "repos": 3, "issues": 3},
+        {"check": TASKS, "rule": "Task {path} has {n} params", "repos": 1, "issues": 1},
+    ], "top rules of the current run")
+    expect([(rule["rule"], rule["repos"], rule["issues"]) for rule in store.top_rules()],
+           [("Script {path} missing strict mode (set -o errexit)", 3, 4), ("Task {path} has {n} params", 1, 1)],
+           "top rules of every finished run")
+    expect([rule["repos"] for rule in store.top_rules(template_type="helm")], [1], "top rules of helm repos")
+    store.close()
+
+def check_compliance_rate(work_dir: Path) -> None:
+    """The compliance rate is the share of repo runs without issues, per template type"""
+    store, base, current = open_history(work_dir)
+    expect(store.compliance_rate(run_id=base),
+           [{"template_type": "kustomize", "repo_runs": 2, "compliant": 1, "rate": 0.5}], "rate of the base run")
+    expect(store.compliance_rate(), [
+        {"template_type": "helm", "repo_runs": 1, "compliant": 0, "rate": 0.0},
+        {"template_type": "kustomize", "repo_runs": 4, "compliant": 1, "rate": 0.25},
+    ], "rate of every finished run")
+    store.close()
+
+def check_regressions(work_dir: Path) -> None:
+    """Only issues a repo did not have in the base run are regressions"""
+    store, base, current = open_history(work_dir)
+    expect([(entry["repo"], entry["rule"], entry["path"]) for entry in store.regressions(base, current)], [
+        ("svc-a", "Task {path} has {n} params", "ci/tasks/deploy/task.yml"),
+        ("svc-b", "Script {path} missing strict mode (set -o errexit)", "ci/scripts/helpers.sh"),
+    ], "regressions (svc-c has no base result)")
+    expect([entry["repo"] for entry in store.regressions(base, current, rule="Script * strict mode*")], ["svc-b"],
+           "regressions of the strict mode rule")
+    store.close()
+
+CHECKS = [
+    check_rule_template,
+    check_latest_run,
+    check_top_rules,
+    check_compliance_rate,
+    check_regressions,
+]
+
+def main():
+    """Main entry point"""
+    run_checks("compliance history", CHECKS, lambda: temp_tree({}, "compliance-history-"))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Image Inventory Tests
+
+This script checks template_tools.image_inventory against a small project
+written to a temporary directory: how image references are parsed, which
+tags are mutable, the cold pulls and cache misses per build, and the pin,
+converge, share and registry-image suggestions.
+
+Usage:
+    python test-image-inventory.py
+
+Author: CI/CD Platform Team
+"""
+
+import os
+import sys
+from pathlib import Path
+
+SCRIPT_DIR = Path(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from template_tools.image_inventory import ImageInventory, image_ref
+from template_tools.project_sources import FilesystemSource
+from tool_checks import expect, run_checks, temp_tree
+
+PROJECT_FILES = {
+    "ci/tasks/build/task.yml": """---
+platform: linux
+image_resource:
+  type: registry-image
+  source:
+    repository: golang
+run:
+  path: repo/ci/tasks/build/task.sh
+""",
+    "ci/tasks/test/task.yml": """---
+platform: linux
+image_resource:
+  type: registry-image
+  source:
+    repository: docker.io/library/golang:1.22
+run:
+  path: repo/ci/tasks/test/task.sh
+""",
+    "ci/pipelines/main.yml": """---
+resource_types:
+  - name: slack-notification
+    type: docker-image
+    source:
+      repository: cfcommunity/slack-notification-resource
+      tag: v1.7.0
+resources:
+  - name: helm-image
+    type: registry-image
+    source:
+      repository: alpine/helm@sha256:0123abcd
+  - name: tools-image
+    type: registry-image
+    source:
+      repository: ((registry))/tools
+      tag: stable
+jobs:
+  - name: build
+    plan:
+      - task: build
+        file: repo/ci/tasks/build/task.yml
+      - in_parallel:
+          - task: unit
+            file: repo/ci/tasks/build/task.yml
+          - task: lint
+            config:
+              platform: linux
+              image_resource:
+                type: registry-image
+                source: {repository: python, tag: 3.12-slim}
+              run: {path: yamllint}
+  - name: deploy
+    plan:
+      - get: helm-image
+      - task: deploy
+        image: helm-image
+        file: repo/ci/tasks/deploy/task.yml
+      - task: test
+        file: repo/ci/tasks/test/task.yml
+""",
+}
+
+def load_inventory(work_dir: Path) -> ImageInventory:
+    """Index the project of a work directory"""
+    inventory = ImageInventory()
+    inventory.add_source(FilesystemSource(str(work_dir)), "demo")
+    return inventory
+
+def ref_of(repository: str, tag: str = "", config_type: str = "registry-image"):
+    """Parse the image of a registry-image source"""
+    return image_ref("demo", "ci/pipelines/main.yml", "resources.image", "resource",
+                     {"type": config_type, "source": {"repository": repository, "tag": tag}})
+
+def check_image_ref(work_dir: Path) -> None:
+    """Tags and digests are split off the repository, Docker Hub prefixes are dropped"""
+    expect(ref_of("docker.io/library/golang:1.22").image, "golang:1.22", "a Docker Hub image with a tag")
+    expect(ref_of("alpine/helm@sha256:0123abcd").image, "alpine/helm@sha256:0123abcd", "an image with a digest")
+    expect(ref_of("registry.example.com:5000/app").image, "registry.example.com:5000/app:latest",
+           "a registry with a port and no tag")
+    expect(ref_of("golang", "1.22").mutable, False, "a version tag")
+    expect(ref_of("golang", "latest").mutable, True, "latest")
+    expect(ref_of("golang", "alpine").mutable, True, "a tag without a version")
+    expect(ref_of("((registry))/tools", "stable").mutable, False, "an unresolved repository")
+    expect(ref_of("golang", "1.22", "git"), None, "a git resource")
+
+def check_images(work_dir: Path) -> None:
+    """Images are indexed from task files, inline configs, resources and resource types"""
+    inventory = load_inventory(work_dir)
+    expect(list(inventory.images()), [
+        "((registry))/tools:stable",
+        "alpine/helm@sha256:0123abcd",
+        "cfcommunity/slack-notification-resource:v1.7.0",
+        "golang:1.22",
+        "golang:latest",
+        "python:3.12-slim",
+    ], "images")
+    expect([ref.id for ref in inventory.mutable()], ["demo:ci/tasks/build/task.yml:image_resource"],
+           "mutable references")
+    expect(inventory.cold_pulls(workers=3), 18, "cold pulls for 3 workers")
+
+def check_task_runs(work_dir: Path) -> None:
+    """Each job build misses the cache once per mutable image its tasks fetch themselves"""
+    inventory = load_inventory(work_dir)
+    expect([(run.job, run.task, run.image.image if run.image else None, run.shared) for run in inventory.runs], [
+        ("build", "build", "golang:latest", False),
+        ("build", "unit", "golang:latest", False),
+        ("build", "lint", "python:3.12-slim", False),
+        ("deploy", "deploy", None, True),
+        ("deploy", "test", "golang:1.22", False),
+    ], "task runs")
+    expect(inventory.misses_per_build(), {"demo:main/build": 1, "demo:main/deploy": 0}, "misses per build")
+
+def check_suggestions(work_dir: Path) -> None:
+    """Mutable tags are pinned, versions converged, repeated images shared and docker-image replaced"""
+    suggestions = load_inventory(work_dir).suggestions()
+    expect([(entry["action"], entry["image"], entry["references"]) for entry in suggestions], [
+        ("pin", "golang", ["demo:ci/tasks/build/task.yml:image_resource"]),
+        ("converge", "golang", ["demo:ci/tasks/build/task.yml:image_resource"]),
+        ("share", "golang:latest", ["demo:main/build/build", "demo:main/build/unit"]),
+        ("registry-image", "docker-image", ["demo:ci/pipelines/main.yml:resource_types.slack-notification"]),
+    ], "suggestions")
+    expect(suggestions[1]["message"], "use golang:1.22 for all 2 references to golang (2 versions in use)",
+           "converge message")
+
+CHECKS = [
+    check_image_ref,
+    check_images,
+    check_task_runs,
+    check_suggestions,
+]
+
+def main():
+    """Main entry point"""
+    run_checks("image inventory", CHECKS, lambda: temp_tree(PROJECT_FILES, "image-inventory-"))
+
+if __name__ == "__main__":
+    main()
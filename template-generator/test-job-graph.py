@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Job Graph Tests
+
+This script checks template_tools.job_graph against a small pipeline with
+recorded durations: the critical path, the maximum parallelism, the redundant
+and unused passed: constraints, and that promotion gates are not reported.
+
+Usage:
+    python test-job-graph.py
+
+Author: CI/CD Platform Team
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import yaml
+
+SCRIPT_DIR = Path(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from template_tools.job_graph import Durations, JobGraph, format_seconds
+from tool_checks import expect, run_checks
+
+# build -> validate -> deploy -> smoke/report, with docs on its own.
+# deploy waits for validate through repo, which validate only gets: a gate.
+# deploy also waits for build through config, which build never uses and
+# validate already implies; report waits for deploy through metrics only.
+PIPELINE = yaml.safe_load("""---
+jobs:
+  - name: build
+    plan:
+      - get: repo
+        trigger: true
+      - put: image
+  - name: validate
+    plan:
+      - in_parallel:
+          - get: repo
+            passed: [build]
+          - get: image
+            passed: [build]
+  - name: deploy
+    plan:
+      - get: repo
+        passed: [validate]
+      - get: image
+        passed: [validate]
+      - get: config
+        passed: [build]
+  - name: smoke
+    plan:
+      - get: repo
+        passed: [deploy]
+  - name: report
+    plan:
+      - get: metrics
+        passed: [deploy]
+  - name: docs
+    plan:
+      - get: repo
+        trigger: true
+""")
+
+DURATIONS = Durations({
+    "main/build": [280.0, 300.0, 320.0],
+    "main-cml-k8s-n-01/validate": [120.0],
+    "deploy": [180.0],
+    "main/report": [240.0],
+    "main/docs": [600.0],
+})
+
+def check_durations() -> None:
+    """Durations are the median of exact, per-foundation or job-only samples, else the default"""
+    expect(DURATIONS.get("main", "build"), (300.0, True), "build (main/build)")
+    expect(DURATIONS.get("main", "validate"), (120.0, True), "validate (main-cml-k8s-n-01/validate)")
+    expect(DURATIONS.get("main", "deploy"), (180.0, True), "deploy (deploy)")
+    expect(DURATIONS.get("main", "smoke"), (60.0, False), "smoke (not recorded)")
+
+    builds = [
+        {"pipeline_name": "main", "job_name": "build", "status": "succeeded", "start_time": 100, "end_time": 400},
+        {"pipeline_name": "main", "job_name": "build", "status": "failed", "start_time": 100, "end_time": 110},
+        {"pipeline_name": "main", "job_name": "build", "status": "started", "start_time": 100},
+    ]
+    with tempfile.TemporaryDirectory(prefix="job-graph-") as temp_dir:
+        path = Path(temp_dir) / "builds.json"
+        path.write_text(json.dumps(builds))
+        expect(Durations.load(str(path)).samples, {"main/build": [300.0]}, "samples of succeeded builds")
+        path.write_text(json.dumps({"build": "5m", "deploy": [60, "2m"]}))
+        expect(Durations.load(str(path)).samples, {"build": [300.0], "deploy": [60.0, 120.0]}, "samples of a mapping")
+
+def check_critical_path() -> None:
+    """The critical path is the longest chain of dependent jobs"""
+    graph = JobGraph.from_pipeline(PIPELINE, "main", DURATIONS)
+    expect(graph.critical_path(), (["build", "validate", "deploy", "report"], 840.0), "critical path")
+    expect(graph.max_parallelism(), 3, "max parallelism (smoke, report and docs)")
+    expect(sorted(graph.recorded), ["build", "deploy", "docs", "report", "validate"], "jobs with recorded durations")
+    expect(format_seconds(840.0), "14m00s", "critical path duration")
+
+def check_redundant_edges() -> None:
+    """A constraint implied by a longer chain is redundant"""
+    graph = JobGraph.from_pipeline(PIPELINE, "main", DURATIONS)
+    expect(list(graph.edges()), [("build", "deploy"), ("validate", "deploy"), ("deploy", "report"),
+                                 ("deploy", "smoke"), ("build", "validate")], "edges")
+    expect(graph.redundant_edges(), [("build", "deploy")], "redundant edges")
+
+def check_unused_constraints() -> None:
+    """Constraints on resources the upstream job does not use are reported with the time they cost"""
+    graph = JobGraph.from_pipeline(PIPELINE, "main", DURATIONS)
+    expect(graph.unused_constraints(), [
+        {"upstream": "deploy", "job": "report", "resources": ["metrics"], "seconds_saved": 180.0},
+        {"upstream": "build", "job": "deploy", "resources": ["config"], "seconds_saved": 0.0},
+    ], "unused constraints")
+
+def check_gates_not_reported() -> None:
+    """Constraints on resources the upstream job only gets are gates and never reported"""
+    graph = JobGraph.from_pipeline(PIPELINE, "main", DURATIONS)
+    reported = {(entry["upstream"], entry["job"]) for entry in graph.unused_constraints()}
+    reported |= set(graph.redundant_edges())
+    for gate in [("validate", "deploy"), ("deploy", "smoke"), ("build", "validate")]:
+        if gate in reported:
+            raise AssertionError(f"gate {gate[0]} -> {gate[1]} was reported")
+
+def check_cycle() -> None:
+    """A cycle of passed: constraints is an error"""
+    pipeline = yaml.safe_load("""---
+jobs:
+  - name: a
+    plan: [{get: repo, passed: [b]}]
+  - name: b
+    plan: [{get: repo, passed: [a]}]
+""")
+    try:
+        JobGraph.from_pipeline(pipeline, "cycle").critical_path()
+    except ValueError as e:
+        expect(str(e), "Pipeline cycle has a cycle of passed: constraints between a, b", "error")
+    else:
+        raise AssertionError("a cycle was not detected")
+
+CHECKS = [
+    check_durations,
+    check_critical_path,
+    check_redundant_edges,
+    check_unused_constraints,
+    check_gates_not_reported,
+    check_cycle,
+]
+
+def main():
+    """Main entry point"""
+    run_checks("job graph", CHECKS)
+
+if __name__ == "__main__":
+    main()
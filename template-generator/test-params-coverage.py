@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Params Coverage Tests
+
+This script checks template_tools.params_coverage against a small params
+repository and project written to a temporary directory: which ((vars)) are
+extracted, which vars are missing or unused per foundation, and which value a
+key defined in several params files resolves to.
+
+Usage:
+    python test-params-coverage.py
+
+Author: CI/CD Platform Team
+"""
+
+import os
+import sys
+from pathlib import Path
+
+SCRIPT_DIR = Path(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from template_tools.params_coverage import ParamsTree, VarIndex, check_coverage, extract_vars
+from template_tools.project_sources import FilesystemSource
+from tool_checks import expect, run_checks, temp_tree
+
+PARAMS_FILES = {
+    "global.yml": "log_level: info\nreplicas: 1\nunused_global: x\n",
+    "k8s-global.yml": "registry: registry.example.com\n",
+    "cml/cml.yml": "region: cml\n",
+    "cml/cml-k8s.yml": "cluster_size: small\n",
+    "cml/cml-k8s-n-01.yml": "replicas: 3\nnamespace_limit: 5\n",
+    "cml/cml-k8s-n-02.yml": "namespace_limit: 2\n",
+}
+
+PROJECT_FILES = {
+    "ci/pipelines/main.yml": """---
+resources:
+  - name: repo
+    type: git
+    source:
+      uri: ((git_uri))
+      branch: ((branch))
+      private_key: ((vault:git_private_key))
+jobs:
+  - name: deploy
+    plan:
+      - get: repo
+      - task: deploy
+        file: repo/ci/tasks/deploy/task.yml
+        params:
+          REPLICAS: ((replicas))
+          REGISTRY: ((registry.host))
+          # LEGACY: ((legacy_setting))
+""",
+    "ci/tasks/deploy/task.yml": """---
+platform: linux
+params:
+  LOG_LEVEL: ((log_level))
+  NAMESPACE_LIMIT: ((namespace_limit))
+run:
+  path: bash
+  args: ["-c", "echo $((1 + 2))"]
+""",
+}
+
+# The work directory of each check holds the params repo and the project
+WORK_FILES = {
+    **{f"params/{rel_path}": content for rel_path, content in PARAMS_FILES.items()},
+    **{f"project/{rel_path}": content for rel_path, content in PROJECT_FILES.items()},
+}
+
+def check_extract_vars(work_dir: Path) -> None:
+    """Vars are extracted without var sources, comments and shell arithmetic"""
+    expect(extract_vars(PROJECT_FILES["ci/pipelines/main.yml"]), {"git_uri", "branch", "replicas", "registry"},
+           "vars of main.yml")
+    expect(extract_vars(PROJECT_FILES["ci/tasks/deploy/task.yml"]), {"log_level", "namespace_limit"},
+           "vars of task.yml")
+
+def check_foundations(work_dir: Path) -> None:
+    """Foundations are discovered from the datacenter directories, with the files fly.sh loads"""
+    params = ParamsTree.load(str(work_dir / "params"))
+    expect(sorted(params.foundations), ["cml-k8s-n-01", "cml-k8s-n-02"], "foundations")
+    expect(params.foundations["cml-k8s-n-01"], ["cml/cml-k8s-n-01.yml", "cml/cml-k8s.yml", "cml/cml.yml",
+                                                "k8s-global.yml", "global.yml"], "params files of cml-k8s-n-01")
+
+def check_precedence(work_dir: Path) -> None:
+    """A key in both global.yml and the foundation file resolves like fly's -l order: the later file wins"""
+    params = ParamsTree.load(str(work_dir / "params"))
+    values = params.values("cml-k8s-n-01")
+    expect(values["replicas"], 1, "replicas of cml-k8s-n-01 (global.yml is passed after the foundation file)")
+    expect(values["namespace_limit"], 5, "namespace_limit of cml-k8s-n-01 (only in the foundation file)")
+    expect(params.defined_in("cml-k8s-n-01", "replicas"), ["cml/cml-k8s-n-01.yml", "global.yml"],
+           "files defining replicas")
+
+def check_coverage_report(work_dir: Path) -> None:
+    """Missing vars and unused keys are reported per foundation, fly.sh vars count as supplied"""
+    params = ParamsTree.load(str(work_dir / "params"))
+    index = VarIndex.from_source(FilesystemSource(str(work_dir / "project")))
+    reports = {report.foundation: report for report in check_coverage([index], params)}
+
+    expect(reports["cml-k8s-n-01"].missing, {}, "missing vars of cml-k8s-n-01")
+    expect(sorted(reports["cml-k8s-n-01"].unused), ["cluster_size", "region", "unused_global"],
+           "unused keys of cml-k8s-n-01")
+    expect(reports["cml-k8s-n-02"].missing, {}, "missing vars of cml-k8s-n-02")
+
+    (work_dir / "params" / "cml" / "cml-k8s-n-02.yml").write_text("{}\n")
+    params = ParamsTree.load(str(work_dir / "params"))
+    reports = {report.foundation: report for report in check_coverage([index], params)}
+    expect(reports["cml-k8s-n-02"].missing, {"namespace_limit": ["ci/tasks/deploy/task.yml"]},
+           "missing vars of cml-k8s-n-02 without its foundation file")
+
+    reports = {report.foundation: report for report in check_coverage([index], params, ignore=["namespace_*"])}
+    expect(reports["cml-k8s-n-02"].missing, {}, "missing vars of cml-k8s-n-02 with namespace_* ignored")
+
+CHECKS = [
+    check_extract_vars,
+    check_foundations,
+    check_precedence,
+    check_coverage_report,
+]
+
+def main():
+    """Main entry point"""
+    run_checks("params coverage", CHECKS, lambda: temp_tree(WORK_FILES, "params-coverage-"))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Pipeline Budget Tests
+
+This script checks template_tools.pipeline_budget against a small pipeline:
+how its size, steps and passed: fan-in are measured after interpolation, how
+budget overrides are parsed, which metrics breach their budget, and which
+jobs are reported as contributing most to each breach.
+
+Usage:
+    python test-pipeline-budget.py
+
+Author: CI/CD Platform Team
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import yaml
+
+SCRIPT_DIR = Path(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from template_tools.check_load import interpolate
+from template_tools.pipeline_budget import DEFAULT_BUDGETS, contributors, measure_pipeline, over_budget, parse_budgets
+from tool_checks import expect, expect_error, run_checks
+
+PIPELINE = yaml.safe_load("""---
+resource_types:
+  - name: slack-notification
+    type: registry-image
+    source: {repository: cfcommunity/slack-notification-resource}
+resources:
+  - name: repo
+    type: git
+    source: {uri: ((git_uri))}
+  - name: image
+    type: registry-image
+    source: {repository: ((registry))/app}
+  - name: notify
+    type: slack-notification
+    source: {url: ((slack_url))}
+jobs:
+  - name: build
+    plan:
+      - get: repo
+        trigger: true
+      - task: build
+        file: repo/ci/tasks/build/task.yml
+      - put: image
+    on_failure:
+      put: notify
+  - name: test
+    plan:
+      - in_parallel:
+          - get: repo
+            passed: [build]
+          - get: image
+            passed: [build]
+      - task: unit
+        file: repo/ci/tasks/unit/task.yml
+      - try:
+          task: flaky
+          file: repo/ci/tasks/flaky/task.yml
+  - name: deploy
+    plan:
+      - get: repo
+        passed: [build, test]
+      - get: image
+        passed: [test]
+      - do:
+          - task: deploy
+            file: repo/ci/tasks/deploy/task.yml
+          - task: smoke
+            file: repo/ci/tasks/smoke/task.yml
+            ensure:
+              task: cleanup
+              file: repo/ci/tasks/cleanup/task.yml
+      - put: notify
+""")
+
+VARIABLES = {"git_uri": "git@example.com:demo.git", "registry": "registry.example.com", "slack_url": "https://example.com"}
+
+def check_measure() -> None:
+    """Steps include nested steps and hooks, fan-in counts the upstream jobs of one job"""
+    metrics = measure_pipeline(interpolate(PIPELINE, VARIABLES), "main", "cml-k8s-n-01")
+    expect([(job.name, job.steps, job.upstream) for job in metrics.jobs], [
+        ("build", 4, ()),
+        ("test", 6, ("build",)),
+        ("deploy", 7, ("build", "test")),
+    ], "jobs")
+    expect({metric: value for metric, value in metrics.values.items() if metric != "config_bytes"},
+           {"jobs": 3, "steps": 17, "resources": 3, "resource_types": 1, "passed_fan_in": 2}, "metrics")
+
+def check_config_bytes() -> None:
+    """The config is measured as compact JSON after interpolating the params"""
+    interpolated = interpolate(PIPELINE, VARIABLES)
+    metrics = measure_pipeline(interpolated, "main")
+    expect(metrics.config_bytes, len(json.dumps(interpolated, separators=(",", ":"))), "config bytes")
+    growth = len("registry.example.com") - len("((registry))")
+    expect(metrics.config_bytes - measure_pipeline(interpolate(PIPELINE, {**VARIABLES, "registry": "((registry))"}),
+                                                   "main").config_bytes, growth, "growth from the registry var")
+
+def check_parse_budgets() -> None:
+    """Budget overrides replace the defaults, unknown names and invalid values are errors"""
+    budgets = parse_budgets(["steps=10", "passed_fan_in=1"])
+    expect(budgets, {**DEFAULT_BUDGETS, "steps": 10, "passed_fan_in": 1}, "budgets")
+    for assignment, error in [("jobs", "Budget must be NAME=VALUE"), ("tasks=5", "Budget must be NAME=VALUE"),
+                              ("steps=0", "Budget steps must be a positive integer"),
+                              ("steps=-1", "Budget steps must be a positive integer")]:
+        expect_error(lambda: parse_budgets([assignment]), error, assignment)
+
+def check_over_budget() -> None:
+    """Metrics over their budget are reported, metrics at their budget are not"""
+    metrics = measure_pipeline(interpolate(PIPELINE, VARIABLES), "main")
+    expect(over_budget(metrics, DEFAULT_BUDGETS), [], "breaches of the default budgets")
+    expect(over_budget(metrics, parse_budgets(["steps=10", "passed_fan_in=1", "jobs=3"])),
+           [("steps", 17, 10), ("passed_fan_in", 2, 1)], "breaches")
+
+def check_contributors() -> None:
+    """The jobs contributing most to a breached metric are reported"""
+    metrics = measure_pipeline(interpolate(PIPELINE, VARIABLES), "main")
+    expect(contributors(metrics, "steps", top=2), ["deploy (7 steps)", "test (6 steps)"], "steps")
+    expect(contributors(metrics, "passed_fan_in"), ["deploy (2 upstream jobs)", "test (1 upstream jobs)"],
+           "passed fan-in (build has no upstream jobs)")
+    expect(contributors(metrics, "config_bytes", top=1)[0].startswith("deploy ("), True, "config bytes")
+    expect(contributors(metrics, "resources"), [], "resources")
+
+CHECKS = [
+    check_measure,
+    check_config_bytes,
+    check_parse_budgets,
+    check_over_budget,
+    check_contributors,
+]
+
+def main():
+    """Main entry point"""
+    run_checks("pipeline budget", CHECKS)
+
+if __name__ == "__main__":
+    main()
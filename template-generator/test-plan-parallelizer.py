@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Plan Parallelizer Tests
+
+This script checks template_tools.plan_parallelizer against small job plans:
+which runs of steps are independent, how get, put and task steps are
+grouped, and that rewriting keeps comments and formatting and is idempotent.
+
+Usage:
+    python test-plan-parallelizer.py
+
+Author: CI/CD Platform Team
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import yaml
+
+SCRIPT_DIR = Path(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from template_tools.plan_parallelizer import STEP_TYPES, parallel_runs, parallelize, step_access
+from tool_checks import expect, run_checks
+
+PIPELINE = """---
+jobs:
+  - name: deploy
+    plan:
+      # Fetch the inputs
+      - get: repo
+        trigger: true
+      - get: image
+      - get: params  # per foundation
+
+      - task: build
+        file: repo/ci/tasks/build/task.yml
+      - put: notify
+"""
+
+GROUPED = """---
+jobs:
+  - name: deploy
+    plan:
+      # Fetch the inputs
+      - in_parallel:
+          - get: repo
+            trigger: true
+          - get: image
+          - get: params  # per foundation
+
+      - task: build
+        file: repo/ci/tasks/build/task.yml
+      - put: notify
+"""
+
+GROUPED_WITH_LIMIT = """---
+jobs:
+  - name: deploy
+    plan:
+      # Fetch the inputs
+      - in_parallel:
+          limit: 2
+          steps:
+            - get: repo
+              trigger: true
+            - get: image
+            - get: params  # per foundation
+
+      - task: build
+        file: repo/ci/tasks/build/task.yml
+      - put: notify
+"""
+
+# Configs of the tasks loaded with file:
+TASK_FILES = {
+    "repo/ci/tasks/build/task.yml": {"inputs": [{"name": "repo"}], "outputs": [{"name": "binary"}]},
+}
+
+MIXED_PLAN = yaml.safe_load("""---
+- get: repo
+- get: image
+- task: build
+  file: repo/ci/tasks/build/task.yml
+- task: lint
+  config:
+    inputs: [{name: source}]
+    outputs: [{name: report}]
+  input_mapping: {source: repo}
+  output_mapping: {report: lint-report}
+- put: notify
+  inputs: [lint-report]
+- put: archive
+  inputs: [binary]
+""")
+
+def check_step_access() -> None:
+    """Steps read their inputs and write their outputs, through input and output mappings"""
+    expect(step_access(MIXED_PLAN[0]), ("get", frozenset(), frozenset({"repo"})), "get: repo")
+    expect(step_access(MIXED_PLAN[2], TASK_FILES.get), ("task", frozenset({"repo"}), frozenset({"binary"})),
+           "task: build")
+    expect(step_access(MIXED_PLAN[3]), ("task", frozenset({"repo"}), frozenset({"lint-report"})), "task: lint")
+    expect(step_access(MIXED_PLAN[4]), ("put", frozenset({"lint-report"}), frozenset({"notify"})), "put: notify")
+    expect(step_access({"put": "notify"}).reads, None, "a put without inputs reads every artifact")
+    expect(step_access({"task": "build", "file": "repo/ci/tasks/missing/task.yml"}, TASK_FILES.get).reads, None,
+           "a task whose file cannot be read")
+    expect(step_access({"get": "repo", "on_failure": {"put": "notify"}}), None, "a step with a hook")
+    expect(step_access({"get": "repo", "across": [{"var": "x", "values": [1, 2]}]}), None, "a step with across")
+
+def check_parallel_runs() -> None:
+    """Runs end where a step reads or writes an artifact an earlier step of the run writes"""
+    expect(parallel_runs(MIXED_PLAN), [(0, 2)], "runs of gets")
+    expect(parallel_runs(MIXED_PLAN, STEP_TYPES, TASK_FILES.get), [(0, 2), (2, 4), (4, 6)], "runs of all step types")
+    expect(parallel_runs(MIXED_PLAN, STEP_TYPES), [(0, 2), (4, 6)], "runs without the task file config")
+
+def check_rewrite() -> None:
+    """Grouped steps are indented under in_parallel, keeping comments and blank lines"""
+    text, suggestions = parallelize(PIPELINE)
+    expect(text, GROUPED, "rewritten pipeline")
+    expect([(s.job, s.start, s.end, s.steps, s.line) for s in suggestions],
+           [("deploy", 0, 3, ["get: repo", "get: image", "get: params"], 6)], "suggestions")
+
+    text, _ = parallelize(PIPELINE, limit=2)
+    expect(text, GROUPED_WITH_LIMIT, "rewritten pipeline with a limit")
+
+def check_idempotent() -> None:
+    """A rewritten pipeline has nothing left to group"""
+    expect(parallelize(GROUPED), (GROUPED, []), "second rewrite")
+    expect(parallelize(GROUPED_WITH_LIMIT, limit=2), (GROUPED_WITH_LIMIT, []), "second rewrite with a limit")
+
+def check_flow_style() -> None:
+    """Flow-style plans and files without jobs are left alone"""
+    text = "jobs:\n  - name: deploy\n    plan: [{get: repo}, {get: image}]\n"
+    expect(parallelize(text), (text, []), "a flow-style plan")
+    expect(parallelize("platform: linux\n"), ("platform: linux\n", []), "a task file")
+
+CHECKS = [
+    check_step_access,
+    check_parallel_runs,
+    check_rewrite,
+    check_idempotent,
+    check_flow_style,
+]
+
+def main():
+    """Main entry point"""
+    run_checks("plan parallelizer", CHECKS)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Project Source Tests
+
+This script checks template_tools.project_sources against a small repository
+created with git init in a temporary directory: that a commit is listed and
+read without a checkout, that globs match the working tree, that a missing
+commit or object is an error, and that one cat-file process and one result
+cache are shared between the commits validated with --git-dir and --rev.
+
+Usage:
+    python test-project-sources.py
+
+Author: CI/CD Platform Team
+"""
+
+import os
+import re
+import subprocess
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List
+
+SCRIPT_DIR = Path(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from template_tools.project_sources import (FilesystemSource, GitCatFile, GitObjectSource, MemorySource,
+                                            git_blob_id, glob_paths)
+from tool_checks import expect, expect_error, run_checks, temp_tree, write_files
+
+TASK_SCRIPT = "#!/usr/bin/env bash\nset -o errexit\nset -o pipefail\necho \"deploying\"\n"
+
+PROJECT_FILES = {
+    "ci/pipelines/main.yml": "---\njobs:\n  - name: deploy\n    plan:\n      - task: deploy\n",
+    "ci/tasks/deploy/task.yml": "---\nplatform: linux\nrun:\n  path: repo/ci/tasks/deploy/task.sh\n",
+    "ci/tasks/deploy/task.sh": TASK_SCRIPT,
+    "ci/tasks/build/task.yml": "---\nplatform: linux\nrun:\n  path: repo/ci/tasks/build/task.sh\n",
+    "ci/tasks/build/task.sh": TASK_SCRIPT,
+    "ci/tasks/common/notify/task.yaml": "---\nplatform: linux\n",
+    "README.md": "# Demo\n",
+}
+
+# The second commit changes one script
+CHANGED_FILES = {"ci/tasks/build/task.sh": TASK_SCRIPT + "echo \"built\"\n"}
+
+PATTERNS = ["ci/tasks/**/task.yml", "ci/tasks/**/*", "ci/tasks/deploy/task.*", "ci/tasks/*", "ci/*", "*", "**",
+            "ci/tasks/deploy", "ci/tasks/deploy/**", "ci/tasks/missing/*", "**/task.sh", "ci/tasks/[bd]*/task.?ml"]
+
+def git(repo: Path, *args: str) -> str:
+    """Run a git command in a repository"""
+    return subprocess.run(["git", "-C", str(repo), "-c", "user.name=CI", "-c", "user.email=ci@example.com", *args],
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=True).stdout
+
+@contextmanager
+def git_repo() -> Iterator[Path]:
+    """Create a repository with two commits, the first tagged "first" """
+    with temp_tree(PROJECT_FILES, "project-sources-") as repo:
+        git(repo, "init", "--quiet")
+        git(repo, "add", ".")
+        git(repo, "commit", "--quiet", "-m", "first")
+        git(repo, "tag", "first")
+        write_files(repo, CHANGED_FILES)
+        git(repo, "commit", "--quiet", "-am", "second")
+        yield repo
+
+def check_listing(repo: Path) -> None:
+    """A commit is listed once and read without a checkout, with blob ids from the tree"""
+    source = GitObjectSource(str(repo / ".git"), "first")
+    try:
+        expect(sorted(source.blobs), sorted(PROJECT_FILES), "files of the first commit")
+        expect((source.is_dir("ci/tasks"), source.is_dir("ci/tasks/"), source.is_file("ci/tasks")),
+               (True, True, False), "ci/tasks")
+        expect(list(source.files("ci/tasks/deploy")), ["ci/tasks/deploy/task.sh", "ci/tasks/deploy/task.yml"],
+               "files below ci/tasks/deploy")
+        expect(source.read_text("ci/tasks/build/task.sh"), TASK_SCRIPT, "task.sh of the first commit")
+        expect(source.blob_id("README.md"), git_blob_id(b"# Demo\n"), "blob id of README.md")
+        expect(source.content_id("README.md"), git(repo, "rev-parse", "first:README.md").strip(),
+               "content id of README.md")
+        expect(source.blob_id("missing.md"), None, "blob id of a missing file")
+    finally:
+        source.close()
+
+def check_glob(repo: Path) -> None:
+    """Globs match the same paths in a commit, in memory and in the working tree"""
+    git_source = GitObjectSource(str(repo / ".git"))
+    memory_source = MemorySource({**PROJECT_FILES, **CHANGED_FILES})
+    filesystem_source = FilesystemSource(str(repo))
+    all_paths = git_source.dirs | set(git_source.blobs)
+    try:
+        for pattern in PATTERNS:
+            expected = list(glob_paths(pattern, all_paths))
+            expect(list(git_source.glob(pattern)), expected, f"{pattern} in the commit")
+            expect(list(memory_source.glob(pattern)), expected, f"{pattern} in memory")
+            if pattern.endswith("**"):
+                # pathlib matches only directories with a trailing "**"
+                continue
+            expect(sorted(path for path in filesystem_source.glob(pattern) if not path.startswith(".git")),
+                   expected, f"{pattern} in the working tree")
+    finally:
+        git_source.close()
+
+def check_missing(repo: Path) -> None:
+    """A missing commit or object is an error"""
+    git_dir = str(repo / ".git")
+    expect_error(lambda: GitObjectSource(git_dir, "missing"), f"Cannot list missing in {git_dir}", "a missing commit")
+
+    cat_file = GitCatFile(git_dir)
+    try:
+        expect_error(lambda: cat_file.read("0" * 40), f"Object {'0' * 40} not found in {git_dir}",
+                     "a missing object")
+        # The process keeps serving requests after a missing object
+        expect(cat_file.read(git_blob_id(b"# Demo\n")), b"# Demo\n", "README.md after a missing object")
+    finally:
+        cat_file.close()
+
+def check_shared_cat_file(repo: Path) -> None:
+    """One cat-file process serves both commits and outlives the sources using it"""
+    cat_file = GitCatFile(str(repo / ".git"))
+    try:
+        sources = [GitObjectSource(str(repo / ".git"), rev, cat_file=cat_file) for rev in ["first", "HEAD"]]
+        expect([source.read_text("ci/tasks/build/task.sh") for source in sources],
+               [TASK_SCRIPT, CHANGED_FILES["ci/tasks/build/task.sh"]], "task.sh of both commits")
+        for source in sources:
+            source.close()
+        expect(cat_file.process.poll(), None, "exit status of the shared process after closing the sources")
+        expect(cat_file.bytes_read, len(TASK_SCRIPT) + len(CHANGED_FILES["ci/tasks/build/task.sh"]), "bytes read")
+    finally:
+        cat_file.close()
+    expect(cat_file.process.poll(), 0, "exit status of the shared process after closing it")
+
+def validate_revs(repo: Path, revs: List[str]) -> List[int]:
+    """Validate commits with --git-dir and --rev, returning the unique and reused file counts"""
+    command = [sys.executable, str(SCRIPT_DIR / "validate-template-compliance.py"), "--git-dir", str(repo / ".git"),
+               "--verbose", "--summary-only"]
+    for rev in revs:
+        command += ["--rev", rev]
+    output = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True).stdout
+    match = re.search(r"Checked (\d+) unique files, reused results for (\d+)", output)
+    if not match:
+        raise AssertionError(f"no cache summary in the output of {' '.join(revs)}:\n{output}")
+    return [int(match.group(1)), int(match.group(2))]
+
+def check_result_cache(repo: Path) -> None:
+    """Per-file results are reused for identical blobs across the commits of one run"""
+    unique, reused = validate_revs(repo, ["first"])
+    expect(reused, 0, "reused results for one commit")
+    expect(validate_revs(repo, ["first", "first"]), [unique, unique], "results for the same commit twice")
+
+    # Only the changed task.sh is checked again for the second commit
+    unique_both, reused_both = validate_revs(repo, ["first", "HEAD"])
+    expect(unique_both > unique and unique_both + reused_both == 2 * unique, True,
+           f"{unique_both} unique and {reused_both} reused results for two commits, {unique} for one")
+
+CHECKS = [
+    check_listing,
+    check_glob,
+    check_missing,
+    check_shared_cat_file,
+    check_result_cache,
+]
+
+def main():
+    """Main entry point"""
+    run_checks("project source", CHECKS, git_repo)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Script Bundler Tests
+
+This script checks template_tools.script_bundler against a small fly.sh and
+modules written inline, and the bundle the generator writes with
+--bundle-fly-script: how modules are inlined, that a guarded helpers.sh is
+inlined only when it exists, that a module sourcing itself is an error, the
+module and self hashes that detect edits, and what strip_help removes.
+
+Usage:
+    python test-script-bundler.py
+
+Author: CI/CD Platform Team
+"""
+
+import hashlib
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Callable, Dict, List
+
+SCRIPT_DIR = Path(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from template_tools.script_bundler import BundleError, bundle_script, check_bundle
+from tool_checks import expect, run_checks
+
+FLY_SCRIPT = """#!/usr/bin/env bash
+# Entry point
+set -o errexit
+
+source "${LIB_DIR}/utils.sh"
+if [[ -f "${SCRIPT_DIR}/helpers.sh" ]]; then
+  source "${SCRIPT_DIR}/helpers.sh"
+fi
+main "$@"
+"""
+
+MODULES = {
+    "lib/utils.sh": "#!/usr/bin/env bash\n. \"${LIB_DIR}/logging.sh\"\nmain() { log \"$@\"; }\n",
+    "lib/logging.sh": "log() { echo \"$*\"; }",
+    "helpers.sh": "helper() { :; }\n",
+}
+
+# Source of the optional helpers.sh in FLY_SCRIPT, kept as is when helpers.sh does not exist
+GUARD = 'if [[ -f "${SCRIPT_DIR}/helpers.sh" ]]; then\n  source "${SCRIPT_DIR}/helpers.sh"\nfi\n'
+
+HELP_SCRIPT = """#!/usr/bin/env bash
+SUPPORTED_COMMANDS="set|unpause"
+
+show_command_usage() {
+  case "$1" in
+    set)
+      # Usage of set
+      cat <<EOF
+Usage: fly.sh set
+# not a comment inside the help text
+
+EOF
+      ;;
+    destroy)
+      echo "Usage: fly.sh destroy"
+      ;;
+    *)
+      echo "Unknown command"
+      ;;
+  esac
+}
+"""
+
+def sha256(text: str) -> str:
+    """Hash a module the way bundle-source headers record it"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def body(text: str) -> List[str]:
+    """List the lines of a bundle after its header"""
+    lines = text.splitlines()
+    return lines[next(number for number, line in enumerate(lines) if line.startswith("# bundle-sha256: ")) + 1:]
+
+def expect_bundle_error(action: Callable[[], object], message: str, what: str) -> None:
+    """Fail a check unless an action raises a BundleError with the given message"""
+    try:
+        action()
+    except BundleError as e:
+        expect(str(e), message, f"error of {what}")
+    else:
+        raise AssertionError(f"{what} was bundled")
+
+def check_bundle_script() -> None:
+    """Modules are inlined recursively between markers, with their hashes in the header"""
+    bundle = bundle_script(FLY_SCRIPT, MODULES.get)
+    expect([path for path, _ in bundle.sources], ["lib/utils.sh", "lib/logging.sh", "helpers.sh"], "inlined modules")
+    expect(bundle.text.splitlines()[:len(bundle.sources) + 4], [
+        "#!/usr/bin/env bash",
+        "# fly.sh bundled with the modules it sources; do not edit.",
+        "# Edit the modules and bundle again (template-generator/bundle-fly-script.py or --bundle-fly-script).",
+    ] + [f"# bundle-source: {path} {sha256(MODULES[path])}" for path in MODULES] + [
+        f"# bundle-sha256: {bundle.sha256}",
+    ], "header")
+    expect(body(bundle.text), [
+        "# Entry point",
+        "set -o errexit",
+        "",
+        "# >>> lib/utils.sh",
+        "# >>> lib/logging.sh",
+        "log() { echo \"$*\"; }",
+        "# <<< lib/logging.sh",
+        "main() { log \"$@\"; }",
+        "# <<< lib/utils.sh",
+        "# >>> helpers.sh",
+        "helper() { :; }",
+        "# <<< helpers.sh",
+        "main \"$@\"",
+    ], "inlined body")
+    expect(bundle.text.count("#!/usr/bin/env bash"), 1, "shebangs in the bundle")
+    expect_bundle_error(lambda: bundle_script(bundle.text, MODULES.get), "fly.sh is already a bundle", "a bundle")
+
+def check_guarded_source() -> None:
+    """A guarded helpers.sh is inlined when it exists and kept as a guarded source otherwise"""
+    without_helpers = {path: content for path, content in MODULES.items() if path != "helpers.sh"}
+    bundle = bundle_script(FLY_SCRIPT, without_helpers.get)
+    expect([path for path, _ in bundle.sources], ["lib/utils.sh", "lib/logging.sh"], "inlined modules")
+    expect(GUARD in bundle.text, True, "guarded source kept")
+    expect(check_bundle(bundle.text, without_helpers.get), [], "problems of the bundle without helpers.sh")
+
+    # Without the guard, a missing module is an error
+    expect_bundle_error(lambda: bundle_script(FLY_SCRIPT.replace(GUARD, 'source "${SCRIPT_DIR}/helpers.sh"\n'),
+                                              without_helpers.get),
+                        "fly.sh sources helpers.sh, which does not exist", "a missing module")
+
+def check_cycle() -> None:
+    """A module that sources itself, directly or through another module, is an error"""
+    modules = {**MODULES, "lib/logging.sh": ". \"${LIB_DIR}/utils.sh\"\n"}
+    expect_bundle_error(lambda: bundle_script(FLY_SCRIPT, modules.get),
+                        "lib/utils.sh sources itself through fly.sh -> lib/utils.sh -> lib/logging.sh",
+                        "a cycle through lib/logging.sh")
+
+    modules = {**MODULES, "lib/utils.sh": "source \"${LIB_DIR}/utils.sh\"\n"}
+    expect_bundle_error(lambda: bundle_script(FLY_SCRIPT, modules.get),
+                        "lib/utils.sh sources itself through fly.sh -> lib/utils.sh", "a module sourcing itself")
+
+def check_verification() -> None:
+    """Edits to the bundle and modules changed or removed since it was built are reported"""
+    bundle = bundle_script(FLY_SCRIPT, MODULES.get)
+    expect(check_bundle(bundle.text, MODULES.get), [], "problems of a fresh bundle")
+    expect(check_bundle(bundle.text.replace("helper()", "helpers()")),
+           ["content does not match its bundle-sha256; it was edited after bundling"], "problems of an edited bundle")
+
+    modules: Dict[str, str] = {**MODULES, "lib/logging.sh": "log() { printf '%s\\n' \"$*\"; }\n"}
+    del modules["helpers.sh"]
+    expect(check_bundle(bundle.text, modules.get),
+           ["lib/logging.sh changed since the bundle was built", "helpers.sh no longer exists"],
+           "problems after changing the modules")
+    expect(check_bundle(FLY_SCRIPT), ["not a bundle (no bundle-sha256 header)"], "problems of the original")
+
+def check_strip_help() -> None:
+    """Comments, blank lines and the help of unsupported commands are removed, here documents are kept"""
+    stripped = bundle_script(HELP_SCRIPT, MODULES.get, strip_help=True)
+    expect(body(stripped.text), [
+        "SUPPORTED_COMMANDS=\"set|unpause\"",
+        "show_command_usage() {",
+        "  case \"$1\" in",
+        "    set)",
+        "      cat <<EOF",
+        "Usage: fly.sh set",
+        "# not a comment inside the help text",
+        "",
+        "EOF",
+        "      ;;",
+        "    *)",
+        "      echo \"Unknown command\"",
+        "      ;;",
+        "  esac",
+        "}",
+    ], "stripped script")
+    expect(check_bundle(stripped.text), [], "problems of the stripped bundle")
+    expect(bundle_script(HELP_SCRIPT, MODULES.get).text.count("destroy"), 2, "destroy help kept without strip_help")
+
+def check_generated_bundle() -> None:
+    """The generator bundles fly.sh against the modules it writes, and --strip-help requires the bundle"""
+    generator = [sys.executable, str(SCRIPT_DIR / "generate-reference-template.py"), "--template-type", "kustomize"]
+    with tempfile.TemporaryDirectory(prefix="script-bundler-") as temp_dir:
+        project_dir = Path(temp_dir) / "my-service"
+        subprocess.run(generator + ["--output-dir", str(project_dir), "--bundle-fly-script", "--strip-help"],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        scripts_dir = project_dir / "ci" / "scripts"
+
+        def read_source(rel_path: str):
+            path = scripts_dir / rel_path
+            return path.read_text(encoding="utf-8") if path.is_file() else None
+
+        expect(check_bundle((scripts_dir / "fly.sh").read_text(encoding="utf-8"), read_source), [],
+               "problems of the generated bundle")
+
+        result = subprocess.run(generator + ["--output-dir", str(project_dir), "--strip-help"],
+                                stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+        expect((result.returncode, result.stdout.splitlines()[-1:]),
+               (2, ["generate-reference-template.py: error: --strip-help requires --bundle-fly-script"]),
+               "exit code and error of --strip-help alone")
+
+CHECKS = [
+    check_bundle_script,
+    check_guarded_source,
+    check_cycle,
+    check_verification,
+    check_strip_help,
+    check_generated_bundle,
+]
+
+def main():
+    """Main entry point"""
+    run_checks("script bundler", CHECKS)
+
+if __name__ == "__main__":
+    main()
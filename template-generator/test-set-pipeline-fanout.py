@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Set-Pipeline Fan-Out Tests
+
+This script checks template_tools.set_pipeline_fanout against a small
+set-pipeline pipeline: how foundations are parsed, the exact text of the
+fanned-out job, that fanning out twice changes nothing, and the issues
+reported for across blocks with unbounded, serial or mismatched settings.
+
+Usage:
+    python test-set-pipeline-fanout.py
+
+Author: CI/CD Platform Team
+"""
+
+import os
+import sys
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+SCRIPT_DIR = Path(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from template_tools.generator import DEFAULTS
+from template_tools.set_pipeline_fanout import fan_out, fanout_issues, parse_foundations
+from tool_checks import expect, expect_error, run_checks
+
+PATTERN = DEFAULTS["datacenter_pattern"]
+
+FOUNDATIONS = ["cml-k8s-n-01", "cic-vxr-n-02"]
+
+PIPELINE = """---
+jobs:
+  - name: set-pipelines
+    plan:
+      - get: repo
+        trigger: true
+      # Render the pipeline of the foundation
+      - task: get-pipeline
+        file: repo/ci/tasks/get-pipeline/task.yml
+        params:
+          FOUNDATION: ((foundation))
+          DATACENTER: ((dc))
+      - set_pipeline: main
+        file: pipeline/main.yml
+        var_files:
+          - params/((dc))/((foundation)).yml
+  - name: unit
+    plan:
+      - get: repo
+"""
+
+FANNED_OUT = """---
+jobs:
+  - name: set-pipelines
+    plan:
+      - get: repo
+        trigger: true
+      # Render the pipeline of the foundation
+      - across:
+          - var: target
+            values:
+              - {foundation: cml-k8s-n-01, dc: cml, dc_type: k8s}
+              - {foundation: cic-vxr-n-02, dc: cic, dc_type: vxr}
+            max_in_flight: 2
+        do:
+          - task: get-pipeline
+            file: repo/ci/tasks/get-pipeline/task.yml
+            params:
+              FOUNDATION: ((.:target.foundation))
+              DATACENTER: ((.:target.dc))
+          - set_pipeline: ((pipeline))-((.:target.foundation))
+            file: pipeline/main.yml
+            var_files:
+              - params/((.:target.dc))/((.:target.foundation)).yml
+  - name: unit
+    plan:
+      - get: repo
+"""
+
+def across_pipeline(across: str, set_pipeline: str = "((pipeline))-((.:target.foundation))") -> Any:
+    """Parse a pipeline whose set_pipeline step runs across the given entries"""
+    return yaml.safe_load(f"""---
+jobs:
+  - name: set-pipelines
+    plan:
+      - across: {across}
+        do:
+          - set_pipeline: {set_pipeline}
+            file: pipeline/main.yml
+""")
+
+def check_parse_foundations() -> None:
+    """Foundations are split into dc and dc_type by the datacenter pattern"""
+    expect(parse_foundations(FOUNDATIONS, PATTERN), [
+        {"foundation": "cml-k8s-n-01", "dc": "cml", "dc_type": "k8s"},
+        {"foundation": "cic-vxr-n-02", "dc": "cic", "dc_type": "vxr"},
+    ], "targets")
+    expect_error(lambda: parse_foundations(["lab"], PATTERN),
+                 f"Foundation lab does not match the datacenter pattern {PATTERN}", "a name outside the pattern")
+    expect_error(lambda: parse_foundations(["cml-k8s-n-01", "cml-k8s-n-01"], PATTERN),
+                 "Foundation cml-k8s-n-01 is listed more than once", "a duplicate foundation")
+
+def check_fan_out() -> None:
+    """The per-foundation steps are wrapped in an across block, keeping comments"""
+    targets = parse_foundations(FOUNDATIONS, PATTERN)
+    expect(fan_out(PIPELINE, targets, max_in_flight=2), (FANNED_OUT, ["set-pipelines"]), "fanned-out pipeline")
+    expect(fanout_issues(yaml.safe_load(FANNED_OUT), PATTERN), [], "issues of the fanned-out pipeline")
+    expect_error(lambda: fan_out(PIPELINE, targets, max_in_flight=0), "max_in_flight must be at least 1, got 0",
+                 "max_in_flight 0")
+    expect(fan_out(PIPELINE, [], max_in_flight=2), (PIPELINE, []), "no foundations")
+
+def check_idempotent() -> None:
+    """A job that already runs across foundations is not fanned out again"""
+    targets = parse_foundations(FOUNDATIONS, PATTERN)
+    expect(fan_out(FANNED_OUT, targets, max_in_flight=2), (FANNED_OUT, []), "second fan-out")
+
+def check_max_in_flight_issues() -> None:
+    """An across block without a bounded max_in_flight above 1 is reported"""
+    values = "[{foundation: cml-k8s-n-01, dc: cml, dc_type: k8s}]"
+    where = "set_pipeline step of job 'set-pipelines'"
+    expect(fanout_issues(across_pipeline(f"[{{var: target, values: {values}, max_in_flight: all}}]"), PATTERN),
+           [f"{where} has an unbounded or invalid max_in_flight (all) across 'target'"], "max_in_flight: all")
+    expect(fanout_issues(across_pipeline(f"[{{var: target, values: {values}, max_in_flight: 0}}]"), PATTERN),
+           [f"{where} has an unbounded or invalid max_in_flight (0) across 'target'"], "max_in_flight: 0")
+    expect(fanout_issues(across_pipeline(f"[{{var: target, values: {values}}}]"), PATTERN),
+           [f"{where} sets the pipelines across 'target' one at a time; set max_in_flight above 1"],
+           "no max_in_flight")
+
+def check_value_issues() -> None:
+    """Values outside the datacenter pattern, wrong dc/dc_type and a shared pipeline name are reported"""
+    where = "set_pipeline step of job 'set-pipelines'"
+    values = "[{foundation: lab}, {foundation: cml-k8s-n-01, dc: cic, dc_type: k8s}]"
+    expect(fanout_issues(across_pipeline(f"[{{var: target, values: {values}, max_in_flight: 2}}]", "main"), PATTERN), [
+        f"{where} fans out to lab, which does not match the datacenter pattern",
+        f"{where} has dc/dc_type cic/k8s for cml-k8s-n-01, expected cml/k8s",
+        f"{where} sets the same pipeline 'main' for every foundation; "
+        "name it after the across var, e.g. ((pipeline))-((.:target.foundation))",
+    ], "issues")
+
+CHECKS = [
+    check_parse_foundations,
+    check_fan_out,
+    check_idempotent,
+    check_max_in_flight_issues,
+    check_value_issues,
+]
+
+def main():
+    """Main entry point"""
+    run_checks("set-pipeline fan-out", CHECKS)
+
+if __name__ == "__main__":
+    main()
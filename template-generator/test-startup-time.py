@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Test that the template tools start up within a fixed time budget.
+
+Hooks and Makefile targets run the generator and the validator thousands of
+times a day, so their startup time adds up. This script times `--help` of both
+commands and a validation of an empty project in fresh interpreters, compares
+the median against the budget, and checks that `--help` does not import the
+modules the tools only need once they read or write files.
+
+Usage:
+    python test-startup-time.py [--budget-ms 300] [--runs 5] [--verbose]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Any, List
+
+SCRIPT_DIR = Path(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must stay unimported until a code path needs them
+LAZY_MODULES = ["yaml", "json", "datetime", "sqlite3"]
+
+COMMANDS = {
+    "generator": "template_tools.generator",
+    "validator": "template_tools.validator"
+}
+
+# Runs a command's main() in-process and prints the lazy modules it imported
+PROBE = """
+import sys
+sys.path.insert(0, {script_dir!r})
+sys.argv = ["probe", "--help"]
+from {module} import main
+try:
+    main()
+except SystemExit:
+    pass
+sys.stderr.write(",".join(name for name in {modules!r} if name in sys.modules))
+"""
+
+def parse_args() -> Dict[str, Any]:
+    """Parse command line arguments
+
+    Returns:
+        Dictionary of argument values
+    """
+    parser = argparse.ArgumentParser(
+        description="Test that the template tools start up within a fixed time budget"
+    )
+
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=300.0,
+        help="Maximum median wall time of a run in milliseconds (default: 300)"
+    )
+
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=5,
+        help="Number of runs per command; the median is compared (default: 5)"
+    )
+
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Show the time of every run"
+    )
+
+    return vars(parser.parse_args())
+
+def median_ms(command: List[str], runs: int, verbose: bool) -> float:
+    """Run a command several times and get the median wall time
+
+    Args:
+        command: Command line to run
+        runs: Number of runs
+        verbose: Whether to print the time of every run
+
+    Returns:
+        Median wall time in milliseconds
+    """
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+        times.append((time.perf_counter() - start) * 1000)
+    if verbose:
+        print(f"  runs: {', '.join(f'{value:.0f}ms' for value in times)}")
+    return statistics.median(times)
+
+def eager_imports(module: str) -> List[str]:
+    """Get the lazy modules a command imports for --help
+
+    Args:
+        module: Module of the command
+
+    Returns:
+        Names of the lazy modules found in sys.modules
+    """
+    probe = PROBE.format(script_dir=str(SCRIPT_DIR), module=module, modules=LAZY_MODULES)
+    result = subprocess.run([sys.executable, "-c", probe], stdout=subprocess.DEVNULL,
+                            stderr=subprocess.PIPE, text=True, check=False)
+    return [name for name in result.stderr.strip().split(",") if name]
+
+def main():
+    args = parse_args()
+    failures = []
+
+    with tempfile.TemporaryDirectory() as empty_project:
+        checks = {
+            "generate-reference-template --help": [sys.executable, str(SCRIPT_DIR / "generate-reference-template.py"), "--help"],
+            "validate-template-compliance --help": [sys.executable, str(SCRIPT_DIR / "validate-template-compliance.py"), "--help"],
+            "validate-template-compliance on an empty project": [
+                sys.executable, str(SCRIPT_DIR / "validate-template-compliance.py"), "--project-dir", empty_project]
+        }
+        for name, command in checks.items():
+            print(f"\nTiming {name}...")
+            median = median_ms(command, max(1, args["runs"]), args["verbose"])
+            if median <= args["budget_ms"]:
+                print(f"✅ {median:.0f}ms (budget {args['budget_ms']:.0f}ms)")
+            else:
+                print(f"❌ {median:.0f}ms exceeds the budget of {args['budget_ms']:.0f}ms")
+                failures.append(name)
+
+    for name, module in COMMANDS.items():
+        print(f"\nChecking the imports of the {name} for --help...")
+        eager = eager_imports(module)
+        if eager:
+            print(f"❌ Imported at startup: {', '.join(eager)}")
+            failures.append(f"{name} imports")
+        else:
+            print(f"✅ None of {', '.join(LAZY_MODULES)} imported")
+
+    # Print summary
+    print("\n=== Test Summary ===")
+    if failures:
+        print(f"❌ {len(failures)} check(s) failed: {', '.join(failures)}")
+        return 1
+    else:
+        print(f"✅ All {len(checks) + len(COMMANDS)} startup checks passed")
+        return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Task Cache Tests
+
+This script checks template_tools.task_caches against small task files and
+scripts written to a temporary directory: how tasks are classified, that
+caches and env vars are inserted with comments kept, that inserting and
+wiring twice changes nothing, and that the wired script resolves the cache
+paths against the build directory.
+
+Usage:
+    python test-task-caches.py
+
+Author: CI/CD Platform Team
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SCRIPT_DIR = Path(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from template_tools.project_sources import FilesystemSource
+from template_tools.task_caches import (CACHE_KINDS_BY_NAME, classify_task_file, insert_caches, missing_caches,
+                                        wire_script)
+from tool_checks import expect, run_checks, temp_tree
+
+PROJECT_FILES = {
+    "ci/tasks/build/task.yml": """---
+platform: linux
+
+image_resource:
+  type: registry-image
+  source:
+    repository: docker.io/library/golang
+
+inputs:
+  - name: repo
+
+params:
+  # Build flags
+  CGO_ENABLED: 0
+
+run:
+  path: repo/ci/tasks/build/task.sh
+""",
+    "ci/tasks/build/task.sh": """#!/usr/bin/env bash
+#
+# Build the binary
+#
+
+set -o errexit
+set -o pipefail
+
+"${REPO_ROOT}/ci/scripts/download.sh"
+cd repo
+""",
+    "ci/scripts/download.sh": """#!/usr/bin/env bash
+curl -sSfLo /usr/local/bin/kubectl "${KUBECTL_URL}"
+""",
+    "ci/tasks/lint/task.yml": """---
+platform: linux
+run:
+  path: bash
+  args:
+    - -c
+    - |
+      # pip install yamllint
+      helm dependency build chart
+""",
+}
+
+GO_AND_DOWNLOAD = [CACHE_KINDS_BY_NAME["go"], CACHE_KINDS_BY_NAME["download"]]
+
+BUILD_TASK_WITH_CACHES = """---
+platform: linux
+
+image_resource:
+  type: registry-image
+  source:
+    repository: docker.io/library/golang
+
+inputs:
+  - name: repo
+
+params:
+  # Build flags
+  CGO_ENABLED: 0
+  GOMODCACHE: go-cache/mod
+  GOCACHE: go-cache/build
+  DOWNLOAD_CACHE_DIR: download-cache
+
+caches:
+  - path: go-cache
+  - path: download-cache
+
+run:
+  path: repo/ci/tasks/build/task.sh
+"""
+
+def check_classify(work_dir: Path) -> None:
+    """Tasks are classified by image, task script, the project scripts it runs and inline args"""
+    source = FilesystemSource(str(work_dir))
+    _, script_path, kinds = classify_task_file(source, "ci/tasks/build/task.yml")
+    expect(script_path, "ci/tasks/build/task.sh", "script of the build task")
+    expect([kind.name for kind in kinds], ["go", "download"], "kinds of the build task")
+
+    _, script_path, kinds = classify_task_file(source, "ci/tasks/lint/task.yml")
+    expect(script_path, None, "script of the inline lint task")
+    expect([kind.name for kind in kinds], ["helm"], "kinds of the lint task (pip install is commented out)")
+
+def check_insert_caches(work_dir: Path) -> None:
+    """Caches go before run: and env vars at the end of params:, keeping comments"""
+    text = (work_dir / "ci/tasks/build/task.yml").read_text()
+    expect(insert_caches(text, GO_AND_DOWNLOAD), BUILD_TASK_WITH_CACHES, "build task with caches")
+    expect(insert_caches("platform: linux\nrun:\n  path: true\n", [CACHE_KINDS_BY_NAME["pip"]]),
+           "platform: linux\ncaches:\n  - path: pip-cache\nrun:\n  path: true\nparams:\n  PIP_CACHE_DIR: pip-cache\n",
+           "task without params or blank lines")
+
+def check_insert_idempotent(work_dir: Path) -> None:
+    """Inserting the caches of a task that declares them changes nothing"""
+    expect(insert_caches(BUILD_TASK_WITH_CACHES, GO_AND_DOWNLOAD), BUILD_TASK_WITH_CACHES, "second insert")
+    expect(missing_caches({"caches": [{"path": "go-cache"}], "params": {"GOCACHE": "go-cache/build"}},
+                          GO_AND_DOWNLOAD), GO_AND_DOWNLOAD, "kinds with a missing env var or cache")
+
+def check_wire_script(work_dir: Path) -> None:
+    """Cache env vars are resolved after the strict mode settings, once"""
+    script = (work_dir / "ci/tasks/build/task.sh").read_text()
+    wired = wire_script(script, [CACHE_KINDS_BY_NAME["go"]])
+    lines = wired.splitlines()
+    expect(lines[8:12], [
+        "# Resolve task cache directories against the build directory",
+        '[[ -z "${GOMODCACHE:-}" || "${GOMODCACHE}" == /* ]] || export GOMODCACHE="${PWD}/${GOMODCACHE}"',
+        '[[ -z "${GOCACHE:-}" || "${GOCACHE}" == /* ]] || export GOCACHE="${PWD}/${GOCACHE}"',
+        "",
+    ], "wired lines after set -o pipefail")
+    expect(wire_script(wired, [CACHE_KINDS_BY_NAME["go"]]), wired, "second wiring")
+
+    rewired = wire_script(wired, GO_AND_DOWNLOAD)
+    expect(rewired.count("# Resolve task cache directories"), 1, "wiring comments after adding a kind")
+    expect(rewired.splitlines()[11].endswith('export DOWNLOAD_CACHE_DIR="${PWD}/${DOWNLOAD_CACHE_DIR}"'), True,
+           "the new env var follows the existing wiring")
+
+def check_wired_paths(work_dir: Path) -> None:
+    """The wired script sees absolute cache paths, and keeps absolute ones as they are"""
+    script = wire_script('#!/usr/bin/env bash\nset -o errexit\necho "${GOMODCACHE} ${GOCACHE}"\n',
+                         [CACHE_KINDS_BY_NAME["go"]])
+    env = {**os.environ, "GOMODCACHE": "go-cache/mod", "GOCACHE": "/var/cache/go"}
+    result = subprocess.run(["bash", "-c", script], cwd=str(work_dir), env=env, capture_output=True, text=True)
+    expect(result.returncode, 0, f"exit code ({result.stderr.strip()})")
+    expect(result.stdout.split(), [f"{os.path.realpath(work_dir)}/go-cache/mod", "/var/cache/go"], "cache paths")
+
+CHECKS = [
+    check_classify,
+    check_insert_caches,
+    check_insert_idempotent,
+    check_wire_script,
+    check_wired_paths,
+]
+
+def main():
+    """Main entry point"""
+    run_checks("task cache", CHECKS, lambda: temp_tree(PROJECT_FILES, "task-caches-"))
+
+if __name__ == "__main__":
+    main()
@@ -2,130 +2,216 @@
 """
 Test that task filtering works correctly based on template type.
 
-This script generates templates for each template type and checks that
-only the appropriate task directories are included in each template.
+This script computes the generator's copy plan for each template type and
+checks that only the appropriate task directories are included in each
+template. The generator is imported and run in-process, nothing is written to
+disk, and no dependencies are installed: the script only verifies that they
+are importable, so it works on air-gapped runners.
 
 Usage:
-    python test-task-filtering.py
+    python test-task-filtering.py [--verbose] [--jobs N]
 """
 
+import argparse
+import hashlib
+import importlib.util
+import io
 import os
 import sys
-import shutil
-import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
 from pathlib import Path
-import tempfile
+from typing import Dict, Any, List, Set
 
-def run_command(cmd):
-    """Run a command and return its output"""
+# Modules the generator needs at runtime, and the package that provides them
+REQUIRED_MODULES = {
+    "yaml": "pyyaml"
+}
+
+TEMPLATE_TYPES = ["kustomize", "helm", "cli-tool"]
+
+SCRIPT_DIR = Path(os.path.dirname(os.path.abspath(__file__)))
+
+# State kept between test runs; TEMPLATE_TOOLS_STATE_DIR moves it, e.g. to a CI cache
+STATE_DIR = Path(os.environ.get("TEMPLATE_TOOLS_STATE_DIR") or SCRIPT_DIR / ".test-state")
+
+# Fingerprint of the last environment whose dependencies were verified
+FINGERPRINT_FILE = STATE_DIR / "test-task-filtering.env"
+
+def parse_args() -> Dict[str, Any]:
+    """Parse command line arguments
+
+    Returns:
+        Dictionary of argument values
+    """
+    parser = argparse.ArgumentParser(
+        description="Test that generated templates only include the task categories for their type"
+    )
+
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Show generator output"
+    )
+
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=len(TEMPLATE_TYPES),
+        help=f"Number of template types to check in parallel (default: {len(TEMPLATE_TYPES)})"
+    )
+
+    return vars(parser.parse_args())
+
+def environment_fingerprint() -> str:
+    """Fingerprint the interpreter and the location of the required modules
+
+    Returns:
+        Hex digest identifying the current environment
+    """
+    digest = hashlib.sha256()
+    digest.update(sys.executable.encode())
+    digest.update(sys.version.encode())
+    for path in sys.path:
+        digest.update(path.encode())
+        if os.path.isdir(path):
+            digest.update(str(os.stat(path).st_mtime_ns).encode())
+    return digest.hexdigest()
+
+def check_dependencies() -> List[str]:
+    """Verify that the required modules are importable, without installing anything
+
+    The check is skipped when the environment fingerprint matches the last
+    environment that passed, so reusing an environment costs nothing.
+
+    Returns:
+        List of missing packages
+    """
+    fingerprint = environment_fingerprint()
     try:
-        result = subprocess.run(cmd, 
-                               check=True, 
-                               shell=True, 
-                               stdout=subprocess.PIPE, 
-                               stderr=subprocess.PIPE, 
-                               universal_newlines=True)
-        return result.stdout
-    except subprocess.CalledProcessError as e:
-        print(f"Error running command: {cmd}")
-        print(f"Error output:\n{e.stderr}")
-        sys.exit(1)
-
-def check_task_directories(template_dir, template_type):
+        if FINGERPRINT_FILE.read_text() == fingerprint:
+            return []
+    except OSError:
+        pass
+
+    missing = [package for module, package in REQUIRED_MODULES.items()
+               if importlib.util.find_spec(module) is None]
+
+    if not missing:
+        try:
+            FINGERPRINT_FILE.parent.mkdir(parents=True, exist_ok=True)
+            FINGERPRINT_FILE.write_text(fingerprint)
+        except OSError:
+            # A read-only checkout only loses the shortcut
+            pass
+
+    return missing
+
+def load_generator():
+    """Import the generator module of the template_tools package
+
+    Returns:
+        Loaded generator module
+    """
+    sys.path.insert(0, str(SCRIPT_DIR))
+    return importlib.import_module("template_tools.generator")
+
+def planned_task_categories(generator_tool, template_type: str) -> Set[str]:
+    """Get the task categories the generator would copy for a template type
+
+    Args:
+        generator_tool: Loaded generator module
+        template_type: Type of template
+
+    Returns:
+        Set of task category directory names
+    """
+    generator = generator_tool.TemplateGenerator({
+        "template_type": template_type,
+        "org_name": "TestOrg",
+        "repo_name": f"test-{template_type}"
+    })
+
+    categories = set()
+    for entry in generator.copy_plan():
+        parts = entry.path.parts
+        if len(parts) > 3 and parts[:2] == ("ci", "tasks"):
+            categories.add(parts[2])
+    return categories
+
+def check_task_directories(task_categories: Set[str], template_type: str) -> bool:
     """Check that only the appropriate task directories exist"""
     # Common tasks that should be in all templates
     common_tasks = ["common", "tkgi", "testing"]
-    
+
     # Template-specific tasks - note that some template-specific tasks are in the common directory
     template_specific_tasks = {
-        "kustomize": [],
+        "kustomize": ["k8s"],
         "helm": ["helm", "k8s"],
         "cli-tool": ["cli-tool"]
     }
-    
-    # Get all task category directories
-    task_dir = Path(template_dir) / "ci" / "tasks"
-    if not task_dir.exists():
-        print(f"ERROR: Task directory not found at {task_dir}")
-        return False
-    
-    task_categories = [d.name for d in task_dir.iterdir() if d.is_dir()]
-    
+
     # Check that all expected task categories exist
     expected_categories = common_tasks + template_specific_tasks.get(template_type, [])
     missing_categories = [c for c in expected_categories if c not in task_categories]
     if missing_categories:
         print(f"ERROR: Missing expected task categories: {missing_categories}")
         return False
-    
+
     # Check that no unexpected task categories exist
-    unexpected_categories = [c for c in task_categories if c not in expected_categories]
+    unexpected_categories = sorted(c for c in task_categories if c not in expected_categories)
     if unexpected_categories:
         print(f"ERROR: Found unexpected task categories: {unexpected_categories}")
         return False
-    
+
     # Check for task directories from other template types
     other_template_types = [t for t in template_specific_tasks.keys() if t != template_type]
     other_template_tasks = []
     for t in other_template_types:
-        other_template_tasks.extend(template_specific_tasks[t])
-    
-    wrong_template_categories = [c for c in task_categories if c in other_template_tasks]
+        other_template_tasks.extend(c for c in template_specific_tasks[t] if c not in expected_categories)
+
+    wrong_template_categories = sorted(c for c in task_categories if c in other_template_tasks)
     if wrong_template_categories:
         print(f"ERROR: Found task categories from other template types: {wrong_template_categories}")
         return False
-    
+
     return True
 
 def main():
-    # Get the script directory
-    script_dir = Path(os.path.dirname(os.path.abspath(__file__)))
-    repo_root = script_dir.parent
-    
-    # Create virtual environment if needed and activate it
-    venv_dir = repo_root / ".venv"
-    if not venv_dir.exists():
-        print("Creating virtual environment...")
-        run_command(f"cd {repo_root} && python3 -m venv .venv")
-    
-    # Install required dependencies
-    print("Installing dependencies...")
-    run_command(f"cd {repo_root} && source .venv/bin/activate && pip install pyyaml")
-    
-    # Test each template type
-    template_types = ["kustomize", "helm", "cli-tool"]
+    args = parse_args()
+
+    # Verify dependencies instead of installing them
+    missing = check_dependencies()
+    if missing:
+        print(f"❌ Missing dependencies: {', '.join(missing)}")
+        print("Install them into the active environment (e.g. `make setup`) and re-run the test.")
+        return 1
+
+    generator_tool = load_generator()
+
+    # Compute the copy plan for each template type in parallel
+    output = sys.stdout if args["verbose"] else io.StringIO()
+    with redirect_stdout(output), ThreadPoolExecutor(max_workers=max(1, args["jobs"])) as executor:
+        plans = dict(zip(TEMPLATE_TYPES, executor.map(
+            lambda template_type: planned_task_categories(generator_tool, template_type), TEMPLATE_TYPES)))
+
     failures = []
-    
-    for template_type in template_types:
+    for template_type in TEMPLATE_TYPES:
         print(f"\nTesting {template_type} template...")
-        
-        # Create a temporary directory for the template
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Generate the template
-            cmd = f"cd {repo_root} && source .venv/bin/activate && "
-            cmd += f"python {script_dir}/generate-reference-template.py "
-            cmd += f"--output-dir {temp_dir} --template-type {template_type} "
-            cmd += f"--org-name TestOrg --repo-name test-{template_type}"
-            
-            print(f"Generating template in {temp_dir}...")
-            run_command(cmd)
-            
-            # Check the task directories
-            print(f"Checking task directories...")
-            if check_task_directories(temp_dir, template_type):
-                print(f"✅ {template_type} template passed task filtering test")
-            else:
-                print(f"❌ {template_type} template failed task filtering test")
-                failures.append(template_type)
-    
+        if check_task_directories(plans[template_type], template_type):
+            print(f"✅ {template_type} template passed task filtering test")
+        else:
+            print(f"❌ {template_type} template failed task filtering test")
+            failures.append(template_type)
+
     # Print summary
     print("\n=== Test Summary ===")
     if failures:
         print(f"❌ {len(failures)} template(s) failed: {', '.join(failures)}")
         return 1
     else:
-        print(f"✅ All {len(template_types)} templates passed task filtering tests")
+        print(f"✅ All {len(TEMPLATE_TYPES)} templates passed task filtering tests")
         return 0
 
 if __name__ == "__main__":
-    sys.exit(main())
\ No newline at end of file
+    sys.exit(main())
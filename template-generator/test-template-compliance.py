@@ -2,27 +2,44 @@
 """
 Template Compliance Testing Script
 
-This script tests that projects created by generate-reference-template.py 
+This script tests that projects created by generate-reference-template.py
 pass validation with validate-template-compliance.py.
 
+Both tools are imported and run in-process. Each template type is generated
+and validated in its own worker process, and the generated project is kept in
+memory (or on tmpfs with --on-disk), so the check is fast enough to run on
+every change to reference/.
+
 Usage:
-    python test-template-compliance.py [--verbose]
+    python test-template-compliance.py [--verbose] [--jobs N] [--on-disk]
 
 Author: CI/CD Platform Team
 """
 
 import argparse
+import importlib
+import io
 import os
 import sys
-import shutil
 import tempfile
-import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any, List, Tuple, Set
+from types import ModuleType
+from typing import Dict, Any, Optional
 
 # Template types to test
 TEMPLATE_TYPES = ["kustomize", "helm", "cli-tool"]
 
+SCRIPT_DIR = Path(os.path.dirname(os.path.abspath(__file__)))
+
+# The tools are imported from the template_tools package next to this script
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from template_tools.project_sources import MemorySource
+
 def parse_args() -> Dict[str, Any]:
     """Parse command line arguments
 
@@ -32,154 +49,156 @@ def parse_args() -> Dict[str, Any]:
     parser = argparse.ArgumentParser(
         description="Test that generated templates pass validation"
     )
-    
+
     parser.add_argument(
         "--verbose",
         action="store_true",
         help="Enable verbose output"
     )
-    
+
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=len(TEMPLATE_TYPES),
+        help=f"Number of template types to test in parallel (default: {len(TEMPLATE_TYPES)})"
+    )
+
+    parser.add_argument(
+        "--on-disk",
+        action="store_true",
+        help="Write generated projects to tmpfs and validate the files instead of the in-memory tree"
+    )
+
     return vars(parser.parse_args())
 
-def run_generator(template_type: str, output_dir: Path, verbose: bool) -> bool:
-    """Run the template generator for a specific template type
+@lru_cache(maxsize=None)
+def load_tool(name: str) -> ModuleType:
+    """Import one of the modules of the template_tools package
 
     Args:
-        template_type: Type of template to generate
-        output_dir: Directory where the template should be generated
-        verbose: Whether to show verbose output
+        name: Module name, e.g. generator
 
     Returns:
-        Boolean indicating success or failure
+        Loaded module
     """
-    cmd = [
-        sys.executable,
-        "generate-reference-template.py",
-        "--output-dir", str(output_dir),
-        "--template-type", template_type,
-        "--org-name", "TestOrg",
-        "--repo-name", f"test-{template_type}"
-    ]
-    
-    try:
-        result = subprocess.run(
-            cmd,
-            stdout=subprocess.PIPE if not verbose else None,
-            stderr=subprocess.PIPE if not verbose else None,
-            text=True,
-            check=True
-        )
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"Error generating {template_type} template: {e}")
-        if not verbose:
-            print(f"Stdout: {e.stdout}")
-            print(f"Stderr: {e.stderr}")
-        return False
+    return importlib.import_module(f"template_tools.{name}")
+
+def tmpfs_dir() -> Optional[str]:
+    """Get a memory-backed directory for temporary projects, if available
 
-def run_validator(template_type: str, project_dir: Path, verbose: bool) -> Tuple[bool, List[str]]:
-    """Run the template validator on a project directory
+    Returns:
+        Path to a tmpfs directory, or None to use the default temp directory
+    """
+    shm = Path("/dev/shm")
+    if shm.is_dir() and os.access(shm, os.W_OK):
+        return str(shm)
+    return None
+
+def check_template_type(template_type: str, on_disk: bool = False, verbose: bool = False) -> Dict[str, Any]:
+    """Generate and validate a template type in-process
 
     Args:
-        template_type: Type of template to validate against
-        project_dir: Directory of the project to validate
-        verbose: Whether to show verbose output
+        template_type: Type of template to test
+        on_disk: Whether to write the generated project to tmpfs before validating
+        verbose: Whether to show generator and validator output
 
     Returns:
-        Tuple of (success, issues_list)
+        Dictionary with the template type, the validator's issues, any error
+        raised while generating or validating, and the elapsed time
     """
-    cmd = [
-        sys.executable,
-        "validate-template-compliance.py",
-        "--project-dir", str(project_dir),
-        "--template-type", template_type
-    ]
-    
-    if verbose:
-        cmd.append("--verbose")
-    
+    generator_tool = load_tool("generator")
+    validator_tool = load_tool("validator")
+
+    config = {
+        "template_type": template_type,
+        "org_name": "TestOrg",
+        "repo_name": f"test-{template_type}",
+        "output_dir": f"test-{template_type}"
+    }
+
+    start = time.perf_counter()
+    output = sys.stdout if verbose else io.StringIO()
+    issues = []
+    error = None
+
     try:
-        result = subprocess.run(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
-        
-        if result.returncode != 0:
-            # Validation failed, extract issues
-            issues = []
-            for line in result.stdout.splitlines():
-                if line.strip().startswith(("1.", "2.", "3.")) and ". " in line:
-                    issues.append(line.strip())
-            return False, issues
-        else:
-            return True, []
-    except subprocess.CalledProcessError as e:
-        print(f"Error validating {template_type} template: {e}")
-        print(f"Stdout: {e.stdout}")
-        print(f"Stderr: {e.stderr}")
-        return False, ["Validator execution failed"]
-
-def test_template_type(template_type: str, verbose: bool) -> bool:
-    """Test a specific template type for compliance
+        with redirect_stdout(output):
+            if on_disk:
+                with tempfile.TemporaryDirectory(dir=tmpfs_dir()) as temp_dir:
+                    config["output_dir"] = str(Path(temp_dir) / f"test-{template_type}")
+                    generator_tool.TemplateGenerator(config).generate_template()
+                    validator = validator_tool.TemplateValidator(config["output_dir"], template_type, verbose)
+                    issues = validator.validate()
+            else:
+                tree = generator_tool.TemplateGenerator(config).render_tree()
+                source = MemorySource(tree, label=f"<test-{template_type}>")
+                validator = validator_tool.TemplateValidator(source.label, template_type, verbose, source=source)
+                issues = validator.validate()
+    except (Exception, SystemExit) as e:
+        error = f"{type(e).__name__}: {e}"
+
+    return {
+        "template_type": template_type,
+        "issues": [issue.to_dict() for issue in issues],
+        "error": error,
+        "seconds": time.perf_counter() - start
+    }
+
+def print_result(result: Dict[str, Any]) -> bool:
+    """Print the result of testing a template type
 
     Args:
-        template_type: Type of template to test
-        verbose: Whether to show verbose output
+        result: Result returned by check_template_type
 
     Returns:
         Boolean indicating success or failure
     """
-    print(f"\n===== Testing {template_type} template =====")
-    
-    # Create temporary directory
-    with tempfile.TemporaryDirectory() as temp_dir:
-        output_dir = Path(temp_dir) / f"test-{template_type}"
-        
-        # Run generator
-        print(f"Generating {template_type} template in {output_dir}")
-        if not run_generator(template_type, output_dir, verbose):
-            print(f"❌ Failed to generate {template_type} template")
-            return False
-            
-        # Run validator
-        print(f"Validating {template_type} template")
-        success, issues = run_validator(template_type, output_dir, verbose)
-        
-        if success:
-            print(f"✅ {template_type} template passed validation")
-            return True
-        else:
-            print(f"❌ {template_type} template failed validation")
-            print(f"Issues found:")
-            for issue in issues:
-                print(f"  - {issue}")
-            return False
+    template_type = result["template_type"]
+    print(f"\n===== Testing {template_type} template ({result['seconds']:.2f}s) =====")
+
+    if result["error"]:
+        print(f"❌ Failed to generate or validate {template_type} template: {result['error']}")
+        return False
+
+    if not result["issues"]:
+        print(f"✅ {template_type} template passed validation")
+        return True
+
+    print(f"❌ {template_type} template failed validation")
+    print("Issues found:")
+    for issue in result["issues"]:
+        print(f"  - [{issue['category'].upper()}] {issue['message']}")
+    return False
 
 def main():
     """Main entry point"""
     args = parse_args()
     verbose = args.get("verbose", False)
-    
+    jobs = max(1, min(args["jobs"], len(TEMPLATE_TYPES)))
+
     print("Starting template compliance testing...")
-    
-    # Test each template type
-    results = {}
-    for template_type in TEMPLATE_TYPES:
-        results[template_type] = test_template_type(template_type, verbose)
-    
+
+    # Test each template type, in parallel worker processes unless a single job is requested
+    if jobs == 1:
+        results = [check_template_type(t, args["on_disk"], verbose) for t in TEMPLATE_TYPES]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = [executor.submit(check_template_type, t, args["on_disk"], verbose) for t in TEMPLATE_TYPES]
+            results = [future.result() for future in futures]
+
+    passed = {result["template_type"]: print_result(result) for result in results}
+
     # Print summary
     print("\n===== Test Results =====")
     all_passed = True
-    for template_type, success in results.items():
+    for template_type, success in passed.items():
         status = "✅ Passed" if success else "❌ Failed"
         print(f"{template_type}: {status}")
         if not success:
             all_passed = False
-    
+
     # Exit with appropriate code
     sys.exit(0 if all_passed else 1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
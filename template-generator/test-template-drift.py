@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Template Drift Tests
+
+This script checks template_tools.template_drift against small trees written
+inline and detect-template-drift.py against a freshly generated project: how
+directory hashes cover their children, which files are reported as added,
+removed or modified, that identical subtrees are skipped, and that an
+untouched project has no drift until one of its files is edited.
+
+Usage:
+    python test-template-drift.py
+
+Author: CI/CD Platform Team
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List
+
+SCRIPT_DIR = Path(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from template_tools.project_sources import MemorySource
+from template_tools.template_drift import DriftReport, MerkleTree, compare_project, compare_trees
+from tool_checks import expect, run_checks
+
+EXPECTED = {
+    "ci/scripts/fly.sh": "#!/usr/bin/env bash\necho \"my-service\"\n",
+    "ci/scripts/lib/logging.sh": "#!/usr/bin/env bash\n",
+    "ci/tasks/deploy/task.yml": "---\nplatform: linux\n",
+    "ci/tasks/build/task.yml": "---\nplatform: linux\n",
+    "README.md": "# my-service\n",
+    "GUIDE.md": "# Guide\n",
+}
+
+def drifted(changes: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy the expected contents with files changed, added or removed (None)"""
+    contents = {**EXPECTED, **changes}
+    return {path: content for path, content in contents.items() if content is not None}
+
+def check_merkle_tree() -> None:
+    """Directory hashes cover the names and content of their children, not the order they were added in"""
+    tree = MerkleTree.from_contents(EXPECTED)
+    expect(tree.hash, MerkleTree.from_contents(dict(reversed(list(EXPECTED.items())))).hash, "hash in reverse order")
+    expect(list(tree.dirs["ci"].leaves("ci")), ["ci/scripts/fly.sh", "ci/scripts/lib/logging.sh",
+                                                "ci/tasks/build/task.yml", "ci/tasks/deploy/task.yml"], "leaves of ci")
+
+    edited = MerkleTree.from_contents(drifted({"ci/scripts/fly.sh": "#!/usr/bin/env bash\n"}))
+    expect(edited.hash != tree.hash, True, "root hash after editing fly.sh changed")
+    expect(edited.dirs["ci"].dirs["tasks"].hash, tree.dirs["ci"].dirs["tasks"].hash, "hash of the untouched ci/tasks")
+
+    renamed = MerkleTree.from_contents(drifted({"README.md": None, "readme.md": EXPECTED["README.md"]}))
+    expect(renamed.hash != tree.hash, True, "root hash after renaming README.md changed")
+    expect(list(MerkleTree.from_contents(EXPECTED, excludes=["GUIDE.md", "ci"]).leaves()), ["README.md"],
+           "leaves with GUIDE.md and ci excluded")
+
+def compare(actual: Dict[str, Any]) -> DriftReport:
+    """Compare a tree of contents with the expected one"""
+    report = DriftReport("demo")
+    compare_trees(MerkleTree.from_contents(EXPECTED), MerkleTree.from_contents(actual), report)
+    return report
+
+def check_compare_trees() -> None:
+    """Added, removed and modified files are reported, identical subtrees are skipped"""
+    report = compare(EXPECTED)
+    expect((report.total, report.nodes_compared), (0, 1), "differences and nodes compared for identical trees")
+
+    report = compare(drifted({"ci/tasks/deploy/task.yml": "---\nplatform: windows\n",
+                              "ci/tasks/test/task.yml": "---\n", "README.md": None}))
+    expect((report.added, report.removed, report.modified),
+           (["ci/tasks/test/task.yml"], ["README.md"], ["ci/tasks/deploy/task.yml"]), "differences")
+    # root, ci and ci/tasks differ; ci/scripts and the task directories are compared once each
+    expect(report.nodes_compared, 6, "nodes compared")
+
+    # A file replaced by a directory of the same name
+    report = compare(drifted({"README.md": None, "README.md/index.md": "# my-service\n"}))
+    expect((report.added, report.removed), (["README.md/index.md"], ["README.md"]), "file replaced by a directory")
+
+def check_compare_project() -> None:
+    """Only the top-level names of the template are read from the project, excludes are skipped"""
+    source = MemorySource(drifted({"src/main.go": "package main\n", "GUIDE.md": "# Edited guide\n"}))
+    report = compare_project(MerkleTree.from_contents(EXPECTED, excludes=["GUIDE.md"]), source, ["GUIDE.md"])
+    expect(report.to_dict(), {"project": "<memory>", "added": [], "removed": [], "modified": [],
+                              "nodes_compared": 1}, "report without application code and GUIDE.md")
+
+def detect_drift(project_dir: Path) -> List[Dict[str, Any]]:
+    """Run detect-template-drift.py on a project, returning its NDJSON reports"""
+    result = subprocess.run([sys.executable, str(SCRIPT_DIR / "detect-template-drift.py"),
+                             "--project-dir", str(project_dir), "--ndjson-file", "-"],
+                            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    return [json.loads(line) for line in result.stdout.splitlines()]
+
+def check_generated_project() -> None:
+    """A generated project has no drift until a file is edited, then exactly that file is modified"""
+    with tempfile.TemporaryDirectory(prefix="template-drift-") as temp_dir:
+        # The generator's default repo_name is my-service, the name drift detection assumes for this directory
+        project_dir = Path(temp_dir) / "my-service"
+        subprocess.run([sys.executable, str(SCRIPT_DIR / "generate-reference-template.py"),
+                        "--output-dir", str(project_dir), "--template-type", "kustomize"],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        expect([(report["added"], report["removed"], report["modified"]) for report in detect_drift(project_dir)],
+               [([], [], [])], "drift of the untouched project")
+
+        with open(project_dir / "scripts" / "build.sh", "a") as f:
+            f.write("# Local change\n")
+        expect([(report["added"], report["removed"], report["modified"]) for report in detect_drift(project_dir)],
+               [([], [], ["scripts/build.sh"])], "drift after editing scripts/build.sh")
+
+CHECKS = [
+    check_merkle_tree,
+    check_compare_trees,
+    check_compare_project,
+    check_generated_project,
+]
+
+def main():
+    """Main entry point"""
+    run_checks("template drift", CHECKS)
+
+if __name__ == "__main__":
+    main()
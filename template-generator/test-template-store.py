@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Template Store Tests
+
+This script checks template_tools.template_store against small template
+layers written to a temporary directory: that identical files are stored as
+one blob, how blobs are tokenized and rendered, and which shared files are
+reported as diverged between layers.
+
+Usage:
+    python test-template-store.py
+
+Author: CI/CD Platform Team
+"""
+
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict
+
+SCRIPT_DIR = Path(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from template_tools.template_store import (SHARED_PATTERNS, TemplateStore, divergence, reference_layers,
+                                           variant_diff)
+from tool_checks import expect, run_checks, temp_tree
+
+LOGGING = "#!/usr/bin/env bash\nfunction info() { echo \"INFO: $*\"; }\n"
+
+# Files of each layer; cli-tool has no directory
+LAYERS: Dict[str, Dict[str, Any]] = {
+    "pipeline": {
+        "ci/scripts/lib/logging.sh": LOGGING,
+        "ci/scripts/fly.sh": "#!/usr/bin/env bash\necho \"${REPO_NAME}\"\n",
+        "ci/tasks/common/cleanup/task.sh": "#!/usr/bin/env bash\nrm -rf work\n",
+        "ci/tasks/common/notify/icon.png": b"\x89PNG\0first",
+        "README.md": "# Reference pipeline\n",
+    },
+    "templates/kustomize": {
+        "ci/scripts/lib/logging.sh": LOGGING,
+        "ci/scripts/fly.sh": "#!/usr/bin/env bash\necho \"${REPO_NAME}\"\n",
+        "ci/tasks/common/cleanup/task.sh": "#!/usr/bin/env bash\nrm -rf work output\n",
+        "ci/tasks/common/notify/icon.png": b"\x89PNG\0second",
+        "README.md": "# Kustomize template\n",
+    },
+    "templates/helm": {
+        "ci/scripts/lib/logging.sh": LOGGING,
+        "ci/scripts/fly.sh": "#!/usr/bin/env bash\nset -o errexit\necho \"${REPO_NAME}\"\n",
+        "README.md": "# Helm template\n",
+    },
+}
+
+# The reference directory of each check
+REFERENCE_FILES = {f"{layer}/{rel_path}": content for layer, files in LAYERS.items()
+                   for rel_path, content in files.items()}
+
+def check_manifest(reference_dir: Path) -> None:
+    """Layers are read once and identical files share one blob"""
+    store = TemplateStore()
+    layers = reference_layers(reference_dir)
+    expect(list(layers), ["pipeline", "kustomize", "helm"], "layers (cli-tool has no directory)")
+
+    manifests = {name: store.manifest(directory) for name, directory in layers.items()}
+    if store.manifest(layers["helm"]) is not manifests["helm"]:
+        raise AssertionError("a layer was read twice")
+    expect(list(manifests["helm"]), ["README.md", "ci/scripts/fly.sh", "ci/scripts/lib/logging.sh"], "helm paths")
+    expect(manifests["helm"]["ci/scripts/lib/logging.sh"],
+           manifests["pipeline"]["ci/scripts/lib/logging.sh"], "logging.sh entries")
+    expect(manifests["helm"]["ci/scripts/fly.sh"].executable, True, "fly.sh is executable")
+    expect(manifests["helm"]["README.md"].executable, False, "README.md is not executable")
+    contents = [content if isinstance(content, bytes) else content.encode() for files in LAYERS.values()
+                for content in files.values()]
+    expect(store.stats(), {"layers": 3, "files": 13, "file_bytes": sum(map(len, contents)),
+                           "blobs": 10, "blob_bytes": sum(map(len, set(contents)))}, "stats")
+
+def check_render(reference_dir: Path) -> None:
+    """Blobs are split into ${VAR} tokens and rendered once per set of values"""
+    store = TemplateStore()
+    manifest = store.manifest(reference_dir / "pipeline")
+    blob = manifest["ci/scripts/fly.sh"].blob
+    expect(store.variables(blob), ("REPO_NAME",), "variables of fly.sh")
+
+    first = store.render(blob, {"REPO_NAME": "my-service"}.get)
+    expect(first, "#!/usr/bin/env bash\necho \"my-service\"\n", "rendered fly.sh")
+    if store.render(blob, {"REPO_NAME": "my-service"}.get) is not first:
+        raise AssertionError("the same values rendered a new string")
+    expect(store.render(blob, {"REPO_NAME": "other"}.get), "#!/usr/bin/env bash\necho \"other\"\n",
+           "fly.sh rendered with other values")
+
+    png = manifest["ci/tasks/common/notify/icon.png"].blob
+    expect((store.text(png), store.render(png, str)), (None, None), "a binary blob")
+
+def check_divergence(reference_dir: Path) -> None:
+    """Shared files with more than one variant are reported, the variant most layers use first"""
+    store = TemplateStore()
+    report = {item.path: item for item in divergence(store, reference_layers(reference_dir), SHARED_PATTERNS)}
+    expect(sorted(report), ["ci/scripts/fly.sh", "ci/tasks/common/cleanup/task.sh", "ci/tasks/common/notify/icon.png"],
+           "diverged files (README.md is not shared, logging.sh is identical)")
+    expect([names for _, names in report["ci/scripts/fly.sh"].variants], [["pipeline", "kustomize"], ["helm"]],
+           "variants of fly.sh")
+    expect(report["ci/scripts/fly.sh"].missing, [], "layers without fly.sh")
+    expect([names for _, names in report["ci/tasks/common/cleanup/task.sh"].variants], [["pipeline"], ["kustomize"]],
+           "variants of cleanup/task.sh (a tie goes to the first layer)")
+    expect(report["ci/tasks/common/cleanup/task.sh"].missing, ["helm"], "layers without cleanup/task.sh")
+
+def check_variant_diff(reference_dir: Path) -> None:
+    """Variants are diffed against the canonical variant"""
+    store = TemplateStore()
+    report = {item.path: item for item in divergence(store, reference_layers(reference_dir), SHARED_PATTERNS)}
+    fly = report["ci/scripts/fly.sh"]
+    expect(variant_diff(store, fly, fly.variants[1][0]), [
+        "--- pipeline+kustomize/ci/scripts/fly.sh\n",
+        "+++ helm/ci/scripts/fly.sh\n",
+        "@@ -1,2 +1,3 @@\n",
+        " #!/usr/bin/env bash\n",
+        "+set -o errexit\n",
+        " echo \"${REPO_NAME}\"\n",
+    ], "diff of the helm fly.sh")
+    icon = report["ci/tasks/common/notify/icon.png"]
+    expect(variant_diff(store, icon, icon.variants[1][0]), ["Binary files ci/tasks/common/notify/icon.png differ\n"],
+           "diff of a binary file")
+
+CHECKS = [
+    check_manifest,
+    check_render,
+    check_divergence,
+    check_variant_diff,
+]
+
+def main():
+    """Main entry point"""
+    run_checks("template store", CHECKS, lambda: temp_tree(REFERENCE_FILES, "template-store-"))
+
+if __name__ == "__main__":
+    main()
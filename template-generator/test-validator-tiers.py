@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Validator Tier Tests
+
+This script checks the cost tiers, latency budget and changed files of
+template_tools.validator against a small project written to a temporary
+directory: that --tier selects the checks run, that changed files limit the
+per-file checks but not the graph checks, and that checks skipped to stay
+within --budget-ms are listed with a command that runs them later.
+
+Usage:
+    python test-validator-tiers.py
+
+Author: CI/CD Platform Team
+"""
+
+import io
+import json
+import os
+import shlex
+import subprocess
+import sys
+from pathlib import Path
+from typing import List, Set, Tuple
+
+SCRIPT_DIR = Path(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from template_tools.validator import CHECKS as VALIDATOR_CHECKS, ConsoleSink, TemplateValidator
+from tool_checks import expect, run_checks, temp_tree
+
+SCRIPT = "#!/usr/bin/env bash\necho \"building\"\n"
+
+# Neither script sets strict mode, and the go build refetches its modules
+PROJECT_FILES = {
+    "ci/scripts/build.sh": SCRIPT,
+    "ci/scripts/deploy.sh": SCRIPT,
+    "ci/tasks/build/task.yml": "---\nplatform: linux\nrun:\n  path: repo/ci/tasks/build/task.sh\n",
+    "ci/tasks/build/task.sh": "#!/usr/bin/env bash\nset -o errexit\nset -o pipefail\ngo build ./...\n",
+    "ci/pipelines/main.yml": "---\njobs:\n  - name: build\n    plan:\n      - task: build\n        file: repo/ci/tasks/build/task.yml\n",
+}
+
+def validate(command: List[str]) -> Tuple[int, Set[Tuple[str, str]], str]:
+    """Run validate-template-compliance.py, returning its exit code, the checks and paths of its issues and its output"""
+    result = subprocess.run([sys.executable, *command, "--ndjson-file", "-", "--summary-only"], cwd=SCRIPT_DIR,
+                            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    records = [json.loads(line) for line in result.stdout.splitlines() if line.startswith("{")]
+    issues = {(record["check"], record["path"]) for record in records if record["type"] == "issue"}
+    return result.returncode, issues, result.stdout
+
+def project_command(project_dir: Path, *args: str) -> List[str]:
+    """Build the command validating a project with the given extra arguments"""
+    return ["validate-template-compliance.py", "--project-dir", str(project_dir), "--template-type", "kustomize", *args]
+
+def checks_of(issues: Set[Tuple[str, str]]) -> List[str]:
+    """List the checks that reported issues, in the order of the validator's checks"""
+    return [check for check in VALIDATOR_CHECKS if any(issue[0] == check for issue in issues)]
+
+def check_tiers(project_dir: Path) -> None:
+    """Only the checks of the selected tiers run, and an unknown tier is an error"""
+    _, issues, _ = validate(project_command(project_dir, "--check-caches"))
+    expect(checks_of(issues), ["directory_structure", "required_files", "script_standards", "fly_script",
+                               "pipeline_files", "task_files", "task_caches"], "checks of all tiers")
+
+    _, issues, _ = validate(project_command(project_dir, "--check-caches", "--tier", "stat,graph"))
+    expect(checks_of(issues), ["directory_structure", "required_files", "task_caches"], "checks of stat,graph")
+
+    _, issues, _ = validate(project_command(project_dir, "--tier", "regex", "--tier", "parse"))
+    expect(checks_of(issues), ["script_standards", "fly_script", "pipeline_files", "task_files"],
+           "checks of repeated --tier regex and parse")
+
+    returncode, _, output = validate(project_command(project_dir, "--tier", "stat,bogus"))
+    expect((returncode, "Unknown tier bogus, choose from stat, regex, parse, graph" in output), (2, True),
+           "exit code and error of an unknown tier")
+
+def check_changed_files(project_dir: Path) -> None:
+    """Changed files limit the per-file checks to them, graph checks still read the whole project"""
+    _, issues, _ = validate(project_command(project_dir, "--check-caches", str(project_dir / "ci/scripts/build.sh")))
+    expect(sorted(issue for issue in issues if issue[0] not in ["directory_structure", "required_files"]),
+           [("script_standards", "ci/scripts/build.sh"), ("task_caches", "ci/tasks/build/task.yml")],
+           "issues of the checks reading build.sh")
+
+    # The fly.sh, pipeline and task checks do not read README.md, the stat checks always run
+    _, issues, _ = validate(project_command(project_dir, "--check-caches", str(project_dir / "README.md")))
+    expect(checks_of(issues), ["directory_structure", "required_files"], "checks run for a changed README.md")
+
+    returncode, _, output = validate(project_command(project_dir, "/etc/hosts"))
+    expect((returncode, f"Changed file /etc/hosts is outside {project_dir}" in output), (2, True),
+           "exit code and error of a file outside the project")
+
+def check_budget(project_dir: Path) -> None:
+    """Checks that do not fit the latency budget are skipped and listed with a command that runs them later"""
+    output = io.StringIO()
+    validator = TemplateValidator(str(project_dir), "kustomize", sinks=[ConsoleSink(output)], check_caches=True,
+                                  changed_files=["ci/scripts/build.sh"], budget_ms=0.001)
+    expect(validator.validate(), [], "issues within a used up budget")
+    expect([(skipped.check, skipped.tier) for skipped in validator.summary.skipped],
+           [("directory_structure", "stat"), ("required_files", "stat"), ("script_standards", "regex"),
+            ("task_caches", "graph")], "skipped checks")
+
+    lines = output.getvalue().splitlines()
+    expect(lines[1], "⏭  Skipped 4 check(s) to stay within the latency budget:", "skipped summary")
+    later = [line for line in lines if line.startswith("Run them later with: ")]
+    expect(later, [f"Run them later with: python validate-template-compliance.py --project-dir {project_dir} "
+                   f"--template-type kustomize --tier stat,regex,graph --check-caches "
+                   f"{project_dir / 'ci/scripts/build.sh'}"], "command to run the skipped checks later")
+
+    # The command runs the skipped checks on the changed file, and nothing else
+    _, issues, output = validate(shlex.split(later[0][len("Run them later with: python "):]))
+    expect((checks_of(issues), "Skipped" in output),
+           (["directory_structure", "required_files", "script_standards", "task_caches"], False),
+           "checks reporting issues when run later")
+    expect(sorted(path for check, path in issues if check == "script_standards"), ["ci/scripts/build.sh"],
+           "scripts checked when run later")
+
+    validator = TemplateValidator(str(project_dir), "kustomize", collect=False, budget_ms=60000)
+    validator.validate()
+    expect(validator.summary.skipped, [], "checks skipped within a minute")
+
+CHECKS = [
+    check_tiers,
+    check_changed_files,
+    check_budget,
+]
+
+def main():
+    """Main entry point"""
+    run_checks("validator tier", CHECKS, lambda: temp_tree(PROJECT_FILES, "validator-tiers-"))
+
+if __name__ == "__main__":
+    main()
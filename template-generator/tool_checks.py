@@ -0,0 +1,83 @@
+"""
+Check Runner for the Analysis Tool Tests
+
+The test-<module>.py scripts run a list of checks against small pipelines,
+task files and params written inline. Each check is a function whose
+docstring says what it checks; a check fails by raising, and the runner
+reports every failed check with the expected and actual values instead of
+stopping at the first one.
+
+Usage:
+    run_checks("job graph", [check_critical_path, check_cycle])
+    run_checks("params coverage", CHECKS, lambda: temp_tree(FILES, "params-coverage-"))
+
+Author: CI/CD Platform Team
+"""
+
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, ContextManager, Dict, Iterator, List, Optional, Union
+
+def expect(actual: Any, expected: Any, what: str) -> None:
+    """Fail a check when a value differs from the expected one"""
+    if actual != expected:
+        raise AssertionError(f"{what}: expected {expected!r}, got {actual!r}")
+
+def expect_error(action: Callable[[], Any], message: str, what: str) -> None:
+    """Fail a check unless an action raises a ValueError whose message starts with the given text"""
+    try:
+        action()
+    except ValueError as e:
+        if not str(e).startswith(message):
+            raise AssertionError(f"error of {what}: expected {message!r}, got {str(e)!r}")
+    else:
+        raise AssertionError(f"{what} was accepted")
+
+def write_files(root: Path, files: Dict[str, Union[str, bytes]]) -> None:
+    """Write a tree of files below a directory, making shell scripts executable"""
+    for rel_path, content in files.items():
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if isinstance(content, bytes):
+            path.write_bytes(content)
+        else:
+            path.write_text(content)
+        if rel_path.endswith(".sh"):
+            path.chmod(0o755)
+
+@contextmanager
+def temp_tree(files: Dict[str, Union[str, bytes]], prefix: str = "tool-checks-") -> Iterator[Path]:
+    """Write a tree of files to a temporary directory, removed afterwards"""
+    with tempfile.TemporaryDirectory(prefix=prefix) as temp_dir:
+        root = Path(temp_dir)
+        write_files(root, files)
+        yield root
+
+def run_checks(name: str, checks: List[Callable[..., None]],
+               fixture: Optional[Callable[[], ContextManager[Any]]] = None) -> None:
+    """Run checks, print their results and exit non-zero if any failed
+
+    Args:
+        name: Name of the checked module in the summary, e.g. "job graph"
+        checks: Check functions
+        fixture: Context manager factory whose value each check gets, set up
+            anew for every check (default: checks take no argument)
+    """
+    failed = 0
+
+    for check in checks:
+        try:
+            if fixture is None:
+                check()
+            else:
+                with fixture() as value:
+                    check(value)
+            print(f"✅ {check.__doc__}")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {check.__doc__}\n   {type(e).__name__}: {e}")
+
+    print(f"\n{len(checks) - failed}/{len(checks)} {name} checks passed")
+    sys.exit(1 if failed else 0)